@@ -0,0 +1,122 @@
+"""
+Benchmark de los backends de almacenamiento (utils.almacenamiento).
+
+Contra un servidor S3 local (utils.servidor_s3) con una latencia fija por
+pedido, como la de un servicio remoto, compara subir las evaluaciones de a una
+abriendo una conexión por objeto, de a una reutilizando la conexión, y en lote
+con el pool de conexiones en paralelo. Mide también lo que espera quien guarda
+una evaluación con la escritura diferida frente a escribir directo al backend,
+los lotes en los backends local y SQLite, y una subida multiparte ida y vuelta.
+
+Uso:
+    python benchmarks/bench_almacenamiento.py [n_evaluaciones] [latencia_ms]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from utils.almacenamiento import (
+    AlmacenamientoLocal,
+    AlmacenamientoSQLite,
+    EscrituraDiferida,
+    clave_evaluacion,
+    serializar_evaluacion,
+)
+from utils.servidor_s3 import ServidorS3Local
+
+
+def _fila(nombre: str, segundos: float, n: int, conexiones: int = None) -> None:
+    extra = f"{conexiones:>6} conexiones" if conexiones is not None else ""
+    print(f"  {nombre:<38} {segundos:>8.3f} s {n / segundos:>9,.0f} obj/s  {extra}".rstrip())
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 5.0) / 1000
+    rng = random.Random(11)
+    objetos = [(clave_evaluacion(i), serializar_evaluacion(evaluacion_sintetica(rng, i))) for i in range(1, n + 1)]
+    tamano = sum(len(datos) for _, datos in objetos)
+    print(f"{n} evaluaciones ({tamano / n:,.0f} B c/u), S3 local con {latencia * 1000:.1f} ms por pedido\n")
+
+    with ServidorS3Local(latencia=latencia) as servidor:
+        antes = servidor.conexiones
+        inicio = time.perf_counter()
+        for clave, datos in objetos:
+            with servidor.backend(prefijo="uno-por-conexion") as backend:
+                backend.escribir(clave, datos)
+        _fila("de a una, conexión nueva por objeto", time.perf_counter() - inicio, n, servidor.conexiones - antes)
+
+        antes = servidor.conexiones
+        with servidor.backend(prefijo="secuencial", conexiones=1) as backend:
+            inicio = time.perf_counter()
+            for clave, datos in objetos:
+                backend.escribir(clave, datos)
+            _fila("de a una, conexión reutilizada", time.perf_counter() - inicio, n, servidor.conexiones - antes)
+
+        antes = servidor.conexiones
+        with servidor.backend(prefijo="lote") as backend:
+            inicio = time.perf_counter()
+            fallos = backend.escribir_lote(objetos)
+            _fila(f"en lote, pool de {backend.conexiones} conexiones", time.perf_counter() - inicio, n,
+                  servidor.conexiones - antes)
+            assert not fallos, fallos
+            assert len(backend.listar("historial/")) == n
+            inicio = time.perf_counter()
+            leidos = backend.leer_lote([clave for clave, _ in objetos])
+            _fila("lectura en lote", time.perf_counter() - inicio, n)
+            assert leidos == dict(objetos)
+
+        print("\n  Espera de quien guarda (por evaluación):")
+        with servidor.backend(prefijo="directo") as backend:
+            inicio = time.perf_counter()
+            for clave, datos in objetos:
+                backend.escribir(clave, datos)
+            directo = (time.perf_counter() - inicio) / n
+        with tempfile.TemporaryDirectory() as directorio, servidor.backend(prefijo="diferida") as backend:
+            diferida = EscrituraDiferida(backend, os.path.join(directorio, "pendientes"))
+            inicio = time.perf_counter()
+            for clave, datos in objetos:
+                diferida.escribir(clave, datos)
+            encolar = (time.perf_counter() - inicio) / n
+            inicio = time.perf_counter()
+            assert diferida.vaciar(60) == 0, diferida.ultimo_error
+            subida = time.perf_counter() - inicio
+            assert len(backend.listar("historial/")) == n
+        print(f"  {'escritura directa al backend':<38} {directo * 1000:>8.3f} ms")
+        print(f"  {'escritura diferida (al spool local)':<38} {encolar * 1000:>8.3f} ms "
+              f"({directo / encolar:,.0f}x menos; la subida terminó {subida:.2f} s después)")
+
+        print("\n  Subida multiparte:")
+        grande = os.urandom(3 * 1024 * 1024 + 123)
+        with servidor.backend(prefijo="multiparte", tamano_parte=1024 * 1024) as backend:
+            inicio = time.perf_counter()
+            backend.escribir("reports/grande.bin", grande)
+            t_subida = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            leido = backend.leer("reports/grande.bin")
+            t_lectura = time.perf_counter() - inicio
+            etag = backend.listar("reports/")["reports/grande.bin"]
+            assert leido == grande and etag == backend.etag(grande), "la subida multiparte no coincide"
+        print(f"  {len(grande) / 1024 / 1024:.1f} MiB en partes de 1 MiB: subida {t_subida:.3f} s, "
+              f"lectura {t_lectura:.3f} s, ETag {etag}")
+
+    print("\n  Backends locales (lote):")
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, backend in (
+            ("directorio", AlmacenamientoLocal(os.path.join(directorio, "objetos"))),
+            ("sqlite", AlmacenamientoSQLite(os.path.join(directorio, "objetos.db"))),
+        ):
+            with backend:
+                inicio = time.perf_counter()
+                assert not backend.escribir_lote(objetos)
+                t_escritura = time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                assert backend.leer_lote([clave for clave, _ in objetos]) == dict(objetos)
+                _fila(f"{nombre}: escritura", t_escritura, n)
+                _fila(f"{nombre}: lectura", time.perf_counter() - inicio, n)
@@ -0,0 +1,69 @@
+"""
+Benchmark del registro de cambios (utils.cambios) frente a releer el resumen
+completo para encontrar lo nuevo.
+
+Con un historial de n evaluaciones, compara lo que cuesta a un consumidor
+externo ponerse al día con las últimas evaluaciones releyendo todo el CSV de
+resumen contra leer los cambios desde su cursor, y mide lo que agrega cada
+guardado al escribir su cambio (con fsync).
+
+Uso:
+    python benchmarks/bench_cambios.py [n_evaluaciones] [nuevas]
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from utils.cambios import leer_cambios, preparar_cambios, registrar_cambios, ultimo_cambio
+from utils.persistencia import ARCHIVO_CSV, ENCABEZADOS_CSV, fila_resumen
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    nuevas = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rng = random.Random(13)
+    filas = [fila_resumen(evaluacion_sintetica(rng, i)) for i in range(2_000)]
+    print(f"{n:,} evaluaciones en el historial, el consumidor tiene que traer las últimas {nuevas}\n")
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        os.makedirs(os.path.join(base_dir, "data"))
+        preparar_cambios(base_dir)
+        lote = 10_000
+        for inicio in range(0, n, lote):
+            registrar_cambios(base_dir, [
+                ("alta", i + 1, filas[i % len(filas)]) for i in range(inicio, min(inicio + lote, n))
+            ])
+        with open(os.path.join(base_dir, ARCHIVO_CSV), "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ENCABEZADOS_CSV)
+            writer.writeheader()
+            writer.writerows(filas[i % len(filas)] for i in range(n))
+
+        cursor = n - nuevas
+        inicio = time.perf_counter()
+        with open(os.path.join(base_dir, ARCHIVO_CSV), newline="", encoding="utf-8") as f:
+            releidas = list(csv.DictReader(f))[cursor:]
+        t_csv = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        cambios = leer_cambios(base_dir, cursor)
+        t_cursor = time.perf_counter() - inicio
+        assert len(releidas) == len(cambios) == nuevas and cambios[0]["seq"] == cursor + 1
+
+        inicio = time.perf_counter()
+        for i in range(200):
+            registrar_cambios(base_dir, [("alta", n + i + 1, filas[i])])
+        t_registrar = (time.perf_counter() - inicio) / 200
+        assert ultimo_cambio(base_dir) == n + 200
+        tamano = os.path.getsize(os.path.join(base_dir, "data", "cambios", "cambios.jsonl"))
+
+    print(f"  {'releer el CSV de resumen completo':<38} {t_csv * 1000:>10.2f} ms")
+    print(f"  {'leer los cambios desde el cursor':<38} {t_cursor * 1000:>10.3f} ms ({t_csv / t_cursor:,.0f}x)")
+    print(f"  {'registrar un cambio al guardar':<38} {t_registrar * 1000:>10.3f} ms (con fsync)")
+    print(f"  {'tamaño del registro':<38} {tamano / 1024 / 1024:>10.1f} MiB ({tamano / n:,.0f} B por cambio)")
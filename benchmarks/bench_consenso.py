@@ -0,0 +1,90 @@
+"""
+Benchmark del consenso entre evaluadores (utils.consenso) frente a contar las
+respuestas evaluador por evaluador.
+
+Arma iniciativas sintéticas con varios evaluadores cada una y compara el
+cálculo por columnas de bytes (`bytes.count` sobre el tramo de cada
+iniciativa) con un recorrido directo que cuenta pregunta por pregunta las
+respuestas de cada evaluación. Ambos arman el mismo resumen por pregunta y
+puntúan el consenso con `calcular_puntaje`; se verifica que den lo mismo. Se
+mide también cuánto del total es `calcular_puntaje`, igual en los dos.
+
+Uso:
+    python benchmarks/bench_consenso.py [n_iniciativas] [evaluadores]
+"""
+
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from core.evaluador import calcular_puntaje
+from core.preguntas import CATEGORIAS
+from utils.consenso import MINIMO_EVALUADORES, consensuar
+
+
+def _consenso_directo(grupos: dict) -> dict:
+    """Lo mismo contando pregunta por pregunta las respuestas de cada evaluación, sin columnas."""
+    preguntas = [(p["id"], p["texto"], {op[0]: op[2] for op in p["opciones"]})
+                 for cat in CATEGORIAS for p in cat["preguntas"]]
+    puntajes = {}
+    for iniciativa_id, evaluadores in grupos.items():
+        if len(evaluadores) < MINIMO_EVALUADORES:
+            continue
+        respuestas, resumenes = {}, []
+        for pid, texto, puntos in preguntas:
+            conteo = Counter(ev["respuestas"][pid][0] for _, ev in evaluadores.values() if pid in ev["respuestas"])
+            if not conteo:
+                continue
+            n = sum(conteo.values())
+            maximo = max(conteo.values())
+            ganadoras = [l for l, c in conteo.items() if c == maximo]
+            letra = ganadoras[0] if len(ganadoras) == 1 else None
+            respuestas[pid] = (letra, sum(c * puntos[l] for l, c in conteo.items()) / len(evaluadores))
+            elegidos = [puntos[l] for l in conteo]
+            resumenes.append({
+                "id": pid, "texto": texto, "conteo": dict(conteo), "consenso": letra,
+                "acuerdo": sum(c * (c - 1) for c in conteo.values()) / (n * (n - 1)) if n > 1 else None,
+                "rango": max(elegidos) - min(elegidos),
+            })
+        puntajes[iniciativa_id] = calcular_puntaje(respuestas, registrar_metricas=False)["puntaje_global"]
+    return puntajes
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    evaluadores = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    rng = random.Random(17)
+    distintas = [evaluacion_sintetica(rng, i) for i in range(2_000)]
+    grupos = {
+        i: {f"evaluador {j}": (i * evaluadores + j, rng.choice(distintas)) for j in range(evaluadores)}
+        for i in range(1, n + 1)
+    }
+    print(f"{n:,} iniciativas × {evaluadores} evaluadores = {n * evaluadores:,} evaluaciones\n")
+
+    inicio = time.perf_counter()
+    directo = _consenso_directo(grupos)
+    t_directo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    consenso = consensuar(grupos)
+    t_columnas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for c in consenso["iniciativas"]:
+        calcular_puntaje(c["respuestas"], registrar_metricas=False)
+    t_puntaje = time.perf_counter() - inicio
+
+    assert {c["iniciativa_id"]: c["resultados"]["puntaje_global"] for c in consenso["iniciativas"]} == directo
+
+    print(f"  {'contando evaluación por evaluación':<38} {t_directo:>8.3f} s")
+    print(f"  {'columnas de bytes (utils.consenso)':<38} {t_columnas:>8.3f} s ({t_directo / t_columnas:.1f}x), "
+          f"más el kappa del portafolio")
+    print(f"  {'de cada uno, en calcular_puntaje':<38} {t_puntaje:>8.3f} s")
+    peor = consenso["preguntas"][0]
+    print(f"\n  Pregunta con menos acuerdo: {peor['id']} (κ={peor['kappa']:+.3f}, "
+          f"acuerdo {peor['acuerdo'] * 100:.0f}%)")
@@ -0,0 +1,82 @@
+"""
+Benchmark de los percentiles con bosquejos KLL (utils.cuantiles) frente a
+ordenar el historial en cada evaluación.
+
+Mide el costo de ubicar una evaluación nueva (ordenar los puntajes del
+historial vs consultar el bosquejo), el de sumarla al bosquejo al guardar, el
+tamaño del bosquejo y su error máximo de percentil, y el de fusionar los
+bosquejos de varios fragmentos.
+
+Uso:
+    python benchmarks/bench_cuantiles.py [n_evaluaciones] [fragmentos]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from bisect import bisect_left, bisect_right
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from utils.cuantiles import K, BosquejoCuantiles
+
+
+def _percentil_exacto(ordenados: list, valor: float) -> float:
+    menores = bisect_left(ordenados, valor)
+    return (menores + (bisect_right(ordenados, valor) - menores) / 2) / len(ordenados)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_fragmentos = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    rng = random.Random(5)
+    distintas = [evaluacion_sintetica(rng, i) for i in range(2_000)]
+    puntajes = [ev["resultados"]["puntaje_global"] for ev in distintas]
+    historial = [rng.choice(puntajes) for _ in range(n)]
+    consultas = [rng.choice(puntajes) for _ in range(200)]
+    print(f"{n:,} puntajes en el historial, {len(consultas)} evaluaciones nuevas, k={K}\n")
+
+    inicio = time.perf_counter()
+    for valor in consultas[:20]:
+        _percentil_exacto(sorted(historial), valor)
+    t_ordenar = (time.perf_counter() - inicio) / 20
+
+    bosquejo = BosquejoCuantiles()
+    inicio = time.perf_counter()
+    for valor in historial:
+        bosquejo.agregar(valor)
+    t_agregar = (time.perf_counter() - inicio) / n
+
+    bosquejo.percentil(consultas[0])          # la primera consulta arma la tabla ordenada
+    inicio = time.perf_counter()
+    for valor in consultas:
+        bosquejo.percentil(valor)
+    t_consulta = (time.perf_counter() - inicio) / len(consultas)
+
+    ordenados = sorted(historial)
+    error = max(abs(bosquejo.percentil(v) - _percentil_exacto(ordenados, v)) for v in set(puntajes))
+    tamano = len(json.dumps(bosquejo.a_dict(), separators=(",", ":")))
+    retenidos = sum(len(valores) for valores in bosquejo.niveles)
+
+    print(f"  {'ordenar el historial y buscar':<36} {t_ordenar * 1000:>10.3f} ms por evaluación")
+    print(f"  {'consultar el bosquejo':<36} {t_consulta * 1000:>10.4f} ms por evaluación "
+          f"({t_ordenar / t_consulta:,.0f}x)")
+    print(f"  {'sumar al bosquejo (al guardar)':<36} {t_agregar * 1e6:>10.2f} µs por evaluación")
+    print(f"  {'tamaño del bosquejo':<36} {retenidos:>10,} valores, {tamano:,} bytes en JSON")
+    print(f"  {'error máximo de percentil':<36} {error * 100:>10.2f} puntos\n")
+
+    fragmentos = [BosquejoCuantiles() for _ in range(n_fragmentos)]
+    for i, valor in enumerate(historial):
+        fragmentos[i % n_fragmentos].agregar(valor)
+    inicio = time.perf_counter()
+    fusion = BosquejoCuantiles()
+    for fragmento in fragmentos:
+        fusion.fusionar(fragmento)
+    t_fusion = time.perf_counter() - inicio
+    error = max(abs(fusion.percentil(v) - _percentil_exacto(ordenados, v)) for v in set(puntajes))
+    assert fusion.n == n
+    print(f"  fusión de {n_fragmentos} fragmentos: {t_fusion * 1000:.2f} ms, "
+          f"error máximo {error * 100:.2f} puntos de percentil")
@@ -0,0 +1,39 @@
+"""
+Benchmark de la detección de duplicados contra un índice sintético grande.
+
+Uso:
+    python benchmarks/bench_duplicados.py [n_registros]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.duplicados import IndiceDuplicados, simhash
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(7)
+    # Pocas combinaciones de respuestas distintas para que los buckets sean grandes
+    claves = [rng.getrandbits(64) for _ in range(n // 20)]
+    registros = [(i, rng.choice(claves), rng.getrandbits(64)) for i in range(1, n + 1)]
+
+    inicio = time.perf_counter()
+    indice = IndiceDuplicados(registros)
+    print(f"Carga de {n} huellas: {time.perf_counter() - inicio:.2f} s")
+
+    texto = "Facturación OCR | Finanzas | Leer facturas PDF de proveedores y registrarlas en el ERP"
+    inicio = time.perf_counter()
+    for _ in range(100):
+        huella = simhash(texto)
+    print(f"Cálculo de SimHash: {(time.perf_counter() - inicio) / 100 * 1e6:.0f} µs")
+
+    consultas = [rng.choice(claves) for _ in range(10_000)]
+    inicio = time.perf_counter()
+    for clave in consultas:
+        indice.buscar(clave, huella)
+    print(f"Consulta de duplicados: {(time.perf_counter() - inicio) / len(consultas) * 1e6:.1f} µs")
@@ -0,0 +1,80 @@
+"""
+Benchmark de consultas por equipo: recorrer el historial completo y filtrar vs
+leer solo los fragmentos del equipo (utils.fragmentos).
+
+Uso:
+    python benchmarks/bench_fragmentos.py [n_evaluaciones] [n_equipos]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from core.metricas import REGISTRO
+from utils.fragmentos import cargar_catalogo, clave_equipo, consultar_historial, invalidar_fragmentos
+from utils.persistencia import guardar_evaluaciones, iterar_historial, migrar_historial
+
+
+def medir(funcion, repeticiones: int = 3) -> tuple:
+    mejor, resultado = None, None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+        mejor = segundos if mejor is None else min(mejor, segundos)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_equipos = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    REGISTRO.activo = False
+    rng = random.Random(11)
+    equipos = [f"Equipo {i}" for i in range(n_equipos)]
+    evaluaciones = []
+    for i in range(n):
+        evaluacion = evaluacion_sintetica(rng, i)
+        evaluacion["meta"]["equipo"] = rng.choice(equipos)
+        evaluacion["meta"]["fecha"] = f"2025-{rng.randint(1, 12):02d}-15T10:00:00"
+        evaluaciones.append(evaluacion)
+
+    base_dir = tempfile.mkdtemp(prefix="bench_fragmentos_")
+    try:
+        for i in range(0, n, 5000):
+            guardar_evaluaciones(evaluaciones[i:i + 5000], base_dir)
+        migrar_historial(base_dir, "zlib")
+        invalidar_fragmentos(base_dir)
+        _, segundos_catalogo = medir(lambda: cargar_catalogo(base_dir), 1)
+
+        equipo = equipos[0]
+        clave = clave_equipo(equipo)
+
+        def completo(desde=None):
+            return [
+                (i, ev) for i, ev in iterar_historial(base_dir)
+                if clave_equipo(ev["meta"]["equipo"]) == clave
+                and (desde is None or ev["meta"]["fecha"][:7] >= desde)
+            ]
+
+        filas_completo, t_completo = medir(completo)
+        filas_fragmentos, t_fragmentos = medir(lambda: consultar_historial(base_dir, equipo=equipo))
+        assert filas_completo == filas_fragmentos
+        _, t_trimestre_completo = medir(lambda: completo("2025-10"))
+        _, t_trimestre = medir(lambda: consultar_historial(base_dir, equipo=equipo, desde="2025-10"))
+
+        print(f"Historial: {n:,} evaluaciones, {n_equipos} equipos × 12 meses "
+              f"(fragmentos reconstruidos en {segundos_catalogo:.2f} s)\n")
+        print(f"{'Consulta':<34}{'historial completo':>20}{'fragmentos':>14}{'x':>8}")
+        for nombre, a, b in (
+            (f"{equipo} ({len(filas_fragmentos):,} evaluaciones)", t_completo, t_fragmentos),
+            (f"{equipo}, desde 2025-10", t_trimestre_completo, t_trimestre),
+        ):
+            print(f"{nombre:<34}{a * 1000:>17.1f} ms{b * 1000:>11.1f} ms{a / b:>7.1f}x")
+    finally:
+        shutil.rmtree(base_dir)
@@ -0,0 +1,60 @@
+"""
+Benchmark de respuestas con incertidumbre: distribución exacta del puntaje
+global (convolución en la grilla de core.incertidumbre) vs muestreo.
+
+Cada pregunta queda en duda con probabilidad `fraccion_duda` entre dos o tres
+opciones. Se informa el tiempo por evaluación y el error absoluto máximo del
+muestreo en la probabilidad de AGENTE RECOMENDADO.
+
+Uso:
+    python benchmarks/bench_incertidumbre.py [n_evaluaciones] [fraccion_duda] [muestras]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.incertidumbre import opcion_mas_probable, resumir_incertidumbre
+from core.preguntas import CATEGORIAS
+
+
+def caso_aleatorio(rng: random.Random, fraccion_duda: float) -> tuple:
+    respuestas, distribuciones = {}, {}
+    for cat in CATEGORIAS:
+        for preg in cat["preguntas"]:
+            letras = [op[0] for op in preg["opciones"]]
+            if rng.random() < fraccion_duda:
+                elegidas = rng.sample(letras, rng.randint(2, min(3, len(letras))))
+                pesos = [rng.random() + 0.01 for _ in elegidas]
+                distribuciones[preg["id"]] = {l: p / sum(pesos) for l, p in zip(elegidas, pesos)}
+                respuestas[preg["id"]] = opcion_mas_probable(distribuciones[preg["id"]], preg["id"])
+            else:
+                op = rng.choice(preg["opciones"])
+                respuestas[preg["id"]] = (op[0], op[2])
+    return respuestas, distribuciones
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    fraccion = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    muestras = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+    rng = random.Random(7)
+    casos = [caso_aleatorio(rng, fraccion) for _ in range(n)]
+
+    inicio = time.perf_counter()
+    exactos = [resumir_incertidumbre(r, d) for r, d in casos]
+    t_exacto = (time.perf_counter() - inicio) / n
+
+    inicio = time.perf_counter()
+    estimados = [resumir_incertidumbre(r, d, muestras=muestras, rng=rng) for r, d in casos]
+    t_muestreo = (time.perf_counter() - inicio) / n
+
+    error = max(abs(a["prob_agente_recomendado"] - b["prob_agente_recomendado"])
+                for a, b in zip(exactos, estimados))
+    print(f"{n:,} evaluaciones, {fraccion:.0%} de preguntas en duda\n")
+    print(f"  exacto:            {t_exacto * 1000:8.2f} ms/evaluación")
+    print(f"  muestreo ({muestras:,}): {t_muestreo * 1000:8.2f} ms/evaluación"
+          f"  (error máx. {error:.4f} en P(AGENTE RECOMENDADO))")
@@ -0,0 +1,58 @@
+"""
+Benchmark de acceso aleatorio al historial: segmento + índice mmap vs JSON completo.
+
+Uso:
+    python benchmarks/bench_lector.py [n_evaluaciones]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from utils.segmento import LectorSegmento, escribir_segmento
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rng = random.Random(3)
+    base = [evaluacion_sintetica(rng, i) for i in range(1_000)]
+
+    def historial():
+        for i in range(n):
+            ev = dict(base[i % len(base)])
+            ev["meta"] = dict(ev["meta"], nombre_iniciativa=f"Iniciativa {i}")
+            yield ev
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_json = os.path.join(directorio, "historial.json")
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            json.dump(list(historial()), f, ensure_ascii=False, indent=2)
+        inicio = time.perf_counter()
+        with open(ruta_json, encoding="utf-8") as f:
+            json.load(f)[n // 2]
+        print(f"{n} evaluaciones")
+        print(f"  JSON, cargar todo para ver una:      {(time.perf_counter() - inicio) * 1e3:>9.1f} ms")
+
+        ids = [rng.randint(1, n) for _ in range(2_000)]
+        for codec in ("ninguno", "zlib"):
+            ruta = os.path.join(directorio, f"historial.{codec}.seg")
+            escribir_segmento(ruta, historial(), codec=codec)
+            inicio = time.perf_counter()
+            lector = LectorSegmento(ruta)      # reconstruye el índice .idx
+            t_indice = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            for i in ids:
+                lector.evaluacion(i)
+            t_aleatorio = (time.perf_counter() - inicio) / len(ids)
+            inicio = time.perf_counter()
+            lector.pagina(n // 2, 20)
+            t_pagina = time.perf_counter() - inicio
+            lector.close()
+            print(f"  {codec:<8} índice {t_indice * 1e3:>7.1f} ms | #N aleatorio {t_aleatorio * 1e6:>6.0f} µs"
+                  f" | página de 20 {t_pagina * 1e3:>6.1f} ms")
@@ -0,0 +1,102 @@
+"""
+Benchmark del linaje de iniciativas (utils.linaje): cadenas de versiones con
+solo los cambios vs registros completos del historial.
+
+Se guardan `n_iniciativas` iniciativas re-evaluadas `versiones` veces, cada
+re-evaluación con 1-4 respuestas distintas de la anterior. Se compara:
+
+  - bytes: cadenas del linaje vs las mismas evaluaciones en el historial JSON
+  - trayectoria: evolucion_iniciativa vs recorrer el historial completo
+    filtrando por la iniciativa (lo que haría falta sin el linaje)
+  - última versión: version_iniciativa (desde la copia completa anterior)
+
+Uso:
+    python benchmarks/bench_linaje.py [n_iniciativas] [versiones]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from core.evaluador import calcular_puntaje, generar_veredicto
+from core.metricas import REGISTRO
+from core.preguntas import CATEGORIAS
+from utils.linaje import DIRECTORIO_LINAJE, clave_iniciativa, evolucion_iniciativa, version_iniciativa
+from utils.persistencia import ARCHIVO_JSON, guardar_evaluaciones, iterar_historial
+
+
+_PREGUNTAS = [preg for cat in CATEGORIAS for preg in cat["preguntas"]]
+
+
+def reevaluar(rng: random.Random, evaluacion: dict, fecha: str) -> dict:
+    respuestas = {pid: list(r) for pid, r in evaluacion["respuestas"].items()}
+    for preg in rng.sample(_PREGUNTAS, rng.randint(1, 4)):
+        letra, _, puntaje = rng.choice(preg["opciones"])
+        respuestas[preg["id"]] = [letra, puntaje]
+    resultados = calcular_puntaje(respuestas)
+    return {
+        "meta": dict(evaluacion["meta"], fecha=fecha),
+        "respuestas": respuestas,
+        "resultados": resultados,
+        "veredicto": generar_veredicto(resultados["puntaje_global"], resultados["categorias"]),
+    }
+
+
+def trayectoria_sin_linaje(base_dir: str, clave: str) -> list:
+    return [
+        (id_registro, ev["resultados"]["puntaje_global"])
+        for id_registro, ev in iterar_historial(base_dir)
+        if clave_iniciativa(ev["meta"]) == clave
+    ]
+
+
+def medir(funcion, repeticiones: int = 5) -> tuple:
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+        mejor = segundos if mejor is None else min(mejor, segundos)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    n_iniciativas = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    versiones = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+    REGISTRO.activo = False
+    rng = random.Random(5)
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        actuales = [evaluacion_sintetica(rng, i) for i in range(n_iniciativas)]
+        for i, ev in enumerate(actuales):
+            ev["meta"]["nombre_iniciativa"] = f"Iniciativa {i}"
+        guardar_evaluaciones(actuales, base_dir)
+        for v in range(1, versiones):
+            actuales = [reevaluar(rng, ev, f"2026-{v % 12 + 1:02d}-01T10:00:00") for ev in actuales]
+            guardar_evaluaciones(actuales, base_dir)
+
+        directorio = os.path.join(base_dir, DIRECTORIO_LINAJE)
+        bytes_linaje = sum(
+            os.path.getsize(os.path.join(directorio, n)) for n in os.listdir(directorio) if n.endswith(".jsonl")
+        )
+        bytes_json = os.path.getsize(os.path.join(base_dir, ARCHIVO_JSON))
+
+        iniciativa_id = 1
+        clave = clave_iniciativa({"nombre_iniciativa": "Iniciativa 0", "equipo": actuales[0]["meta"]["equipo"]})
+        trayectoria, t_linaje = medir(lambda: evolucion_iniciativa(iniciativa_id, base_dir))
+        esperada, t_historial = medir(lambda: trayectoria_sin_linaje(base_dir, clave), repeticiones=1)
+        assert [(v["id"], v["puntaje_global"]) for v in trayectoria] == esperada
+        _, t_version = medir(lambda: version_iniciativa(iniciativa_id, versiones, base_dir))
+
+        total = n_iniciativas * versiones
+        print(f"{n_iniciativas:,} iniciativas × {versiones} versiones = {total:,} evaluaciones\n")
+        print(f"  historial JSON:       {bytes_json / 1e6:8.2f} MB ({bytes_json / total:,.0f} B/evaluación)")
+        print(f"  cadenas del linaje:   {bytes_linaje / 1e6:8.2f} MB ({bytes_linaje / total:,.0f} B/versión)")
+        print(f"\n  trayectoria (--evolucion):   {t_linaje * 1000:8.2f} ms")
+        print(f"  recorriendo el historial:    {t_historial * 1000:8.2f} ms ({t_historial / t_linaje:,.0f}x)")
+        print(f"  última versión:              {t_version * 1000:8.2f} ms")
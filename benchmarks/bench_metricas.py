@@ -0,0 +1,40 @@
+"""
+Benchmark del costo de las métricas en el camino caliente del scoring.
+
+Uso:
+    python benchmarks/bench_metricas.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.evaluador import calcular_puntaje, generar_veredicto
+from core.metricas import REGISTRO
+from core.preguntas import CATEGORIAS
+
+RESPUESTAS = {
+    p["id"]: (p["opciones"][0][0], p["opciones"][0][2])
+    for c in CATEGORIAS for p in c["preguntas"]
+}
+
+
+def _evaluar():
+    resultados = calcular_puntaje(RESPUESTAS)
+    generar_veredicto(resultados["puntaje_global"], resultados["categorias"])
+
+
+def _medir(activo: bool, repeticiones: int) -> float:
+    REGISTRO.activo = activo
+    return min(timeit.repeat(_evaluar, number=repeticiones, repeat=5)) / repeticiones * 1e6
+
+
+if __name__ == "__main__":
+    n = 5000
+    sin = _medir(False, n)
+    con = _medir(True, n)
+    print(f"calcular_puntaje + generar_veredicto sin métricas: {sin:8.2f} µs")
+    print(f"calcular_puntaje + generar_veredicto con métricas: {con:8.2f} µs")
+    print(f"Sobrecosto por evaluación:                         {con - sin:8.2f} µs ({(con / sin - 1) * 100:.1f}%)")
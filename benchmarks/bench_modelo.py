@@ -0,0 +1,80 @@
+"""
+Benchmark de memoria y tamaño en disco: dicts del historial vs modelo compacto.
+
+Uso:
+    python benchmarks/bench_modelo.py [n_evaluaciones]
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.evaluador import calcular_puntaje, generar_veredicto
+from core.modelo import EvaluacionCompacta, a_registro, desde_registro
+from core.preguntas import CATEGORIAS
+
+
+def evaluacion_sintetica(rng: random.Random, i: int) -> dict:
+    respuestas = {}
+    for cat in CATEGORIAS:
+        for preg in cat["preguntas"]:
+            letra, _, puntaje = rng.choice(preg["opciones"])
+            respuestas[preg["id"]] = [letra, puntaje]
+    resultados = calcular_puntaje(respuestas)
+    return {
+        "meta": {
+            "nombre_iniciativa": f"Iniciativa {i}",
+            "equipo": rng.choice(["Finanzas", "Operaciones", "Ventas", "TI"]),
+            "responsable": rng.choice(["Ana", "Luis", "Marta"]),
+            "descripcion": f"Automatizar el proceso {i} del área",
+            "fecha": "2026-01-01T10:00:00",
+        },
+        "respuestas": respuestas,
+        "resultados": resultados,
+        "veredicto": generar_veredicto(resultados["puntaje_global"], resultados["categorias"]),
+    }
+
+
+def medir(construir) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    datos = construir()
+    segundos = time.perf_counter() - inicio
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return datos, memoria, segundos
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    rng = random.Random(3)
+    historial = [evaluacion_sintetica(rng, i) for i in range(n)]
+
+    json_historial = json.dumps(historial, ensure_ascii=False, indent=2)
+    json_compacto = json.dumps(
+        [a_registro(EvaluacionCompacta.desde_dict(ev)) for ev in historial],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    del historial
+
+    dicts, mem_dicts, t_dicts = medir(lambda: json.loads(json_historial))
+    compacto, mem_compacto, t_compacto = medir(
+        lambda: [EvaluacionCompacta.desde_dict(ev) for ev in json.loads(json_historial)]
+    )
+    _, mem_registro, t_registro = medir(lambda: [desde_registro(r) for r in json.loads(json_compacto)])
+
+    assert all(c.a_dict() == d for c, d in zip(compacto, dicts)), "conversión con pérdida"
+
+    print(f"{n} evaluaciones")
+    print(f"  Memoria dicts (json.load):        {mem_dicts / n:>8.0f} B/evaluación  {t_dicts:.2f} s")
+    print(f"  Memoria modelo compacto:          {mem_compacto / n:>8.0f} B/evaluación  {t_compacto:.2f} s")
+    print(f"  Memoria desde registro compacto:  {mem_registro / n:>8.0f} B/evaluación  {t_registro:.2f} s")
+    print(f"  Disco historial JSON:             {len(json_historial.encode()) / n:>8.0f} B/evaluación")
+    print(f"  Disco registro compacto:          {len(json_compacto.encode()) / n:>8.0f} B/evaluación")
@@ -0,0 +1,59 @@
+"""
+Benchmark del orden de preguntas: preguntas esperadas hasta que el veredicto
+queda fijo con el orden fijo del cuestionario, con el orden por alcance y con
+el árbol optimizado sobre el historial (modo --orden-optimizado).
+
+El historial sintético tiene respuestas correlacionadas (cada iniciativa tiene
+una "madurez" que sesga todas sus respuestas); el árbol se entrena con el 80%
+y se mide sobre el 20% restante.
+
+Uso:
+    python benchmarks/bench_orden_preguntas.py [n_evaluaciones]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.preguntas import CATEGORIAS
+from utils.politica import (
+    ORDEN_FIJO, ORDEN_POR_ALCANCE, construir_politica, preguntas_esperadas,
+)
+
+
+def respuestas_sinteticas(rng: random.Random) -> dict:
+    madurez = rng.betavariate(0.6, 0.6)
+    letras = {}
+    for cat in CATEGORIAS:
+        for preg in cat["preguntas"]:
+            opciones = sorted(preg["opciones"], key=lambda op: op[2], reverse=True)
+            # Con madurez alta se eligen más las opciones de mayor puntaje
+            pesos = [(madurez if i == 0 else 1 - madurez) + 0.15 for i in range(len(opciones))]
+            letras[preg["id"]] = rng.choices(opciones, weights=pesos)[0][0]
+    return letras
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = random.Random(5)
+    historial = [respuestas_sinteticas(rng) for _ in range(n)]
+    corte = int(n * 0.8)
+    entrenamiento, prueba = historial[:corte], historial[corte:]
+
+    inicio = time.perf_counter()
+    politica = construir_politica(entrenamiento)
+    segundos = time.perf_counter() - inicio
+
+    total = len(ORDEN_FIJO)
+    print(f"Historial sintético: {n:,} evaluaciones ({len(entrenamiento):,} entrenamiento, "
+          f"{len(prueba):,} prueba); árbol construido en {segundos:.2f} s\n")
+    print(f"{'Orden':<24}{'preguntas esperadas':>22}{'ahorro':>10}")
+    for nombre, esperadas in (
+        ("fijo (CATEGORIAS)", preguntas_esperadas(prueba, orden=ORDEN_FIJO)),
+        ("por alcance", preguntas_esperadas(prueba, orden=ORDEN_POR_ALCANCE)),
+        ("árbol optimizado", preguntas_esperadas(prueba, politica)),
+    ):
+        print(f"{nombre:<24}{esperadas:>15.2f} / {total}{(1 - esperadas / total) * 100:>9.1f}%")
@@ -0,0 +1,101 @@
+"""
+Benchmark de la pantalla completa (utils.pantalla) vs el modo de línea:
+bytes que cada uno envía a la terminal para responder el cuestionario.
+
+Cada modo corre en un proceso hijo conectado a una pseudo-terminal de
+`filas`×`columnas`; el padre escribe las respuestas (una tecla por pregunta en
+pantalla completa, letra + Enter en modo de línea) y cuenta los bytes que
+recibe. Pasar de pregunta cuesta parecido en ambos modos (el texto nuevo hay
+que enviarlo igual); la diferencia está en lo que no se reenvía: mover el
+cursor, volver atrás o cambiar una respuesta solo manda las celdas que
+cambian, frente a repintar la pantalla entera (lo que costaría limpiar e
+imprimir de nuevo, como hace el modo de línea entre categorías).
+
+Solo en sistemas con pty (Linux, macOS).
+
+Uso:
+    python benchmarks/bench_pantalla.py [filas] [columnas]
+"""
+
+import fcntl
+import os
+import pty
+import select
+import struct
+import sys
+import termios
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.preguntas import CATEGORIAS
+
+_N_PREGUNTAS = sum(len(cat["preguntas"]) for cat in CATEGORIAS)
+_IZQUIERDA = "\x1bOD"         # flechas con el teclado en modo aplicación (tras keypad)
+_ABAJO = "\x1bOB"
+
+
+def _hijo(modo: str) -> None:
+    os.environ["TERM"] = "xterm-256color"
+    if modo == "linea":
+        from main import ejecutar_cuestionario
+        ejecutar_cuestionario()
+    else:
+        from utils.pantalla import PantallaCompleta
+        with PantallaCompleta() as pantalla:
+            pantalla.cuestionario()
+    os._exit(0)
+
+
+def _leer(fd: int, segundos: float) -> int:
+    """Bytes leídos hasta que la terminal quede `segundos` sin salida."""
+    total = 0
+    while select.select([fd], [], [], segundos)[0]:
+        try:
+            datos = os.read(fd, 65536)
+        except OSError:
+            break
+        if not datos:
+            break
+        total += len(datos)
+    return total
+
+
+def medir(modo: str, filas: int, columnas: int, teclas: list) -> tuple:
+    """(bytes al iniciar, [bytes tras cada tecla], segundos) de un cuestionario completo."""
+    pid, fd = pty.fork()
+    if pid == 0:
+        _hijo(modo)
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", filas, columnas, 0, 0))
+    inicio = time.perf_counter()
+    inicial = _leer(fd, 0.5)
+    por_tecla = []
+    for tecla in teclas:
+        os.write(fd, tecla.encode())
+        por_tecla.append(_leer(fd, 0.1))
+    os.write(fd, b"\r")          # pantalla completa: Enter en la revisión final
+    por_tecla.append(_leer(fd, 0.3))
+    os.waitpid(pid, 0)
+    return inicial, por_tecla, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    columnas = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+
+    inicial_l, linea, _ = medir("linea", filas, columnas, ["B\n"] * _N_PREGUNTAS)
+    inicial_p, pantalla, _ = medir("pantalla", filas, columnas, ["B"] * _N_PREGUNTAS)
+    n = _N_PREGUNTAS - 1
+    _, revision, _ = medir(
+        "pantalla", filas, columnas, ["B"] * n + [_ABAJO] + [_IZQUIERDA] * 5 + ["A", "B"]
+    )
+
+    total_l = inicial_l + sum(linea)
+    total_p = inicial_p + sum(pantalla)
+    print(f"Cuestionario de {_N_PREGUNTAS} preguntas en una terminal de {filas}×{columnas}\n")
+    print(f"  modo de línea:      {total_l:8,} bytes ({sum(linea) / _N_PREGUNTAS:6,.0f} B/respuesta)")
+    print(f"  pantalla completa:  {total_p:8,} bytes ({sum(pantalla[:-1]) / _N_PREGUNTAS:6,.0f} B/respuesta)\n")
+    print(f"  pantalla completa repintada desde cero: {inicial_p:6,} bytes")
+    print(f"  mover el cursor a otra opción:          {revision[n]:6,} bytes")
+    print(f"  volver 5 preguntas atrás:               {sum(revision[n + 1:n + 6]) / 5:6,.0f} bytes/pregunta")
+    print(f"  cambiar esa respuesta (salta a la última): {revision[n + 6]:,} bytes")
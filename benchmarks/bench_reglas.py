@@ -0,0 +1,121 @@
+"""
+Benchmark del motor de reglas: reglas compiladas a máscaras de bits
+(core.reglas) vs un intérprete que recorre cada regla y cada condición.
+
+Las reglas aleatorias combinan 1-4 condiciones sobre respuestas, porcentajes
+de categoría y puntaje global; se verifica que ambos den el mismo resultado.
+"máscara" mide solo cuánto tarda el motor en saber qué reglas se cumplen; el
+resto de "compiladas" es armar la lista de alertas y alternativas.
+
+Uso:
+    python benchmarks/bench_reglas.py [n_reglas] [n_evaluaciones]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from core.evaluador import ALTERNATIVAS
+from core.metricas import REGISTRO
+from core.preguntas import CATEGORIAS
+from core.reglas import MAXIMO_ALTERNATIVAS, REGLAS_POR_DEFECTO, compilar_reglas
+
+
+_LETRAS = {preg["id"]: [op[0] for op in preg["opciones"]] for cat in CATEGORIAS for preg in cat["preguntas"]}
+_TEXTO_A_ID = {preg["texto"]: preg["id"] for cat in CATEGORIAS for preg in cat["preguntas"]}
+
+
+def regla_aleatoria(rng: random.Random, i: int) -> dict:
+    condiciones = []
+    for _ in range(rng.randint(1, 4)):
+        tipo = rng.random()
+        if tipo < 0.6:
+            pid = rng.choice(list(_LETRAS))
+            letras = rng.sample(_LETRAS[pid], rng.randint(1, len(_LETRAS[pid]) - 1))
+            condiciones.append({"respuesta": pid, rng.choice(["en", "no_en"]): letras})
+        elif tipo < 0.9:
+            cota = rng.choice(["menor_que", "al_menos"])
+            condiciones.append({
+                "categoria": rng.choice(CATEGORIAS)["id"], "porcentaje": {cota: rng.randrange(10, 95, 5)},
+            })
+        else:
+            condiciones.append({"puntaje_global": {rng.choice(["menor_que", "al_menos"]): rng.randrange(20, 90, 5)}})
+    regla = {"id": f"r{i}", "si": condiciones, "prioridad": rng.randint(0, 3)}
+    if rng.random() < 0.5:
+        regla["alerta"] = f"Alerta {i}"
+    else:
+        regla["alternativa"] = rng.choice(list(ALTERNATIVAS))
+    return regla
+
+
+# ─── Intérprete de referencia ──────────────────────────────────────────────────
+def _cotas(valor: float, cotas: dict) -> bool:
+    return valor < cotas.get("menor_que", float("inf")) and valor >= cotas.get("al_menos", float("-inf"))
+
+
+def interpretar(reglas: list, puntaje_global: float, resultados_categorias: list) -> tuple:
+    letras = {}
+    porcentajes = {}
+    for cat in resultados_categorias:
+        porcentajes[cat["id"]] = cat["porcentaje"]
+        for preg in cat["preguntas"]:
+            letras[_TEXTO_A_ID.get(preg["pregunta"])] = preg["respuesta"]
+    orden = sorted(range(len(reglas)), key=lambda i: (-reglas[i].get("prioridad", 0), i))
+    alertas, alternativas = [], []
+    for i in orden:
+        regla = reglas[i]
+        cumple = True
+        for condicion in regla["si"]:
+            if "respuesta" in condicion:
+                letra = letras.get(condicion["respuesta"], "-")
+                cumple = letra in condicion["en"] if "en" in condicion else letra not in condicion["no_en"]
+            elif "categoria" in condicion:
+                cumple = condicion["categoria"] in porcentajes and _cotas(
+                    porcentajes[condicion["categoria"]], condicion["porcentaje"])
+            else:
+                cumple = _cotas(puntaje_global, condicion["puntaje_global"])
+            if not cumple:
+                break
+        if not cumple:
+            continue
+        if "alerta" in regla and regla["alerta"] not in alertas:
+            alertas.append(regla["alerta"])
+        elif "alternativa" in regla and regla["alternativa"] not in alternativas:
+            alternativas.append(regla["alternativa"])
+    return alertas, alternativas[:MAXIMO_ALTERNATIVAS]
+
+
+def medir(funcion, evaluaciones: list, repeticiones: int = 3) -> tuple:
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultados = [funcion(ev["resultados"]["puntaje_global"], ev["resultados"]["categorias"]) for ev in evaluaciones]
+        segundos = (time.perf_counter() - inicio) / len(evaluaciones)
+        mejor = segundos if mejor is None else min(mejor, segundos)
+    return resultados, mejor
+
+
+if __name__ == "__main__":
+    n_reglas = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    REGISTRO.activo = False
+    rng = random.Random(3)
+    evaluaciones = [evaluacion_sintetica(rng, i) for i in range(n)]
+
+    print(f"{n:,} evaluaciones sintéticas\n")
+    print(f"{'Reglas':>8}{'compilar':>12}{'intérprete':>14}{'compiladas':>14}{'x':>8}{'máscara':>12}{'cumplidas':>11}")
+    for reglas in (REGLAS_POR_DEFECTO, [regla_aleatoria(rng, i) for i in range(n_reglas)]):
+        inicio = time.perf_counter()
+        motor = compilar_reglas(reglas, ALTERNATIVAS)
+        compilar = time.perf_counter() - inicio
+        esperado, t_interprete = medir(lambda p, c: interpretar(reglas, p, c), evaluaciones)
+        obtenido, t_motor = medir(motor.evaluar, evaluaciones)
+        assert obtenido == esperado
+        mascaras, t_mascara = medir(motor.reglas_cumplidas, evaluaciones)
+        cumplidas = sum(bin(m).count("1") for m in mascaras) / n
+        print(f"{len(reglas):>8,}{compilar * 1000:>9.1f} ms{t_interprete * 1e6:>11.1f} µs"
+              f"{t_motor * 1e6:>11.1f} µs{t_interprete / t_motor:>7.1f}x{t_mascara * 1e6:>9.1f} µs{cumplidas:>11.0f}")
@@ -0,0 +1,46 @@
+"""
+Benchmark de generación de reportes: Markdown, HTML directo y PDF simple.
+
+Uso:
+    python benchmarks/bench_reporte.py [repeticiones]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from utils.reporte import generar_html, generar_markdown, generar_pdf_simple
+
+
+def medir(nombre: str, funcion, repeticiones: int) -> None:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    ms = (time.perf_counter() - inicio) / repeticiones * 1000
+    print(f"  {nombre:<12} {ms:8.2f} ms por reporte")
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    evaluacion = evaluacion_sintetica(random.Random(7), 1)
+    similares = [
+        {"id": i, "nombre_iniciativa": f"Iniciativa {i}", "equipo": "TI",
+         "puntaje_global": 60.0, "nivel": "AGENTE RECOMENDADO", "similitud": 80.0}
+        for i in range(5)
+    ]
+    print(f"Reportes de una evaluación ({repeticiones} repeticiones)")
+    medir("markdown", lambda: generar_markdown(evaluacion, similares), repeticiones)
+    medir("html", lambda: generar_html(evaluacion, similares), repeticiones)
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "reporte.pdf")
+        medir("pdf simple", lambda: generar_pdf_simple(evaluacion, ruta, similares), repeticiones)
+        print(f"  tamaño del PDF: {os.path.getsize(ruta)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark del formato compacto de segmentos contra el historial JSON actual.
+
+Uso:
+    python benchmarks/bench_segmento.py [n_evaluaciones]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from utils.segmento import CODECS, escribir_segmento, leer_segmento
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    rng = random.Random(3)
+    historial = json.loads(json.dumps([evaluacion_sintetica(rng, i) for i in range(n)]))
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_json = os.path.join(directorio, "historial.json")
+        inicio = time.perf_counter()
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            json.dump(historial, f, ensure_ascii=False, indent=2)
+        t_escritura = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        with open(ruta_json, encoding="utf-8") as f:
+            json.load(f)
+        t_lectura = time.perf_counter() - inicio
+        base = os.path.getsize(ruta_json)
+        print(f"{n} evaluaciones")
+        print(f"  {'formato':<10} {'bytes/eval':>10} {'reducción':>10} {'escritura':>10} {'lectura':>10}")
+        print(f"  {'json':<10} {base / n:>10.0f} {1:>9.1f}x {t_escritura:>9.2f}s {t_lectura:>9.2f}s")
+
+        for codec in CODECS:
+            ruta = os.path.join(directorio, f"historial.{codec}.seg")
+            inicio = time.perf_counter()
+            escribir_segmento(ruta, historial, codec=codec)
+            t_escritura = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            leidos = list(leer_segmento(ruta))
+            t_lectura = time.perf_counter() - inicio
+            assert leidos == historial, f"{codec}: el segmento no reconstruye el historial"
+            tamano = os.path.getsize(ruta)
+            print(f"  {codec:<10} {tamano / n:>10.0f} {base / tamano:>9.1f}x "
+                  f"{t_escritura:>9.2f}s {t_lectura:>9.2f}s")
@@ -0,0 +1,49 @@
+"""
+Benchmark del índice de iniciativas similares con un historial sintético.
+
+Uso:
+    python benchmarks/bench_similitud.py [n_registros]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.preguntas import CATEGORIAS
+from utils.similitud import IndiceSimilitud
+from utils.texto import tokenizar
+
+PALABRAS = (
+    "facturación OCR correos clientes reportes conciliación contratos soporte tickets "
+    "inventario ventas proveedores nómina auditoría cobranza reclamos onboarding "
+    "cotizaciones licitaciones pedidos despacho garantías crédito riesgo fraude"
+).split()
+
+
+def _registro_sintetico(rng: random.Random) -> tuple:
+    letras = "".join(
+        rng.choice(p["opciones"])[0] for c in CATEGORIAS for p in c["preguntas"]
+    )
+    tokens = sorted(set(tokenizar(" ".join(rng.sample(PALABRAS, 6)))))
+    return letras, tokens
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    indice = IndiceSimilitud()
+
+    inicio = time.perf_counter()
+    for i in range(1, n + 1):
+        letras, tokens = _registro_sintetico(rng)
+        indice.agregar(i, letras, tokens, {})
+    print(f"Construcción de {n} registros: {time.perf_counter() - inicio:.2f} s")
+
+    consultas = [_registro_sintetico(rng) for _ in range(50)]
+    inicio = time.perf_counter()
+    for letras, tokens in consultas:
+        indice.buscar(letras, tokens, k=5)
+    print(f"Top-5 combinado: {(time.perf_counter() - inicio) / len(consultas) * 1000:.2f} ms por consulta")
@@ -0,0 +1,107 @@
+"""
+Benchmark de la cola de trabajos (utils.trabajos) frente a importar
+directamente con `importar_respuestas`.
+
+Importa el mismo archivo sintético de n filas dos veces en historiales vacíos:
+una con `importar_respuestas` en este proceso y otra como trabajo de la cola,
+que además guarda el avance en SQLite después de cada bloque. Después repite
+la importación por la cola cortándola a mitad de camino (como si se cayera el
+trabajador) y la retoma, verificando que el historial quede con cada fila una
+sola vez.
+
+Uso:
+    python benchmarks/bench_trabajos.py [n_filas]
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_modelo import evaluacion_sintetica
+from core.preguntas import CATEGORIAS
+from utils import trabajos
+from utils.importador import importar_respuestas
+from utils.persistencia import iterar_historial
+from utils.trabajos import Trabajador, encolar_trabajo, obtener_trabajo
+
+
+class _Caida(Exception):
+    pass
+
+
+def _escribir_archivo(ruta: str, n: int) -> None:
+    pids = [p["id"] for cat in CATEGORIAS for p in cat["preguntas"]]
+    rng = random.Random(19)
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["nombre_iniciativa", "equipo", "responsable"] + pids)
+        for i in range(n):
+            evaluacion = evaluacion_sintetica(rng, i)
+            writer.writerow(
+                [f"Iniciativa {i}", evaluacion["meta"]["equipo"], evaluacion["meta"]["responsable"]]
+                + [evaluacion["respuestas"][pid][0] for pid in pids]
+            )
+
+
+def _importar_por_cola(base_dir: str, ruta: str) -> int:
+    trabajo_id = encolar_trabajo(base_dir, "importar", {"ruta": ruta})
+    Trabajador(base_dir).correr()
+    return trabajo_id
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    print(f"{n:,} filas a importar, bloques de {trabajos.TAMANO_BLOQUE} en la cola\n")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "respuestas.csv")
+        _escribir_archivo(ruta, n)
+
+        base_directa = os.path.join(directorio, "directa")
+        inicio = time.perf_counter()
+        importar_respuestas(ruta, base_directa, trabajadores=1)
+        t_directa = time.perf_counter() - inicio
+
+        base_cola = os.path.join(directorio, "cola")
+        inicio = time.perf_counter()
+        trabajo_id = _importar_por_cola(base_cola, ruta)
+        t_cola = time.perf_counter() - inicio
+        assert obtener_trabajo(base_cola, trabajo_id)["estado"] == "terminado"
+        assert sum(1 for _ in iterar_historial(base_cola)) == n
+
+        # Caída a mitad de camino: el bloque en curso se guarda pero su avance no
+        base_caida = os.path.join(directorio, "caida")
+        trabajo_id = encolar_trabajo(base_caida, "importar", {"ruta": ruta})
+        guardar_avance = Trabajador._guardar_avance
+        bloques = [0]
+
+        def _cortar(self, id_trabajo, avance):
+            bloques[0] += 1
+            if bloques[0] > max(n // trabajos.TAMANO_BLOQUE // 2, 1):
+                raise _Caida()
+            return guardar_avance(self, id_trabajo, avance)
+
+        Trabajador._guardar_avance = _cortar
+        try:
+            Trabajador(base_caida).correr()
+        finally:
+            Trabajador._guardar_avance = guardar_avance
+        antes = obtener_trabajo(base_caida, trabajo_id)
+        assert antes["estado"] == "fallido"
+        guardadas = sum(1 for _ in iterar_historial(base_caida))
+        trabajos.reanudar_trabajo(base_caida, trabajo_id)
+        inicio = time.perf_counter()
+        Trabajador(base_caida).correr()
+        t_retomar = time.perf_counter() - inicio
+        nombres = [ev["meta"]["nombre_iniciativa"] for _, ev in iterar_historial(base_caida)]
+        assert len(nombres) == len(set(nombres)) == n
+
+    print(f"  {'importar_respuestas (1 proceso)':<36} {t_directa:>8.2f} s")
+    print(f"  {'trabajo de la cola':<36} {t_cola:>8.2f} s ({(t_cola / t_directa - 1) * 100:+.0f}%)")
+    print(f"\n  Corte tras {antes['hecho']:,} filas con avance guardado y {guardadas:,} en el historial:")
+    print(f"  {'retomar hasta el final':<36} {t_retomar:>8.2f} s, {len(nombres):,} filas, ninguna repetida")
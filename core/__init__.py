@@ -1,3 +1,4 @@
 """Paquete core del Evaluador de Iniciativas de Agentes."""
-from .preguntas import CATEGORIAS
+from .preguntas import CATEGORIAS, PUNTOS
 from .evaluador import calcular_puntaje, generar_veredicto
+from .modelo import EvaluacionCompacta, ResultadoEvaluacion, calcular_resultado
@@ -0,0 +1,105 @@
+"""
+Cotas del puntaje global alcanzable durante el cuestionario.
+
+Después de cada respuesta se sabe entre qué valores puede terminar el puntaje
+global. La cota inferior es el puntaje que resultaría si se detiene ahora
+(`calcular_puntaje` cuenta las preguntas sin responder como 0) y la superior,
+el que resultaría eligiendo la mejor opción en todas las pendientes. Cuando
+ambas caen en la misma banda de veredicto, las preguntas restantes ya no
+pueden cambiarlo y el cuestionario puede terminar antes.
+"""
+
+from bisect import bisect_right
+
+from .evaluador import (
+    UMBRAL_AGENTE_ALTAMENTE, UMBRAL_AGENTE_CLARO, UMBRAL_EVALUAR_ALTERNATIVAS, motor_reglas,
+)
+from .modelo import NIVELES
+from .preguntas import CATEGORIAS, PUNTOS, obtener_puntaje_maximo_categoria
+
+
+# Inicio de cada banda; el índice de banda coincide con el de NIVELES
+LIMITES_BANDA = (UMBRAL_EVALUAR_ALTERNATIVAS, UMBRAL_AGENTE_CLARO, UMBRAL_AGENTE_ALTAMENTE)
+
+_CATEGORIA_DE = {}          # pregunta_id → índice de categoría
+_MAXIMO_PREGUNTA = {}       # pregunta_id → mejor puntaje de sus opciones
+for _i, _cat in enumerate(CATEGORIAS):
+    for _preg in _cat["preguntas"]:
+        _CATEGORIA_DE[_preg["id"]] = _i
+        _MAXIMO_PREGUNTA[_preg["id"]] = max(PUNTOS[_preg["id"]].values())
+_MAXIMO_CATEGORIA = [obtener_puntaje_maximo_categoria(cat) for cat in CATEGORIAS]
+_PESOS = [cat["peso"] for cat in CATEGORIAS]
+
+
+def alcance_pregunta(pregunta_id: str) -> float:
+    """Cuántos puntos del puntaje global (0-100) puede mover una pregunta."""
+    i = _CATEGORIA_DE[pregunta_id]
+    return _MAXIMO_PREGUNTA[pregunta_id] / _MAXIMO_CATEGORIA[i] * 100 * _PESOS[i]
+
+
+def banda(puntaje: float) -> int:
+    """Índice de banda de veredicto: 0 = no construir … 3 = altamente recomendado."""
+    return bisect_right(LIMITES_BANDA, puntaje)
+
+
+def _ponderar(puntajes_categoria: list) -> float:
+    # Misma aritmética que calcular_puntaje, para que los bordes de banda coincidan
+    total = 0.0
+    for obtenido, maximo, peso in zip(puntajes_categoria, _MAXIMO_CATEGORIA, _PESOS):
+        porcentaje = (obtenido / maximo * 100) if maximo > 0 else 0
+        total += porcentaje * peso
+    return round(total, 1)
+
+
+class CotasPuntaje:
+    """
+    Cotas del puntaje global que se actualizan con cada respuesta.
+
+        cotas = CotasPuntaje()
+        cotas.responder("p1_1", 3)
+        if cotas.decidida:
+            print(cotas.nivel, cotas.minimo, cotas.maximo)
+    """
+
+    def __init__(self):
+        self._obtenido = [0] * len(CATEGORIAS)
+        self._pendiente = list(_MAXIMO_CATEGORIA)   # mejor puntaje aún alcanzable
+        self.pendientes = set(_CATEGORIA_DE)
+        self._actualizar()
+
+    def _actualizar(self) -> None:
+        self.minimo = _ponderar(self._obtenido)
+        self.maximo = _ponderar([o + p for o, p in zip(self._obtenido, self._pendiente)])
+
+    def copia(self) -> "CotasPuntaje":
+        otra = CotasPuntaje.__new__(CotasPuntaje)
+        otra._obtenido = list(self._obtenido)
+        otra._pendiente = list(self._pendiente)
+        otra.pendientes = set(self.pendientes)
+        otra.minimo, otra.maximo = self.minimo, self.maximo
+        return otra
+
+    def responder(self, pregunta_id: str, puntaje: int) -> None:
+        """Registra el puntaje de una pregunta pendiente y recalcula las cotas."""
+        self.pendientes.remove(pregunta_id)
+        i = _CATEGORIA_DE[pregunta_id]
+        self._obtenido[i] += puntaje
+        self._pendiente[i] -= _MAXIMO_PREGUNTA[pregunta_id]
+        self._actualizar()
+
+    @property
+    def decidida(self) -> bool:
+        """True si ninguna combinación de respuestas pendientes cambia la banda."""
+        return banda(self.minimo) == banda(self.maximo)
+
+    @property
+    def nivel(self) -> str:
+        """Nivel de veredicto ya fijado, o None si todavía puede cambiar."""
+        return NIVELES[banda(self.minimo)] if self.decidida else None
+
+    def pendientes_con_alertas(self) -> set:
+        """
+        Preguntas pendientes que aún pueden agregar alertas al reporte: las que
+        aparecen en condiciones de las reglas de alerta activas.
+        """
+        return self.pendientes & motor_reglas().preguntas_con_alertas
@@ -0,0 +1,125 @@
+"""
+Catálogo congelado de cada versión del cuestionario.
+
+Los registros compactos del historial guardan solo las letras elegidas y se
+vuelven a puntuar al leerlos (core.modelo.reconstruir_evaluacion). Para que eso
+devuelva exactamente lo que se guardó, cada versión deja en
+core/catalogos/v<N>.json todo lo que influye en el resultado: preguntas,
+opciones y puntajes, pesos de las categorías, umbrales, textos de los
+veredictos, alternativas y reglas por defecto. Los registros se reconstruyen
+con el archivo de su versión, nunca con el código actual.
+
+Al cambiar cualquiera de esos datos se incrementa VERSION_CUESTIONARIO
+(core/preguntas.py) y se congela la versión nueva:
+
+    python -m core.catalogo
+
+Mientras el catálogo vigente no coincida con el archivo de su versión, las
+evaluaciones nuevas no se reconstruyen igual y el historial las guarda
+completas; tests/test_catalogo.py falla para que no pase inadvertido.
+"""
+
+import json
+import os
+from typing import NamedTuple
+
+from .evaluador import ALTERNATIVAS, TEXTOS_VEREDICTO, UMBRALES
+from .preguntas import CATEGORIAS, VERSION_CUESTIONARIO
+from .reglas import MAXIMO_ALTERNATIVAS, REGLAS_POR_DEFECTO, MotorReglas, compilar_reglas
+
+
+DIRECTORIO_CATALOGOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogos")
+
+_CACHE = {}     # versión → Cuestionario
+
+
+class Cuestionario(NamedTuple):
+    """Catálogo congelado de una versión, listo para volver a puntuar."""
+
+    version: int
+    catalogo: dict      # forma JSON (ver `catalogo_vigente`)
+    orden: tuple        # ids de pregunta en el orden del cuestionario
+    puntos: dict        # {pregunta_id: {letra: puntaje}}
+    motor: MotorReglas  # reglas por defecto de la versión
+
+
+def catalogo_vigente() -> dict:
+    """Catálogo que define el código actual, tal como se guarda en JSON."""
+    return json.loads(json.dumps({
+        "version": VERSION_CUESTIONARIO,
+        "categorias": CATEGORIAS,
+        "umbrales": UMBRALES,
+        "veredictos": TEXTOS_VEREDICTO,
+        "alternativas": ALTERNATIVAS,
+        "reglas": REGLAS_POR_DEFECTO,
+        "maximo_alternativas": MAXIMO_ALTERNATIVAS,
+    }, ensure_ascii=False))
+
+
+def ruta_catalogo(version: int) -> str:
+    return os.path.join(DIRECTORIO_CATALOGOS, f"v{version}.json")
+
+
+def cargar_cuestionario(version: int = VERSION_CUESTIONARIO) -> Cuestionario:
+    """
+    Catálogo congelado de una versión del cuestionario.
+
+    Raises:
+        ValueError: si la versión no está congelada
+    """
+    if version not in _CACHE:
+        try:
+            with open(ruta_catalogo(version), encoding="utf-8") as f:
+                catalogo = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"Versión de cuestionario no disponible: {version}") from None
+        categorias = catalogo["categorias"]
+        _CACHE[version] = Cuestionario(
+            version,
+            catalogo,
+            tuple(preg["id"] for cat in categorias for preg in cat["preguntas"]),
+            {
+                preg["id"]: {op[0]: op[2] for op in preg["opciones"]}
+                for cat in categorias for preg in cat["preguntas"]
+            },
+            compilar_reglas(
+                catalogo["reglas"], catalogo["alternativas"], categorias, catalogo["maximo_alternativas"],
+            ),
+        )
+    return _CACHE[version]
+
+
+def congelar_catalogo() -> str:
+    """
+    Guarda el catálogo vigente en el archivo de VERSION_CUESTIONARIO.
+
+    Returns:
+        ruta del archivo (no se reescribe si ya tiene el mismo contenido)
+
+    Raises:
+        ValueError: si la versión ya está congelada con otro contenido
+    """
+    ruta = ruta_catalogo(VERSION_CUESTIONARIO)
+    vigente = catalogo_vigente()
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            if json.load(f) == vigente:
+                return ruta
+        raise ValueError(
+            f"El catálogo de la versión {VERSION_CUESTIONARIO} ya está congelado y no coincide: "
+            "incrementa VERSION_CUESTIONARIO en core/preguntas.py"
+        )
+    os.makedirs(DIRECTORIO_CATALOGOS, exist_ok=True)
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(vigente, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp, ruta)
+    return ruta
+
+
+if __name__ == "__main__":
+    try:
+        print(f"Catálogo congelado en {congelar_catalogo()}")
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
@@ -5,14 +5,100 @@ Implementa un sistema de scoring ponderado por categorías con umbrales de decis
 basados en los frameworks de Anthropic, Google Cloud, AWS y McKinsey.
 """
 
+from .metricas import EVALUACIONES_PUNTUADAS, PUNTAJE_GLOBAL, REGISTRO, VEREDICTOS
 from .preguntas import CATEGORIAS, obtener_puntaje_maximo_categoria
+from .reglas import REGLAS_POR_DEFECTO, UMBRAL_CATEGORIA_DEBIL, MotorReglas, compilar_reglas
 
 
 # ─── Umbrales de decisión ──────────────────────────────────────────────────────
+UMBRAL_AGENTE_ALTAMENTE = 85      # >= 85%  → Agente altamente recomendado
 UMBRAL_AGENTE_CLARO = 70          # >= 70%  → Construir agente
 UMBRAL_EVALUAR_ALTERNATIVAS = 45  # 45-69% → Explorar alternativas híbridas
 # < 45%  → No construir agente (solución alternativa)
 
+UMBRALES = {
+    "agente_altamente": UMBRAL_AGENTE_ALTAMENTE,
+    "agente_claro": UMBRAL_AGENTE_CLARO,
+    "evaluar_alternativas": UMBRAL_EVALUAR_ALTERNATIVAS,
+    "categoria_debil": UMBRAL_CATEGORIA_DEBIL,
+}
+
+# ─── Textos de cada veredicto ──────────────────────────────────────────────────
+# En "sustento", {puntaje} y {debilidades} se completan al generar el veredicto;
+# "sin_debilidades" reemplaza a {debilidades} si ninguna categoría es débil.
+_RECOMENDACIONES_AGENTE = [
+    "Comenzar con un MVP (Producto Mínimo Viable) acotado en alcance",
+    "Definir métricas claras de éxito antes de comenzar (tasa de error, tiempo ahorrado, adopción)",
+    "Implementar supervisión humana en el loop durante las primeras semanas",
+    "Usar herramientas gratuitas: Ollama (local) o Groq API para el LLM base",
+    "Documentar todos los casos de borde y failures desde el inicio",
+    "Planear un ciclo de evaluación y mejora continua (al menos mensual)",
+]
+
+TEXTOS_VEREDICTO = {
+    "agente_altamente": {
+        "nivel": "AGENTE ALTAMENTE RECOMENDADO",
+        "emoji": "🟢",
+        "construir_agente": True,
+        "sustento": (
+            "Con un puntaje de {puntaje}%, esta iniciativa presenta las características ideales para un agente de IA. "
+            "El problema es genuinamente complejo, con múltiples pasos interdependientes, datos no estructurados y "
+            "necesidad de razonamiento adaptativo. El impacto en el negocio es significativo (alta frecuencia, "
+            "tiempo invertido considerable, amplio alcance organizacional) y la organización cuenta con las "
+            "condiciones técnicas y culturales para adoptarlo. Según el framework de Anthropic ('Building Effective Agents'), "
+            "este es exactamente el tipo de problema donde los agentes añaden valor real que los workflows simples no pueden ofrecer."
+        ),
+        "recomendaciones_construccion": _RECOMENDACIONES_AGENTE,
+    },
+    "agente_claro": {
+        "nivel": "AGENTE RECOMENDADO",
+        "emoji": "🟢",
+        "construir_agente": True,
+        "sustento": (
+            "Con un puntaje de {puntaje}%, esta iniciativa tiene sólidos fundamentos para construir un agente. "
+            "Hay complejidad real en el proceso, impacto de negocio justificable y condiciones técnicas adecuadas. "
+            "Se recomienda comenzar con un prototipo acotado (MVP), validar en producción con supervisión humana "
+            "y escalar progresivamente. Siguiendo el principio de Google Cloud: 'define el éxito antes de construir'."
+        ),
+        "recomendaciones_construccion": _RECOMENDACIONES_AGENTE,
+    },
+    "evaluar_alternativas": {
+        "nivel": "ZONA GRIS: EVALÚA ANTES DE CONSTRUIR",
+        "emoji": "🟡",
+        "construir_agente": False,
+        "sustento": (
+            "Con un puntaje de {puntaje}%, la iniciativa muestra potencial pero tiene debilidades importantes en: "
+            "{debilidades}. Antes de comprometer recursos en un agente completo, se recomienda validar "
+            "con una solución más simple (workflow, prompt chaining o LLM directo) para verificar que la complejidad "
+            "de un agente es realmente necesaria. Como señala Anthropic: 'Aumenta la complejidad solo cuando las "
+            "soluciones más simples demuestren ser insuficientes.'"
+        ),
+        "sin_debilidades": "algunas dimensiones clave",
+        "recomendaciones_construccion": [
+            "Validar primero con un workflow simple o prompt chaining durante 4-6 semanas",
+            "Medir si la solución simple resuelve el 80% del problema",
+            "Solo si quedan casos no resueltos, entonces construir el agente",
+            "Resolver las brechas identificadas (datos, capacidad técnica, adopción) antes de escalar",
+        ],
+    },
+    "no_construir": {
+        "nivel": "NO SE RECOMIENDA CONSTRUIR UN AGENTE",
+        "emoji": "🔴",
+        "construir_agente": False,
+        "sustento": (
+            "Con un puntaje de {puntaje}%, la iniciativa no justifica la inversión en un agente de IA en este momento. "
+            "Las debilidades son significativas en: {debilidades}. "
+            "Construir un agente en estas condiciones representaría un desperdicio de tiempo, esfuerzo y recursos, "
+            "con alta probabilidad de fracaso técnico o de adopción. La evidencia de la industria muestra que el 99% "
+            "de las implementaciones de agentes que fracasan lo hacen porque el problema no requería esa solución "
+            "(Bain, 2024: solo 1% de implementaciones de agentes son consideradas 'maduras'). "
+            "Existen alternativas más simples, económicas y confiables para resolver tu problema."
+        ),
+        "sin_debilidades": "múltiples dimensiones clave",
+        "recomendaciones_construccion": [],
+    },
+}
+
 # ─── Alternativas según categorías débiles ────────────────────────────────────
 ALTERNATIVAS = {
     "proceso_simple": {
@@ -66,12 +152,37 @@ ALTERNATIVAS = {
 }
 
 
-def calcular_puntaje(respuestas: dict) -> dict:
+# ─── Reglas de alertas y alternativas ─────────────────────────────────────────
+MOTOR_POR_DEFECTO = compilar_reglas(REGLAS_POR_DEFECTO, ALTERNATIVAS)
+_MOTOR = MOTOR_POR_DEFECTO
+
+
+def usar_reglas(reglas: list = None) -> MotorReglas:
+    """
+    Compila `reglas` (ver core/reglas.py) y las usa en los veredictos siguientes
+    del proceso. Sin argumentos vuelve a las reglas por defecto.
+
+    Raises:
+        ValueError: si alguna regla no es válida
+    """
+    global _MOTOR
+    _MOTOR = MOTOR_POR_DEFECTO if reglas is None else compilar_reglas(reglas, ALTERNATIVAS)
+    return _MOTOR
+
+
+def motor_reglas() -> MotorReglas:
+    """Motor de reglas que usa `generar_veredicto` por defecto."""
+    return _MOTOR
+
+
+def calcular_puntaje(respuestas: dict, registrar_metricas: bool = True, categorias: list = None) -> dict:
     """
     Calcula el puntaje total y por categoría basado en las respuestas del usuario.
 
     Args:
         respuestas: dict con {pregunta_id: (letra_opcion, puntaje)}
+        registrar_metricas: False al reconstruir registros ya puntuados
+        categorias: cuestionario con que se puntúa (por defecto, el actual)
 
     Returns:
         dict con resultados detallados por categoría y puntaje global
@@ -79,7 +190,7 @@ def calcular_puntaje(respuestas: dict) -> dict:
     resultados_categorias = []
     puntaje_global_ponderado = 0.0
 
-    for categoria in CATEGORIAS:
+    for categoria in categorias or CATEGORIAS:
         puntaje_obtenido = 0
         puntaje_maximo = obtener_puntaje_maximo_categoria(categoria)
         detalles_preguntas = []
@@ -114,223 +225,69 @@ def calcular_puntaje(respuestas: dict) -> dict:
             "preguntas": detalles_preguntas
         })
 
+    puntaje_global = round(puntaje_global_ponderado, 1)
+
+    if registrar_metricas and REGISTRO.activo:
+        EVALUACIONES_PUNTUADAS.inc()
+        PUNTAJE_GLOBAL.observar(puntaje_global)
+
     return {
-        "puntaje_global": round(puntaje_global_ponderado, 1),
+        "puntaje_global": puntaje_global,
         "categorias": resultados_categorias
     }
 
 
-def generar_veredicto(puntaje_global: float, resultados_categorias: list) -> dict:
+def generar_veredicto(puntaje_global: float, resultados_categorias: list,
+                      registrar_metricas: bool = True, motor: MotorReglas = None,
+                      catalogo: dict = None) -> dict:
     """
     Genera el veredicto final, sustento y recomendaciones según el puntaje.
 
+    Args:
+        motor: reglas de alertas y alternativas (por defecto, las de `usar_reglas`)
+        catalogo: umbrales, textos y alternativas de otra versión del
+            cuestionario (ver core/catalogo.py); por defecto, los de este módulo
+
     Returns:
         dict con veredicto, nivel, sustento, alertas y alternativas recomendadas
     """
+    umbrales = catalogo["umbrales"] if catalogo else UMBRALES
+
     # ── Identificar categorías débiles ────────────────────────────────────────
-    cats_debiles = [c for c in resultados_categorias if c["porcentaje"] < 40]
-    cats_nombre_debiles = [c["nombre"] for c in cats_debiles]
+    cats_debiles = [c for c in resultados_categorias if c["porcentaje"] < umbrales["categoria_debil"]]
 
-    # ── Señales de alerta específicas ─────────────────────────────────────────
-    alertas = _detectar_alertas(resultados_categorias)
+    # ── Alertas y alternativas según las reglas ───────────────────────────────
+    alertas, claves = (motor or _MOTOR).evaluar(puntaje_global, resultados_categorias)
+    alternativas = [(catalogo["alternativas"] if catalogo else ALTERNATIVAS)[clave] for clave in claves]
 
     # ── Veredicto por umbral ───────────────────────────────────────────────────
-    if puntaje_global >= UMBRAL_AGENTE_CLARO:
-        veredicto = _veredicto_si(puntaje_global, alertas)
-    elif puntaje_global >= UMBRAL_EVALUAR_ALTERNATIVAS:
-        veredicto = _veredicto_hibrido(puntaje_global, cats_debiles, alertas)
-    else:
-        veredicto = _veredicto_no(puntaje_global, cats_debiles, alertas)
-
-    return veredicto
-
-
-def _detectar_alertas(resultados_categorias: list) -> list:
-    """Detecta señales de alerta específicas basadas en respuestas críticas."""
-    alertas = []
-
-    # Mapa: {pregunta_id: {respuesta: mensaje_alerta}}
-    ALERTAS_MAPA = {
-        "p2_1": {  # KPI definido
-            "C": "⚠️  ALERTA DE ESTRATEGIA: No hay un KPI concreto que el agente deba impactar. Sin un indicador de éxito definido, no podrás medir el retorno ni justificar la inversión. Define primero qué métrica vas a mover."
-        },
-        "p2_3": {  # Valor económico del KPI
-            "C": "⚠️  ALERTA DE ROI: No se ha calculado el valor económico del impacto. Sin este dato es imposible priorizar esta iniciativa frente a otras o aprobar presupuesto."
-        },
-        "p2_4": {  # Tiempo para ver impacto en KPIs
-            "D": "⚠️  ALERTA DE VALOR: No está claro cuándo ni cómo se vería el impacto en los indicadores. Iniciativas sin horizonte de valor definido tienen alta probabilidad de ser canceladas."
-        },
-        "p3_3": {  # Tolerancia al error (antes p2_3)
-            "C": "⚠️  ALERTA CRÍTICA: El proceso tiene alto impacto ante errores. Un agente autónomo puede generar consecuencias graves. Se requiere supervisión humana constante o descartar el agente."
-        },
-        "p4_1": {  # Disponibilidad de datos (antes p3_1)
-            "C": "⚠️  ALERTA DE DATOS: Sin datos digitalizados y accesibles, ningún sistema de IA funcionará. Resuelve primero la calidad y acceso a datos."
-        },
-        "p4_2": {  # Capacidad técnica (antes p3_2)
-            "C": "⚠️  ALERTA TÉCNICA: Sin capacidad técnica interna, el agente generará dependencia total de terceros y riesgo operacional alto."
-        },
-        "p6_2": {  # Resistencia del equipo (antes p5_2)
-            "C": "⚠️  ALERTA DE ADOPCIÓN: Alta resistencia del equipo puede hacer fracasar el proyecto. Gestionar el cambio antes de construir."
-        },
-    }
-
-    # Construir índice de texto → id de pregunta
-    texto_a_id = {}
-    for p_cat in CATEGORIAS:
-        for p in p_cat["preguntas"]:
-            texto_a_id[p["texto"]] = p["id"]
-
-    for cat in resultados_categorias:
-        for preg in cat["preguntas"]:
-            pregunta_id = texto_a_id.get(preg["pregunta"])
-            if pregunta_id and pregunta_id in ALERTAS_MAPA:
-                respuesta = preg["respuesta"]
-                if respuesta in ALERTAS_MAPA[pregunta_id]:
-                    alertas.append(ALERTAS_MAPA[pregunta_id][respuesta])
-
-    return alertas
-
-
-def _veredicto_si(puntaje: float, alertas: list) -> dict:
-    if puntaje >= 85:
-        nivel = "AGENTE ALTAMENTE RECOMENDADO"
-        emoji = "🟢"
-        sustento = (
-            f"Con un puntaje de {puntaje}%, esta iniciativa presenta las características ideales para un agente de IA. "
-            "El problema es genuinamente complejo, con múltiples pasos interdependientes, datos no estructurados y "
-            "necesidad de razonamiento adaptativo. El impacto en el negocio es significativo (alta frecuencia, "
-            "tiempo invertido considerable, amplio alcance organizacional) y la organización cuenta con las "
-            "condiciones técnicas y culturales para adoptarlo. Según el framework de Anthropic ('Building Effective Agents'), "
-            "este es exactamente el tipo de problema donde los agentes añaden valor real que los workflows simples no pueden ofrecer."
-        )
+    if puntaje_global >= umbrales["agente_altamente"]:
+        clave, alternativas = "agente_altamente", []
+    elif puntaje_global >= umbrales["agente_claro"]:
+        clave, alternativas = "agente_claro", []
+    elif puntaje_global >= umbrales["evaluar_alternativas"]:
+        clave = "evaluar_alternativas"
     else:
-        nivel = "AGENTE RECOMENDADO"
-        emoji = "🟢"
-        sustento = (
-            f"Con un puntaje de {puntaje}%, esta iniciativa tiene sólidos fundamentos para construir un agente. "
-            "Hay complejidad real en el proceso, impacto de negocio justificable y condiciones técnicas adecuadas. "
-            "Se recomienda comenzar con un prototipo acotado (MVP), validar en producción con supervisión humana "
-            "y escalar progresivamente. Siguiendo el principio de Google Cloud: 'define el éxito antes de construir'."
-        )
-
-    return {
-        "nivel": nivel,
-        "emoji": emoji,
-        "construir_agente": True,
-        "sustento": sustento,
-        "recomendaciones_construccion": [
-            "Comenzar con un MVP (Producto Mínimo Viable) acotado en alcance",
-            "Definir métricas claras de éxito antes de comenzar (tasa de error, tiempo ahorrado, adopción)",
-            "Implementar supervisión humana en el loop durante las primeras semanas",
-            "Usar herramientas gratuitas: Ollama (local) o Groq API para el LLM base",
-            "Documentar todos los casos de borde y failures desde el inicio",
-            "Planear un ciclo de evaluación y mejora continua (al menos mensual)",
-        ],
-        "alertas": alertas,
-        "alternativas": []
-    }
-
-
-def _veredicto_hibrido(puntaje: float, cats_debiles: list, alertas: list) -> dict:
-    nivel = "ZONA GRIS: EVALÚA ANTES DE CONSTRUIR"
-    emoji = "🟡"
+        clave = "no_construir"
+    textos = (catalogo["veredictos"] if catalogo else TEXTOS_VEREDICTO)[clave]
+    veredicto = _armar_veredicto(textos, puntaje_global, cats_debiles, alertas, alternativas)
 
-    cats_nombres = [c["nombre"] for c in cats_debiles]
-    debilidades_texto = ", ".join(cats_nombres) if cats_nombres else "algunas dimensiones clave"
-
-    sustento = (
-        f"Con un puntaje de {puntaje}%, la iniciativa muestra potencial pero tiene debilidades importantes en: "
-        f"{debilidades_texto}. Antes de comprometer recursos en un agente completo, se recomienda validar "
-        "con una solución más simple (workflow, prompt chaining o LLM directo) para verificar que la complejidad "
-        "de un agente es realmente necesaria. Como señala Anthropic: 'Aumenta la complejidad solo cuando las "
-        "soluciones más simples demuestren ser insuficientes.'"
-    )
-
-    alternativas_recomendadas = _seleccionar_alternativas(cats_debiles)
-
-    return {
-        "nivel": nivel,
-        "emoji": emoji,
-        "construir_agente": False,
-        "sustento": sustento,
-        "recomendaciones_construccion": [
-            "Validar primero con un workflow simple o prompt chaining durante 4-6 semanas",
-            "Medir si la solución simple resuelve el 80% del problema",
-            "Solo si quedan casos no resueltos, entonces construir el agente",
-            "Resolver las brechas identificadas (datos, capacidad técnica, adopción) antes de escalar",
-        ],
-        "alertas": alertas,
-        "alternativas": alternativas_recomendadas
-    }
+    if registrar_metricas and REGISTRO.activo:
+        VEREDICTOS.con(veredicto["nivel"]).inc()
 
+    return veredicto
 
-def _veredicto_no(puntaje: float, cats_debiles: list, alertas: list) -> dict:
-    nivel = "NO SE RECOMIENDA CONSTRUIR UN AGENTE"
-    emoji = "🔴"
 
+def _armar_veredicto(textos: dict, puntaje: float, cats_debiles: list, alertas: list, alternativas: list) -> dict:
     cats_nombres = [c["nombre"] for c in cats_debiles]
-    debilidades_texto = ", ".join(cats_nombres) if cats_nombres else "múltiples dimensiones clave"
-
-    sustento = (
-        f"Con un puntaje de {puntaje}%, la iniciativa no justifica la inversión en un agente de IA en este momento. "
-        f"Las debilidades son significativas en: {debilidades_texto}. "
-        "Construir un agente en estas condiciones representaría un desperdicio de tiempo, esfuerzo y recursos, "
-        "con alta probabilidad de fracaso técnico o de adopción. La evidencia de la industria muestra que el 99% "
-        "de las implementaciones de agentes que fracasan lo hacen porque el problema no requería esa solución "
-        "(Bain, 2024: solo 1% de implementaciones de agentes son consideradas 'maduras'). "
-        "Existen alternativas más simples, económicas y confiables para resolver tu problema."
-    )
-
-    alternativas_recomendadas = _seleccionar_alternativas(cats_debiles)
+    debilidades_texto = ", ".join(cats_nombres) if cats_nombres else textos.get("sin_debilidades", "")
 
     return {
-        "nivel": nivel,
-        "emoji": emoji,
-        "construir_agente": False,
-        "sustento": sustento,
-        "recomendaciones_construccion": [],
+        "nivel": textos["nivel"],
+        "emoji": textos["emoji"],
+        "construir_agente": textos["construir_agente"],
+        "sustento": textos["sustento"].format(puntaje=puntaje, debilidades=debilidades_texto),
+        "recomendaciones_construccion": list(textos["recomendaciones_construccion"]),
         "alertas": alertas,
-        "alternativas": alternativas_recomendadas
+        "alternativas": alternativas
     }
-
-
-def _seleccionar_alternativas(cats_debiles: list) -> list:
-    """Selecciona las alternativas más relevantes según las categorías débiles."""
-    alternativas_seleccionadas = []
-    ids_debiles = {c["id"] for c in cats_debiles}
-
-    # KPIs indefinidos → primero definir caso de negocio
-    if "kpis" in ids_debiles:
-        alternativas_seleccionadas.append(ALTERNATIVAS["definir_kpis"])
-
-    # Siempre recomendar soluciones simples como punto de partida
-    alternativas_seleccionadas.append(ALTERNATIVAS["llm_simple"])
-
-    if "problema" in ids_debiles:
-        # Problema no complejo → workflow o script simple
-        alternativas_seleccionadas.append(ALTERNATIVAS["workflow"])
-        alternativas_seleccionadas.append(ALTERNATIVAS["proceso_simple"])
-
-    if "impacto" in ids_debiles:
-        # Bajo impacto operacional → capacitación o dashboard
-        alternativas_seleccionadas.append(ALTERNATIVAS["dashboard_bi"])
-        alternativas_seleccionadas.append(ALTERNATIVAS["capacitacion"])
-
-    if "viabilidad_tecnica" in ids_debiles:
-        # Sin datos o capacidad técnica → RPA o workflow sin código
-        alternativas_seleccionadas.append(ALTERNATIVAS["rpa"])
-
-    if "complejidad_alternativas" in ids_debiles:
-        # Proceso simple → prompt chaining o script
-        alternativas_seleccionadas.append(ALTERNATIVAS["prompt_chaining"])
-        alternativas_seleccionadas.append(ALTERNATIVAS["proceso_simple"])
-
-    # Eliminar duplicados manteniendo orden
-    vistas = set()
-    resultado = []
-    for alt in alternativas_seleccionadas:
-        if alt["nombre"] not in vistas:
-            vistas.add(alt["nombre"])
-            resultado.append(alt)
-
-    return resultado[:4]  # Máximo 4 alternativas
@@ -0,0 +1,264 @@
+"""
+Respuestas con incertidumbre y probabilidad de cada veredicto.
+
+Cuando quien responde duda entre opciones puede dar una distribución, por
+ejemplo {"A": 0.7, "B": 0.3}. El puntaje y el veredicto del registro se
+calculan con la opción más probable de cada pregunta; además se calcula la
+distribución exacta del puntaje global y la probabilidad de cada banda de
+veredicto.
+
+El cálculo es exacto sin enumerar combinaciones. El puntaje de cada categoría
+es la suma de los puntajes (enteros) de sus preguntas, así que su distribución
+es la convolución de las distribuciones de las preguntas. El puntaje global es
+Σ puntaje_c / máximo_c · 100 · peso_c. Con pesos de dos decimales, al
+multiplicarlo por L (el mcm de los denominadores de los coeficientes) queda
+un entero entre 0 y 100·L. Así, la distribución global es la convolución de
+las distribuciones de categoría desplazadas por su coeficiente sobre una
+grilla de 100·L + 1 puntos (4.801 con el cuestionario actual).
+
+`muestrear_puntajes` es la alternativa por muestreo: toma las n muestras de
+cada pregunta de una vez y las suma en la misma grilla. Se usa si la grilla
+supera `LIMITE_GRILLA` puntos, lo que ocurre con pesos de muchos decimales.
+Con los pesos actuales el cálculo exacto tarda unos ms aun con todas las
+preguntas en duda, menos que 20.000 muestras.
+"""
+
+import random
+import re
+from fractions import Fraction
+from math import gcd
+from operator import add
+
+from .adaptativo import banda
+from .modelo import NIVELES
+from .preguntas import CATEGORIAS, PUNTOS, obtener_puntaje_maximo_categoria
+
+
+TOLERANCIA_SUMA = 0.01          # cuánto puede apartarse de 1 la suma de probabilidades
+LIMITE_GRILLA = 1_000_000       # sobre este tamaño de grilla se muestrea
+MUESTRAS = 20_000
+PERCENTILES = (5, 95)           # intervalo informado del puntaje global
+
+_CATEGORIA_DE = {              # pregunta_id → índice de categoría
+    preg["id"]: i for i, cat in enumerate(CATEGORIAS) for preg in cat["preguntas"]
+}
+
+
+def _coeficientes() -> tuple:
+    """(L, [unidades de grilla por punto de cada categoría])."""
+    coeficientes = []
+    for cat in CATEGORIAS:
+        maximo = obtener_puntaje_maximo_categoria(cat)
+        peso = Fraction(cat["peso"]).limit_denominator(10_000)
+        coeficientes.append(peso * 100 / maximo if maximo > 0 else Fraction(0))
+    escala = 1
+    for c in coeficientes:
+        escala = escala * c.denominator // gcd(escala, c.denominator)
+    return escala, [int(c * escala) for c in coeficientes]
+
+
+ESCALA, _UNIDADES = _coeficientes()
+
+
+# ─── Entrada ───────────────────────────────────────────────────────────────────
+_PATRON_PARTE = re.compile(r"([A-Za-z])\s*[:=]?\s*(\d+(?:[.,]\d+)?)\s*(%?)")
+_SEPARADORES = re.compile(r"[\s,;/|]+")
+_PATRON_DISTRIBUCION = re.compile(
+    rf"\s*{_PATRON_PARTE.pattern}(?:{_SEPARADORES.pattern}{_PATRON_PARTE.pattern})*[\s,;/|]*"
+)
+
+
+def parece_distribucion(texto: str) -> bool:
+    """True si el texto tiene la forma "A:70 B:30" (aunque las cifras no sumen 1)."""
+    return _PATRON_DISTRIBUCION.fullmatch(texto) is not None
+
+
+def interpretar_distribucion(texto: str, pregunta_id: str) -> dict:
+    """
+    Lee una respuesta con incertidumbre como "A:70 B:30", "A=0.7, B=0.3" o
+    "A 70% / B 30%". Sin "%", si algún valor es mayor que 1 se toman todos
+    como porcentajes.
+
+    Returns:
+        dict {letra: probabilidad} normalizado a suma 1
+
+    Raises:
+        ValueError: si el texto no es una distribución válida para la pregunta
+    """
+    partes, posicion = [], 0
+    texto = texto.strip()
+    while posicion < len(texto):
+        separador = _SEPARADORES.match(texto, posicion)
+        if separador:
+            posicion = separador.end()
+            continue
+        parte = _PATRON_PARTE.match(texto, posicion)
+        if parte is None:
+            raise ValueError(f"no se entiende '{texto[posicion:]}' (formato: A:70 B:30)")
+        partes.append((parte.group(1).upper(), float(parte.group(2).replace(",", ".")), parte.group(3)))
+        posicion = parte.end()
+    if not partes:
+        raise ValueError("respuesta vacía")
+    en_porcentaje = any(p[2] or p[1] > 1 for p in partes)
+    return validar_distribucion(
+        {letra: valor / 100 if en_porcentaje else valor for letra, valor, _ in partes}, pregunta_id
+    )
+
+
+def validar_distribucion(distribucion: dict, pregunta_id: str) -> dict:
+    """
+    Verifica letras y probabilidades de una distribución y la normaliza.
+
+    Raises:
+        ValueError: con letras que no son opciones, probabilidades negativas o
+            una suma que no es 1
+    """
+    opciones = PUNTOS[pregunta_id]
+    resultado = {}
+    for letra, probabilidad in distribucion.items():
+        letra = str(letra).strip().upper()
+        if letra not in opciones:
+            raise ValueError(f"'{letra}' no es una opción de {pregunta_id} ({', '.join(opciones)})")
+        if isinstance(probabilidad, bool) or not isinstance(probabilidad, (int, float)) or probabilidad < 0:
+            raise ValueError(f"probabilidad inválida para {letra}: {probabilidad!r}")
+        resultado[letra] = resultado.get(letra, 0.0) + float(probabilidad)
+    total = sum(resultado.values())
+    if abs(total - 1) > TOLERANCIA_SUMA:
+        raise ValueError(f"las probabilidades suman {total:.0%}, no 100%")
+    return {letra: p / total for letra, p in resultado.items() if p > 0}
+
+
+def opcion_mas_probable(distribucion: dict, pregunta_id: str) -> tuple:
+    """(letra, puntaje) de la opción más probable; a igual probabilidad, la primera del cuestionario."""
+    opciones = PUNTOS[pregunta_id]
+    letra = max(opciones, key=lambda l: (distribucion.get(l, 0.0), -list(opciones).index(l)))
+    return letra, opciones[letra]
+
+
+# ─── Distribución exacta ───────────────────────────────────────────────────────
+def _convolucionar(a: list, b: dict, paso: int = 1) -> list:
+    """Convolución de la lista densa `a` con {desplazamiento: probabilidad}·paso."""
+    resultado = [0.0] * (len(a) + max(b) * paso)
+    for desplazamiento, probabilidad in b.items():
+        inicio = desplazamiento * paso
+        fin = inicio + len(a)
+        resultado[inicio:fin] = map(add, resultado[inicio:fin], [probabilidad * x for x in a])
+    return resultado
+
+
+def _distribuciones_pregunta(respuestas: dict, distribuciones: dict) -> dict:
+    """pregunta_id → {puntaje: probabilidad}; sin responder cuenta como 0."""
+    por_pregunta = {}
+    for pid, puntajes in PUNTOS.items():
+        if pid in distribuciones:
+            dist = {}
+            for letra, probabilidad in distribuciones[pid].items():
+                dist[puntajes[letra]] = dist.get(puntajes[letra], 0.0) + probabilidad
+            por_pregunta[pid] = dist
+        elif pid in respuestas:
+            por_pregunta[pid] = {respuestas[pid][1]: 1.0}
+    return por_pregunta
+
+
+def distribucion_puntaje(respuestas: dict, distribuciones: dict = None) -> dict:
+    """
+    Distribución exacta del puntaje global.
+
+    Args:
+        respuestas: {pregunta_id: (letra, puntaje)} de las preguntas sin duda
+        distribuciones: {pregunta_id: {letra: probabilidad}}; tienen prioridad
+            sobre `respuestas`
+
+    Returns:
+        dict {puntaje_global (redondeado como calcular_puntaje): probabilidad}
+    """
+    por_pregunta = _distribuciones_pregunta(respuestas, distribuciones or {})
+    por_categoria = [[1.0] for _ in CATEGORIAS]
+    for pid, dist in por_pregunta.items():
+        i = _CATEGORIA_DE[pid]
+        por_categoria[i] = _convolucionar(por_categoria[i], dist)
+    grilla = [1.0]
+    for dist, unidades in zip(por_categoria, _UNIDADES):
+        grilla = _convolucionar(grilla, {s: p for s, p in enumerate(dist) if p > 0}, unidades)
+    resultado = {}
+    for n, probabilidad in enumerate(grilla):
+        if probabilidad > 0:
+            puntaje = round(n / ESCALA, 1)
+            resultado[puntaje] = resultado.get(puntaje, 0.0) + probabilidad
+    return resultado
+
+
+def probabilidades_nivel(distribucion: dict) -> dict:
+    """{nivel de veredicto: probabilidad} para una distribución del puntaje global."""
+    probabilidades = [0.0] * len(NIVELES)
+    for puntaje, probabilidad in distribucion.items():
+        probabilidades[banda(puntaje)] += probabilidad
+    return dict(zip(NIVELES, probabilidades))
+
+
+def _percentil(distribucion: dict, q: float) -> float:
+    acumulado = 0.0
+    for puntaje in sorted(distribucion):
+        acumulado += distribucion[puntaje]
+        if acumulado >= q / 100 - 1e-12:
+            return puntaje
+    return max(distribucion)
+
+
+def resumir_incertidumbre(respuestas: dict, distribuciones: dict, muestras: int = None,
+                          rng: random.Random = None) -> dict:
+    """
+    Resumen que se guarda en el registro (clave "incertidumbre").
+
+    Args:
+        respuestas: {pregunta_id: (letra, puntaje)} con la opción más probable
+        distribuciones: {pregunta_id: {letra: probabilidad}} de las preguntas con duda
+        muestras: si se pasa, estima por muestreo en lugar del cálculo exacto
+            (por defecto solo se muestrea si la grilla supera `LIMITE_GRILLA`)
+
+    Returns:
+        dict: respuestas (las distribuciones), niveles ({nivel: probabilidad}),
+        prob_agente_recomendado (puntaje >= 70), puntaje_esperado, intervalo
+        (percentiles 5 y 95) y metodo ("exacto" o "muestreo")
+    """
+    if muestras is None and 100 * ESCALA + 1 > LIMITE_GRILLA:
+        muestras = MUESTRAS
+    if muestras:
+        puntajes = muestrear_puntajes(respuestas, distribuciones, muestras, rng)
+        distribucion = {}
+        for puntaje in puntajes:
+            distribucion[puntaje] = distribucion.get(puntaje, 0) + 1 / muestras
+    else:
+        distribucion = distribucion_puntaje(respuestas, distribuciones)
+    niveles = probabilidades_nivel(distribucion)
+    return {
+        "respuestas": distribuciones,
+        "niveles": {nivel: round(p, 4) for nivel, p in niveles.items()},
+        "prob_agente_recomendado": round(niveles[NIVELES[2]] + niveles[NIVELES[3]], 4),
+        "puntaje_esperado": round(sum(p * q for p, q in distribucion.items()), 1),
+        "intervalo": [_percentil(distribucion, q) for q in PERCENTILES],
+        "metodo": "muestreo" if muestras else "exacto",
+    }
+
+
+# ─── Muestreo ──────────────────────────────────────────────────────────────────
+def muestrear_puntajes(respuestas: dict, distribuciones: dict, n: int,
+                       rng: random.Random = None) -> list:
+    """
+    n puntajes globales muestreados. Las preguntas sin duda aportan una
+    constante; las demás se muestrean de a n por pregunta y se suman en la
+    grilla entera de `distribucion_puntaje`.
+    """
+    rng = rng or random.Random()
+    base = 0
+    columnas = []
+    for pid, dist in _distribuciones_pregunta(respuestas, distribuciones).items():
+        unidades = _UNIDADES[_CATEGORIA_DE[pid]]
+        if len(dist) == 1:
+            base += next(iter(dist)) * unidades
+            continue
+        valores = [s * unidades for s in dist]
+        columnas.append(rng.choices(valores, weights=list(dist.values()), k=n))
+    if not columnas:
+        return [round(base / ESCALA, 1)] * n
+    return [round((base + sum(fila)) / ESCALA, 1) for fila in zip(*columnas)]
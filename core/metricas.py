@@ -0,0 +1,275 @@
+"""
+Registro de métricas operacionales del evaluador (formato de exposición Prometheus).
+
+Pensado para cuando el evaluador corre como servicio de larga duración. Los
+contadores e histogramas usan una celda por hilo: cada hilo escribe solo en su
+propia celda y la lectura suma todas, de modo que el camino caliente (scoring)
+no toma ningún lock.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ─── Buckets por defecto ───────────────────────────────────────────────────────
+BUCKETS_PUNTAJE = (10, 20, 30, 40, 45, 50, 60, 70, 80, 85, 90, 100)
+BUCKETS_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Contador:
+    """Contador monótono con una celda por hilo (sin locks al incrementar)."""
+
+    __slots__ = ("_celdas",)
+
+    def __init__(self):
+        self._celdas = {}
+
+    def inc(self, cantidad: float = 1) -> None:
+        ident = threading.get_ident()
+        celda = self._celdas.get(ident)
+        if celda is None:
+            celda = self._celdas.setdefault(ident, [0])
+        celda[0] += cantidad
+
+    def valor(self) -> float:
+        return sum(c[0] for c in list(self._celdas.values()))
+
+
+class Indicador:
+    """Valor instantáneo que puede subir o bajar (ej. profundidad de cola)."""
+
+    __slots__ = ("_valor",)
+
+    def __init__(self):
+        self._valor = 0
+
+    def set(self, valor: float) -> None:
+        self._valor = valor
+
+    def inc(self, cantidad: float = 1) -> None:
+        self._valor += cantidad
+
+    def dec(self, cantidad: float = 1) -> None:
+        self._valor -= cantidad
+
+    def valor(self) -> float:
+        return self._valor
+
+
+class Histograma:
+    """
+    Histograma de buckets fijos. Cada hilo acumula en su propia celda
+    [conteos por bucket..., +Inf, suma]; la exposición combina las celdas.
+    """
+
+    __slots__ = ("buckets", "_celdas")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = tuple(sorted(buckets))
+        self._celdas = {}
+
+    def observar(self, valor: float) -> None:
+        ident = threading.get_ident()
+        celda = self._celdas.get(ident)
+        if celda is None:
+            celda = self._celdas.setdefault(ident, [0] * (len(self.buckets) + 2))
+        celda[bisect_left(self.buckets, valor)] += 1
+        celda[-1] += valor
+
+    def instantanea(self) -> tuple:
+        """Retorna (conteos acumulados por bucket incluyendo +Inf, suma, total)."""
+        n = len(self.buckets) + 1
+        conteos = [0] * n
+        suma = 0.0
+        for celda in list(self._celdas.values()):
+            for i in range(n):
+                conteos[i] += celda[i]
+            suma += celda[-1]
+        acumulados = []
+        total = 0
+        for c in conteos:
+            total += c
+            acumulados.append(total)
+        return acumulados, suma, total
+
+
+class _Familia:
+    """Agrupa las series de una métrica según los valores de sus etiquetas."""
+
+    def __init__(self, nombre: str, tipo: str, ayuda: str, etiquetas: tuple, fabrica):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._fabrica = fabrica
+        self._series = {}
+
+    def con(self, *valores):
+        """Retorna la serie para los valores de etiqueta dados (la crea si no existe)."""
+        serie = self._series.get(valores)
+        if serie is None:
+            serie = self._series.setdefault(valores, self._fabrica())
+        return serie
+
+    def series(self) -> list:
+        return sorted(self._series.items())
+
+
+class RegistroMetricas:
+    """Registro central de métricas con exposición en formato de texto Prometheus."""
+
+    def __init__(self, activo: bool = True):
+        self.activo = activo
+        self._familias = {}
+
+    def _registrar(self, nombre, tipo, ayuda, etiquetas, fabrica):
+        familia = self._familias.get(nombre)
+        if familia is None:
+            familia = _Familia(nombre, tipo, ayuda, tuple(etiquetas), fabrica)
+            self._familias[nombre] = familia
+        return familia
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: tuple = ()):
+        familia = self._registrar(nombre, "counter", ayuda, etiquetas, Contador)
+        return familia if etiquetas else familia.con()
+
+    def indicador(self, nombre: str, ayuda: str, etiquetas: tuple = ()):
+        familia = self._registrar(nombre, "gauge", ayuda, etiquetas, Indicador)
+        return familia if etiquetas else familia.con()
+
+    def histograma(self, nombre: str, ayuda: str, buckets: tuple, etiquetas: tuple = ()):
+        familia = self._registrar(nombre, "histogram", ayuda, etiquetas, lambda: Histograma(buckets))
+        return familia if etiquetas else familia.con()
+
+    def exponer(self) -> str:
+        """Genera el texto de exposición (text/plain; version=0.0.4)."""
+        lineas = []
+        for nombre in sorted(self._familias):
+            familia = self._familias[nombre]
+            lineas.append(f"# HELP {nombre} {familia.ayuda}")
+            lineas.append(f"# TYPE {nombre} {familia.tipo}")
+            for valores, serie in familia.series():
+                etiquetas = _formatear_etiquetas(familia.etiquetas, valores)
+                if familia.tipo == "histogram":
+                    acumulados, suma, total = serie.instantanea()
+                    limites = [_formatear_numero(b) for b in serie.buckets] + ["+Inf"]
+                    for limite, conteo in zip(limites, acumulados):
+                        le = _formatear_etiquetas(familia.etiquetas + ("le",), valores + (limite,))
+                        lineas.append(f"{nombre}_bucket{le} {conteo}")
+                    lineas.append(f"{nombre}_sum{etiquetas} {_formatear_numero(suma)}")
+                    lineas.append(f"{nombre}_count{etiquetas} {total}")
+                else:
+                    lineas.append(f"{nombre}{etiquetas} {_formatear_numero(serie.valor())}")
+        return "\n".join(lineas) + "\n"
+
+
+def _formatear_etiquetas(nombres: tuple, valores: tuple) -> str:
+    if not nombres:
+        return ""
+    pares = []
+    for nombre, valor in zip(nombres, valores):
+        valor = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pares.append(f'{nombre}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+def _formatear_numero(valor: float) -> str:
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor)
+
+
+# ─── Registro global y métricas del evaluador ─────────────────────────────────
+REGISTRO = RegistroMetricas()
+
+EVALUACIONES_PUNTUADAS = REGISTRO.contador(
+    "evaluador_evaluaciones_puntuadas_total",
+    "Evaluaciones puntuadas por calcular_puntaje."
+)
+PUNTAJE_GLOBAL = REGISTRO.histograma(
+    "evaluador_puntaje_global",
+    "Distribución del puntaje global ponderado (0-100).",
+    BUCKETS_PUNTAJE
+)
+VEREDICTOS = REGISTRO.contador(
+    "evaluador_veredictos_total",
+    "Veredictos emitidos por nivel.",
+    etiquetas=("nivel",)
+)
+LATENCIA_PERSISTENCIA = REGISTRO.histograma(
+    "evaluador_persistencia_segundos",
+    "Latencia de guardar_evaluacion en segundos.",
+    BUCKETS_LATENCIA
+)
+LATENCIA_REPORTE = REGISTRO.histograma(
+    "evaluador_reporte_segundos",
+    "Latencia de renderizado de reportes en segundos.",
+    BUCKETS_LATENCIA,
+    etiquetas=("formato",)
+)
+CACHE_REPORTES = REGISTRO.contador(
+    "evaluador_cache_reportes_total",
+    "Consultas a la caché de reportes por resultado (acierto / fallo).",
+    etiquetas=("resultado",)
+)
+PROFUNDIDAD_COLA = REGISTRO.indicador(
+    "evaluador_cola_profundidad",
+    "Tareas pendientes en la cola de trabajo del servicio."
+)
+
+
+# ─── Exposición ────────────────────────────────────────────────────────────────
+def iniciar_servidor_metricas(puerto: int, host: str = "127.0.0.1",
+                              registro: RegistroMetricas = REGISTRO) -> ThreadingHTTPServer:
+    """Expone /metrics por HTTP en un hilo daemon. Retorna el servidor (usar .shutdown())."""
+
+    class _Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            cuerpo = registro.exponer().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+    return servidor
+
+
+def volcar_metricas(ruta: str, registro: RegistroMetricas = REGISTRO) -> None:
+    """Escribe la exposición en disco de forma atómica (compatible con node_exporter textfile)."""
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(registro.exponer())
+    os.replace(temporal, ruta)
+
+
+def iniciar_volcado_periodico(ruta: str, intervalo: float = 15.0,
+                              registro: RegistroMetricas = REGISTRO) -> threading.Event:
+    """
+    Vuelca las métricas a `ruta` cada `intervalo` segundos en un hilo daemon.
+    Retorna un Event: al hacer .set() se detiene tras un último volcado.
+    """
+    detener = threading.Event()
+
+    def _bucle():
+        while not detener.wait(intervalo):
+            volcar_metricas(ruta, registro)
+        volcar_metricas(ruta, registro)
+
+    threading.Thread(target=_bucle, name="metricas-volcado", daemon=True).start()
+    return detener
+
@@ -0,0 +1,361 @@
+"""
+Modelo compacto de resultados de evaluación.
+
+`calcular_puntaje` y `generar_veredicto` devuelven dicts anidados que copian
+en cada resultado el texto completo de preguntas, opciones, categorías y
+alternativas. Este modelo guarda solo lo que varía entre evaluaciones
+(ids de pregunta, letras, puntajes, nivel) en tuplas inmutables y resuelve
+los textos desde el catálogo de `preguntas.py` / `ALTERNATIVAS` al leerlos.
+
+Las conversiones `desde_dict` / `a_dict` son sin pérdida: si un registro
+trae un texto que no coincide con el catálogo actual (p. ej. un historial de
+una versión anterior del cuestionario), ese texto se conserva internado.
+"""
+
+import sys
+from typing import NamedTuple, Optional
+
+from .catalogo import cargar_cuestionario
+from .evaluador import ALTERNATIVAS, TEXTOS_VEREDICTO, calcular_puntaje, generar_veredicto
+from .preguntas import CATEGORIAS, VERSION_CUESTIONARIO, obtener_puntaje_maximo_categoria
+
+
+# ─── Catálogo indexado por id ──────────────────────────────────────────────────
+_PREGUNTAS = {}         # id → (texto, {letra: (texto_opcion, puntaje)}, puntaje_maximo)
+_TEXTO_A_ID = {}        # texto de pregunta → id
+_CATEGORIAS = {}        # id → (nombre, peso, puntaje_maximo)
+for _cat in CATEGORIAS:
+    _CATEGORIAS[_cat["id"]] = (_cat["nombre"], _cat["peso"], obtener_puntaje_maximo_categoria(_cat))
+    for _preg in _cat["preguntas"]:
+        _PREGUNTAS[_preg["id"]] = (
+            _preg["texto"],
+            {op[0]: (op[1], op[2]) for op in _preg["opciones"]},
+            max(op[2] for op in _preg["opciones"]),
+        )
+        _TEXTO_A_ID[_preg["texto"]] = _preg["id"]
+
+# Código de nivel de veredicto usado en el almacenamiento compacto (no reordenar)
+NIVELES = (
+    "NO SE RECOMIENDA CONSTRUIR UN AGENTE",
+    "ZONA GRIS: EVALÚA ANTES DE CONSTRUIR",
+    "AGENTE RECOMENDADO",
+    "AGENTE ALTAMENTE RECOMENDADO",
+)
+# Emoji con que se muestra cada nivel (el mismo del veredicto)
+EMOJI_NIVEL = {textos["nivel"]: textos["emoji"] for textos in TEXTOS_VEREDICTO.values()}
+
+_ALTERNATIVA_A_CLAVE = {alt["nombre"]: clave for clave, alt in ALTERNATIVAS.items()}
+
+
+def _intern(valor):
+    return sys.intern(valor) if isinstance(valor, str) else valor
+
+
+def _intern_dict(d: dict) -> dict:
+    return {_intern(k): _intern(v) for k, v in d.items()}
+
+
+# ─── Modelo ────────────────────────────────────────────────────────────────────
+class RespuestaPregunta(NamedTuple):
+    """Respuesta a una pregunta. Los campos *_propio solo se llenan si difieren del catálogo."""
+
+    pregunta_id: Optional[str]
+    letra: str
+    puntaje: int
+    texto_propio: Optional[str] = None
+    texto_respuesta_propio: Optional[str] = None
+    puntaje_maximo_propio: Optional[int] = None
+
+    @property
+    def pregunta(self) -> str:
+        return self.texto_propio if self.texto_propio is not None else _PREGUNTAS[self.pregunta_id][0]
+
+    @property
+    def texto_respuesta(self) -> str:
+        if self.texto_respuesta_propio is not None:
+            return self.texto_respuesta_propio
+        return _PREGUNTAS[self.pregunta_id][1].get(self.letra, ("", 0))[0]
+
+    @property
+    def puntaje_maximo(self) -> int:
+        if self.puntaje_maximo_propio is not None:
+            return self.puntaje_maximo_propio
+        return _PREGUNTAS[self.pregunta_id][2]
+
+    @classmethod
+    def desde_dict(cls, d: dict) -> "RespuestaPregunta":
+        pid = _TEXTO_A_ID.get(d["pregunta"])
+        letra = sys.intern(d["respuesta"])
+        if pid is None:
+            return cls(None, letra, d["puntaje"], sys.intern(d["pregunta"]),
+                       _intern(d["texto_respuesta"]), d["puntaje_maximo"])
+        texto, opciones, maximo = _PREGUNTAS[pid]
+        texto_respuesta = opciones.get(letra, ("", 0))[0]
+        return cls(
+            pid, letra, d["puntaje"], None,
+            None if d["texto_respuesta"] == texto_respuesta else _intern(d["texto_respuesta"]),
+            None if d["puntaje_maximo"] == maximo else d["puntaje_maximo"],
+        )
+
+    def a_dict(self) -> dict:
+        return {
+            "pregunta": self.pregunta,
+            "respuesta": self.letra,
+            "texto_respuesta": self.texto_respuesta,
+            "puntaje": self.puntaje,
+            "puntaje_maximo": self.puntaje_maximo,
+        }
+
+
+class ResultadoCategoria(NamedTuple):
+    categoria_id: str
+    puntaje_obtenido: int
+    porcentaje: float
+    respuestas: tuple
+    nombre_propio: Optional[str] = None
+    peso_propio: Optional[float] = None
+    puntaje_maximo_propio: Optional[int] = None
+
+    @property
+    def nombre(self) -> str:
+        return self.nombre_propio if self.nombre_propio is not None else _CATEGORIAS[self.categoria_id][0]
+
+    @property
+    def peso(self) -> float:
+        return self.peso_propio if self.peso_propio is not None else _CATEGORIAS[self.categoria_id][1]
+
+    @property
+    def puntaje_maximo(self) -> int:
+        if self.puntaje_maximo_propio is not None:
+            return self.puntaje_maximo_propio
+        return _CATEGORIAS[self.categoria_id][2]
+
+    @classmethod
+    def desde_dict(cls, d: dict) -> "ResultadoCategoria":
+        catalogo = _CATEGORIAS.get(d["id"], (None, None, None))
+        return cls(
+            sys.intern(d["id"]),
+            d["puntaje_obtenido"],
+            d["porcentaje"],
+            tuple(RespuestaPregunta.desde_dict(p) for p in d["preguntas"]),
+            None if d["nombre"] == catalogo[0] else sys.intern(d["nombre"]),
+            None if d["peso"] == catalogo[1] else d["peso"],
+            None if d["puntaje_maximo"] == catalogo[2] else d["puntaje_maximo"],
+        )
+
+    def a_dict(self) -> dict:
+        return {
+            "id": self.categoria_id,
+            "nombre": self.nombre,
+            "puntaje_obtenido": self.puntaje_obtenido,
+            "puntaje_maximo": self.puntaje_maximo,
+            "porcentaje": self.porcentaje,
+            "peso": self.peso,
+            "preguntas": [r.a_dict() for r in self.respuestas],
+        }
+
+
+class ResultadoEvaluacion(NamedTuple):
+    """Equivalente compacto del dict que retorna `calcular_puntaje`."""
+
+    puntaje_global: float
+    categorias: tuple
+
+    @classmethod
+    def desde_dict(cls, d: dict) -> "ResultadoEvaluacion":
+        return cls(d["puntaje_global"], tuple(ResultadoCategoria.desde_dict(c) for c in d["categorias"]))
+
+    def a_dict(self) -> dict:
+        return {
+            "puntaje_global": self.puntaje_global,
+            "categorias": [c.a_dict() for c in self.categorias],
+        }
+
+    def respuestas(self) -> dict:
+        """{pregunta_id: [letra, puntaje]} en el orden del cuestionario (formato del historial)."""
+        return {
+            r.pregunta_id: [r.letra, r.puntaje]
+            for c in self.categorias for r in c.respuestas if r.pregunta_id is not None
+        }
+
+
+class Veredicto(NamedTuple):
+    """Equivalente compacto del dict que retorna `generar_veredicto`."""
+
+    nivel: str
+    emoji: str
+    construir_agente: bool
+    sustento: str
+    recomendaciones_construccion: tuple
+    alertas: tuple
+    alternativas: tuple     # claves de ALTERNATIVAS, o el dict si no está en el catálogo
+
+    @classmethod
+    def desde_dict(cls, d: dict) -> "Veredicto":
+        alternativas = []
+        for alt in d.get("alternativas", []):
+            clave = _ALTERNATIVA_A_CLAVE.get(alt.get("nombre"))
+            alternativas.append(clave if clave and ALTERNATIVAS[clave] == alt else alt)
+        return cls(
+            sys.intern(d["nivel"]),
+            sys.intern(d["emoji"]),
+            d["construir_agente"],
+            d["sustento"],
+            tuple(sys.intern(r) for r in d.get("recomendaciones_construccion", [])),
+            tuple(sys.intern(a) for a in d.get("alertas", [])),
+            tuple(alternativas),
+        )
+
+    def a_dict(self) -> dict:
+        alternativas = []
+        for alt in self.alternativas:
+            alt = ALTERNATIVAS[alt] if isinstance(alt, str) else alt
+            alternativas.append(dict(alt, herramientas=list(alt["herramientas"])))
+        return {
+            "nivel": self.nivel,
+            "emoji": self.emoji,
+            "construir_agente": self.construir_agente,
+            "sustento": self.sustento,
+            "recomendaciones_construccion": list(self.recomendaciones_construccion),
+            "alertas": list(self.alertas),
+            "alternativas": alternativas,
+        }
+
+
+class EvaluacionCompacta(NamedTuple):
+    """
+    Registro completo del historial. `respuestas` se deriva de `resultados`;
+    solo se guarda aparte (respuestas_propias) si el registro no coincide.
+    Claves adicionales del registro se conservan en `extras`.
+    """
+
+    meta: dict
+    resultados: ResultadoEvaluacion
+    veredicto: Veredicto
+    respuestas_propias: Optional[dict] = None
+    extras: Optional[dict] = None
+
+    @property
+    def respuestas(self) -> dict:
+        if self.respuestas_propias is not None:
+            return self.respuestas_propias
+        return self.resultados.respuestas()
+
+    @classmethod
+    def desde_dict(cls, d: dict) -> "EvaluacionCompacta":
+        resultados = ResultadoEvaluacion.desde_dict(d["resultados"])
+        respuestas = d.get("respuestas", {})
+        propias = None if respuestas == resultados.respuestas() else respuestas
+        extras = {k: v for k, v in d.items() if k not in ("meta", "respuestas", "resultados", "veredicto")}
+        return cls(
+            _intern_dict(d["meta"]),
+            resultados,
+            Veredicto.desde_dict(d["veredicto"]),
+            propias,
+            extras or None,
+        )
+
+    def a_dict(self) -> dict:
+        d = {
+            "meta": dict(self.meta),
+            "respuestas": {k: list(v) for k, v in self.respuestas.items()},
+            "resultados": self.resultados.a_dict(),
+            "veredicto": self.veredicto.a_dict(),
+        }
+        if self.extras:
+            d.update(self.extras)
+        return d
+
+
+def calcular_resultado(respuestas: dict) -> ResultadoEvaluacion:
+    """Como `calcular_puntaje`, pero retorna el modelo compacto."""
+    return ResultadoEvaluacion.desde_dict(calcular_puntaje(respuestas))
+
+
+def evaluar(meta: dict, respuestas: dict) -> EvaluacionCompacta:
+    """Puntúa las respuestas y genera el veredicto como una evaluación compacta."""
+    resultados = calcular_puntaje(respuestas)
+    veredicto = generar_veredicto(resultados["puntaje_global"], resultados["categorias"])
+    return EvaluacionCompacta(
+        _intern_dict(meta),
+        ResultadoEvaluacion.desde_dict(resultados),
+        Veredicto.desde_dict(veredicto),
+    )
+
+
+# ─── Registro serializable ─────────────────────────────────────────────────────
+def _a_lista(valor):
+    if isinstance(valor, tuple):
+        items = [_a_lista(v) for v in valor]
+        if hasattr(valor, "_fields"):
+            while items and items[-1] is None:
+                items.pop()
+        return items
+    return valor
+
+
+def a_registro(evaluacion: EvaluacionCompacta) -> list:
+    """
+    Forma JSON del modelo compacto: listas posicionales sin los textos del
+    catálogo ni los campos vacíos.
+    """
+    return _a_lista(evaluacion)
+
+
+def desde_registro(registro: list) -> EvaluacionCompacta:
+    """Inverso de `a_registro`."""
+    meta, resultados, veredicto = registro[:3]
+    puntaje_global, categorias = resultados
+    nivel, emoji, construir, sustento, recomendaciones, alertas, alternativas = veredicto
+    return EvaluacionCompacta(
+        _intern_dict(meta),
+        ResultadoEvaluacion(puntaje_global, tuple(
+            ResultadoCategoria(
+                sys.intern(c[0]), c[1], c[2],
+                tuple(RespuestaPregunta(*(_intern(v) for v in r)) for r in c[3]),
+                *c[4:]
+            )
+            for c in categorias
+        )),
+        Veredicto(
+            sys.intern(nivel), sys.intern(emoji), construir, sustento,
+            tuple(sys.intern(r) for r in recomendaciones),
+            tuple(sys.intern(a) for a in alertas),
+            tuple(_intern(a) for a in alternativas),
+        ),
+        *registro[3:]
+    )
+
+
+# ─── Reconstrucción desde letras ───────────────────────────────────────────────
+def reconstruir_evaluacion(meta: dict, letras: str, version: int = VERSION_CUESTIONARIO) -> dict:
+    """
+    Vuelve a puntuar una evaluación a partir de las letras elegidas, con el
+    catálogo congelado de su versión (core/catalogo.py): preguntas, puntajes,
+    umbrales, textos y reglas por defecto de cuando se respondió.
+
+    Args:
+        meta: metadatos de la iniciativa
+        letras: una letra por pregunta en el orden del cuestionario ('-' = sin responder)
+        version: versión del cuestionario con que se respondió
+
+    Returns:
+        dict con la forma de un registro del historial (meta, respuestas, resultados, veredicto)
+
+    Raises:
+        ValueError: si la versión del cuestionario no está congelada
+    """
+    cuestionario = cargar_cuestionario(version)
+    respuestas = {}
+    for pid, letra in zip(cuestionario.orden, letras):
+        if letra != "-":
+            respuestas[pid] = [letra, cuestionario.puntos[pid][letra]]
+    catalogo = cuestionario.catalogo
+    resultados = calcular_puntaje(respuestas, registrar_metricas=False, categorias=catalogo["categorias"])
+    # Siempre con las reglas por defecto: un registro generado con otras reglas
+    # no se reconstruye igual y el segmento lo guarda completo
+    veredicto = generar_veredicto(
+        resultados["puntaje_global"], resultados["categorias"],
+        registrar_metricas=False, motor=cuestionario.motor, catalogo=catalogo,
+    )
+    return {"meta": meta, "respuestas": respuestas, "resultados": resultados, "veredicto": veredicto}
@@ -18,6 +18,13 @@ Pesos por categoría (deben sumar 1.0):
   6. Madurez Organizacional        → 0.05
 """
 
+# Se incrementa con cualquier cambio de preguntas, opciones, puntajes o pesos
+# (y de umbrales, textos de veredicto, alternativas o reglas por defecto), y
+# luego se congela con `python -m core.catalogo`: los registros compactos del
+# historial guardan solo las letras elegidas y se vuelven a puntuar con el
+# catálogo de la versión con que se respondieron.
+VERSION_CUESTIONARIO = 1
+
 CATEGORIAS = [
     {
         "id": "problema",
@@ -274,6 +281,12 @@ CATEGORIAS = [
     },
 ]
 
+# Puntos de cada opción del cuestionario vigente: {pregunta_id: {letra: puntaje}}
+PUNTOS = {
+    preg["id"]: {letra: puntaje for letra, _, puntaje in preg["opciones"]}
+    for cat in CATEGORIAS for preg in cat["preguntas"]
+}
+
 def obtener_total_preguntas():
     """Retorna el número total de preguntas en todas las categorías."""
     return sum(len(cat["preguntas"]) for cat in CATEGORIAS)
@@ -0,0 +1,351 @@
+"""
+Reglas declarativas de alertas y alternativas.
+
+Una regla es un dict con condiciones sobre las respuestas, el porcentaje de
+cada categoría y el puntaje global, y lo que agrega al veredicto si todas se
+cumplen:
+
+    {
+        "id": "kpi-sin-valor",
+        "si": [
+            {"respuesta": "p2_1", "en": ["B", "C"]},
+            {"respuesta": "p2_3", "no_en": ["A"]},
+            {"categoria": "kpis", "porcentaje": {"menor_que": 40}},
+            {"puntaje_global": {"al_menos": 45, "menor_que": 70}},
+        ],
+        "alerta": "⚠️  ...",            # o "alternativa": "definir_kpis"
+        "prioridad": 10,
+    }
+
+En las respuestas, "-" representa una pregunta sin responder. Las reglas que se
+cumplen aparecen de mayor a menor prioridad y, a igual prioridad, en el orden
+en que se declararon; las alternativas se deduplican y se recortan a
+`MAXIMO_ALTERNATIVAS`.
+
+`compilar_reglas` convierte la lista en un `MotorReglas`: cada regla es un bit
+y, para cada letra de cada pregunta y cada tramo entre umbrales de cada
+puntaje, se precalcula la máscara de las reglas que ese valor descarta. Evaluar
+es una consulta por pregunta y una bisección por puntaje, un OR de esas
+máscaras y un AND NOT contra todas las reglas, así que el costo no crece con la
+cantidad de reglas. `REGLAS_POR_DEFECTO` reproduce las alertas y alternativas
+históricas.
+"""
+
+import json
+from bisect import bisect_right
+
+from .preguntas import CATEGORIAS
+
+
+UMBRAL_CATEGORIA_DEBIL = 40     # porcentaje bajo el cual una categoría es débil
+MAXIMO_ALTERNATIVAS = 4
+SIN_RESPONDER = "-"
+
+
+def _tablas(categorias: list) -> tuple:
+    """(letras válidas por pregunta, texto de pregunta → id, ids de categoría) de un cuestionario."""
+    letras = {
+        preg["id"]: tuple(op[0] for op in preg["opciones"]) + (SIN_RESPONDER,)
+        for cat in categorias for preg in cat["preguntas"]
+    }
+    texto_a_id = {preg["texto"]: preg["id"] for cat in categorias for preg in cat["preguntas"]}
+    return letras, texto_a_id, [cat["id"] for cat in categorias]
+
+
+_LETRAS, _TEXTO_A_ID, _IDS_CATEGORIA = _tablas(CATEGORIAS)
+_GLOBAL = None      # variable numérica del puntaje global (las categorías usan su id)
+
+
+# ─── Alertas por respuesta crítica ────────────────────────────────────────────
+# Mapa: {pregunta_id: {respuesta: mensaje_alerta}}
+ALERTAS_MAPA = {
+    "p2_1": {  # KPI definido
+        "C": "⚠️  ALERTA DE ESTRATEGIA: No hay un KPI concreto que el agente deba impactar. Sin un indicador de éxito definido, no podrás medir el retorno ni justificar la inversión. Define primero qué métrica vas a mover."
+    },
+    "p2_3": {  # Valor económico del KPI
+        "C": "⚠️  ALERTA DE ROI: No se ha calculado el valor económico del impacto. Sin este dato es imposible priorizar esta iniciativa frente a otras o aprobar presupuesto."
+    },
+    "p2_4": {  # Tiempo para ver impacto en KPIs
+        "D": "⚠️  ALERTA DE VALOR: No está claro cuándo ni cómo se vería el impacto en los indicadores. Iniciativas sin horizonte de valor definido tienen alta probabilidad de ser canceladas."
+    },
+    "p3_3": {  # Tolerancia al error (antes p2_3)
+        "C": "⚠️  ALERTA CRÍTICA: El proceso tiene alto impacto ante errores. Un agente autónomo puede generar consecuencias graves. Se requiere supervisión humana constante o descartar el agente."
+    },
+    "p4_1": {  # Disponibilidad de datos (antes p3_1)
+        "C": "⚠️  ALERTA DE DATOS: Sin datos digitalizados y accesibles, ningún sistema de IA funcionará. Resuelve primero la calidad y acceso a datos."
+    },
+    "p4_2": {  # Capacidad técnica (antes p3_2)
+        "C": "⚠️  ALERTA TÉCNICA: Sin capacidad técnica interna, el agente generará dependencia total de terceros y riesgo operacional alto."
+    },
+    "p6_2": {  # Resistencia del equipo (antes p5_2)
+        "C": "⚠️  ALERTA DE ADOPCIÓN: Alta resistencia del equipo puede hacer fracasar el proyecto. Gestionar el cambio antes de construir."
+    },
+}
+
+
+# ─── Reglas por defecto ────────────────────────────────────────────────────────
+def _debil(categoria: str) -> dict:
+    return {"categoria": categoria, "porcentaje": {"menor_que": UMBRAL_CATEGORIA_DEBIL}}
+
+
+# Orden de las alternativas según categorías débiles (llm_simple va siempre)
+_ALTERNATIVAS_POR_DEFECTO = [
+    ("kpis-definir", [_debil("kpis")], "definir_kpis"),
+    ("llm-simple", [], "llm_simple"),
+    ("problema-workflow", [_debil("problema")], "workflow"),
+    ("problema-script", [_debil("problema")], "proceso_simple"),
+    ("impacto-dashboard", [_debil("impacto")], "dashboard_bi"),
+    ("impacto-capacitacion", [_debil("impacto")], "capacitacion"),
+    ("viabilidad-rpa", [_debil("viabilidad_tecnica")], "rpa"),
+    ("complejidad-chaining", [_debil("complejidad_alternativas")], "prompt_chaining"),
+    ("complejidad-script", [_debil("complejidad_alternativas")], "proceso_simple"),
+]
+
+REGLAS_POR_DEFECTO = [
+    {"id": f"alerta-{pid}-{letra}", "si": [{"respuesta": pid, "en": [letra]}], "alerta": texto}
+    for pid, mensajes in ALERTAS_MAPA.items() for letra, texto in mensajes.items()
+] + [
+    {"id": f"alternativa-{id_regla}", "si": condiciones, "alternativa": clave}
+    for id_regla, condiciones, clave in _ALTERNATIVAS_POR_DEFECTO
+]
+
+
+# ─── Validación ────────────────────────────────────────────────────────────────
+def _validar_cotas(id_regla: str, cotas) -> dict:
+    if not isinstance(cotas, dict) or not cotas or set(cotas) - {"menor_que", "al_menos"}:
+        raise ValueError(f"Regla {id_regla!r}: las cotas deben ser {{\"menor_que\": n, \"al_menos\": n}}")
+    for valor in cotas.values():
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            raise ValueError(f"Regla {id_regla!r}: cota no numérica: {valor!r}")
+    return cotas
+
+
+def _validar_regla(regla, ids_vistos: set, alternativas, letras_validas: dict, ids_categoria: list) -> None:
+    if not isinstance(regla, dict):
+        raise ValueError(f"Cada regla debe ser un objeto, no {regla!r}")
+    id_regla = regla.get("id")
+    if not isinstance(id_regla, str) or not id_regla:
+        raise ValueError(f"Regla sin \"id\": {regla!r}")
+    if id_regla in ids_vistos:
+        raise ValueError(f"Regla {id_regla!r} repetida")
+    ids_vistos.add(id_regla)
+    if ("alerta" in regla) == ("alternativa" in regla):
+        raise ValueError(f"Regla {id_regla!r}: debe tener \"alerta\" o \"alternativa\" (solo una)")
+    if "alerta" in regla and not isinstance(regla["alerta"], str):
+        raise ValueError(f"Regla {id_regla!r}: \"alerta\" debe ser texto")
+    if "alternativa" in regla and alternativas is not None and regla["alternativa"] not in alternativas:
+        raise ValueError(f"Regla {id_regla!r}: alternativa desconocida {regla['alternativa']!r}")
+    prioridad = regla.get("prioridad", 0)
+    if isinstance(prioridad, bool) or not isinstance(prioridad, (int, float)):
+        raise ValueError(f"Regla {id_regla!r}: \"prioridad\" debe ser un número")
+    condiciones = regla.get("si", [])
+    if not isinstance(condiciones, list):
+        raise ValueError(f"Regla {id_regla!r}: \"si\" debe ser una lista de condiciones")
+    for condicion in condiciones:
+        if not isinstance(condicion, dict):
+            raise ValueError(f"Regla {id_regla!r}: condición inválida {condicion!r}")
+        if "respuesta" in condicion:
+            pid = condicion["respuesta"]
+            if pid not in letras_validas:
+                raise ValueError(f"Regla {id_regla!r}: pregunta desconocida {pid!r}")
+            if set(condicion) - {"respuesta", "en", "no_en"} or ("en" in condicion) == ("no_en" in condicion):
+                raise ValueError(f"Regla {id_regla!r}: use \"en\" o \"no_en\" con \"respuesta\"")
+            letras = condicion.get("en", condicion.get("no_en"))
+            if not isinstance(letras, list) or not letras or set(letras) - set(letras_validas[pid]):
+                raise ValueError(
+                    f"Regla {id_regla!r}: letras inválidas para {pid}: {letras!r} "
+                    f"(válidas: {', '.join(letras_validas[pid])})"
+                )
+        elif "categoria" in condicion:
+            if condicion["categoria"] not in ids_categoria:
+                raise ValueError(f"Regla {id_regla!r}: categoría desconocida {condicion['categoria']!r}")
+            if set(condicion) != {"categoria", "porcentaje"}:
+                raise ValueError(f"Regla {id_regla!r}: use \"porcentaje\" con \"categoria\"")
+            _validar_cotas(id_regla, condicion["porcentaje"])
+        elif set(condicion) == {"puntaje_global"}:
+            _validar_cotas(id_regla, condicion["puntaje_global"])
+        else:
+            raise ValueError(f"Regla {id_regla!r}: condición desconocida {condicion!r}")
+
+
+# ─── Compilación ───────────────────────────────────────────────────────────────
+class MotorReglas:
+    """
+    Reglas compiladas a tablas de máscaras de bits (bit i = regla i en orden
+    de salida).
+
+        motor = compilar_reglas(REGLAS_POR_DEFECTO)
+        alertas, alternativas = motor.evaluar(puntaje_global, resultados_categorias)
+    """
+
+    def __init__(self):
+        self.ids = []               # id de cada regla, en orden de salida
+        self.salidas = []           # ("alerta", texto) o ("alternativa", clave)
+        self.todas = 0
+        # pregunta_id → {letra o "-": reglas que no se cumplen con esa respuesta}
+        self.descartadas_respuesta = {}
+        # variable → (umbrales, {bisect_right(umbrales, valor) o None si falta: reglas descartadas})
+        self.descartadas_numero = {}
+        self.preguntas_con_alertas = frozenset()
+        self.texto_a_id = _TEXTO_A_ID
+        self.maximo_alternativas = MAXIMO_ALTERNATIVAS
+
+    def reglas_cumplidas(self, puntaje_global: float, resultados_categorias: list) -> int:
+        """Máscara de las reglas que se cumplen."""
+        letras, valores = {}, {_GLOBAL: puntaje_global}
+        for cat in resultados_categorias:
+            valores[cat["id"]] = cat["porcentaje"]
+            for preg in cat["preguntas"]:
+                letras[self.texto_a_id.get(preg["pregunta"])] = preg["respuesta"]
+
+        descartadas = 0
+        for pid, por_letra in self.descartadas_respuesta.items():
+            letra = letras.get(pid, SIN_RESPONDER)
+            # Una letra fuera del catálogo no cumple ninguna condición "en"
+            descartadas |= por_letra[letra] if letra in por_letra else por_letra[None]
+        for variable, (umbrales, por_tramo) in self.descartadas_numero.items():
+            if variable in valores:
+                descartadas |= por_tramo[bisect_right(umbrales, valores[variable])]
+            else:
+                descartadas |= por_tramo[None]
+        return self.todas & ~descartadas
+
+    def evaluar(self, puntaje_global: float, resultados_categorias: list) -> tuple:
+        """
+        Aplica las reglas a una evaluación.
+
+        Args:
+            puntaje_global: puntaje de `calcular_puntaje`
+            resultados_categorias: "categorias" de `calcular_puntaje`
+
+        Returns:
+            tuple: (alertas, claves de alternativas), sin repetidos y con a lo
+            sumo `maximo_alternativas` alternativas
+        """
+        cumplidas = self.reglas_cumplidas(puntaje_global, resultados_categorias)
+        alertas, alternativas, vistas = [], [], set()
+        bits = bin(cumplidas)[:1:-1]    # bits[i] == "1" si se cumple la regla i
+        i = bits.find("1")
+        while i >= 0:
+            salida = self.salidas[i]
+            if salida not in vistas:
+                vistas.add(salida)
+                (alertas if salida[0] == "alerta" else alternativas).append(salida[1])
+            i = bits.find("1", i + 1)
+        return alertas, alternativas[:self.maximo_alternativas]
+
+
+def _condiciones(regla: dict, letras_validas: dict) -> list:
+    """Condiciones de una regla validada como (tipo, variable, valor)."""
+    atomos = []
+    for condicion in regla.get("si", []):
+        if "respuesta" in condicion:
+            pid = condicion["respuesta"]
+            if "en" in condicion:
+                letras = frozenset(condicion["en"])
+            else:
+                letras = frozenset(letras_validas[pid]) - set(condicion["no_en"])
+            atomos.append(("respuesta", pid, letras))
+        else:
+            variable = condicion.get("categoria", _GLOBAL)
+            cotas = condicion.get("porcentaje", condicion.get("puntaje_global"))
+            for tipo, umbral in cotas.items():
+                atomos.append((tipo, variable, umbral))
+    return atomos
+
+
+def compilar_reglas(reglas: list, alternativas: dict = None, categorias: list = None,
+                    maximo_alternativas: int = MAXIMO_ALTERNATIVAS) -> MotorReglas:
+    """
+    Valida y compila reglas declarativas.
+
+    Args:
+        reglas: lista de reglas (ver el formato al inicio del módulo)
+        alternativas: catálogo de alternativas para validar las claves
+        categorias: cuestionario sobre el que se evalúan (por defecto, el actual;
+            ver core/catalogo.py para los de versiones anteriores)
+        maximo_alternativas: alternativas que se devuelven como mucho
+
+    Returns:
+        MotorReglas listo para `evaluar`
+
+    Raises:
+        ValueError: si una regla no es válida (el mensaje indica su id)
+    """
+    if categorias is None:
+        letras_validas, texto_a_id, ids_categoria = _LETRAS, _TEXTO_A_ID, _IDS_CATEGORIA
+    else:
+        letras_validas, texto_a_id, ids_categoria = _tablas(categorias)
+    ids_vistos = set()
+    for regla in reglas:
+        _validar_regla(regla, ids_vistos, alternativas, letras_validas, ids_categoria)
+    orden = sorted(range(len(reglas)), key=lambda i: (-reglas[i].get("prioridad", 0), i))
+
+    motor = MotorReglas()
+    motor.texto_a_id = texto_a_id
+    motor.maximo_alternativas = maximo_alternativas
+    por_pregunta = {}       # pregunta_id → [(letras admitidas, bit de la regla)]
+    por_variable = {}       # variable → [(tipo de cota, umbral, bit de la regla)]
+    for bit_i, i in enumerate(orden):
+        regla = reglas[i]
+        bit = 1 << bit_i
+        motor.ids.append(regla["id"])
+        motor.salidas.append(("alerta", regla["alerta"]) if "alerta" in regla else ("alternativa", regla["alternativa"]))
+        motor.todas |= bit
+        for tipo, variable, valor in _condiciones(regla, letras_validas):
+            if tipo == "respuesta":
+                por_pregunta.setdefault(variable, []).append((valor, bit))
+            else:
+                por_variable.setdefault(variable, []).append((tipo, valor, bit))
+
+    # Respuestas: la clave None cubre letras que no están en el catálogo
+    for pid, condiciones in por_pregunta.items():
+        motor.descartadas_respuesta[pid] = {
+            letra: _unir(bit for letras, bit in condiciones if letra not in letras)
+            for letra in letras_validas[pid] + (None,)
+        }
+
+    # Puntajes: con j = bisect_right(umbrales, valor), "valor < u" se cumple para
+    # los umbrales desde j y "valor >= u" para los anteriores a j
+    for variable, cotas in por_variable.items():
+        umbrales = sorted({umbral for _, umbral, _ in cotas})
+        posicion = {umbral: j for j, umbral in enumerate(umbrales)}
+        por_tramo = {None: _unir(bit for _, _, bit in cotas)}   # categoría ausente
+        for j in range(len(umbrales) + 1):
+            por_tramo[j] = _unir(
+                bit for tipo, umbral, bit in cotas
+                if (posicion[umbral] < j) == (tipo == "menor_que")
+            )
+        motor.descartadas_numero[variable] = (umbrales, por_tramo)
+
+    motor.preguntas_con_alertas = frozenset(
+        atomo[1] for regla in reglas if "alerta" in regla
+        for atomo in _condiciones(regla, letras_validas) if atomo[0] == "respuesta"
+    )
+    return motor
+
+
+def _unir(bits) -> int:
+    mascara = 0
+    for bit in bits:
+        mascara |= bit
+    return mascara
+
+
+def cargar_reglas(ruta: str) -> list:
+    """
+    Lee reglas de un archivo JSON.
+
+    El archivo puede ser una lista de reglas, que se agregan a
+    `REGLAS_POR_DEFECTO`, o {"reglas": [...], "reemplazar_predeterminadas": true}
+    para usar solo las del archivo.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        contenido = json.load(f)
+    if isinstance(contenido, list):
+        return REGLAS_POR_DEFECTO + contenido
+    if not isinstance(contenido, dict) or not isinstance(contenido.get("reglas"), list):
+        raise ValueError("El archivo de reglas debe ser una lista o un objeto con \"reglas\"")
+    if contenido.get("reemplazar_predeterminadas"):
+        return contenido["reglas"]
+    return REGLAS_POR_DEFECTO + contenido["reglas"]
@@ -11,11 +11,30 @@
 Uso:
     python main.py           → Iniciar nueva evaluación
     python main.py --historial → Ver evaluaciones previas
+    python main.py --ver 12    → Ver (y re-exportar) la evaluación #12
+    python main.py --buscar "facturación OCR" → Buscar en el historial
+    python main.py --metricas-puerto 9108 → Exponer métricas Prometheus en /metrics
+    python main.py --migrar lzma → Pasar el historial al formato compacto
+    python main.py --portafolio html → Reporte agregado de todas las evaluaciones
+    python main.py --exportar html → Reporte de cada evaluación (con caché)
+    python main.py --importar respuestas.csv → Importar respuestas de una planilla
+    python main.py --adaptativo → Terminar antes si el veredicto ya está decidido
+    python main.py --optimizar-orden → Calcular el orden de preguntas con el historial
+    python main.py --evolucion 12 → Trayectoria de puntajes de la iniciativa #12
+    python main.py --modo-linea → Cuestionario sin pantalla completa
+    python main.py --almacenamiento s3://bucket/evaluador → Copia remota del historial y los reportes
+    python main.py --cambios --cursor data/bi.cursor → Cambios del historial desde la última lectura
+    python main.py --consenso → Consenso y desacuerdo entre evaluadores de cada iniciativa
+    python main.py --jobs encolar importar respuestas.csv → Encolar un trabajo largo (--jobs trabajar lo corre)
 """
 
 import argparse
+import atexit
+import json
 import os
 import sys
+import threading
+import time
 from datetime import datetime
 
 # Añadir el directorio raíz al path
@@ -23,9 +42,36 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, BASE_DIR)
 
 from core.preguntas import CATEGORIAS
-from core.evaluador import calcular_puntaje, generar_veredicto
-from utils.reporte import guardar_markdown, guardar_pdf, generar_markdown
-from utils.persistencia import guardar_evaluacion, mostrar_historial
+from core.evaluador import calcular_puntaje, generar_veredicto, usar_reglas
+from core.adaptativo import CotasPuntaje
+from core.reglas import cargar_reglas
+from core.incertidumbre import interpretar_distribucion, opcion_mas_probable, resumir_incertidumbre
+from utils.reporte import guardar_markdown, guardar_pdf, guardar_html, generar_markdown, exportar_reportes
+from utils.persistencia import (
+    anonimizar_evaluacion, borrar_evaluacion, compactar_historial, guardar_evaluacion,
+    migrar_historial, mostrar_historial, obtener_evaluacion,
+)
+from utils.similitud import buscar_similares
+from utils.cuantiles import describir_percentiles, percentil_categoria, percentiles_evaluacion
+from utils.escritor import obtener_escritor
+from utils.busqueda import mostrar_busqueda
+from utils.portafolio import guardar_portafolio
+from utils.importador import cargar_mapa_columnas, importar_respuestas
+from utils.consenso import cargar_pesos, mostrar_consenso
+from utils.linaje import mostrar_evolucion, obtener_iniciativa, resolver_iniciativa
+from utils.pantalla import PantallaCompleta, disponible, partes_barra
+from utils.almacenamiento import (
+    abrir_almacenamiento, configurar_almacenamiento, restaurar_historial, sincronizar,
+)
+from utils.cambios import (
+    guardar_cursor, iniciar_servidor_cambios, leer_cambios, leer_cursor, preparar_cambios, seguir_cambios,
+)
+from utils.trabajos import (
+    PARALELO, TIPOS, Trabajador, cancelar_trabajo, describir_avance, describir_trabajo, encolar_trabajo,
+    mostrar_trabajos, obtener_trabajo, reanudar_trabajo,
+)
+from utils.politica import RecorridoPolitica, cargar_politica, optimizar_orden
+from core.metricas import iniciar_servidor_metricas, iniciar_volcado_periodico, volcar_metricas
 
 # ── Colores ANSI para terminal ─────────────────────────────────────────────────
 RESET   = "\033[0m"
@@ -95,7 +141,11 @@ def recoger_metadatos() -> dict:
 
 def hacer_pregunta(pregunta: dict, num_pregunta: int, total: int) -> tuple:
     """
-    Presenta una pregunta al usuario y retorna (letra, puntaje).
+    Presenta una pregunta al usuario y retorna (letra, puntaje, distribución).
+
+    Si quien responde duda puede repartir la probabilidad entre opciones
+    ("A:70 B:30"); entonces la letra es la más probable y la distribución
+    queda en el tercer elemento (None si la respuesta es una sola letra).
     """
     print(f"\n  {BOLD}{CYAN}Pregunta {num_pregunta}/{total}{RESET}")
     print(f"  {BOLD}{pregunta['texto']}{RESET}")
@@ -111,56 +161,125 @@ def hacer_pregunta(pregunta: dict, num_pregunta: int, total: int) -> tuple:
     opciones_validas = {op[0].upper() for op in pregunta["opciones"]}
 
     while True:
-        respuesta = input(f"  {BOLD}Tu respuesta [{'/'.join(sorted(opciones_validas))}]:{RESET} ").strip().upper()
+        respuesta = input(f"  {BOLD}Tu respuesta [{'/'.join(sorted(opciones_validas))}]{RESET}"
+                          f"{DIM} (si dudas: A:70 B:30){RESET}{BOLD}:{RESET} ").strip().upper()
         if respuesta in opciones_validas:
             puntaje = next(op[2] for op in pregunta["opciones"] if op[0] == respuesta)
-            return respuesta, puntaje
-        else:
-            print(f"  {ROJO}Opción inválida. Por favor elige: {', '.join(sorted(opciones_validas))}{RESET}")
+            return respuesta, puntaje, None
+        if len(respuesta) > 1:
+            try:
+                distribucion = interpretar_distribucion(respuesta, pregunta["id"])
+            except ValueError as e:
+                print(f"  {ROJO}{e}{RESET}")
+                continue
+            letra, puntaje = opcion_mas_probable(distribucion, pregunta["id"])
+            if len(distribucion) == 1:
+                return letra, puntaje, None
+            return letra, puntaje, distribucion
+        print(f"  {ROJO}Opción inválida. Por favor elige: {', '.join(sorted(opciones_validas))}{RESET}")
+
+
+def ofrecer_terminar(cotas: CotasPuntaje, restantes: int) -> str:
+    """
+    Avisa que el veredicto ya quedó fijo y pregunta cómo seguir.
 
+    Returns:
+        str: "T" (terminar), "A" (solo preguntas con alertas) o "C" (continuar)
+    """
+    con_alertas = len(cotas.pendientes_con_alertas())
+    print(f"\n  {BOLD}{VERDE}✅ El veredicto ya no puede cambiar: {cotas.nivel}{RESET}")
+    print(f"  {DIM}Si terminas ahora el puntaje será {cotas.minimo}% "
+          f"(hasta {cotas.maximo}% respondiendo las {restantes} preguntas restantes).{RESET}\n")
+    opciones = ["T", "C"]
+    print(f"    {BOLD}{AMARILLO}[T]{RESET} Terminar ahora (las preguntas pendientes cuentan como 0)")
+    if 0 < con_alertas < restantes:
+        opciones.insert(1, "A")
+        print(f"    {BOLD}{AMARILLO}[A]{RESET} Responder solo las que pueden agregar alertas al reporte ({con_alertas})")
+    print(f"    {BOLD}{AMARILLO}[C]{RESET} Continuar con todas")
 
-def ejecutar_cuestionario() -> dict:
+    while True:
+        opcion = input(f"\n  {BOLD}Opción [{'/'.join(opciones)}]:{RESET} ").strip().upper()
+        if opcion in opciones:
+            return opcion
+        print(f"  {ROJO}Opción inválida. Por favor elige: {', '.join(opciones)}{RESET}")
+
+
+def ejecutar_cuestionario(adaptativo: bool = False, politica: dict = None) -> dict:
     """
     Ejecuta el cuestionario completo por categorías.
 
+    Args:
+        adaptativo: ofrecer terminar antes cuando las cotas del puntaje
+            alcanzable dejan fijo el veredicto
+        politica: árbol de utils.politica; si se pasa, las preguntas siguen ese
+            orden en lugar del de CATEGORIAS
+
     Returns:
-        dict de {pregunta_id: (letra, puntaje)}
+        tuple: ({pregunta_id: (letra, puntaje)}, {pregunta_id: {letra:
+        probabilidad}} de las preguntas respondidas con duda)
     """
     respuestas = {}
-    total_preguntas = sum(len(cat["preguntas"]) for cat in CATEGORIAS)
+    distribuciones = {}
+    preguntas = {
+        pregunta["id"]: (categoria, pregunta)
+        for categoria in CATEGORIAS for pregunta in categoria["preguntas"]
+    }
+    cola = list(preguntas)
+    total_preguntas = total_cuestionario = len(cola)
+    cotas = CotasPuntaje() if adaptativo or politica is not None else None
+    recorrido = RecorridoPolitica(politica) if politica is not None else None
+    categoria_actual = None
     contador = 0
 
-    for categoria in CATEGORIAS:
-        print(f"\n\n{BOLD}{AZUL}{'═' * 70}{RESET}")
-        print(f"{BOLD}{AZUL}  {categoria['nombre']}{RESET}")
-        print(f"{BOLD}{AZUL}{'═' * 70}{RESET}")
-        print(f"  {DIM}{categoria['descripcion']}{RESET}")
-
-        for pregunta in categoria["preguntas"]:
-            contador += 1
-            letra, puntaje = hacer_pregunta(pregunta, contador, total_preguntas)
-            respuestas[pregunta["id"]] = (letra, puntaje)
-
-    return respuestas
+    while cola:
+        pregunta_id = recorrido.siguiente(cola) if recorrido else cola[0]
+        cola.remove(pregunta_id)
+        categoria, pregunta = preguntas[pregunta_id]
+        if categoria is not categoria_actual:
+            categoria_actual = categoria
+            print(f"\n\n{BOLD}{AZUL}{'═' * 70}{RESET}")
+            print(f"{BOLD}{AZUL}  {categoria['nombre']}{RESET}")
+            print(f"{BOLD}{AZUL}{'═' * 70}{RESET}")
+            print(f"  {DIM}{categoria['descripcion']}{RESET}")
+
+        contador += 1
+        letra, puntaje, distribucion = hacer_pregunta(pregunta, contador, total_preguntas)
+        respuestas[pregunta_id] = (letra, puntaje)
+        if distribucion:
+            distribuciones[pregunta_id] = distribucion
+        if recorrido:
+            recorrido.responder(pregunta_id, letra)
+
+        if cotas is None:
+            continue
+        cotas.responder(pregunta_id, puntaje)
+        if cotas.decidida and cola:
+            opcion = ofrecer_terminar(cotas, len(cola))
+            if opcion == "T":
+                cola = []
+            elif opcion == "A":
+                con_alertas = cotas.pendientes_con_alertas()
+                cola = [pid for pid in cola if pid in con_alertas]
+            total_preguntas = contador + len(cola)
+            cotas = None        # el aviso se muestra una sola vez
+
+    if len(respuestas) < total_cuestionario:
+        print(f"\n  {VERDE}⏱️  Te ahorraste {total_cuestionario - len(respuestas)} "
+              f"de {total_cuestionario} preguntas.{RESET}")
+
+    return respuestas, distribuciones
 
 
 def mostrar_barra_progreso_terminal(porcentaje: float, ancho: int = 35) -> str:
     """Genera una barra de progreso coloreada para terminal."""
-    llenos = int(porcentaje / 100 * ancho)
-    vacios = ancho - llenos
-
-    if porcentaje >= 70:
-        color = VERDE
-    elif porcentaje >= 45:
-        color = AMARILLO
-    else:
-        color = ROJO
-
+    llenos, vacios, tono = partes_barra(porcentaje, ancho)
+    color = {"verde": VERDE, "amarillo": AMARILLO, "rojo": ROJO}[tono]
     barra = f"{color}{'█' * llenos}{DIM}{'░' * vacios}{RESET}"
     return barra
 
 
-def mostrar_resultados(resultados: dict, veredicto: dict):
+def mostrar_resultados(resultados: dict, veredicto: dict, similares: list = None,
+                       incertidumbre: dict = None, percentiles: dict = None):
     """Presenta los resultados de forma visual en la terminal."""
     puntaje = resultados["puntaje_global"]
 
@@ -180,6 +299,10 @@ def mostrar_resultados(resultados: dict, veredicto: dict):
     print(f"  {BOLD}{color_veredicto}{veredicto['emoji']} {veredicto['nivel']}{RESET}")
     print(f"\n  {BOLD}Puntaje Global: {color_veredicto}{puntaje}% / 100%{RESET}")
     print(f"  {mostrar_barra_progreso_terminal(puntaje)}  {color_veredicto}{puntaje:.1f}%{RESET}")
+    if percentiles:
+        print(f"  {CYAN}📈 {describir_percentiles(percentiles)}{RESET}")
+    if incertidumbre:
+        mostrar_incertidumbre(incertidumbre)
 
     # ── Sustento ──────────────────────────────────────────────────────────────
     print(f"\n{BOLD}  📝 Sustento:{RESET}")
@@ -208,7 +331,9 @@ def mostrar_resultados(resultados: dict, veredicto: dict):
     for cat in resultados["categorias"]:
         barra = mostrar_barra_progreso_terminal(cat["porcentaje"], ancho=25)
         print(f"\n  {cat['nombre']}")
-        print(f"  {barra}  {cat['porcentaje']:.1f}%  ({cat['puntaje_obtenido']}/{cat['puntaje_maximo']} pts)")
+        percentil = percentil_categoria(percentiles, cat["id"])
+        print(f"  {barra}  {cat['porcentaje']:.1f}%  ({cat['puntaje_obtenido']}/{cat['puntaje_maximo']} pts)"
+              + (f"  {DIM}{percentil}{RESET}" if percentil else ""))
 
     # ── Recomendaciones ───────────────────────────────────────────────────────
     if veredicto.get("recomendaciones_construccion"):
@@ -226,64 +351,162 @@ def mostrar_resultados(resultados: dict, veredicto: dict):
             print(f"  {alt['descripcion']}")
             print(f"  {DIM}📦 Herramientas: {', '.join(alt['herramientas'])}{RESET}")
 
+    # ── Iniciativas similares ─────────────────────────────────────────────────
+    if similares:
+        mostrar_similares(similares)
+    else:
+        print(f"\n{BOLD}{AZUL}{'═' * 70}{RESET}\n")
+
+
+def mostrar_incertidumbre(incertidumbre: dict):
+    """Probabilidad de cada veredicto cuando hubo respuestas con duda."""
+    dudas = len(incertidumbre["respuestas"])
+    bajo, alto = incertidumbre["intervalo"]
+    print(f"\n  {BOLD}🎲 Con duda en {dudas} pregunta{'s' if dudas != 1 else ''} "
+          f"(puntaje con la opción más probable de cada una):{RESET}")
+    print(f"  {BOLD}Probabilidad de AGENTE RECOMENDADO (≥ 70%): "
+          f"{incertidumbre['prob_agente_recomendado'] * 100:.0f}%{RESET}")
+    print(f"  {DIM}Puntaje esperado {incertidumbre['puntaje_esperado']}%, "
+          f"90% de probabilidad entre {bajo}% y {alto}%{RESET}")
+    for nivel, probabilidad in incertidumbre["niveles"].items():
+        if probabilidad > 0:
+            print(f"    {DIM}{probabilidad * 100:5.1f}%  {nivel}{RESET}")
+
+
+def mostrar_similares(similares: list):
+    """Lista las iniciativas similares del historial y cierra el bloque de resultados."""
+    if similares:
+        print(f"\n\n{BOLD}  🔗 Iniciativas similares en el historial:{RESET}")
+        separador()
+        for sim in similares:
+            print(f"  {BOLD}#{sim['id']:<4}{RESET} {sim['nombre_iniciativa'][:30]:<30} "
+                  f"{DIM}{sim['equipo'][:16]:<16}{RESET} {sim['puntaje_global']:>5.1f}%  "
+                  f"{CYAN}{sim['similitud']:.0f}% similar{RESET}")
+            print(f"        {DIM}{sim['nivel']}{RESET}")
+
     print(f"\n{BOLD}{AZUL}{'═' * 70}{RESET}\n")
 
 
-def preguntar_exportar(evaluacion: dict) -> tuple:
-    """Pregunta al usuario si desea exportar el reporte y lo genera."""
+def exportar_reporte(opcion: str, evaluacion: dict, similares: list = None, percentiles: dict = None) -> list:
+    """
+    Genera los archivos de la opción de exportación elegida.
+
+    Returns:
+        lista de (etiqueta, ruta)
+    """
+    directorio_reportes = os.path.join(BASE_DIR, "reports")
+    if opcion == "H":
+        return [("Reporte HTML", guardar_html(evaluacion, directorio_reportes, similares, percentiles))]
+    if opcion in ("M", "P"):
+        ruta_md = guardar_markdown(evaluacion, directorio_reportes, similares, percentiles)
+        archivos = [("Reporte Markdown", ruta_md)]
+        if opcion == "P":
+            archivos.append(("PDF", guardar_pdf(ruta_md, evaluacion, similares, percentiles)))
+        return archivos
+    return []
+
+
+def mostrar_archivos(archivos: list):
+    for etiqueta, ruta in archivos:
+        print(f"\n  {VERDE}✅ {etiqueta} guardado en:{RESET}")
+        print(f"  {DIM}{ruta}{RESET}")
+
+
+def preguntar_exportar(evaluacion: dict, similares: list = None, escritor=None, percentiles: dict = None):
+    """
+    Pregunta al usuario si desea exportar el reporte y lo genera.
+
+    Args:
+        escritor: EscritorSegundoPlano; si se pasa, el reporte se genera en
+            segundo plano y se retorna la tarea en lugar de esperar
+
+    Returns:
+        lista de (etiqueta, ruta), Future con esa lista, o None si no se exporta
+    """
     print(f"\n  {BOLD}¿Deseas exportar el reporte de esta evaluación?{RESET}")
     print(f"  {AMARILLO}[M]{RESET} Exportar como Markdown (.md)")
-    print(f"  {AMARILLO}[P]{RESET} Exportar como Markdown + intentar PDF")
+    print(f"  {AMARILLO}[H]{RESET} Exportar como HTML (.html, listo para imprimir)")
+    print(f"  {AMARILLO}[P]{RESET} Exportar como Markdown + PDF")
     print(f"  {AMARILLO}[N]{RESET} No exportar ahora")
 
-    opcion = input(f"\n  Tu opción [M/P/N]: ").strip().upper()
+    opcion = input(f"\n  Tu opción [M/H/P/N]: ").strip().upper()
+    if opcion not in ("M", "H", "P"):
+        return None
 
-    directorio_reportes = os.path.join(BASE_DIR, "reports")
-    ruta_md = None
-    ruta_pdf = None
+    if escritor is not None:
+        print(f"  {DIM}Generando el reporte en segundo plano...{RESET}")
+        return escritor.enviar("generar el reporte", exportar_reporte, opcion, evaluacion, similares, percentiles)
 
-    if opcion in ("M", "P"):
-        ruta_md = guardar_markdown(evaluacion, directorio_reportes)
-        print(f"\n  {VERDE}✅ Reporte Markdown guardado en:{RESET}")
-        print(f"  {DIM}{ruta_md}{RESET}")
+    archivos = exportar_reporte(opcion, evaluacion, similares, percentiles)
+    mostrar_archivos(archivos)
+    return archivos
 
-        if opcion == "P":
-            print(f"\n  {DIM}Intentando generar PDF (requiere weasyprint + markdown)...{RESET}")
-            ruta_pdf = guardar_pdf(ruta_md)
-            if ruta_pdf:
-                print(f"  {VERDE}✅ PDF guardado en:{RESET}")
-                print(f"  {DIM}{ruta_pdf}{RESET}")
-            else:
-                print(f"  {AMARILLO}⚠️  PDF no disponible. Instala: pip install weasyprint markdown{RESET}")
-                print(f"  {DIM}El reporte Markdown ya está guardado y puede convertirse manualmente.{RESET}")
 
-    return ruta_md, ruta_pdf
+def armar_evaluacion(meta: dict, respuestas: dict, distribuciones: dict) -> dict:
+    """Calcula resultados y veredicto y arma la evaluación completa que se guarda."""
+    omitidas = sum(len(cat["preguntas"]) for cat in CATEGORIAS) - len(respuestas)
+    if omitidas:
+        meta["preguntas_omitidas"] = omitidas
 
+    resultados = calcular_puntaje(respuestas)
+    veredicto = generar_veredicto(
+        resultados["puntaje_global"],
+        resultados["categorias"]
+    )
+    evaluacion = {
+        "meta": meta,
+        "respuestas": {k: list(v) for k, v in respuestas.items()},
+        "resultados": resultados,
+        "veredicto": veredicto
+    }
+    if distribuciones:
+        evaluacion["incertidumbre"] = resumir_incertidumbre(respuestas, distribuciones)
+    return evaluacion
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Evaluador de Iniciativas de Agentes de IA",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Ejemplos:
-  python main.py               → Iniciar nueva evaluación
-  python main.py --historial   → Ver evaluaciones anteriores
-        """
+
+def encolar_guardado(evaluacion: dict) -> tuple:
+    """
+    Encola en segundo plano la búsqueda de similares y el guardado. La cola es
+    FIFO: los similares se buscan antes de guardar, así la propia evaluación no
+    aparece entre ellos.
+
+    Returns:
+        tuple: (escritor, tarea de similares, tarea de guardado)
+    """
+    escritor = obtener_escritor()
+    tarea_similares = escritor.enviar(
+        "buscar iniciativas similares", buscar_similares, evaluacion, BASE_DIR, k=3
     )
-    parser.add_argument(
-        "--historial",
-        action="store_true",
-        help="Mostrar el historial de evaluaciones anteriores"
+    tarea_guardar = escritor.enviar(
+        "guardar la evaluación en el historial", guardar_evaluacion, evaluacion, BASE_DIR
     )
-    args = parser.parse_args()
+    return escritor, tarea_similares, tarea_guardar
 
-    if args.historial:
-        imprimir_banner()
-        mostrar_historial(BASE_DIR)
-        return
 
-    # ── FLUJO PRINCIPAL ────────────────────────────────────────────────────────
+def evaluar_en_lineas(args, iniciativa_id: int = None) -> tuple:
+    """
+    Evaluación nueva en modo línea (sin TTY, --modo-linea, --adaptativo u
+    --orden-optimizado).
+
+    Args:
+        iniciativa_id: iniciativa que se re-evalúa (--iniciativa), o None
+
+    Returns:
+        tuple: (escritor, evaluación, tarea de guardado, tarea del reporte o None)
+    """
     imprimir_banner()
+    if iniciativa_id is not None:
+        iniciativa = obtener_iniciativa(iniciativa_id, BASE_DIR)
+        print(f"  {BOLD}Re-evaluación de la iniciativa #{iniciativa_id}: {iniciativa['nombre']} "
+              f"({iniciativa['equipo']}), versión {iniciativa['versiones'] + 1}{RESET}\n")
+
+    politica = None
+    if args.orden_optimizado:
+        politica = cargar_politica(BASE_DIR)
+        if politica is None:
+            print(f"  {AMARILLO}No hay un orden optimizado para esta versión del cuestionario "
+                  f"(python main.py --optimizar-orden); se usará el orden por peso.{RESET}\n")
+            politica = {}
 
     print(f"  {DIM}Este evaluador te ayudará a determinar si tu iniciativa realmente{RESET}")
     print(f"  {DIM}amerita construir un agente de IA, o si existe una solución más{RESET}")
@@ -299,39 +522,816 @@ Ejemplos:
 
     # 1. Metadatos
     meta = recoger_metadatos()
+    if iniciativa_id is not None:
+        meta["iniciativa_id"] = iniciativa_id
 
     # 2. Cuestionario
     try:
         print(f"\n\n  {BOLD}Comenzando el cuestionario...{RESET}")
         print(f"  {DIM}(Puedes presionar Ctrl+C en cualquier momento para cancelar){RESET}")
-        respuestas = ejecutar_cuestionario()
+        respuestas, distribuciones = ejecutar_cuestionario(adaptativo=args.adaptativo, politica=politica)
     except KeyboardInterrupt:
         print(f"\n\n  {AMARILLO}⚠️  Evaluación interrumpida por el usuario.{RESET}\n")
         sys.exit(0)
 
-    # 3. Calcular resultados
-    resultados = calcular_puntaje(respuestas)
-    veredicto = generar_veredicto(
-        resultados["puntaje_global"],
-        resultados["categorias"]
+    # 3. Calcular resultados y 4. ensamblar la evaluación; percentiles contra el
+    # historial previo (la consulta a los bosquejos no espera al guardado)
+    evaluacion = armar_evaluacion(meta, respuestas, distribuciones)
+    percentiles = percentiles_evaluacion(evaluacion, BASE_DIR)
+
+    # 5. Guardar en historial en segundo plano
+    escritor, tarea_similares, tarea_guardar = encolar_guardado(evaluacion)
+
+    # 6. Mostrar resultados en pantalla (sin esperar al disco)
+    mostrar_resultados(evaluacion["resultados"], evaluacion["veredicto"],
+                       incertidumbre=evaluacion.get("incertidumbre"), percentiles=percentiles)
+    similares = [] if tarea_similares.exception() else tarea_similares.result()
+    mostrar_similares(similares)
+
+    # 7. Exportar reporte (se encola detrás del guardado)
+    tarea_reporte = preguntar_exportar(evaluacion, similares, escritor, percentiles)
+    return escritor, evaluacion, tarea_guardar, tarea_reporte
+
+
+def evaluar_en_pantalla(iniciativa_id: int = None) -> tuple:
+    """
+    Evaluación nueva en pantalla completa: formulario, cuestionario con
+    navegación y resultados, sin salir de curses hasta elegir qué exportar.
+
+    Args:
+        iniciativa_id: iniciativa que se re-evalúa (--iniciativa); precarga su
+            nombre y equipo en el formulario
+
+    Returns:
+        tuple: (escritor, evaluación, tarea de guardado, tarea del reporte o None)
+    """
+    iniciales = None
+    if iniciativa_id is not None:
+        iniciativa = obtener_iniciativa(iniciativa_id, BASE_DIR)
+        iniciales = {"nombre_iniciativa": iniciativa["nombre"], "equipo": iniciativa["equipo"]}
+    try:
+        with PantallaCompleta() as pantalla:
+            meta = pantalla.metadatos(iniciales)
+            if iniciativa_id is not None:
+                meta["iniciativa_id"] = iniciativa_id
+            respuestas, distribuciones = pantalla.cuestionario()
+            evaluacion = armar_evaluacion(meta, respuestas, distribuciones)
+            percentiles = percentiles_evaluacion(evaluacion, BASE_DIR)
+            escritor, tarea_similares, tarea_guardar = encolar_guardado(evaluacion)
+            opcion = pantalla.resultados(evaluacion, tarea_similares, percentiles=percentiles)
+    except KeyboardInterrupt:
+        print(f"\n  {AMARILLO}⚠️  Evaluación interrumpida por el usuario.{RESET}\n")
+        sys.exit(0)
+
+    tarea_reporte = None
+    if opcion is not None:
+        similares = [] if tarea_similares.exception() else tarea_similares.result()
+        tarea_reporte = escritor.enviar(
+            "generar el reporte", exportar_reporte, opcion, evaluacion, similares, percentiles
+        )
+    return escritor, evaluacion, tarea_guardar, tarea_reporte
+
+
+def mes_argumento(valor: str) -> str:
+    """Valida un mes "AAAA-MM" de la línea de comandos."""
+    try:
+        datetime.strptime(valor, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"mes inválido: {valor!r} (formato AAAA-MM)")
+    return valor
+
+
+def importar(args) -> None:
+    """Importa un archivo de respuestas (--importar) e informa el resultado."""
+    try:
+        mapa = cargar_mapa_columnas(args.mapa_columnas) if args.mapa_columnas else None
+        resumen = importar_respuestas(
+            args.importar, BASE_DIR, mapa, simular=args.simular,
+            omitir_duplicados=args.omitir_duplicados,
+        )
+    except (OSError, ValueError) as e:
+        print(f"\n  {ROJO}No se pudo importar: {e}{RESET}\n")
+        return
+
+    accion = "validadas (simulación, no se guardó nada)" if args.simular else "importadas"
+    print(f"\n  {VERDE}✅ {resumen['importadas']} de {resumen['leidas']} filas {accion} "
+          f"en {resumen['segundos']} s{RESET}")
+    if resumen["ids"]:
+        print(f"  {DIM}Ids #{resumen['ids'][0]} a #{resumen['ids'][-1]} del historial{RESET}")
+    if resumen["duplicadas"]:
+        print(f"  {AMARILLO}⚠️  {resumen['duplicadas']} quedaron marcadas como duplicado{RESET}")
+    if resumen["omitidas"]:
+        print(f"  {DIM}{resumen['omitidas']} duplicadas no se guardaron{RESET}")
+    if resumen["errores"]:
+        print(f"\n  {ROJO}{len(resumen['errores'])} filas con errores (no importadas):{RESET}")
+        for error in resumen["errores"][:20]:
+            print(f"  {DIM}- {error}{RESET}")
+        if len(resumen["errores"]) > 20:
+            print(f"  {DIM}... y {len(resumen['errores']) - 20} más{RESET}")
+    print()
+
+
+def consumir_cambios(args) -> None:
+    """
+    Escribe en stdout, en JSON Lines, los cambios del historial posteriores a
+    --cambios N (o al cursor de --cursor). Con --seguir sigue esperando cambios
+    nuevos; con --cursor guarda el último `seq` escrito después de cada lote.
+    """
+    desde = args.cambios if args.cambios is not None else (leer_cursor(args.cursor) if args.cursor else 0)
+    preparar_cambios(BASE_DIR)
+    lotes = seguir_cambios(BASE_DIR, desde) if args.seguir else None
+    try:
+        while True:
+            lote = next(lotes) if lotes else leer_cambios(BASE_DIR, desde)
+            if not lote:
+                return
+            sys.stdout.write("".join(json.dumps(cambio, ensure_ascii=False) + "\n" for cambio in lote))
+            sys.stdout.flush()
+            desde = lote[-1]["seq"]
+            if args.cursor:
+                guardar_cursor(args.cursor, desde)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+
+def _parametros_trabajo(args, tipo: str, argumento: str) -> dict:
+    """Parámetros de `--jobs encolar TIPO [ARG]` según las demás opciones."""
+    parametros = {}
+    if tipo == "importar":
+        if not argumento:
+            raise ValueError("indica el archivo: --jobs encolar importar ARCHIVO")
+        parametros["ruta"] = argumento
+        parametros["omitir_duplicados"] = args.omitir_duplicados
+        if args.mapa_columnas:
+            parametros["mapa"] = cargar_mapa_columnas(args.mapa_columnas)
+    elif tipo == "exportar":
+        parametros["formato"] = argumento or "md"
+    if args.reglas and tipo in ("importar", "repuntuar"):
+        parametros["reglas"] = cargar_reglas(args.reglas)
+    return parametros
+
+
+_ULTIMO_AVANCE = {}     # id del trabajo → último aviso en consola
+
+
+def _mostrar_avance(evento: str, trabajo: dict) -> None:
+    """Avance de `--jobs trabajar` en consola: inicio, fin y a lo sumo un bloque por segundo."""
+    ahora = time.monotonic()
+    if evento == "bloque" and ahora - _ULTIMO_AVANCE.get(trabajo["id"], 0) < 1.0:
+        return
+    _ULTIMO_AVANCE[trabajo["id"]] = ahora
+    encabezado = f"#{trabajo['id']} {trabajo['tipo']}"
+    if evento == "inicio":
+        retoma = f" (retoma desde {describir_avance(trabajo)})" if trabajo["hecho"] else ""
+        print(f"  {CYAN}▶ {encabezado}{retoma}{RESET}")
+    elif evento == "bloque":
+        print(f"  {DIM}  {encabezado}: {describir_avance(trabajo)}{RESET}")
+    elif trabajo["estado"] == "terminado":
+        detalle = describir_trabajo(trabajo)
+        print(f"  {VERDE}✅ {encabezado} terminado{': ' + detalle if detalle else ''}{RESET}")
+    elif trabajo["estado"] == "fallido":
+        print(f"  {ROJO}❌ {encabezado} falló: {trabajo['error']}{RESET}")
+        print(f"  {DIM}  Corrige la causa y reanúdalo con: python main.py --jobs reanudar {trabajo['id']}{RESET}")
+    elif trabajo["estado"] == "cancelado":
+        print(f"  {AMARILLO}■ {encabezado} cancelado en {describir_avance(trabajo)}{RESET}")
+    else:
+        print(f"  {AMARILLO}■ {encabezado} queda pendiente en {describir_avance(trabajo)}{RESET}")
+
+
+def administrar_trabajos(args) -> int:
+    """
+    --jobs: muestra la cola (estado [ID]), encola (encolar TIPO [ARG]), la
+    atiende (trabajar), cancela o reanuda un trabajo. Retorna el código de
+    salida.
+    """
+    accion, argumentos = (args.jobs[0], args.jobs[1:]) if args.jobs else ("estado", [])
+    acciones = ("estado", "encolar", "trabajar", "cancelar", "reanudar")
+    if accion not in acciones:
+        print(f"\n  {ROJO}Acción desconocida: {accion!r} (usa {', '.join(acciones)}).{RESET}\n")
+        return 1
+    trabajo_id = None
+    if accion in ("estado", "cancelar", "reanudar") and argumentos:
+        if not argumentos[0].isdigit():
+            print(f"\n  {ROJO}El id del trabajo debe ser un número: {argumentos[0]!r}.{RESET}\n")
+            return 1
+        trabajo_id = int(argumentos[0])
+    if accion in ("cancelar", "reanudar") and trabajo_id is None:
+        print(f"\n  {ROJO}Indica el trabajo: --jobs {accion} ID{RESET}\n")
+        return 1
+
+    if accion == "encolar":
+        if not argumentos:
+            print(f"\n  {ROJO}Indica el tipo: --jobs encolar {'|'.join(TIPOS)} [ARG]{RESET}\n")
+            return 1
+        tipo, argumento = argumentos[0], (argumentos[1] if len(argumentos) > 1 else None)
+        try:
+            trabajo_id = encolar_trabajo(BASE_DIR, tipo, _parametros_trabajo(args, tipo, argumento))
+        except (OSError, ValueError) as e:
+            print(f"\n  {ROJO}No se pudo encolar el trabajo: {e}{RESET}\n")
+            return 1
+        print(f"\n  {VERDE}✅ Trabajo #{trabajo_id} ({tipo}) encolado.{RESET}")
+        print(f"  {DIM}Córrelo con: python main.py --jobs trabajar{RESET}\n")
+        return 0
+
+    if accion == "trabajar":
+        trabajador = Trabajador(BASE_DIR, args.paralelo, seguir=args.seguir, al_avanzar=_mostrar_avance)
+        print(f"\n  {DIM}Atendiendo la cola ({trabajador.paralelo} a la vez"
+              f"{', esperando trabajos nuevos' if args.seguir else ''}). Ctrl+C para detener.{RESET}\n")
+        try:
+            tomados = trabajador.correr()
+        except KeyboardInterrupt:
+            # correr() ya esperó a que los trabajos en curso cerraran su bloque
+            print(f"\n  {AMARILLO}Detenido: los trabajos que estaban en curso quedaron pendientes.{RESET}\n")
+            return 130
+        if not tomados:
+            print(f"  {DIM}No había trabajos pendientes.{RESET}")
+        print()
+        return 0
+
+    if accion == "cancelar":
+        estado = cancelar_trabajo(BASE_DIR, trabajo_id)
+        if estado is None:
+            print(f"\n  {ROJO}No existe el trabajo #{trabajo_id}.{RESET}\n")
+            return 1
+        if estado == "cancelado":
+            print(f"\n  {VERDE}✅ Trabajo #{trabajo_id} cancelado.{RESET}\n")
+        elif estado == "cancelando":
+            print(f"\n  {AMARILLO}El trabajo #{trabajo_id} se detendrá al terminar el bloque en curso.{RESET}\n")
+        else:
+            print(f"\n  {AMARILLO}El trabajo #{trabajo_id} ya estaba {estado}.{RESET}\n")
+        return 0
+
+    if accion == "reanudar":
+        if not reanudar_trabajo(BASE_DIR, trabajo_id):
+            print(f"\n  {ROJO}El trabajo #{trabajo_id} no existe o no está fallido ni cancelado.{RESET}\n")
+            return 1
+        print(f"\n  {VERDE}✅ Trabajo #{trabajo_id} vuelve a la cola desde su último bloque.{RESET}\n")
+        return 0
+
+    if trabajo_id is None:
+        mostrar_trabajos(BASE_DIR)
+        return 0
+    trabajo = obtener_trabajo(BASE_DIR, trabajo_id)
+    if trabajo is None:
+        print(f"\n  {ROJO}No existe el trabajo #{trabajo_id}.{RESET}\n")
+        return 1
+    print(f"\n  {BOLD}Trabajo #{trabajo['id']} · {trabajo['tipo']} · {trabajo['estado']}{RESET}")
+    print(f"  Avance: {describir_avance(trabajo)}   Intentos: {trabajo['intentos'] + 1}")
+    print(f"  Creado: {trabajo['creado']}   Terminado: {trabajo['terminado'] or '-'}")
+    parametros = {k: v for k, v in trabajo["parametros"].items() if k != "reglas"}
+    if trabajo["parametros"].get("reglas"):
+        parametros["reglas"] = f"{len(trabajo['parametros']['reglas'])} reglas propias"
+    if parametros:
+        print(f"  Parámetros: {json.dumps(parametros, ensure_ascii=False)}")
+    if trabajo["error"]:
+        print(f"  {ROJO}Error: {trabajo['error']}{RESET}")
+    for clave, valor in trabajo["resumen"].items():
+        if clave == "detalle_errores":
+            for error in valor:
+                print(f"  {DIM}- {error}{RESET}")
+        else:
+            print(f"  {clave}: {valor}")
+    print()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Evaluador de Iniciativas de Agentes de IA",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos:
+  python main.py               → Iniciar nueva evaluación
+  python main.py --historial   → Ver evaluaciones anteriores
+  python main.py --historial --pagina 3
+                               → Ver una página (20 registros) del historial
+  python main.py --historial --equipo Finanzas --desde 2026-01
+                               → Solo un equipo y/o rango de meses (lee solo
+                                 los fragmentos de ese equipo)
+  python main.py --ver 12      → Ver la evaluación #12 y regenerar su reporte
+  python main.py --buscar "facturación OCR"
+                               → Buscar en el historial (nombre, descripción,
+                                 equipo, alertas y respuestas)
+  python main.py --metricas-archivo data/metricas.prom
+                               → Volcar métricas Prometheus a un archivo
+  python main.py --migrar zlib → Migrar el historial al segmento compacto
+                                 (zlib, lzma o ninguno; "json" para volver)
+  python main.py --borrar 12   → Borrar la evaluación #12 (historial migrado)
+  python main.py --anonimizar 12
+                               → Quitar el responsable de la evaluación #12
+  python main.py --compactar   → Compactar los segmentos del historial
+  python main.py --portafolio html
+                               → Reporte de portafolio (md, html o pdf)
+  python main.py --exportar pdf
+                               → Reporte de cada evaluación del historial
+                                 (reutiliza los que no cambiaron)
+  python main.py --importar respuestas.csv --mapa-columnas mapa.json
+                               → Importar respuestas de Google Forms / Excel
+                                 (--simular solo valida y puntúa)
+  python main.py --adaptativo  → Nueva evaluación que ofrece terminar antes
+                                 cuando el veredicto ya no puede cambiar
+  python main.py --optimizar-orden
+                               → Calcular con el historial el orden de preguntas
+                                 que fija antes el veredicto
+  python main.py --orden-optimizado
+                               → Nueva evaluación adaptativa en ese orden
+  python main.py --reglas reglas.json
+                               → Nueva evaluación con reglas propias de alertas
+                                 y alternativas (también con --importar)
+  python main.py --evolucion 12
+                               → Puntaje y categorías de cada re-evaluación de
+                                 la iniciativa #12 (o de la evaluación #12)
+  python main.py --iniciativa 12
+                               → Nueva evaluación como re-evaluación de la
+                                 iniciativa #12 aunque cambie el nombre
+  python main.py --consenso    → Iniciativas evaluadas por varios responsables:
+                                 puntaje de consenso, acuerdo y preguntas con
+                                 más desacuerdo (--consenso 12 para el detalle)
+  python main.py --consenso --pesos-evaluadores pesos.json
+                               → Consenso ponderado por evaluador
+  python main.py --modo-linea  → Cuestionario e historial línea a línea, sin
+                                 la pantalla completa (sin TTY es lo habitual)
+  python main.py --almacenamiento "s3://evaluador/prod?endpoint=https://objetos:9000"
+                               → Copiar en segundo plano cada evaluación y
+                                 reporte (también sqlite:ruta.db o un directorio;
+                                 o la variable EVALUADOR_ALMACENAMIENTO)
+  python main.py --almacenamiento sqlite:/respaldo/evaluador.db --sincronizar
+                               → Subir lo que falte o haya cambiado
+  python main.py --almacenamiento s3://evaluador/prod --restaurar
+                               → Traer el historial a una instalación nueva
+  python main.py --cambios --cursor data/bi.cursor
+                               → Altas, ediciones y bajas del historial desde
+                                 la última lectura, en JSON Lines (--seguir
+                                 queda esperando las nuevas, como tail -f)
+  python main.py --servir-cambios 9110
+                               → Servir esos cambios en
+                                 http://127.0.0.1:9110/cambios?desde=N&espera=30
+  python main.py --jobs encolar importar respuestas.csv --mapa-columnas mapa.json
+                               → Encolar un trabajo largo: importar ARCHIVO,
+                                 exportar [md|html|pdf], repuntuar o reindexar
+  python main.py --jobs trabajar --paralelo 3
+                               → Correr los trabajos pendientes (retoma los que
+                                 quedaron cortados desde su último bloque)
+  python main.py --jobs        → Estado y avance de la cola (--jobs estado 4
+                                 para uno; --jobs cancelar 4, --jobs reanudar 4)
+        """
     )
+    parser.add_argument(
+        "--historial",
+        action="store_true",
+        help="Mostrar el historial de evaluaciones anteriores"
+    )
+    parser.add_argument(
+        "--pagina",
+        type=int,
+        metavar="N",
+        help="Con --historial, mostrar solo la página N (20 registros por página)"
+    )
+    parser.add_argument(
+        "--equipo",
+        help="Con --historial, --portafolio o --consenso, solo las evaluaciones de este equipo"
+    )
+    parser.add_argument(
+        "--desde",
+        type=mes_argumento,
+        metavar="AAAA-MM",
+        help="Con --historial o --portafolio, desde este mes (inclusive)"
+    )
+    parser.add_argument(
+        "--hasta",
+        type=mes_argumento,
+        metavar="AAAA-MM",
+        help="Con --historial o --portafolio, hasta este mes (inclusive)"
+    )
+    parser.add_argument(
+        "--ver",
+        type=int,
+        metavar="ID",
+        help="Mostrar una evaluación del historial por su # y ofrecer exportar su reporte"
+    )
+    parser.add_argument(
+        "--buscar",
+        metavar="CONSULTA",
+        help="Buscar evaluaciones en el historial (ranking BM25, sin distinguir tildes)"
+    )
+    parser.add_argument(
+        "--metricas-puerto",
+        type=int,
+        metavar="PUERTO",
+        help="Exponer métricas en formato Prometheus en http://127.0.0.1:PUERTO/metrics"
+    )
+    parser.add_argument(
+        "--metricas-archivo",
+        metavar="RUTA",
+        help="Volcar periódicamente las métricas Prometheus a un archivo de texto"
+    )
+    parser.add_argument(
+        "--migrar",
+        choices=["ninguno", "zlib", "lzma", "json"],
+        help="Migrar el historial al formato compacto con ese codec, o de vuelta a JSON"
+    )
+    parser.add_argument(
+        "--borrar",
+        type=int,
+        metavar="ID",
+        help="Borrar una evaluación del historial migrado (los demás ids no cambian)"
+    )
+    parser.add_argument(
+        "--anonimizar",
+        type=int,
+        metavar="ID",
+        help="Quitar el responsable de una evaluación del historial migrado"
+    )
+    parser.add_argument(
+        "--compactar",
+        action="store_true",
+        help="Compactar los segmentos del historial y aplicar borrados y ediciones"
+    )
+    parser.add_argument(
+        "--portafolio",
+        nargs="?",
+        const="md",
+        choices=["md", "html", "pdf"],
+        help="Generar el reporte de portafolio de todo el historial (por defecto md)"
+    )
+    parser.add_argument(
+        "--incluir-duplicados",
+        action="store_true",
+        help="Con --portafolio, contar también las evaluaciones marcadas como duplicadas"
+    )
+    parser.add_argument(
+        "--importar",
+        metavar="ARCHIVO",
+        help="Importar respuestas desde un CSV, JSON o JSON Lines al historial"
+    )
+    parser.add_argument(
+        "--mapa-columnas",
+        metavar="JSON",
+        help="Con --importar, mapa {encabezado: pregunta_id o campo de meta}"
+    )
+    parser.add_argument(
+        "--simular",
+        action="store_true",
+        help="Con --importar, validar y puntuar sin guardar"
+    )
+    parser.add_argument(
+        "--omitir-duplicados",
+        action="store_true",
+        help="Con --importar, no guardar las filas detectadas como duplicado"
+    )
+    parser.add_argument(
+        "--exportar",
+        choices=["md", "html", "pdf"],
+        help="Exportar el reporte de todas las evaluaciones del historial a reports/"
+    )
+    parser.add_argument(
+        "--optimizar-orden",
+        action="store_true",
+        help="Calcular con el historial el orden de preguntas que decide antes el veredicto"
+    )
+    parser.add_argument(
+        "--orden-optimizado",
+        action="store_true",
+        help="Modo adaptativo siguiendo el orden calculado con --optimizar-orden"
+    )
+    parser.add_argument(
+        "--adaptativo",
+        action="store_true",
+        help="Ofrecer terminar el cuestionario apenas el veredicto ya no pueda cambiar"
+    )
+    parser.add_argument(
+        "--reglas",
+        metavar="JSON",
+        help="Reglas de alertas y alternativas para las evaluaciones nuevas y --importar"
+    )
+    parser.add_argument(
+        "--evolucion",
+        type=int,
+        metavar="ID",
+        help="Mostrar la trayectoria de puntajes de una iniciativa (su id o el # de una de sus evaluaciones)"
+    )
+    parser.add_argument(
+        "--iniciativa",
+        type=int,
+        metavar="ID",
+        help="Registrar la nueva evaluación como re-evaluación de la iniciativa ID"
+    )
+    parser.add_argument(
+        "--consenso",
+        nargs="?",
+        const=0,
+        type=int,
+        metavar="ID",
+        help="Consenso entre los responsables que evaluaron cada iniciativa (o solo la iniciativa ID)"
+    )
+    parser.add_argument(
+        "--pesos-evaluadores",
+        metavar="JSON",
+        help="Con --consenso, pesos {responsable: peso} en lugar de la moda"
+    )
+    parser.add_argument(
+        "--modo-linea",
+        action="store_true",
+        help="No usar la pantalla completa aunque la terminal lo permita"
+    )
+    parser.add_argument(
+        "--almacenamiento",
+        metavar="DESTINO",
+        default=os.environ.get("EVALUADOR_ALMACENAMIENTO"),
+        help="Copiar el historial y los reportes a un directorio, sqlite:ARCHIVO o s3://BUCKET/PREFIJO"
+    )
+    parser.add_argument(
+        "--sincronizar",
+        action="store_true",
+        help="Subir al almacenamiento lo que falte o haya cambiado del historial y los reportes"
+    )
+    parser.add_argument(
+        "--restaurar",
+        action="store_true",
+        help="Descargar el historial del almacenamiento a una instalación sin historial"
+    )
+    parser.add_argument(
+        "--cambios",
+        nargs="?",
+        const=None,
+        default=argparse.SUPPRESS,
+        type=int,
+        metavar="SEQ",
+        help="Escribir en JSON Lines los cambios del historial posteriores a SEQ (o al cursor)"
+    )
+    parser.add_argument(
+        "--cursor",
+        metavar="RUTA",
+        help="Con --cambios, leer y guardar ahí el último cambio procesado"
+    )
+    parser.add_argument(
+        "--seguir",
+        action="store_true",
+        help="Con --cambios, seguir esperando cambios nuevos (como tail -f); con --jobs trabajar, "
+             "seguir esperando trabajos nuevos"
+    )
+    parser.add_argument(
+        "--servir-cambios",
+        type=int,
+        metavar="PUERTO",
+        help="Servir los cambios del historial en http://127.0.0.1:PUERTO/cambios (long-poll)"
+    )
+    parser.add_argument(
+        "--jobs",
+        nargs="*",
+        metavar="ACCION",
+        help="Cola de trabajos largos: estado [ID], encolar TIPO [ARG], trabajar, cancelar ID o reanudar ID"
+    )
+    parser.add_argument(
+        "--paralelo",
+        type=int,
+        default=PARALELO,
+        metavar="N",
+        help="Con --jobs trabajar, cuántos trabajos correr a la vez"
+    )
+    args = parser.parse_args()
+    pantalla_completa = disponible() and not args.modo_linea
+
+    if args.metricas_puerto:
+        iniciar_servidor_metricas(args.metricas_puerto)
+    if args.metricas_archivo:
+        iniciar_volcado_periodico(args.metricas_archivo)
+        atexit.register(volcar_metricas, args.metricas_archivo)
+
+    if args.reglas:
+        try:
+            usar_reglas(cargar_reglas(args.reglas))
+        except (OSError, ValueError) as e:
+            print(f"\n  {ROJO}No se pudieron cargar las reglas: {e}{RESET}\n")
+            sys.exit(1)
+
+    if (args.sincronizar or args.restaurar) and not args.almacenamiento:
+        print(f"\n  {ROJO}Indica el destino con --almacenamiento (o EVALUADOR_ALMACENAMIENTO).{RESET}\n")
+        sys.exit(1)
+
+    if args.restaurar:
+        try:
+            with abrir_almacenamiento(args.almacenamiento) as backend:
+                resumen = restaurar_historial(BASE_DIR, backend)
+        except (OSError, ValueError) as e:
+            print(f"\n  {ROJO}No se pudo restaurar el historial: {e}{RESET}\n")
+            sys.exit(1)
+        print(f"\n  {VERDE}✅ Historial restaurado: {resumen['registros']} evaluaciones.{RESET}")
+        if resumen["renumerados"]:
+            print(f"  {AMARILLO}Había evaluaciones borradas y los ids cambiaron; para alinear la copia "
+                  f"remota: python main.py --sincronizar{RESET}")
+        print()
+        return
 
-    # 4. Ensamblar evaluación completa
-    evaluacion = {
-        "meta": meta,
-        "respuestas": {k: list(v) for k, v in respuestas.items()},
-        "resultados": resultados,
-        "veredicto": veredicto
-    }
+    if args.almacenamiento:
+        try:
+            escritura = configurar_almacenamiento(args.almacenamiento, BASE_DIR)
+        except (OSError, ValueError) as e:
+            print(f"\n  {ROJO}No se pudo abrir el almacenamiento: {e}{RESET}\n")
+            sys.exit(1)
+
+    if args.sincronizar:
+        try:
+            resumen = sincronizar(BASE_DIR, os.path.join(BASE_DIR, "reports"), escritura.backend)
+        except (OSError, ValueError) as e:
+            print(f"\n  {ROJO}No se pudo sincronizar: {e}{RESET}\n")
+            sys.exit(1)
+        print(f"\n  {VERDE}✅ Almacenamiento sincronizado: {resumen['subidos']} subidos, "
+              f"{resumen['borrados']} borrados, {resumen['sin_cambios']} sin cambios "
+              f"({resumen['segundos']} s){RESET}")
+        for clave, error in resumen["fallos"]:
+            print(f"  {ROJO}❌ {clave}: {error}{RESET}")
+        print()
+        if resumen["fallos"]:
+            sys.exit(1)
+        return
 
-    # 5. Guardar en historial
-    guardar_evaluacion(evaluacion, BASE_DIR)
+    if hasattr(args, "cambios"):
+        consumir_cambios(args)
+        return
 
-    # 6. Mostrar resultados en pantalla
-    mostrar_resultados(resultados, veredicto)
+    if args.jobs is not None:
+        sys.exit(administrar_trabajos(args))
+
+    if args.servir_cambios:
+        servidor = iniciar_servidor_cambios(BASE_DIR, args.servir_cambios)
+        print(f"\n  {VERDE}Cambios del historial en http://127.0.0.1:{args.servir_cambios}/cambios"
+              f"?desde=N&limite=M&espera=S{RESET}")
+        print(f"  {DIM}Ctrl+C para terminar.{RESET}\n")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            servidor.shutdown()
+        return
 
-    # 7. Exportar reporte
-    preguntar_exportar(evaluacion)
+    if args.historial:
+        if pantalla_completa:
+            filtros = {k: v for k, v in (("equipo", args.equipo), ("desde", args.desde), ("hasta", args.hasta)) if v}
+            try:
+                with PantallaCompleta() as pantalla:
+                    pantalla.historial(BASE_DIR, filtros, pagina=args.pagina, exportar=exportar_reporte)
+            except KeyboardInterrupt:
+                pass
+            return
+        imprimir_banner()
+        mostrar_historial(BASE_DIR, pagina=args.pagina, equipo=args.equipo, desde=args.desde, hasta=args.hasta)
+        return
+
+    if args.ver:
+        evaluacion = obtener_evaluacion(args.ver, BASE_DIR)
+        if evaluacion is None:
+            print(f"\n  {ROJO}No existe la evaluación #{args.ver} en el historial.{RESET}\n")
+            return
+        similares = buscar_similares(evaluacion, BASE_DIR, k=3, excluir_id=args.ver)
+        percentiles = percentiles_evaluacion(evaluacion, BASE_DIR, en_historial=True)
+        if pantalla_completa:
+            try:
+                with PantallaCompleta() as pantalla:
+                    pantalla.resultados(evaluacion, similares, exportar_reporte, titulo=f"Evaluación #{args.ver}",
+                                        percentiles=percentiles)
+            except KeyboardInterrupt:
+                pass
+            return
+        mostrar_resultados(evaluacion["resultados"], evaluacion["veredicto"], similares,
+                           evaluacion.get("incertidumbre"), percentiles)
+        preguntar_exportar(evaluacion, similares, percentiles=percentiles)
+        return
+
+    if args.evolucion:
+        iniciativa_id = resolver_iniciativa(args.evolucion, BASE_DIR)
+        if iniciativa_id is None:
+            print(f"\n  {ROJO}No existe la iniciativa ni la evaluación #{args.evolucion}.{RESET}\n")
+            return
+        imprimir_banner()
+        mostrar_evolucion(iniciativa_id, BASE_DIR)
+        return
+
+    if args.consenso is not None:
+        try:
+            pesos = cargar_pesos(args.pesos_evaluadores) if args.pesos_evaluadores else None
+        except (OSError, ValueError) as e:
+            print(f"\n  {ROJO}No se pudieron cargar los pesos: {e}{RESET}\n")
+            sys.exit(1)
+        iniciativa_id = None
+        if args.consenso:
+            iniciativa_id = resolver_iniciativa(args.consenso, BASE_DIR)
+            if iniciativa_id is None:
+                print(f"\n  {ROJO}No existe la iniciativa ni la evaluación #{args.consenso}.{RESET}\n")
+                return
+        imprimir_banner()
+        mostrar_consenso(BASE_DIR, iniciativa_id, pesos, equipo=args.equipo)
+        return
+
+    if args.buscar:
+        imprimir_banner()
+        mostrar_busqueda(args.buscar, BASE_DIR)
+        return
+
+    if args.borrar or args.anonimizar:
+        id_registro = args.borrar or args.anonimizar
+        operacion = borrar_evaluacion if args.borrar else anonimizar_evaluacion
+        try:
+            compactacion = operacion(id_registro, BASE_DIR)
+        except ValueError as e:
+            print(f"\n  {ROJO}{e}{RESET}\n")
+            return
+        if compactacion is None:
+            print(f"\n  {ROJO}No existe la evaluación #{id_registro} en el historial.{RESET}\n")
+            return
+        print(f"\n  {DIM}Aplicando el cambio en segmentos, CSV e índices...{RESET}")
+        compactacion.join()
+        accion = "borrada" if args.borrar else "anonimizada"
+        print(f"  {VERDE}✅ Evaluación #{id_registro} {accion}.{RESET}\n")
+        return
+
+    if args.compactar:
+        resumen = compactar_historial(BASE_DIR, completa=True)
+        if resumen is None:
+            print(f"\n  {AMARILLO}No hay historial migrado a segmentos o ya hay una compactación en curso.{RESET}\n")
+            return
+        print(f"\n  {VERDE}✅ Historial compactado: {resumen['segmentos_antes']} → "
+              f"{resumen['segmentos_despues']} segmentos, {resumen['mutaciones']} cambios aplicados{RESET}\n")
+        return
+
+    if args.portafolio:
+        ruta = guardar_portafolio(
+            BASE_DIR, os.path.join(BASE_DIR, "reports"), args.portafolio, args.incluir_duplicados,
+            equipo=args.equipo, desde=args.desde, hasta=args.hasta,
+        )
+        if ruta:
+            print(f"\n  {VERDE}✅ Reporte de portafolio guardado en:{RESET}")
+            print(f"  {DIM}{ruta}{RESET}\n")
+        else:
+            print(f"\n  {AMARILLO}⚠️  PDF no disponible. Instala: pip install weasyprint markdown{RESET}")
+            print(f"  {DIM}El portafolio en Markdown quedó guardado en reports/.{RESET}\n")
+        return
+
+    if args.importar:
+        importar(args)
+        return
+
+    if args.optimizar_orden:
+        resumen = optimizar_orden(BASE_DIR)
+        print(f"\n  {VERDE}✅ Orden de preguntas optimizado con {resumen['registros']} evaluaciones "
+              f"({resumen['nodos']} nodos, {resumen['segundos']} s).{RESET}")
+        print(f"  {DIM}Preguntas esperadas hasta fijar el veredicto: {resumen['preguntas_esperadas']} "
+              f"(orden fijo: {resumen['preguntas_orden_fijo']}).{RESET}")
+        if resumen["mejora"]:
+            print(f"  {DIM}Úsalo con: python main.py --orden-optimizado{RESET}\n")
+        else:
+            print(f"  {DIM}La política no mejora el orden del cuestionario con este historial: "
+                  f"--orden-optimizado seguirá ese orden.{RESET}\n")
+        return
+
+    if args.exportar:
+        resumen = exportar_reportes(BASE_DIR, os.path.join(BASE_DIR, "reports"), args.exportar)
+        print(f"\n  {VERDE}✅ Reportes exportados a reports/: {resumen['generados']} generados, "
+              f"{resumen['reutilizados']} sin cambios ({resumen['segundos']} s){RESET}\n")
+        return
+
+    if args.migrar:
+        resumen = migrar_historial(BASE_DIR, args.migrar)
+        print(f"\n  {VERDE}✅ Historial migrado a {args.migrar}: {resumen['registros']} registros, "
+              f"{resumen['bytes_antes']:,} → {resumen['bytes_despues']:,} bytes{RESET}\n")
+        return
+
+    # ── FLUJO PRINCIPAL ────────────────────────────────────────────────────────
+    iniciativa_id = None
+    if args.iniciativa:
+        iniciativa_id = resolver_iniciativa(args.iniciativa, BASE_DIR)
+        if iniciativa_id is None:
+            print(f"\n  {ROJO}No existe la iniciativa #{args.iniciativa}.{RESET}\n")
+            sys.exit(1)
+
+    # El modo adaptativo ofrece terminar antes con preguntas de sí/no: sigue en modo línea
+    if pantalla_completa and not (args.adaptativo or args.orden_optimizado):
+        escritor, evaluacion, tarea_guardar, tarea_reporte = evaluar_en_pantalla(iniciativa_id)
+    else:
+        escritor, evaluacion, tarea_guardar, tarea_reporte = evaluar_en_lineas(args, iniciativa_id)
+    meta = evaluacion["meta"]
+
+    # 8. Esperar lo que quede pendiente e informar
+    if not tarea_guardar.done() or (tarea_reporte is not None and not tarea_reporte.done()):
+        print(f"\n  {DIM}Terminando de guardar...{RESET}")
+    escritor.esperar()
+
+    if "duplicado_de" in meta:
+        print(f"\n  {AMARILLO}⚠️  Esta evaluación parece un duplicado de la #{meta['duplicado_de']} "
+              f"(mismas respuestas y nombre/descripción casi iguales).{RESET}")
+        print(f"  {DIM}Quedó marcada como duplicado en el historial.{RESET}")
+    if "iniciativa_id" in meta and not tarea_guardar.exception():
+        entrada = obtener_iniciativa(meta["iniciativa_id"], BASE_DIR)
+        print(f"\n  {CYAN}🧬 Versión {entrada['versiones']} de la iniciativa #{meta['iniciativa_id']} "
+              f"({entrada['ultimos_cambios']} respuestas cambiaron).{RESET}")
+        print(f"  {DIM}Trayectoria: python main.py --evolucion {meta['iniciativa_id']}{RESET}")
+    if tarea_reporte is not None and not tarea_reporte.exception():
+        mostrar_archivos(tarea_reporte.result())
+
+    fallos = escritor.tomar_fallos()
+    for descripcion, error in fallos:
+        print(f"\n  {ROJO}❌ No se pudo {descripcion}: {error}{RESET}")
+    if fallos:
+        sys.exit(1)
 
     print(f"\n  {BOLD}{VERDE}¡Evaluación completada!{RESET}")
     print(f"  {DIM}Puedes ver el historial con: python main.py --historial{RESET}\n")
@@ -0,0 +1,28 @@
+"""Filas y evaluaciones aleatorias (reproducibles con la semilla del `random.Random`) para las pruebas."""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.preguntas import CATEGORIAS
+from utils.importador import puntuar_lote, resolver_columnas, validar_fila
+
+
+PREGUNTAS = [(p["id"], [op[0] for op in p["opciones"]]) for cat in CATEGORIAS for p in cat["preguntas"]]
+ENCABEZADOS = ["nombre_iniciativa", "equipo", "responsable"] + [pid for pid, _ in PREGUNTAS]
+
+
+def fila_aleatoria(rng: random.Random, nombre: str) -> dict:
+    """Fila de un archivo a importar, con una letra al azar por pregunta."""
+    fila = {"nombre_iniciativa": nombre, "equipo": rng.choice(["Ventas", "Soporte", "Finanzas"]),
+            "responsable": "Ana"}
+    fila.update((pid, rng.choice(letras)) for pid, letras in PREGUNTAS)
+    return fila
+
+
+def evaluacion_aleatoria(rng: random.Random, nombre: str) -> dict:
+    """Evaluación completa, como la que guarda la terminal."""
+    columnas = resolver_columnas(ENCABEZADOS)
+    return puntuar_lote([validar_fila(fila_aleatoria(rng, nombre), columnas, 1)])[0]
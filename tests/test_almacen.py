@@ -0,0 +1,104 @@
+"""
+Compactación del almacén de segmentos (utils.almacen).
+
+Agregar evaluaciones nunca debe disparar una compactación: los segmentos que
+rotan por llenos se quedan como están. Solo las mutaciones y los segmentos
+chicos contiguos la justifican, y después de compactar ya no hace falta otra.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import evaluacion_aleatoria
+from utils import almacen
+from utils.almacen import SEGMENTOS_PARA_COMPACTAR, AlmacenHistorial
+
+
+TAMANO = 2048       # segmentos chicos para que roten seguido
+
+
+class CompactacionTest(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.almacen = AlmacenHistorial(os.path.join(directorio.name, "data", "segmentos"))
+        self.rng = random.Random(5)
+        self.guardadas = {}
+
+    def _agregar(self, n: int) -> None:
+        for _ in range(n):
+            evaluacion = evaluacion_aleatoria(self.rng, f"Iniciativa {len(self.guardadas)}")
+            self.guardadas[self.almacen.agregar(evaluacion)] = evaluacion
+
+    def _segmentos(self) -> list:
+        return self.almacen._leer_manifiesto()["segmentos"]
+
+    def _verificar_contenido(self) -> None:
+        self.assertEqual(dict(self.almacen.iterar()), {i: ev for i, ev in self.guardadas.items() if ev})
+
+    def test_agregar_no_dispara_compactaciones(self):
+        with mock.patch.object(almacen, "TAMANO_SEGMENTO", TAMANO):
+            for _ in range(300):
+                self._agregar(1)
+                self.assertFalse(self.almacen.necesita_compactar())
+        self.assertGreater(len(self._segmentos()), SEGMENTOS_PARA_COMPACTAR + 1)
+        self._verificar_contenido()
+
+    def test_una_compactacion_por_borrado(self):
+        compactaciones = borrados = 0
+        with mock.patch.object(almacen, "TAMANO_SEGMENTO", TAMANO):
+            for _ in range(12):
+                self._agregar(25)
+                id_borrado = self.rng.choice([i for i, ev in self.guardadas.items() if ev])
+                self.assertTrue(self.almacen.borrar(id_borrado))
+                self.guardadas[id_borrado] = None
+                borrados += 1
+                while self.almacen.necesita_compactar():
+                    self.assertIsNotNone(self.almacen.compactar())
+                    compactaciones += 1
+                    self.assertLessEqual(compactaciones, borrados)
+        self.assertEqual(compactaciones, borrados)
+        self._verificar_contenido()
+
+    def test_junta_segmentos_chicos(self):
+        # Cada borrado en el segmento activo lo sella: sin juntarlos quedaría
+        # un segmento chico por compactación
+        for _ in range(2 * SEGMENTOS_PARA_COMPACTAR):
+            self._agregar(3)
+            id_borrado = max(self.guardadas)
+            self.almacen.borrar(id_borrado)
+            self.guardadas[id_borrado] = None
+            self.almacen.compactar()
+            self.assertFalse(self.almacen.necesita_compactar())
+        self.assertLessEqual(len(self._segmentos()), 2)
+        self._verificar_contenido()
+
+    def test_compactar_completa_conserva_ids(self):
+        with mock.patch.object(almacen, "TAMANO_SEGMENTO", TAMANO):
+            self._agregar(120)
+            for id_borrado in (3, 40, 41, 119):
+                self.almacen.borrar(id_borrado)
+                self.guardadas[id_borrado] = None
+            editada = evaluacion_aleatoria(self.rng, "Editada")
+            self.almacen.editar(60, editada)
+            self.guardadas[60] = editada
+            resumen = self.almacen.compactar(completa=True)
+        self.assertEqual(resumen["mutaciones"], 5)
+        self.assertEqual(len(self.almacen), 120)
+        self.assertIsNone(self.almacen.evaluacion(40))
+        self.assertEqual(self.almacen.evaluacion(60), editada)
+        self._verificar_contenido()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Anonimizar el registro de cambios (utils.cambios) sin desalinear log e índice.
+
+Un consumidor lee el log sin candado mientras otro proceso puede estar
+anonimizando una evaluación. Cada lectura debe traer cambios completos y
+consecutivos, con el responsable ya borrado o todavía sin borrar, nunca una
+línea de otra posición.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import evaluacion_aleatoria
+from utils.cambios import _rutas, anonimizar_cambios, leer_cambios, ultimo_cambio
+from utils.persistencia import anonimizar_evaluacion, guardar_evaluaciones, migrar_historial
+
+
+class AnonimizarCambiosTest(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.base_dir = directorio.name
+        migrar_historial(self.base_dir, "zlib")
+        rng = random.Random(29)
+        evaluaciones = []
+        for i in range(60):
+            evaluacion = evaluacion_aleatoria(rng, f"Iniciativa {i}")
+            evaluacion["meta"]["responsable"] = f"Responsable número {i}"
+            evaluaciones.append(evaluacion)
+        guardar_evaluaciones(evaluaciones[:30], self.base_dir)
+        guardar_evaluaciones(evaluaciones[30:], self.base_dir)
+
+    def _indice(self) -> bytes:
+        with open(_rutas(self.base_dir)[1], "rb") as f:
+            return f.read()
+
+    def test_anonimizar_no_mueve_las_lineas(self):
+        indice = self._indice()
+        antes = leer_cambios(self.base_dir, 0, 1000)
+        anonimizar_evaluacion(7, self.base_dir).join()
+        despues = leer_cambios(self.base_dir, 0, 1000)
+
+        self.assertEqual(self._indice()[:len(indice)], indice)
+        self.assertEqual(len(despues), ultimo_cambio(self.base_dir))
+        for previo, cambio in zip(antes, despues):
+            if cambio["id"] == 7:
+                self.assertEqual(cambio["fila"]["responsable"], "")
+            else:
+                self.assertEqual(cambio, previo)
+        self.assertEqual(despues[-1]["op"], "edicion")
+
+    def test_lectores_durante_la_anonimizacion(self):
+        errores, terminar = [], threading.Event()
+
+        def leer():
+            while not terminar.is_set():
+                desde = random.randrange(ultimo_cambio(self.base_dir))
+                try:
+                    cambios = leer_cambios(self.base_dir, desde, 20)
+                except ValueError as e:
+                    errores.append(e)
+                    return
+                if [c["seq"] for c in cambios] != list(range(desde + 1, desde + 1 + len(cambios))):
+                    errores.append(cambios)
+                    return
+
+        lectores = [threading.Thread(target=leer) for _ in range(3)]
+        for lector in lectores:
+            lector.start()
+        try:
+            for id_registro in range(1, 61, 2):
+                anonimizar_cambios(self.base_dir, id_registro)
+        finally:
+            terminar.set()
+            for lector in lectores:
+                lector.join()
+        self.assertEqual(errores, [])
+
+    def test_log_desalineado(self):
+        ruta_log = _rutas(self.base_dir)[0]
+        with open(ruta_log, "rb") as f:
+            lineas = f.readlines()
+        with open(ruta_log, "wb") as f:
+            f.writelines(lineas[1:])
+        with self.assertRaises(ValueError):
+            leer_cambios(self.base_dir, 10, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Catálogo congelado por versión del cuestionario (core.catalogo).
+
+Los registros compactos del historial guardan solo las letras y se vuelven a
+puntuar al leerlos. Editar pesos, umbrales o textos no debe cambiar lo que se
+lee de un registro ya guardado: se reconstruye con el catálogo de su versión, y
+lo que se evalúe con el catálogo editado se guarda completo.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import evaluacion_aleatoria
+from core.catalogo import catalogo_vigente, cargar_cuestionario, ruta_catalogo
+from core.evaluador import TEXTOS_VEREDICTO, UMBRALES
+from core.modelo import reconstruir_evaluacion
+from core.preguntas import CATEGORIAS, VERSION_CUESTIONARIO
+from utils.segmento import _TIPO_JSON, _TIPO_RECONSTRUIBLE, codificar_registro, decodificar_registro
+
+
+class CatalogoCongeladoTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(13)
+        self.evaluaciones = [evaluacion_aleatoria(rng, f"Iniciativa {i}") for i in range(40)]
+
+    def test_catalogo_vigente_congelado(self):
+        with open(ruta_catalogo(VERSION_CUESTIONARIO), encoding="utf-8") as f:
+            congelado = json.load(f)
+        self.assertEqual(
+            catalogo_vigente(), congelado,
+            "El catálogo cambió: incrementa VERSION_CUESTIONARIO y corre `python -m core.catalogo`",
+        )
+
+    def test_registros_guardados_no_cambian_al_editar_el_catalogo(self):
+        registros = [codificar_registro(ev) for ev in self.evaluaciones]
+        self.assertTrue(all(r[0] == _TIPO_RECONSTRUIBLE for r in registros))
+
+        sustentos = {clave: "Otro texto ({puntaje}%)." for clave in TEXTOS_VEREDICTO}
+        with mock.patch.dict(CATEGORIAS[0], peso=0.5), mock.patch.dict(UMBRALES, agente_claro=50), \
+                mock.patch.dict(TEXTOS_VEREDICTO, {
+                    clave: dict(textos, sustento=sustentos[clave]) for clave, textos in TEXTOS_VEREDICTO.items()
+                }):
+            self.assertEqual([decodificar_registro(r) for r in registros], self.evaluaciones)
+
+            editadas = [evaluacion_aleatoria(random.Random(17), "Editada")]
+            self.assertTrue(editadas[0]["veredicto"]["sustento"].startswith("Otro texto"))
+            registro = codificar_registro(editadas[0])
+            self.assertEqual(registro[0], _TIPO_JSON)
+        self.assertEqual(decodificar_registro(registro), editadas[0])
+
+    def test_version_sin_congelar(self):
+        with self.assertRaises(ValueError):
+            cargar_cuestionario(VERSION_CUESTIONARIO + 1)
+        letras = "-" * len(cargar_cuestionario().orden)
+        with self.assertRaises(ValueError):
+            reconstruir_evaluacion({}, letras, VERSION_CUESTIONARIO + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Consenso entre evaluadores (utils.consenso).
+
+El puntaje de consenso de cada iniciativa debe quedar entre el menor y el mayor
+puntaje de sus evaluadores, con cualquier cantidad de evaluadores, con pesos y
+con preguntas sin responder. Un empate no favorece a ninguna opción.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import PREGUNTAS, evaluacion_aleatoria
+from core.evaluador import calcular_puntaje
+from utils.consenso import consensuar
+
+
+class ConsensoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(23)
+
+    def _evaluacion(self, responsable: str, sin_responder: int = 0) -> dict:
+        evaluacion = evaluacion_aleatoria(self.rng, "Iniciativa")
+        evaluacion["meta"]["responsable"] = responsable
+        if sin_responder:
+            for pid, _ in self.rng.sample(PREGUNTAS, sin_responder):
+                del evaluacion["respuestas"][pid]
+            evaluacion["resultados"] = calcular_puntaje(evaluacion["respuestas"], registrar_metricas=False)
+        return evaluacion
+
+    def _portafolio(self) -> dict:
+        grupos, id_registro = {}, 0
+        for iniciativa_id in range(1, 201):
+            evaluadores = {}
+            for j in range(self.rng.randint(2, 6)):
+                id_registro += 1
+                evaluadores[f"evaluador {j}"] = (id_registro, self._evaluacion(f"Evaluador {j}", self.rng.choice([0, 0, 3])))
+            grupos[iniciativa_id] = evaluadores
+        return grupos
+
+    def _verificar_rangos(self, consenso: dict) -> None:
+        self.assertEqual(len(consenso["iniciativas"]), 200)
+        for c in consenso["iniciativas"]:
+            individuales = [e["puntaje_global"] for e in c["evaluadores"]]
+            self.assertGreaterEqual(c["resultados"]["puntaje_global"], min(individuales), c["iniciativa_id"])
+            self.assertLessEqual(c["resultados"]["puntaje_global"], max(individuales), c["iniciativa_id"])
+
+    def test_consenso_dentro_del_rango_de_los_evaluadores(self):
+        self._verificar_rangos(consensuar(self._portafolio()))
+
+    def test_consenso_ponderado_dentro_del_rango(self):
+        pesos = {f"evaluador {j}": peso for j, peso in enumerate([3.0, 1.0, 0.5, 2.0, 1.0, 1.5])}
+        self._verificar_rangos(consensuar(self._portafolio(), pesos))
+
+    def test_empate_sin_consenso(self):
+        a, b = self._evaluacion("Ana"), self._evaluacion("Luis")
+        consenso = consensuar({1: {"ana": (1, a), "luis": (2, b)}})["iniciativas"][0]
+        for pid, (letra, puntos) in consenso["respuestas"].items():
+            if a["respuestas"][pid][0] == b["respuestas"][pid][0]:
+                self.assertEqual(letra, a["respuestas"][pid][0])
+            else:
+                self.assertIsNone(letra)
+            self.assertEqual(puntos, (a["respuestas"][pid][1] + b["respuestas"][pid][1]) / 2)
+        promedio = (a["resultados"]["puntaje_global"] + b["resultados"]["puntaje_global"]) / 2
+        self.assertAlmostEqual(consenso["resultados"]["puntaje_global"], promedio, delta=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Índices de similitud y duplicados en memoria cuando otro proceso los reconstruye.
+
+Cada proceso guarda en memoria hasta dónde leyó el archivo del índice. Un
+borrado en otro proceso (p. ej. la terminal mientras corre el trabajador de la
+cola) reconstruye el archivo; el proceso que ya lo tenía cargado debe notarlo
+y volver a leerlo en vez de seguir desde una posición que ya no vale.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from datos import evaluacion_aleatoria
+from utils.duplicados import buscar_duplicados, cargar_indice_duplicados
+from utils.persistencia import guardar_evaluaciones, migrar_historial
+from utils.similitud import buscar_similares, cargar_indice_similitud
+
+
+class IndiceReconstruidoPorOtroProcesoTest(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.base_dir = directorio.name
+        self.rng = random.Random(3)
+        migrar_historial(self.base_dir, "zlib")
+        guardar_evaluaciones([evaluacion_aleatoria(self.rng, f"Iniciativa {i}") for i in range(30)], self.base_dir)
+
+    def _en_otro_proceso(self, codigo: str) -> None:
+        subprocess.run(
+            [sys.executable, "-c", textwrap.dedent(codigo)],
+            cwd=RAIZ, env=dict(os.environ, BASE_DIR=self.base_dir), check=True,
+        )
+
+    def test_borrado_y_nuevas_evaluaciones_desde_otro_proceso(self):
+        self.assertEqual(len(cargar_indice_similitud(self.base_dir)), 30)
+        self.assertEqual(len(cargar_indice_duplicados(self.base_dir)), 30)
+        self._en_otro_proceso("""
+            import os, random, sys
+            sys.path.insert(0, "tests")
+            from datos import evaluacion_aleatoria
+            from utils.persistencia import borrar_evaluacion, guardar_evaluaciones
+            base_dir = os.environ["BASE_DIR"]
+            borrar_evaluacion(5, base_dir).join()
+            rng = random.Random(4)
+            guardar_evaluaciones([evaluacion_aleatoria(rng, f"Nueva {i}") for i in range(10)], base_dir)
+        """)
+
+        similitud = cargar_indice_similitud(self.base_dir)
+        duplicados = cargar_indice_duplicados(self.base_dir)
+        self.assertEqual(len(similitud), 39)
+        self.assertEqual(len(duplicados), 39)
+        evaluacion = evaluacion_aleatoria(random.Random(4), "Nueva 0")
+        self.assertEqual(buscar_similares(evaluacion, self.base_dir, k=1)[0]["id"], 31)
+        self.assertEqual(buscar_duplicados(evaluacion, self.base_dir), [31])
+        ids = {e["id"] for e in buscar_similares(evaluacion, self.base_dir, k=50)}
+        self.assertNotIn(5, ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Trayectoria de una iniciativa (utils.linaje).
+
+La evolución debe mostrar cada versión con el puntaje y el nivel con que se
+guardó, aunque después cambien los pesos, puntajes o umbrales del cuestionario.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import evaluacion_aleatoria
+from core.evaluador import UMBRALES
+from core.preguntas import CATEGORIAS
+from utils import linaje
+from utils.linaje import ARCHIVO_CATALOGO, DIRECTORIO_LINAJE, evolucion_iniciativa
+from utils.persistencia import guardar_evaluaciones
+
+
+VERSIONES = 12      # más que INTERVALO_INSTANTANEA: cadena con copias completas y cambios
+
+
+class EvolucionTest(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.base_dir = directorio.name
+        rng = random.Random(19)
+        self.evaluaciones = []
+        for _ in range(VERSIONES):
+            evaluacion = evaluacion_aleatoria(rng, "OCR de facturas")
+            evaluacion["meta"]["equipo"] = "Finanzas"
+            self.evaluaciones.append(evaluacion)
+        self.ids = guardar_evaluaciones(self.evaluaciones, self.base_dir)
+
+    def _verificar(self) -> None:
+        trayectoria = evolucion_iniciativa(self.ids[0], self.base_dir)
+        self.assertEqual([v["id"] for v in trayectoria], self.ids)
+        for version, evaluacion in zip(trayectoria, self.evaluaciones):
+            resultados = evaluacion["resultados"]
+            self.assertEqual(version["puntaje_global"], resultados["puntaje_global"])
+            self.assertEqual(version["categorias"], [c["porcentaje"] for c in resultados["categorias"]])
+            self.assertEqual(version["nivel"], evaluacion["veredicto"]["nivel"])
+
+    def test_puntajes_guardados_con_el_cuestionario_editado(self):
+        with mock.patch.dict(CATEGORIAS[0], peso=0.6), mock.patch.dict(CATEGORIAS[1], peso=0.0), \
+                mock.patch.dict(UMBRALES, evaluar_alternativas=0):
+            self._verificar()
+
+    def test_reconstruye_cadenas_de_formato_anterior(self):
+        self._verificar()
+        ruta = os.path.join(self.base_dir, DIRECTORIO_LINAJE, ARCHIVO_CATALOGO)
+        with open(ruta, encoding="utf-8") as f:
+            catalogo = json.load(f)
+        del catalogo["formato"]
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(catalogo, f)
+        linaje._CACHE.clear()
+        self._verificar()
+
+
+if __name__ == "__main__":
+    unittest.main()
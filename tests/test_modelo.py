@@ -0,0 +1,93 @@
+"""
+Modelo compacto de evaluaciones (core.modelo): conversiones sin pérdida.
+
+`desde_dict` / `a_dict` y `a_registro` / `desde_registro` deben devolver el
+mismo registro del historial, también cuando trae textos que no están en el
+catálogo (versiones anteriores del cuestionario, alternativas editadas),
+respuestas que no coinciden con los resultados o claves adicionales.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import copy
+import json
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import evaluacion_aleatoria
+from core.modelo import EvaluacionCompacta, a_registro, desde_registro, evaluar
+
+
+def _normalizar(evaluacion: dict) -> dict:
+    return json.loads(json.dumps(evaluacion, ensure_ascii=False))
+
+
+class ConversionesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(37)
+        self.evaluaciones = [_normalizar(evaluacion_aleatoria(self.rng, f"Iniciativa {i}")) for i in range(200)]
+
+    def _verificar(self, evaluacion: dict) -> None:
+        compacta = EvaluacionCompacta.desde_dict(evaluacion)
+        self.assertEqual(_normalizar(compacta.a_dict()), evaluacion)
+        registro = json.loads(json.dumps(a_registro(compacta), ensure_ascii=False))
+        self.assertEqual(desde_registro(registro), compacta)
+        self.assertEqual(_normalizar(desde_registro(registro).a_dict()), evaluacion)
+
+    def test_ida_y_vuelta(self):
+        for evaluacion in self.evaluaciones:
+            self._verificar(evaluacion)
+
+    def test_sin_textos_del_catalogo_en_el_registro(self):
+        evaluacion = self.evaluaciones[0]
+        registro = json.dumps(a_registro(EvaluacionCompacta.desde_dict(evaluacion)), ensure_ascii=False)
+        pregunta = evaluacion["resultados"]["categorias"][0]["preguntas"][0]
+        self.assertNotIn(pregunta["pregunta"], registro)
+        self.assertNotIn(pregunta["texto_respuesta"], registro)
+
+    def test_textos_fuera_del_catalogo(self):
+        for evaluacion in self.evaluaciones[:50]:
+            editada = copy.deepcopy(evaluacion)
+            categoria = self.rng.choice(editada["resultados"]["categorias"])
+            categoria["nombre"] = "Categoría renombrada"
+            categoria["peso"] = 0.5
+            categoria["puntaje_maximo"] += 1
+            pregunta = self.rng.choice(categoria["preguntas"])
+            pregunta["texto_respuesta"] = "Opción de otra versión"
+            pregunta["puntaje_maximo"] += 2
+            otra = self.rng.choice(categoria["preguntas"])
+            otra["pregunta"] = "¿Pregunta que ya no existe?"
+            self._verificar(editada)
+
+    def test_alternativas_editadas_y_claves_adicionales(self):
+        evaluacion = next(ev for ev in self.evaluaciones if ev["veredicto"]["alternativas"])
+        editada = copy.deepcopy(evaluacion)
+        editada["veredicto"]["alternativas"][0]["herramientas"].append("Otra herramienta")
+        editada["veredicto"]["alternativas"].append(
+            {"nombre": "Alternativa propia", "descripcion": "", "cuando": "", "herramientas": []}
+        )
+        editada["incertidumbre"] = {"p1_1": ["A", "B"]}
+        self._verificar(editada)
+
+    def test_respuestas_que_no_coinciden_con_los_resultados(self):
+        editada = copy.deepcopy(self.evaluaciones[1])
+        pid = next(iter(editada["respuestas"]))
+        editada["respuestas"][pid] = ["Z", 9]
+        compacta = EvaluacionCompacta.desde_dict(editada)
+        self.assertIsNotNone(compacta.respuestas_propias)
+        self._verificar(editada)
+
+    def test_evaluar_equivale_al_dict(self):
+        evaluacion = self.evaluaciones[2]
+        compacta = evaluar(evaluacion["meta"], evaluacion["respuestas"])
+        self.assertEqual(_normalizar(compacta.a_dict()), evaluacion)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Reglas por defecto (core.reglas) frente a las alertas y alternativas históricas.
+
+`REGLAS_POR_DEFECTO` reemplazó a `_detectar_alertas` y
+`_seleccionar_alternativas` de core/evaluador.py; las copias de abajo son esas
+funciones tal como estaban, y el motor compilado debe dar exactamente lo mismo
+(textos, orden y recorte a cuatro alternativas), también con preguntas sin
+responder y porcentajes justo en el umbral de categoría débil.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import copy
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import evaluacion_aleatoria
+from core.evaluador import ALTERNATIVAS, MOTOR_POR_DEFECTO, generar_veredicto
+from core.preguntas import CATEGORIAS
+from core.reglas import ALERTAS_MAPA, REGLAS_POR_DEFECTO, compilar_reglas
+
+
+# ─── Comportamiento histórico ──────────────────────────────────────────────────
+def _detectar_alertas(resultados_categorias: list) -> list:
+    alertas = []
+    texto_a_id = {}
+    for p_cat in CATEGORIAS:
+        for p in p_cat["preguntas"]:
+            texto_a_id[p["texto"]] = p["id"]
+    for cat in resultados_categorias:
+        for preg in cat["preguntas"]:
+            pregunta_id = texto_a_id.get(preg["pregunta"])
+            if pregunta_id and pregunta_id in ALERTAS_MAPA:
+                respuesta = preg["respuesta"]
+                if respuesta in ALERTAS_MAPA[pregunta_id]:
+                    alertas.append(ALERTAS_MAPA[pregunta_id][respuesta])
+    return alertas
+
+
+def _seleccionar_alternativas(cats_debiles: list) -> list:
+    alternativas_seleccionadas = []
+    ids_debiles = {c["id"] for c in cats_debiles}
+    if "kpis" in ids_debiles:
+        alternativas_seleccionadas.append(ALTERNATIVAS["definir_kpis"])
+    alternativas_seleccionadas.append(ALTERNATIVAS["llm_simple"])
+    if "problema" in ids_debiles:
+        alternativas_seleccionadas.append(ALTERNATIVAS["workflow"])
+        alternativas_seleccionadas.append(ALTERNATIVAS["proceso_simple"])
+    if "impacto" in ids_debiles:
+        alternativas_seleccionadas.append(ALTERNATIVAS["dashboard_bi"])
+        alternativas_seleccionadas.append(ALTERNATIVAS["capacitacion"])
+    if "viabilidad_tecnica" in ids_debiles:
+        alternativas_seleccionadas.append(ALTERNATIVAS["rpa"])
+    if "complejidad_alternativas" in ids_debiles:
+        alternativas_seleccionadas.append(ALTERNATIVAS["prompt_chaining"])
+        alternativas_seleccionadas.append(ALTERNATIVAS["proceso_simple"])
+    vistas = set()
+    resultado = []
+    for alt in alternativas_seleccionadas:
+        if alt["nombre"] not in vistas:
+            vistas.add(alt["nombre"])
+            resultado.append(alt)
+    return resultado[:4]
+
+
+class ReglasPorDefectoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(31)
+
+    def _casos(self, n: int):
+        """resultados["categorias"] variados: sin responder y porcentajes en el umbral."""
+        for i in range(n):
+            categorias = copy.deepcopy(evaluacion_aleatoria(self.rng, f"Iniciativa {i}")["resultados"]["categorias"])
+            for cat in categorias:
+                if self.rng.random() < 0.2:
+                    cat["preguntas"] = [p for p in cat["preguntas"] if self.rng.random() < 0.5]
+                if self.rng.random() < 0.5:
+                    cat["porcentaje"] = self.rng.choice([0.0, 39.9, 40.0, 40.1, 100.0])
+            yield self.rng.uniform(0, 100), categorias
+
+    def _verificar(self, motor) -> None:
+        for puntaje, categorias in self._casos(3000):
+            alertas, claves = motor.evaluar(puntaje, categorias)
+            self.assertEqual(alertas, _detectar_alertas(categorias))
+            debiles = [c for c in categorias if c["porcentaje"] < 40]
+            self.assertEqual([ALTERNATIVAS[c] for c in claves], _seleccionar_alternativas(debiles))
+
+    def test_motor_por_defecto(self):
+        self._verificar(MOTOR_POR_DEFECTO)
+
+    def test_reglas_por_defecto_desde_json(self):
+        # Lo mismo con las reglas tal como quedan en un archivo de reglas o en un catálogo congelado
+        reglas = copy.deepcopy(REGLAS_POR_DEFECTO)
+        self._verificar(compilar_reglas(reglas, ALTERNATIVAS, copy.deepcopy(CATEGORIAS)))
+
+    def test_veredicto_con_alternativas_historicas(self):
+        for puntaje, categorias in self._casos(500):
+            veredicto = generar_veredicto(puntaje, categorias, registrar_metricas=False)
+            self.assertEqual(veredicto["alertas"], _detectar_alertas(categorias))
+            if veredicto["construir_agente"]:
+                self.assertEqual(veredicto["alternativas"], [])
+            else:
+                debiles = [c for c in categorias if c["porcentaje"] < 40]
+                self.assertEqual(veredicto["alternativas"], _seleccionar_alternativas(debiles))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Lectura y escritura de segmentos del historial (utils.segmento).
+
+Un segmento escrito con cualquier codec debe leerse igual en orden y por id
+(mmap + índice de posiciones), aceptar agregados, conservar las posiciones
+vacías, ignorar un bloque truncado por un corte y rechazar uno corrupto.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import evaluacion_aleatoria
+from utils.segmento import (
+    CODECS, REGISTRO_VACIO, LectorSegmento, agregar_a_segmento, agregar_registros, codificar_registro,
+    contar_registros, decodificar_registro, escribir_registros, escribir_segmento, iterar_registros,
+    leer_segmento, nivel_registro, ruta_indice,
+)
+
+
+class SegmentoTest(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = os.path.join(directorio.name, "seg-000001.seg")
+        rng = random.Random(41)
+        self.evaluaciones = [evaluacion_aleatoria(rng, f"Iniciativa {i}") for i in range(150)]
+
+    def _verificar(self, esperadas: list) -> None:
+        self.assertEqual(list(leer_segmento(self.ruta)), esperadas)
+        self.assertEqual(contar_registros(self.ruta), len(esperadas))
+        with LectorSegmento(self.ruta) as lector:
+            self.assertEqual(len(lector), len(esperadas))
+            for i in random.Random(1).sample(range(1, len(esperadas) + 1), 40):
+                self.assertEqual(lector.evaluacion(i), esperadas[i - 1])
+            self.assertEqual(lector.pagina(60, 30), list(enumerate(esperadas, 1))[59:89])
+            with self.assertRaises(IndexError):
+                lector.datos(len(esperadas) + 1)
+
+    def test_codecs(self):
+        for codec in CODECS:
+            with self.subTest(codec=codec):
+                self.assertEqual(escribir_segmento(self.ruta, self.evaluaciones, codec), len(self.evaluaciones))
+                self._verificar(self.evaluaciones)
+
+    def test_agregar_y_registros_vacios(self):
+        escribir_registros(self.ruta, (codificar_registro(ev) for ev in self.evaluaciones[:100]))
+        esperadas = list(self.evaluaciones[:100])
+        for evaluacion in self.evaluaciones[100:110]:
+            esperadas.append(evaluacion)
+            self.assertEqual(agregar_a_segmento(self.ruta, evaluacion), len(esperadas))
+        lote = [codificar_registro(ev) for ev in self.evaluaciones[110:]] + [REGISTRO_VACIO]
+        self.assertEqual(agregar_registros(self.ruta, lote), 151)
+        esperadas += self.evaluaciones[110:] + [None]
+        self._verificar(esperadas)
+
+        # Sin índice se reconstruye desde los bloques
+        os.remove(ruta_indice(self.ruta))
+        self._verificar(esperadas)
+
+    def test_registros_reconstruibles_y_completos(self):
+        evaluacion = self.evaluaciones[0]
+        reconstruible = codificar_registro(evaluacion)
+        self.assertLess(len(reconstruible), 300)
+        con_extras = dict(evaluacion, incertidumbre={"p1_1": ["A", "B"]})
+        completo = codificar_registro(con_extras)
+        for datos, esperada in ((reconstruible, evaluacion), (completo, con_extras)):
+            self.assertEqual(decodificar_registro(datos), esperada)
+            self.assertEqual(decodificar_registro(memoryview(datos)), esperada)
+            self.assertEqual(nivel_registro(datos), esperada["veredicto"]["nivel"])
+        self.assertIsNone(decodificar_registro(REGISTRO_VACIO))
+        self.assertIsNone(nivel_registro(REGISTRO_VACIO))
+
+    def test_limite_de_bytes(self):
+        registros = iter([codificar_registro(ev) for ev in self.evaluaciones])
+        escritos = escribir_registros(self.ruta, registros, registros_por_bloque=16, limite_bytes=1024)
+        self.assertEqual(escritos % 16, 0)
+        self.assertLess(escritos, len(self.evaluaciones))
+        self.assertGreaterEqual(os.path.getsize(self.ruta), 1024)
+        self.assertEqual(list(leer_segmento(self.ruta)), self.evaluaciones[:escritos])
+        # Lo que no se escribió sigue en el iterador, para el segmento siguiente
+        self.assertEqual(len(list(registros)), len(self.evaluaciones) - escritos)
+
+    def test_bloque_truncado_por_un_corte(self):
+        escribir_segmento(self.ruta, self.evaluaciones[:100])
+        with open(self.ruta, "ab") as f:
+            # Marco de un bloque de 64 bytes del que llegaron a escribirse 10
+            f.write(b"\x40\x00\x00\x00\x01\x00\x00\x00\x00\x00" + bytes(10))
+        self._verificar(self.evaluaciones[:100])
+        # El siguiente agregado pisa la cola truncada
+        agregar_a_segmento(self.ruta, self.evaluaciones[100])
+        self._verificar(self.evaluaciones[:101])
+
+    def test_bloque_corrupto(self):
+        escribir_segmento(self.ruta, self.evaluaciones, "ninguno")
+        with open(self.ruta, "r+b") as f:
+            f.seek(os.path.getsize(self.ruta) // 2)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes((byte[0] ^ 0xFF,)))
+        with self.assertRaises(ValueError):
+            list(iterar_registros(self.ruta))
+
+
+if __name__ == "__main__":
+    unittest.main()
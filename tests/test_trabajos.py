@@ -0,0 +1,124 @@
+"""
+Retomar una importación de la cola (utils.trabajos) después de una caída.
+
+El trabajador se corta justo después de guardar un bloque y antes de guardar
+su avance (lo peor que puede pasar: el historial tiene filas que el punto de
+control no conoce). Al retomar, el historial debe quedar con cada fila del
+archivo exactamente una vez, también si entre medio se guardaron evaluaciones
+desde la terminal.
+
+Uso:
+    python -m unittest discover tests
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import ENCABEZADOS, evaluacion_aleatoria, fila_aleatoria
+from utils import trabajos
+from utils.persistencia import guardar_evaluacion, iterar_historial, migrar_historial
+from utils.trabajos import Trabajador, encolar_trabajo, obtener_trabajo, reanudar_trabajo
+
+
+BLOQUE = 20
+FILAS = 3 * BLOQUE + 7          # el último bloque queda incompleto
+
+
+class _Caida(Exception):
+    pass
+
+
+class RetomarImportacionTest(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.base_dir = directorio.name
+        self.ruta = os.path.join(self.base_dir, "respuestas.csv")
+        rng = random.Random(7)
+        with open(self.ruta, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ENCABEZADOS)
+            writer.writeheader()
+            writer.writerows(fila_aleatoria(rng, f"Iniciativa {i}") for i in range(FILAS))
+        parche = mock.patch.object(trabajos, "TAMANO_BLOQUE", BLOQUE)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def _importar_con_caida(self) -> int:
+        """Encola la importación y la corta después de guardar su primer bloque."""
+        trabajo_id = encolar_trabajo(self.base_dir, "importar", {"ruta": self.ruta})
+        guardar_avance = Trabajador._guardar_avance
+        llamadas = [0]
+
+        def _cortar(trabajador, id_trabajo, avance):
+            # 1ª llamada: punto de partida; 2ª: después del primer bloque
+            llamadas[0] += 1
+            if llamadas[0] == 2:
+                raise _Caida()
+            return guardar_avance(trabajador, id_trabajo, avance)
+
+        with mock.patch.object(Trabajador, "_guardar_avance", _cortar):
+            Trabajador(self.base_dir).correr()
+        trabajo = obtener_trabajo(self.base_dir, trabajo_id)
+        self.assertEqual(trabajo["estado"], "fallido")
+        self.assertEqual(trabajo["hecho"], 0)
+        self.assertEqual(len(self._nombres()), BLOQUE)
+        return trabajo_id
+
+    def _nombres(self) -> list:
+        return [ev["meta"]["nombre_iniciativa"] for _, ev in iterar_historial(self.base_dir)]
+
+    def _verificar(self, trabajo_id: int, interactivas: list) -> None:
+        trabajo = obtener_trabajo(self.base_dir, trabajo_id)
+        self.assertEqual(trabajo["estado"], "terminado")
+        self.assertEqual(trabajo["resumen"]["importadas"], FILAS)
+        nombres = self._nombres()
+        self.assertEqual(len(nombres), len(set(nombres)), "hay filas repetidas")
+        self.assertEqual(set(nombres), {f"Iniciativa {i}" for i in range(FILAS)} | set(interactivas))
+        ids = [i for i, _ in iterar_historial(self.base_dir)]
+        self.assertEqual(ids, list(range(1, len(ids) + 1)))
+
+    def test_retomar_no_repite_ni_pierde_filas(self):
+        trabajo_id = self._importar_con_caida()
+        self.assertTrue(reanudar_trabajo(self.base_dir, trabajo_id))
+        Trabajador(self.base_dir).correr()
+        self._verificar(trabajo_id, [])
+
+    def test_retomar_con_historial_migrado(self):
+        migrar_historial(self.base_dir, "zlib")
+        trabajo_id = self._importar_con_caida()
+        reanudar_trabajo(self.base_dir, trabajo_id)
+        Trabajador(self.base_dir).correr()
+        self._verificar(trabajo_id, [])
+
+    def test_guardados_interactivos_intercalados(self):
+        rng = random.Random(11)
+        interactivas = []
+
+        def guardar(nombre):
+            guardar_evaluacion(evaluacion_aleatoria(rng, nombre), self.base_dir)
+            interactivas.append(nombre)
+
+        trabajo_id = self._importar_con_caida()
+        # Entre la caída y la reanudación, justo después del bloque cortado
+        guardar("Terminal tras la caída")
+        reanudar_trabajo(self.base_dir, trabajo_id)
+
+        def al_avanzar(evento, trabajo):
+            if evento == "bloque":
+                guardar(f"Terminal tras el bloque {trabajo['hecho']}")
+
+        Trabajador(self.base_dir, al_avanzar=al_avanzar).correr()
+        self.assertGreater(len(interactivas), 1)
+        self._verificar(trabajo_id, interactivas)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
 """Utilidades del Evaluador de Iniciativas de Agentes."""
-from .reporte import guardar_markdown, guardar_pdf, generar_markdown
-from .persistencia import guardar_evaluacion, mostrar_historial
+from .reporte import guardar_markdown, guardar_pdf, generar_markdown, guardar_html, generar_html
+from .persistencia import guardar_evaluacion, mostrar_historial, cargar_historial_compacto
+from .similitud import buscar_similares
+from .busqueda import buscar
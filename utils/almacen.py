@@ -0,0 +1,378 @@
+"""
+Historial estructurado como log: segmentos con rotación, lápidas y compactación.
+
+El almacén vive en data/segmentos/ y se describe con un manifiesto:
+
+    manifiesto.json   lista ordenada de segmentos de datos y de logs de mutaciones
+    seg-NNNNNN.seg    registros de evaluaciones (formato de utils.segmento)
+    mut-NNNNNN.seg    log de mutaciones: lápidas (borrar #id) y ediciones (#id → registro)
+
+El id de una evaluación es su posición entre todos los segmentos de datos y no
+cambia nunca: borrar o editar agrega una mutación al log, y al leer se aplica
+sobre el registro original. La compactación reescribe los segmentos sellados
+que tienen mutaciones aplicándolas (las evaluaciones borradas quedan como
+registros vacíos de un byte, para conservar los ids) y junta los segmentos
+chicos contiguos en segmentos de `TAMANO_SEGMENTO`; los llenos sin cambios no
+se tocan. Después cambia el manifiesto de forma atómica. Solo toma el candado de escritura para sellar al inicio y para
+publicar el manifiesto al final, así que puede correr en un hilo mientras se
+guardan evaluaciones.
+
+El candado de escritura es el del historial (data/.historial.lock, ver
+utils.candado), que vale también entre procesos; una sola compactación corre a
+la vez aunque la lancen procesos distintos.
+"""
+
+import json
+import os
+import struct
+from bisect import bisect_left, bisect_right
+from itertools import chain
+
+from .candado import ARCHIVO_CANDADO, candado
+from .segmento import (
+    REGISTRO_VACIO, LectorSegmento, agregar_registro, agregar_registros, codificar_registro, contar_registros,
+    decodificar_registro, escribir_registros, iterar_registros, ruta_indice,
+)
+
+
+ARCHIVO_MANIFIESTO = "manifiesto.json"
+TAMANO_SEGMENTO = 8 * 1024 * 1024       # bytes de un segmento antes de rotar
+SEGMENTOS_PARA_COMPACTAR = 8            # segmentos sellados chicos que justifican juntarlos
+
+_MUTACION = struct.Struct("<BI")        # operación, id
+_BORRAR = 0
+_EDITAR = 1
+
+ARCHIVO_COMPACTACION = ".compactacion.lock"     # junto al candado del historial
+
+
+class AlmacenHistorial:
+    """Historial en segmentos bajo `directorio` (se crea al primer uso)."""
+
+    def __init__(self, directorio: str, codec: str = "zlib"):
+        self.directorio = directorio
+        self.codec = codec
+        datos = os.path.dirname(os.path.abspath(directorio))
+        self._candado = candado(os.path.join(datos, ARCHIVO_CANDADO))         # escrituras y manifiesto
+        self._compactando = candado(os.path.join(datos, ARCHIVO_COMPACTACION))
+
+    # ── Manifiesto ─────────────────────────────────────────────────────────────
+    def _ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre)
+
+    def existe(self) -> bool:
+        return os.path.exists(self._ruta(ARCHIVO_MANIFIESTO))
+
+    def _leer_manifiesto(self) -> dict:
+        if not self.existe():
+            with self._candado:
+                if not self.existe():
+                    os.makedirs(self.directorio, exist_ok=True)
+                    manifiesto = {"codec": self.codec, "siguiente": 1, "segmentos": [], "mutaciones": []}
+                    manifiesto["segmentos"].append(self._nuevo_archivo(manifiesto, "seg"))
+                    manifiesto["mutaciones"].append(self._nuevo_archivo(manifiesto, "mut"))
+                    self._escribir_manifiesto(manifiesto)
+        with open(self._ruta(ARCHIVO_MANIFIESTO), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _escribir_manifiesto(self, manifiesto: dict) -> None:
+        temporal = self._ruta(f"{ARCHIVO_MANIFIESTO}.tmp")
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(manifiesto, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self._ruta(ARCHIVO_MANIFIESTO))
+
+    def _nuevo_archivo(self, manifiesto: dict, prefijo: str, registros=()) -> str:
+        nombre = f"{prefijo}-{manifiesto['siguiente']:06d}.seg"
+        manifiesto["siguiente"] += 1
+        escribir_registros(self._ruta(nombre), registros, manifiesto["codec"])
+        return nombre
+
+    def adoptar(self, ruta_segmento: str) -> None:
+        """Convierte un segmento único (historial.seg) en el primer segmento del almacén."""
+        with self._candado:
+            manifiesto = self._leer_manifiesto()
+            if any(contar_registros(self._ruta(s)) for s in manifiesto["segmentos"]):
+                raise ValueError("El almacén ya tiene registros")
+            nombre = f"seg-{manifiesto['siguiente']:06d}.seg"
+            manifiesto["siguiente"] += 1
+            os.replace(ruta_segmento, self._ruta(nombre))
+            if os.path.exists(ruta_indice(ruta_segmento)):
+                os.remove(ruta_indice(ruta_segmento))
+            viejos = manifiesto["segmentos"]
+            manifiesto["segmentos"] = [nombre]
+            self._escribir_manifiesto(manifiesto)
+            self._eliminar(viejos)
+
+    def cambiar_codec(self, codec: str) -> None:
+        """Codec de los segmentos que se escriban desde ahora (la compactación recomprime)."""
+        with self._candado:
+            manifiesto = self._leer_manifiesto()
+            manifiesto["codec"] = codec
+            self._escribir_manifiesto(manifiesto)
+
+    def _eliminar(self, nombres: list) -> None:
+        for nombre in nombres:
+            for ruta in (self._ruta(nombre), ruta_indice(self._ruta(nombre))):
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+
+    # ── Lectura ────────────────────────────────────────────────────────────────
+    def _inicios(self, segmentos: list) -> list:
+        """Id del primer registro de cada segmento (más el total al final)."""
+        inicios = [1]
+        for nombre in segmentos:
+            inicios.append(inicios[-1] + contar_registros(self._ruta(nombre)))
+        return inicios
+
+    def _mutaciones(self, logs: list) -> dict:
+        """{id: registro codificado que lo reemplaza (REGISTRO_VACIO si se borró)}."""
+        cambios = {}
+        for nombre in logs:
+            for datos in iterar_registros(self._ruta(nombre)):
+                operacion, id_registro = _MUTACION.unpack_from(datos)
+                cambios[id_registro] = (
+                    REGISTRO_VACIO if operacion == _BORRAR else bytes(datos[_MUTACION.size:])
+                )
+        return cambios
+
+    def __len__(self) -> int:
+        """Cantidad de ids asignados (incluye los borrados)."""
+        return self._inicios(self._leer_manifiesto()["segmentos"])[-1] - 1
+
+    def evaluacion(self, id_registro: int) -> dict:
+        """Evaluación #id_registro con sus ediciones aplicadas, o None si no existe o se borró."""
+        manifiesto = self._leer_manifiesto()
+        cambios = self._mutaciones(manifiesto["mutaciones"])
+        if id_registro in cambios:
+            return decodificar_registro(cambios[id_registro])
+        inicios = self._inicios(manifiesto["segmentos"])
+        if not 1 <= id_registro < inicios[-1]:
+            return None
+        i = bisect_right(inicios, id_registro) - 1
+        with LectorSegmento(self._ruta(manifiesto["segmentos"][i])) as lector:
+            return lector.evaluacion(id_registro - inicios[i] + 1)
+
+    def pagina(self, desde: int, cantidad: int) -> list:
+        """[(id, evaluación)] de los ids desde..desde+cantidad-1 que no estén borrados."""
+        manifiesto = self._leer_manifiesto()
+        cambios = self._mutaciones(manifiesto["mutaciones"])
+        inicios = self._inicios(manifiesto["segmentos"])
+        filas = []
+        for i, nombre in enumerate(manifiesto["segmentos"]):
+            primero, ultimo = max(desde, inicios[i]), min(desde + cantidad, inicios[i + 1]) - 1
+            if primero > ultimo:
+                continue
+            with LectorSegmento(self._ruta(nombre)) as lector:
+                for id_registro in range(primero, ultimo + 1):
+                    if id_registro in cambios:
+                        evaluacion = decodificar_registro(cambios[id_registro])
+                    else:
+                        evaluacion = lector.evaluacion(id_registro - inicios[i] + 1)
+                    if evaluacion is not None:
+                        filas.append((id_registro, evaluacion))
+        return filas
+
+    def iterar(self):
+        """Itera (id, evaluación) de todo el historial en orden, sin las borradas."""
+        manifiesto = self._leer_manifiesto()
+        cambios = self._mutaciones(manifiesto["mutaciones"])
+        for id_registro, datos in self._registros(manifiesto["segmentos"], cambios):
+            evaluacion = decodificar_registro(datos)
+            if evaluacion is not None:
+                yield id_registro, evaluacion
+
+    def _registros(self, segmentos: list, cambios: dict, id_inicial: int = 1):
+        id_registro = id_inicial
+        for nombre in segmentos:
+            for datos in iterar_registros(self._ruta(nombre)):
+                yield id_registro, cambios.get(id_registro, datos)
+                id_registro += 1
+
+    # ── Escritura ──────────────────────────────────────────────────────────────
+    def agregar(self, evaluacion: dict) -> int:
+        """Agrega una evaluación al segmento activo (rotando si está lleno) y retorna su id."""
+        datos = codificar_registro(evaluacion)
+        with self._candado:
+            manifiesto = self._leer_manifiesto()
+            activo = self._ruta(manifiesto["segmentos"][-1])
+            if os.path.getsize(activo) >= TAMANO_SEGMENTO:
+                manifiesto["segmentos"].append(self._nuevo_archivo(manifiesto, "seg"))
+                self._escribir_manifiesto(manifiesto)
+                activo = self._ruta(manifiesto["segmentos"][-1])
+            previos = self._inicios(manifiesto["segmentos"][:-1])[-1] - 1
+            return previos + agregar_registro(activo, datos)
+
+    def agregar_lote(self, preparar) -> list:
+        """
+        Agrega un lote de evaluaciones al segmento activo con una sola escritura.
+
+        Args:
+            preparar: función que recibe el id que tendrá la primera evaluación
+                      y retorna la lista de evaluaciones a guardar. Se llama con
+                      el lock de escritura tomado, así los ids que use para
+                      referenciar evaluaciones del mismo lote son definitivos.
+        Returns:
+            list: ids asignados, en orden
+        """
+        with self._candado:
+            manifiesto = self._leer_manifiesto()
+            activo = self._ruta(manifiesto["segmentos"][-1])
+            if os.path.getsize(activo) >= TAMANO_SEGMENTO:
+                manifiesto["segmentos"].append(self._nuevo_archivo(manifiesto, "seg"))
+                self._escribir_manifiesto(manifiesto)
+                activo = self._ruta(manifiesto["segmentos"][-1])
+            previos = self._inicios(manifiesto["segmentos"][:-1])[-1] - 1
+            primer_id = previos + contar_registros(activo) + 1
+            evaluaciones = preparar(primer_id)
+            if not evaluaciones:
+                return []
+            ultimo = previos + agregar_registros(activo, [codificar_registro(ev) for ev in evaluaciones])
+            return list(range(primer_id, ultimo + 1))
+
+    def _mutar(self, operacion: int, id_registro: int, datos: bytes = b"") -> bool:
+        with self._candado:
+            manifiesto = self._leer_manifiesto()
+            if not 1 <= id_registro <= self._inicios(manifiesto["segmentos"])[-1] - 1:
+                return False
+            agregar_registro(
+                self._ruta(manifiesto["mutaciones"][-1]),
+                _MUTACION.pack(operacion, id_registro) + datos,
+            )
+            return True
+
+    def borrar(self, id_registro: int) -> bool:
+        """Agrega una lápida para #id_registro. Retorna False si el id no existe."""
+        return self._mutar(_BORRAR, id_registro)
+
+    def editar(self, id_registro: int, evaluacion: dict) -> bool:
+        """Reemplaza el contenido de #id_registro. Retorna False si el id no existe."""
+        return self._mutar(_EDITAR, id_registro, codificar_registro(evaluacion))
+
+    # ── Compactación ───────────────────────────────────────────────────────────
+    def _chico(self, nombre: str) -> bool:
+        return os.path.getsize(self._ruta(nombre)) < TAMANO_SEGMENTO
+
+    def _fusionables(self, sellados: list) -> int:
+        """Segmentos sellados chicos junto a otro chico: los que una compactación junta."""
+        chicos = [self._chico(nombre) for nombre in sellados]
+        return sum(
+            1 for i, chico in enumerate(chicos)
+            if chico and ((i > 0 and chicos[i - 1]) or (i + 1 < len(chicos) and chicos[i + 1]))
+        )
+
+    def necesita_compactar(self) -> bool:
+        """
+        Hay mutaciones por aplicar, o `SEGMENTOS_PARA_COMPACTAR` segmentos
+        sellados chicos que se pueden juntar. Los segmentos llenos no cuentan:
+        agregar evaluaciones sin borrar ni editar nunca dispara la compactación.
+        """
+        manifiesto = self._leer_manifiesto()
+        return (
+            any(contar_registros(self._ruta(m)) for m in manifiesto["mutaciones"])
+            or self._fusionables(manifiesto["segmentos"][:-1]) >= SEGMENTOS_PARA_COMPACTAR
+        )
+
+    def compactar(self, completa: bool = False) -> dict:
+        """
+        Aplica lápidas y ediciones y junta segmentos chicos. Solo se reescriben
+        los tramos de segmentos contiguos que tienen mutaciones o que son chicos
+        (de a dos o más); los segmentos llenos sin cambios quedan como están.
+
+        Args:
+            completa: reescribir todos los segmentos (p. ej. para recomprimir
+                      con otro codec), sellando también el activo
+        Returns:
+            dict con segmentos_antes, segmentos_despues y mutaciones aplicadas,
+            o None si ya había una compactación en curso
+        """
+        if not self._compactando.adquirir(esperar=False):
+            return None
+        try:
+            # 1. Sellar el log de mutaciones, y el segmento activo si tiene ids
+            #    mutados: lo que se escriba desde ahora va a archivos nuevos
+            with self._candado:
+                manifiesto = self._leer_manifiesto()
+                self._limpiar_huerfanos(manifiesto)
+                logs = manifiesto["mutaciones"]
+                cambios = self._mutaciones(logs)
+                inicios = self._inicios(manifiesto["segmentos"])
+                if completa or any(id_registro >= inicios[-2] for id_registro in cambios):
+                    manifiesto["segmentos"].append(self._nuevo_archivo(manifiesto, "seg"))
+                    inicios.append(inicios[-1])
+                manifiesto["mutaciones"] = [self._nuevo_archivo(manifiesto, "mut")]
+                self._escribir_manifiesto(manifiesto)
+                sellados = manifiesto["segmentos"][:-1]
+
+            # 2. Reescribir los tramos sin candado (se conservan todas las posiciones)
+            reemplazos, reescritos = {}, []
+            for tramo in self._tramos(sellados, inicios, cambios, completa):
+                nombres = [sellados[i] for i in tramo]
+                reemplazos[nombres[0]] = self._reescribir(nombres, cambios, inicios[tramo[0]])
+                reescritos.extend(nombres)
+
+            # 3. Publicar el manifiesto nuevo y borrar los archivos reemplazados
+            with self._candado:
+                manifiesto = self._leer_manifiesto()
+                segmentos = []
+                for nombre in manifiesto["segmentos"]:
+                    if nombre in reemplazos:
+                        segmentos.extend(reemplazos[nombre])
+                    elif nombre not in reescritos:
+                        segmentos.append(nombre)
+                manifiesto["segmentos"] = segmentos
+                manifiesto["mutaciones"] = [m for m in manifiesto["mutaciones"] if m not in logs]
+                self._escribir_manifiesto(manifiesto)
+                self._eliminar(reescritos + logs)
+            return {
+                "segmentos_antes": len(sellados),
+                "segmentos_despues": len(sellados) - len(reescritos) + sum(map(len, reemplazos.values())),
+                "mutaciones": len(cambios),
+            }
+        finally:
+            self._compactando.liberar()
+
+    def _tramos(self, sellados: list, inicios: list, cambios: dict, completa: bool) -> list:
+        """Índices de segmentos sellados a reescribir, agrupados en tramos contiguos."""
+        mutados = sorted(cambios)
+        tramos, tramo, con_cambios = [], [], False
+        for i, nombre in enumerate(sellados + [None]):
+            mutado = nombre is not None and (
+                bisect_left(mutados, inicios[i]) < bisect_left(mutados, inicios[i + 1])
+            )
+            if nombre is not None and (completa or mutado or self._chico(nombre)):
+                tramo.append(i)
+                con_cambios = con_cambios or mutado
+                continue
+            # Un segmento chico solo, sin cambios, no gana nada con reescribirse
+            if tramo and (completa or con_cambios or len(tramo) > 1):
+                tramos.append(tramo)
+            tramo, con_cambios = [], False
+        return tramos
+
+    def _reescribir(self, nombres: list, cambios: dict, id_inicial: int) -> list:
+        """Escribe los registros de `nombres` en segmentos nuevos de `TAMANO_SEGMENTO` y retorna sus nombres."""
+        registros = (bytes(datos) for _, datos in self._registros(nombres, cambios, id_inicial))
+        nuevos = []
+        for primero in registros:
+            nuevos.append(self._reservar_nombre(chain([primero], registros)))
+        return nuevos
+
+    def _reservar_nombre(self, registros) -> str:
+        with self._candado:
+            manifiesto = self._leer_manifiesto()
+            nombre = f"seg-{manifiesto['siguiente']:06d}.seg"
+            manifiesto["siguiente"] += 1
+            self._escribir_manifiesto(manifiesto)
+        escribir_registros(self._ruta(nombre), registros, manifiesto["codec"], limite_bytes=TAMANO_SEGMENTO)
+        return nombre
+
+    def _limpiar_huerfanos(self, manifiesto: dict) -> None:
+        """Borra archivos de una compactación interrumpida que no llegaron al manifiesto."""
+        vigentes = set(manifiesto["segmentos"]) | set(manifiesto["mutaciones"])
+        for nombre in os.listdir(self.directorio):
+            base = nombre[:-len(".idx")] if nombre.endswith(".idx") else nombre
+            base = base[:-len(".tmp")] if base.endswith(".tmp") else base
+            if base.endswith(".seg") and base not in vigentes:
+                os.remove(self._ruta(nombre))
@@ -0,0 +1,815 @@
+"""
+Backends de almacenamiento para guardar fuera de la máquina el historial y
+los reportes.
+
+data/ sigue siendo la copia de trabajo (los segmentos, los índices y la caché
+de reportes necesitan archivos locales). El backend que se configure con
+--almacenamiento recibe una copia de cada evaluación guardada
+(historial/00000012.json) y de cada reporte generado (reports/<nombre>):
+
+  - AlmacenamientoLocal: un directorio, p. ej. un disco de red montado
+  - AlmacenamientoSQLite: una base con una fila por objeto
+  - AlmacenamientoS3: cualquier servicio compatible con la API de S3, con
+    firma SigV4, conexiones HTTP reutilizadas, lotes en paralelo y subida
+    multiparte de los objetos grandes
+
+Las escrituras no esperan a la red: `EscrituraDiferida` deja cada objeto en
+data/pendientes_almacenamiento/ (así sobrevive a un corte o a quedarse sin
+conexión) y un hilo los sube por lotes. Si la misma clave se vuelve a escribir
+antes de subirla, solo viaja la última versión.
+"""
+
+import atexit
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import queue
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from contextlib import closing
+from datetime import datetime, timezone
+
+
+DIRECTORIO_PENDIENTES = "data/pendientes_almacenamiento"
+PREFIJO_HISTORIAL = "historial/"
+PREFIJO_REPORTES = "reports/"
+TAMANO_PARTE = 8 * 1024 * 1024      # subida multiparte: S3 exige partes de al menos 5 MiB (salvo la última)
+CONEXIONES = 8                      # conexiones HTTP por backend S3 (y pedidos en paralelo)
+OBJETOS_POR_LOTE = 64               # objetos que se suben o descargan por vez
+ESPERA_MAXIMA_REINTENTO = 30.0      # segundos entre reintentos si el backend no responde
+ESPERA_AL_SALIR = 10.0              # segundos que se espera a subir lo pendiente al terminar
+
+_ESCRITURA = None
+_LOCK = threading.Lock()
+
+
+def clave_evaluacion(id_registro: int) -> str:
+    """Clave del objeto de la evaluación #id_registro."""
+    return f"{PREFIJO_HISTORIAL}{id_registro:08d}.json"
+
+
+def serializar_evaluacion(evaluacion: dict) -> bytes:
+    """Bytes con los que se sube una evaluación (estables, para comparar ETags al sincronizar)."""
+    return json.dumps(evaluacion, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+
+# ─── Interfaz ──────────────────────────────────────────────────────────────────
+class Almacenamiento:
+    """
+    Objetos de bytes identificados por una clave "directorio/nombre".
+
+    Las subclases implementan `escribir`, `leer`, `borrar` y `listar`. Las
+    operaciones por lote recorren los objetos de a uno salvo que el backend
+    sepa hacerlo mejor (una transacción, pedidos en paralelo).
+    """
+
+    def escribir(self, clave: str, datos: bytes) -> None:
+        raise NotImplementedError
+
+    def leer(self, clave: str) -> bytes:
+        """Contenido del objeto, o None si no existe."""
+        raise NotImplementedError
+
+    def borrar(self, clave: str) -> None:
+        """Borra el objeto; no es error que no exista."""
+        raise NotImplementedError
+
+    def listar(self, prefijo: str = "") -> dict:
+        """{clave: etag} de los objetos cuya clave empieza con `prefijo`."""
+        raise NotImplementedError
+
+    def etag(self, datos: bytes) -> str:
+        """ETag que tendría `datos` al escribirlo (para saber si hace falta subirlo)."""
+        return hashlib.md5(datos).hexdigest()
+
+    def escribir_lote(self, objetos: list) -> list:
+        """
+        Escribe [(clave, datos)]; datos=None borra la clave.
+
+        Returns:
+            list: (clave, error) de los objetos que no se pudieron escribir
+        """
+        fallos = []
+        for clave, datos in objetos:
+            try:
+                if datos is None:
+                    self.borrar(clave)
+                else:
+                    self.escribir(clave, datos)
+            except OSError as e:
+                fallos.append((clave, e))
+        return fallos
+
+    def leer_lote(self, claves: list) -> dict:
+        """{clave: datos} de las claves pedidas (None las que no existen)."""
+        return {clave: self.leer(clave) for clave in claves}
+
+    def cerrar(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+# ─── Directorio local ──────────────────────────────────────────────────────────
+class AlmacenamientoLocal(Almacenamiento):
+    """Un archivo por objeto bajo `raiz`; cada escritura es un os.replace atómico."""
+
+    def __init__(self, raiz: str):
+        self.raiz = os.path.abspath(raiz)
+        os.makedirs(self.raiz, exist_ok=True)
+
+    def _ruta(self, clave: str) -> str:
+        ruta = os.path.normpath(os.path.join(self.raiz, clave))
+        if not ruta.startswith(self.raiz + os.sep):
+            raise ValueError(f"clave fuera del almacenamiento: {clave!r}")
+        return ruta
+
+    def escribir(self, clave: str, datos: bytes) -> None:
+        ruta = self._ruta(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+
+    def leer(self, clave: str) -> bytes:
+        try:
+            with open(self._ruta(clave), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def borrar(self, clave: str) -> None:
+        try:
+            os.remove(self._ruta(clave))
+        except FileNotFoundError:
+            pass
+
+    def listar(self, prefijo: str = "") -> dict:
+        objetos = {}
+        for directorio, _, archivos in os.walk(self.raiz):
+            for nombre in archivos:
+                if nombre.endswith(".tmp"):
+                    continue
+                ruta = os.path.join(directorio, nombre)
+                clave = os.path.relpath(ruta, self.raiz).replace(os.sep, "/")
+                if clave.startswith(prefijo):
+                    with open(ruta, "rb") as f:
+                        objetos[clave] = self.etag(f.read())
+        return objetos
+
+
+# ─── SQLite ────────────────────────────────────────────────────────────────────
+_ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS objetos (
+    clave TEXT PRIMARY KEY,
+    datos BLOB NOT NULL,
+    etag TEXT NOT NULL,
+    modificado REAL NOT NULL
+);
+"""
+
+
+class AlmacenamientoSQLite(Almacenamiento):
+    """Una fila por objeto; un lote es una sola transacción."""
+
+    def __init__(self, ruta: str):
+        self.ruta = os.path.abspath(ruta)
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        self._conectar().close()
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        conexion.executescript(_ESQUEMA_SQLITE)
+        return conexion
+
+    def escribir(self, clave: str, datos: bytes) -> None:
+        for _, error in self.escribir_lote([(clave, datos)]):
+            raise error
+
+    def escribir_lote(self, objetos: list) -> list:
+        ahora = time.time()
+        try:
+            with closing(self._conectar()) as conexion:
+                with conexion:
+                    for clave, datos in objetos:
+                        if datos is None:
+                            conexion.execute("DELETE FROM objetos WHERE clave = ?", (clave,))
+                        else:
+                            conexion.execute(
+                                "INSERT INTO objetos (clave, datos, etag, modificado) VALUES (?, ?, ?, ?) "
+                                "ON CONFLICT(clave) DO UPDATE SET datos = excluded.datos, "
+                                "etag = excluded.etag, modificado = excluded.modificado",
+                                (clave, datos, self.etag(datos), ahora),
+                            )
+        except sqlite3.Error as e:
+            return [(clave, OSError(f"SQLite: {e}")) for clave, _ in objetos]
+        return []
+
+    def leer(self, clave: str) -> bytes:
+        return self.leer_lote([clave])[clave]
+
+    def leer_lote(self, claves: list) -> dict:
+        resultado = dict.fromkeys(claves)
+        with closing(self._conectar()) as conexion:
+            for i in range(0, len(claves), 500):
+                parte = claves[i:i + 500]
+                filas = conexion.execute(
+                    f"SELECT clave, datos FROM objetos WHERE clave IN ({','.join('?' * len(parte))})", parte
+                )
+                resultado.update((clave, bytes(datos)) for clave, datos in filas)
+        return resultado
+
+    def borrar(self, clave: str) -> None:
+        for _, error in self.escribir_lote([(clave, None)]):
+            raise error
+
+    def listar(self, prefijo: str = "") -> dict:
+        with closing(self._conectar()) as conexion:
+            filas = conexion.execute(
+                "SELECT clave, etag FROM objetos WHERE substr(clave, 1, ?) = ?", (len(prefijo), prefijo)
+            )
+            return dict(filas)
+
+
+# ─── API de S3 ─────────────────────────────────────────────────────────────────
+def _quitar_espacio(etiqueta: str) -> str:
+    return etiqueta.rsplit("}", 1)[-1]
+
+
+def _textos(xml: bytes, etiqueta: str) -> list:
+    """Textos de los elementos `etiqueta` de una respuesta XML de S3 (sin importar el espacio de nombres)."""
+    return [e.text or "" for e in ET.fromstring(xml).iter() if _quitar_espacio(e.tag) == etiqueta]
+
+
+def consulta_canonica(consulta: dict) -> str:
+    """Parámetros de la URL ordenados y codificados como los firma SigV4."""
+    return "&".join(
+        f"{urllib.parse.quote(k, safe='-_.~')}={urllib.parse.quote(v, safe='-_.~')}"
+        for k, v in sorted(consulta.items())
+    )
+
+
+def firmar_sigv4(metodo: str, host: str, ruta: str, consulta: dict, hash_cuerpo: str,
+                 clave_acceso: str, clave_secreta: str, region: str, instante: datetime = None) -> dict:
+    """
+    Cabeceras de autenticación AWS Signature Version 4 de un pedido a S3.
+
+    Args:
+        ruta: ruta ya codificada ("/bucket/historial/00000001.json")
+        hash_cuerpo: SHA-256 hexadecimal del cuerpo
+        instante: hora de la firma (UTC); por defecto, ahora
+
+    Returns:
+        dict con x-amz-date, x-amz-content-sha256 y Authorization
+    """
+    fecha = (instante or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    dia = fecha[:8]
+    firmadas = {"host": host, "x-amz-content-sha256": hash_cuerpo, "x-amz-date": fecha}
+    nombres = ";".join(sorted(firmadas))
+    canonica = "\n".join([
+        metodo, ruta, consulta_canonica(consulta),
+        "".join(f"{k}:{v}\n" for k, v in sorted(firmadas.items())),
+        nombres, hash_cuerpo,
+    ])
+    alcance = f"{dia}/{region}/s3/aws4_request"
+    a_firmar = "\n".join([
+        "AWS4-HMAC-SHA256", fecha, alcance, hashlib.sha256(canonica.encode("utf-8")).hexdigest(),
+    ])
+    clave = ("AWS4" + clave_secreta).encode("utf-8")
+    for parte in (dia, region, "s3", "aws4_request"):
+        clave = hmac.new(clave, parte.encode("utf-8"), hashlib.sha256).digest()
+    firma = hmac.new(clave, a_firmar.encode("utf-8"), hashlib.sha256).hexdigest()
+    return {
+        "x-amz-date": fecha,
+        "x-amz-content-sha256": hash_cuerpo,
+        "Authorization": (f"AWS4-HMAC-SHA256 Credential={clave_acceso}/{alcance}, "
+                          f"SignedHeaders={nombres}, Signature={firma}"),
+    }
+
+
+def _en_paralelo(funcion, elementos: list, hilos: int) -> list:
+    """
+    [funcion(e) for e in elementos] con hasta `hilos` a la vez. Usa hilos
+    propios y no concurrent.futures, que ya no acepta tareas mientras el
+    intérprete termina (cuando se sube lo pendiente al salir).
+    """
+    resultados = [None] * len(elementos)
+    errores = []
+    indices = iter(range(len(elementos)))
+    lock = threading.Lock()
+
+    def trabajar() -> None:
+        while True:
+            with lock:
+                i = next(indices, None)
+            if i is None:
+                return
+            try:
+                resultados[i] = funcion(elementos[i])
+            except BaseException as e:
+                errores.append(e)
+
+    trabajadores = [threading.Thread(target=trabajar) for _ in range(max(1, min(hilos, len(elementos))))]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    if errores:
+        raise errores[0]
+    return resultados
+
+
+class _PoolConexiones:
+    """
+    Conexiones HTTP/1.1 persistentes a un host, compartidas entre hilos. A lo
+    sumo `maximo` pedidos en vuelo; una conexión libre se reutiliza en lugar
+    de abrir otra (sin repetir el handshake TCP/TLS).
+    """
+
+    def __init__(self, esquema: str, host: str, puerto: int, maximo: int, timeout: float):
+        self._clase = http.client.HTTPSConnection if esquema == "https" else http.client.HTTPConnection
+        self._host, self._puerto, self._timeout = host, puerto, timeout
+        self._libres = queue.LifoQueue()
+        self._cupo = threading.BoundedSemaphore(maximo)
+        self.abiertas = 0
+
+    def _nueva(self) -> http.client.HTTPConnection:
+        self.abiertas += 1
+        return self._clase(self._host, self._puerto, timeout=self._timeout)
+
+    def pedir(self, metodo: str, ruta: str, cuerpo: bytes, cabeceras: dict) -> tuple:
+        """(estado, cabeceras, cuerpo) de la respuesta."""
+        with self._cupo:
+            try:
+                conexion, reutilizada = self._libres.get_nowait(), True
+            except queue.Empty:
+                conexion, reutilizada = self._nueva(), False
+            while True:
+                try:
+                    conexion.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+                    respuesta = conexion.getresponse()
+                    datos = respuesta.read()
+                    break
+                except (http.client.HTTPException, OSError):
+                    conexion.close()
+                    if not reutilizada:
+                        raise
+                    # El servidor pudo cerrar la conexión ociosa: un reintento con una nueva
+                    conexion, reutilizada = self._nueva(), False
+            if respuesta.will_close:
+                conexion.close()
+            else:
+                self._libres.put(conexion)
+            return respuesta.status, {k.lower(): v for k, v in respuesta.getheaders()}, datos
+
+    def cerrar(self) -> None:
+        while True:
+            try:
+                self._libres.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class AlmacenamientoS3(Almacenamiento):
+    """
+    Bucket de un servicio compatible con S3 (direccionamiento por ruta:
+    endpoint/bucket/clave, como MinIO, Ceph o el S3 de AWS).
+
+        backend = AlmacenamientoS3("https://objetos.interno:9000", "evaluador", "prod/")
+        backend.escribir_lote([("reports/a.pdf", datos_a), ("reports/b.pdf", datos_b)])
+
+    Las credenciales, si no se pasan, salen de AWS_ACCESS_KEY_ID y
+    AWS_SECRET_ACCESS_KEY. Los objetos de más de `tamano_parte` bytes se suben
+    por partes en paralelo.
+    """
+
+    def __init__(self, endpoint: str, bucket: str, prefijo: str = "", region: str = "us-east-1",
+                 clave_acceso: str = None, clave_secreta: str = None, conexiones: int = CONEXIONES,
+                 tamano_parte: int = TAMANO_PARTE, timeout: float = 30.0):
+        partes = urllib.parse.urlsplit(endpoint)
+        if partes.scheme not in ("http", "https") or not partes.hostname:
+            raise ValueError(f"endpoint inválido: {endpoint!r}")
+        self.host = partes.netloc
+        self.bucket = bucket
+        self.prefijo = prefijo.strip("/") + "/" if prefijo.strip("/") else ""
+        self.region = region
+        self.clave_acceso = clave_acceso or os.environ.get("AWS_ACCESS_KEY_ID", "")
+        self.clave_secreta = clave_secreta or os.environ.get("AWS_SECRET_ACCESS_KEY", "")
+        self.conexiones = conexiones
+        self.tamano_parte = tamano_parte
+        self.pool = _PoolConexiones(partes.scheme, partes.hostname, partes.port, conexiones, timeout)
+
+    def _pedir(self, metodo: str, clave: str = None, consulta: dict = None, cuerpo: bytes = b"",
+               esperado: tuple = (200,)) -> tuple:
+        ruta = "/" + urllib.parse.quote(self.bucket, safe="")
+        if clave is not None:
+            ruta += "/" + urllib.parse.quote(self.prefijo + clave, safe="/-_.~")
+        consulta = consulta or {}
+        cabeceras = {"Host": self.host}
+        cabeceras.update(firmar_sigv4(
+            metodo, self.host, ruta, consulta, hashlib.sha256(cuerpo).hexdigest(),
+            self.clave_acceso, self.clave_secreta, self.region,
+        ))
+        url = ruta + ("?" + consulta_canonica(consulta) if consulta else "")
+        estado, encabezados, datos = self.pool.pedir(metodo, url, cuerpo, cabeceras)
+        if estado not in esperado:
+            codigo = _textos(datos, "Code") if datos.startswith(b"<") else []
+            raise OSError(f"S3 {metodo} {clave or self.bucket}: HTTP {estado}"
+                          + (f" {codigo[0]}" if codigo else ""))
+        return estado, encabezados, datos
+
+    # ── Objetos ───────────────────────────────────────────────────────────────
+    def escribir(self, clave: str, datos: bytes) -> None:
+        if len(datos) > self.tamano_parte:
+            self._escribir_multiparte(clave, datos)
+        else:
+            self._pedir("PUT", clave, cuerpo=datos)
+
+    def _escribir_multiparte(self, clave: str, datos: bytes) -> None:
+        _, _, respuesta = self._pedir("POST", clave, {"uploads": ""})
+        carga = _textos(respuesta, "UploadId")[0]
+        vista = memoryview(datos)
+        partes = [vista[i:i + self.tamano_parte] for i in range(0, len(datos), self.tamano_parte)]
+
+        def subir(numero: int, parte: memoryview) -> str:
+            _, encabezados, _ = self._pedir(
+                "PUT", clave, {"partNumber": str(numero), "uploadId": carga}, cuerpo=parte
+            )
+            return encabezados["etag"]
+
+        try:
+            etags = _en_paralelo(lambda numerada: subir(*numerada), list(enumerate(partes, 1)), self.conexiones)
+            cuerpo = "<CompleteMultipartUpload>" + "".join(
+                f"<Part><PartNumber>{n}</PartNumber><ETag>{e}</ETag></Part>" for n, e in enumerate(etags, 1)
+            ) + "</CompleteMultipartUpload>"
+            _, _, respuesta = self._pedir("POST", clave, {"uploadId": carga}, cuerpo.encode("utf-8"))
+            # S3 puede responder 200 y fallar igual al armar el objeto
+            if _textos(respuesta, "Code"):
+                raise OSError(f"S3 multiparte {clave}: {_textos(respuesta, 'Code')[0]}")
+        except BaseException:
+            try:
+                self._pedir("DELETE", clave, {"uploadId": carga}, esperado=(200, 204))
+            except OSError:
+                pass
+            raise
+
+    def etag(self, datos: bytes) -> str:
+        if len(datos) <= self.tamano_parte:
+            return hashlib.md5(datos).hexdigest()
+        resumenes = b"".join(
+            hashlib.md5(datos[i:i + self.tamano_parte]).digest() for i in range(0, len(datos), self.tamano_parte)
+        )
+        return f"{hashlib.md5(resumenes).hexdigest()}-{-(-len(datos) // self.tamano_parte)}"
+
+    def leer(self, clave: str) -> bytes:
+        estado, _, datos = self._pedir("GET", clave, esperado=(200, 404))
+        return datos if estado == 200 else None
+
+    def borrar(self, clave: str) -> None:
+        self._pedir("DELETE", clave, esperado=(200, 204))
+
+    def listar(self, prefijo: str = "") -> dict:
+        objetos, token = {}, None
+        while True:
+            consulta = {"list-type": "2", "prefix": self.prefijo + prefijo}
+            if token:
+                consulta["continuation-token"] = token
+            _, _, respuesta = self._pedir("GET", consulta=consulta)
+            raiz = ET.fromstring(respuesta)
+            for contenido in (e for e in raiz if _quitar_espacio(e.tag) == "Contents"):
+                campos = {_quitar_espacio(e.tag): e.text or "" for e in contenido}
+                objetos[campos["Key"][len(self.prefijo):]] = campos.get("ETag", "").strip('"')
+            siguiente = _textos(respuesta, "NextContinuationToken")
+            if not siguiente or _textos(respuesta, "IsTruncated") != ["true"]:
+                return objetos
+            token = siguiente[0]
+
+    # ── Lotes: un pedido por objeto, `conexiones` a la vez ────────────────────
+    def escribir_lote(self, objetos: list) -> list:
+        escribir_uno = super().escribir_lote
+        resultados = _en_paralelo(lambda objeto: escribir_uno([objeto]), objetos, self.conexiones)
+        return [fallo for fallos in resultados for fallo in fallos]
+
+    def leer_lote(self, claves: list) -> dict:
+        return dict(zip(claves, _en_paralelo(self.leer, claves, self.conexiones)))
+
+    def cerrar(self) -> None:
+        self.pool.cerrar()
+
+
+def abrir_almacenamiento(destino: str) -> Almacenamiento:
+    """
+    Backend a partir de un destino de --almacenamiento:
+
+        /ruta/o/local:/ruta              → AlmacenamientoLocal
+        sqlite:/ruta/objetos.db          → AlmacenamientoSQLite
+        s3://bucket/prefijo?endpoint=https://host:9000&region=us-east-1
+                                         → AlmacenamientoS3 (sin endpoint, AWS_ENDPOINT_URL)
+
+    Raises:
+        ValueError: si el destino no es válido
+    """
+    if destino.startswith("s3://"):
+        partes = urllib.parse.urlsplit(destino)
+        if not partes.netloc:
+            raise ValueError(f"falta el bucket en {destino!r}")
+        opciones = dict(urllib.parse.parse_qsl(partes.query))
+        region = opciones.get("region") or os.environ.get("AWS_REGION", "us-east-1")
+        endpoint = (opciones.get("endpoint") or os.environ.get("AWS_ENDPOINT_URL")
+                    or f"https://s3.{region}.amazonaws.com")
+        return AlmacenamientoS3(endpoint, partes.netloc, partes.path, region=region)
+    if destino.startswith("sqlite:"):
+        return AlmacenamientoSQLite(destino[len("sqlite:"):])
+    if destino.startswith("local:"):
+        destino = destino[len("local:"):]
+    if not destino:
+        raise ValueError("destino de almacenamiento vacío")
+    return AlmacenamientoLocal(destino)
+
+
+# ─── Escritura diferida ────────────────────────────────────────────────────────
+class EscrituraDiferida:
+    """
+    Buffer local de escrituras hacia un backend. Cada objeto se escribe primero
+    en `directorio` (un archivo por clave; escribir de nuevo la clave lo
+    reemplaza) y un hilo los sube de a `OBJETOS_POR_LOTE`. Lo que no se pudo
+    subir queda en disco y se reintenta, también en la próxima ejecución.
+
+        diferida = EscrituraDiferida(backend, "data/pendientes_almacenamiento")
+        diferida.escribir("historial/00000012.json", datos)    # no espera a la red
+        diferida.vaciar()
+    """
+
+    def __init__(self, backend: Almacenamiento, directorio: str):
+        os.makedirs(directorio, exist_ok=True)
+        self.backend = backend
+        self.directorio = directorio
+        self.ultimo_error = None
+        self.intentos_fallidos = 0
+        self._lock = threading.Lock()
+        self._hay_pendientes = threading.Event()
+        self._hay_pendientes.set()          # lo que haya quedado de una ejecución anterior
+        self._hilo = threading.Thread(target=self._trabajar, name="almacenamiento", daemon=True)
+        self._hilo.start()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, urllib.parse.quote(clave, safe=""))
+
+    def _encolar(self, clave: str, escribir_contenido) -> None:
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as f:
+            escribir_contenido(f)
+        with self._lock:
+            os.replace(temporal, ruta)
+        self._hay_pendientes.set()
+
+    def escribir(self, clave: str, datos: bytes) -> None:
+        def contenido(f):
+            f.write(b"P")
+            f.write(datos)
+        self._encolar(clave, contenido)
+
+    def escribir_archivo(self, clave: str, ruta: str) -> None:
+        """Como `escribir` con el contenido de un archivo (se copia: el original puede desaparecer)."""
+        def contenido(f):
+            f.write(b"P")
+            with open(ruta, "rb") as origen:
+                shutil.copyfileobj(origen, f)
+        self._encolar(clave, contenido)
+
+    def borrar(self, clave: str) -> None:
+        self._encolar(clave, lambda f: f.write(b"B"))
+
+    def pendientes(self) -> int:
+        """Objetos que todavía no llegaron al backend."""
+        return sum(1 for nombre in os.listdir(self.directorio) if not nombre.endswith(".tmp"))
+
+    def _tomar_lote(self) -> list:
+        """[(clave, datos o None, estado del archivo)] de los pendientes más antiguos."""
+        nombres = []
+        for entrada in os.scandir(self.directorio):
+            if not entrada.name.endswith(".tmp"):
+                nombres.append((entrada.stat().st_mtime_ns, entrada.name))
+        lote = []
+        for _, nombre in sorted(nombres)[:OBJETOS_POR_LOTE]:
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                with open(ruta, "rb") as f:
+                    estado = os.fstat(f.fileno())
+                    contenido = f.read()
+            except FileNotFoundError:
+                continue
+            datos = contenido[1:] if contenido[:1] == b"P" else None
+            lote.append((urllib.parse.unquote(nombre), datos, (estado.st_ino, estado.st_mtime_ns)))
+        return lote
+
+    def _subir(self, lote: list) -> list:
+        fallos = self.backend.escribir_lote([(clave, datos) for clave, datos, _ in lote])
+        fallidas = {clave for clave, _ in fallos}
+        with self._lock:
+            for clave, _, firma in lote:
+                if clave in fallidas:
+                    continue
+                ruta = self._ruta(clave)
+                try:
+                    estado = os.stat(ruta)
+                except FileNotFoundError:
+                    continue
+                # Si se volvió a escribir mientras subía, queda la versión nueva para el próximo lote
+                if (estado.st_ino, estado.st_mtime_ns) == firma:
+                    os.remove(ruta)
+        return fallos
+
+    def _trabajar(self) -> None:
+        espera = 0.5
+        while True:
+            self._hay_pendientes.wait()
+            self._hay_pendientes.clear()
+            while True:
+                try:
+                    lote = self._tomar_lote()
+                    fallos = self._subir(lote) if lote else []
+                except Exception as e:        # el hilo no debe morir: lo pendiente sigue en disco
+                    fallos = [("", e)]
+                if fallos:
+                    self.ultimo_error = fallos[0][1]
+                    self.intentos_fallidos += 1
+                    time.sleep(espera)
+                    espera = min(espera * 2, ESPERA_MAXIMA_REINTENTO)
+                    continue
+                espera = 0.5
+                if not lote:
+                    break
+
+    def vaciar(self, timeout: float = None, intentos: int = None) -> int:
+        """
+        Espera a que se suba todo lo pendiente.
+
+        Args:
+            timeout: segundos como máximo (None: sin límite)
+            intentos: dejar de esperar tras esta cantidad de subidas fallidas
+
+        Returns:
+            int: objetos que siguen pendientes (0 si se subió todo)
+        """
+        fin = None if timeout is None else time.monotonic() + timeout
+        fallidos = self.intentos_fallidos
+        self._hay_pendientes.set()
+        while self.pendientes():
+            if fin is not None and time.monotonic() >= fin:
+                break
+            if intentos is not None and self.intentos_fallidos - fallidos >= intentos:
+                break
+            time.sleep(0.02)
+        return self.pendientes()
+
+
+# ─── Almacenamiento del proceso ────────────────────────────────────────────────
+def configurar_almacenamiento(destino: str, base_dir: str) -> EscrituraDiferida:
+    """
+    Replica en `destino` (ver `abrir_almacenamiento`) las evaluaciones y los
+    reportes que se guarden desde ahora en este proceso. Al salir se espera
+    hasta ESPERA_AL_SALIR segundos a que termine de subirse lo pendiente (menos
+    si un intento falla: lo que quede se sube en la próxima ejecución).
+
+    Raises:
+        ValueError: si el destino no es válido
+    """
+    global _ESCRITURA
+    escritura = EscrituraDiferida(abrir_almacenamiento(destino), os.path.join(base_dir, DIRECTORIO_PENDIENTES))
+    with _LOCK:
+        if _ESCRITURA is None:
+            atexit.register(_vaciar_al_salir)
+        _ESCRITURA = escritura
+    return escritura
+
+
+def almacenamiento_configurado() -> EscrituraDiferida:
+    """La escritura diferida del proceso, o None si no se configuró un almacenamiento."""
+    return _ESCRITURA
+
+
+def _vaciar_al_salir() -> None:
+    pendientes = _ESCRITURA.vaciar(ESPERA_AL_SALIR, intentos=1)
+    if pendientes:
+        print(f"⚠️  {pendientes} objeto(s) quedan en {_ESCRITURA.directorio} y se subirán en la próxima "
+              f"ejecución con --almacenamiento ({_ESCRITURA.ultimo_error})", file=sys.stderr)
+    _ESCRITURA.backend.cerrar()
+
+
+def replicar_evaluaciones(registros: list) -> None:
+    """Encola [(id, evaluación)] recién guardadas o editadas, si hay un almacenamiento configurado."""
+    if _ESCRITURA is not None:
+        for id_registro, evaluacion in registros:
+            _ESCRITURA.escribir(clave_evaluacion(id_registro), serializar_evaluacion(evaluacion))
+
+
+def replicar_borrado(id_registro: int) -> None:
+    if _ESCRITURA is not None:
+        _ESCRITURA.borrar(clave_evaluacion(id_registro))
+
+
+def replicar_reporte(ruta: str) -> None:
+    """Encola un reporte recién generado (reports/<nombre del archivo>)."""
+    if _ESCRITURA is not None:
+        _ESCRITURA.escribir_archivo(PREFIJO_REPORTES + os.path.basename(ruta), ruta)
+
+
+# ─── Sincronización completa ───────────────────────────────────────────────────
+def sincronizar(base_dir: str, directorio_reportes: str, backend: Almacenamiento) -> dict:
+    """
+    Deja en el backend una copia del historial local y de los reportes de la
+    caché: sube lo que falta o cambió (comparando ETags, sin descargar nada),
+    borra del backend las evaluaciones que ya no están en el historial y
+    conserva los reportes remotos aunque la caché local los haya desalojado.
+
+    Returns:
+        dict con subidos, borrados, sin_cambios, fallos y segundos
+    """
+    from .cache_reportes import es_artefacto
+    from .persistencia import iterar_historial
+
+    inicio = time.perf_counter()
+    resumen = {"subidos": 0, "borrados": 0, "sin_cambios": 0, "fallos": []}
+    lote = []
+
+    def agregar(clave: str, datos: bytes) -> None:
+        lote.append((clave, datos))
+        if len(lote) >= OBJETOS_POR_LOTE:
+            enviar()
+
+    def enviar() -> None:
+        fallos = backend.escribir_lote(lote)
+        fallidas = {clave for clave, _ in fallos}
+        for clave, datos in lote:
+            if clave not in fallidas:
+                resumen["borrados" if datos is None else "subidos"] += 1
+        resumen["fallos"] += fallos
+        del lote[:]
+
+    remotos = backend.listar(PREFIJO_HISTORIAL)
+    locales = set()
+    for id_registro, evaluacion in iterar_historial(base_dir):
+        clave, datos = clave_evaluacion(id_registro), serializar_evaluacion(evaluacion)
+        locales.add(clave)
+        if remotos.get(clave) == backend.etag(datos):
+            resumen["sin_cambios"] += 1
+        else:
+            agregar(clave, datos)
+    for clave in sorted(set(remotos) - locales):
+        agregar(clave, None)
+
+    if os.path.isdir(directorio_reportes):
+        remotos = backend.listar(PREFIJO_REPORTES)
+        for nombre in sorted(filter(es_artefacto, os.listdir(directorio_reportes))):
+            with open(os.path.join(directorio_reportes, nombre), "rb") as f:
+                datos = f.read()
+            clave = PREFIJO_REPORTES + nombre
+            if remotos.get(clave) == backend.etag(datos):
+                resumen["sin_cambios"] += 1
+            else:
+                agregar(clave, datos)
+    if lote:
+        enviar()
+    resumen["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resumen
+
+
+def restaurar_historial(base_dir: str, backend: Almacenamiento) -> dict:
+    """
+    Descarga el historial del backend a un historial local vacío (una máquina
+    nueva) y reconstruye el CSV y los índices. Si en el backend hay huecos
+    (evaluaciones borradas), los ids se renumeran como en --migrar json.
+
+    Returns:
+        dict con registros y renumerados (True si los ids cambiaron)
+
+    Raises:
+        ValueError: si el historial local no está vacío
+    """
+    from .persistencia import guardar_evaluaciones, iterar_historial
+
+    if next(iterar_historial(base_dir), None) is not None:
+        raise ValueError("el historial local no está vacío; restaurar solo llena un historial nuevo")
+    claves = sorted(backend.listar(PREFIJO_HISTORIAL))
+    evaluaciones = []
+    for i in range(0, len(claves), OBJETOS_POR_LOTE):
+        lote = claves[i:i + OBJETOS_POR_LOTE]
+        datos = backend.leer_lote(lote)
+        evaluaciones += [json.loads(datos[clave]) for clave in lote if datos[clave] is not None]
+    ids = guardar_evaluaciones(evaluaciones, base_dir)
+    originales = [int(clave[len(PREFIJO_HISTORIAL):].split(".")[0]) for clave in claves]
+    return {"registros": len(evaluaciones), "renumerados": ids != originales}
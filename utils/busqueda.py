@@ -0,0 +1,245 @@
+"""
+Búsqueda de texto completo sobre el historial con un índice invertido en disco.
+
+El índice es una base SQLite en data/ con una tabla de postings
+(token, id, frecuencia, longitud del documento) y un resumen por documento,
+de modo que una consulta solo lee las listas de los términos buscados: no
+recorre ni parsea el JSON del historial. Se actualiza incrementalmente en cada `guardar_evaluacion`.
+
+Campos indexados: nombre de la iniciativa, descripción, equipo, alertas y
+textos de las respuestas elegidas. La tokenización ignora tildes y mayúsculas
+(ver utils.texto) y el ranking es BM25.
+"""
+
+import heapq
+import math
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+from .texto import tokenizar
+
+
+ARCHIVO_INDICE_BUSQUEDA = "data/indice_busqueda.sqlite3"
+
+# Parámetros BM25 y peso de cada campo (el término cuenta tantas veces como su peso)
+BM25_K1 = 1.2
+BM25_B = 0.75
+PESOS_CAMPOS = {
+    "nombre": 3,
+    "equipo": 2,
+    "descripcion": 1,
+    "alertas": 1,
+    "respuestas": 1,
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY,
+    longitud INTEGER NOT NULL,
+    nombre TEXT, equipo TEXT, fecha TEXT,
+    puntaje REAL, nivel TEXT, emoji TEXT
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    longitud INTEGER NOT NULL,
+    PRIMARY KEY (token, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS estadisticas (
+    clave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+"""
+
+_LOCK = threading.Lock()
+
+
+def _campos(evaluacion: dict) -> dict:
+    meta = evaluacion.get("meta", {})
+    resultados = evaluacion.get("resultados", {})
+    return {
+        "nombre": meta.get("nombre_iniciativa", ""),
+        "equipo": meta.get("equipo", ""),
+        "descripcion": meta.get("descripcion", ""),
+        "alertas": " ".join(evaluacion.get("veredicto", {}).get("alertas", [])),
+        "respuestas": " ".join(
+            p.get("texto_respuesta", "")
+            for c in resultados.get("categorias", []) for p in c.get("preguntas", [])
+        ),
+    }
+
+
+def _frecuencias(evaluacion: dict) -> dict:
+    frecuencias = {}
+    for campo, texto in _campos(evaluacion).items():
+        peso = PESOS_CAMPOS[campo]
+        for token in tokenizar(texto):
+            frecuencias[token] = frecuencias.get(token, 0) + peso
+    return frecuencias
+
+
+def _insertar(conexion: sqlite3.Connection, evaluacion: dict, id_registro: int) -> None:
+    meta = evaluacion.get("meta", {})
+    veredicto = evaluacion.get("veredicto", {})
+    frecuencias = _frecuencias(evaluacion)
+    longitud = sum(frecuencias.values())
+
+    anterior = conexion.execute("SELECT longitud FROM documentos WHERE id = ?", (id_registro,)).fetchone()
+    if anterior is not None:
+        # Se vuelve a indexar un id: el documento anterior sale de las
+        # estadísticas y de los postings (sus tokens que ya no están quedarían)
+        conexion.execute("DELETE FROM postings WHERE id = ?", (id_registro,))
+        conexion.executemany(
+            "UPDATE estadisticas SET valor = valor - ? WHERE clave = ?",
+            ((1, "documentos"), (anterior[0], "longitud_total")),
+        )
+
+    conexion.execute(
+        "INSERT OR REPLACE INTO documentos VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            id_registro, longitud,
+            meta.get("nombre_iniciativa", "—"), meta.get("equipo", "—"), meta.get("fecha", ""),
+            evaluacion.get("resultados", {}).get("puntaje_global", 0),
+            veredicto.get("nivel", "—"), veredicto.get("emoji", ""),
+        ),
+    )
+    conexion.executemany(
+        "INSERT INTO postings VALUES (?, ?, ?, ?)",
+        ((token, id_registro, tf, longitud) for token, tf in frecuencias.items()),
+    )
+    conexion.execute(
+        "INSERT INTO estadisticas VALUES ('documentos', 1), ('longitud_total', ?) "
+        "ON CONFLICT(clave) DO UPDATE SET valor = valor + excluded.valor",
+        (longitud,),
+    )
+
+
+def _conectar(ruta: str) -> sqlite3.Connection:
+    conexion = sqlite3.connect(ruta, timeout=30)
+    conexion.executescript(_ESQUEMA)
+    return conexion
+
+
+def _reconstruir(base_dir: str, ruta: str) -> None:
+    from .persistencia import iterar_historial
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    if os.path.exists(temporal):
+        os.remove(temporal)
+    with closing(_conectar(temporal)) as conexion:
+        with conexion:
+            for i, ev in iterar_historial(base_dir):
+                _insertar(conexion, ev, i)
+    os.replace(temporal, ruta)
+
+
+def _abrir(base_dir: str) -> sqlite3.Connection:
+    ruta = os.path.join(base_dir, ARCHIVO_INDICE_BUSQUEDA)
+    with _LOCK:
+        if not os.path.exists(ruta):
+            _reconstruir(base_dir, ruta)
+    return _conectar(ruta)
+
+
+def preparar_indice_busqueda(base_dir: str) -> None:
+    """Construye el índice desde el historial si todavía no existe."""
+    _abrir(base_dir).close()
+
+
+def indexar_busqueda_lote(registros: list, base_dir: str) -> None:
+    """Agrega [(id, evaluación)] recién guardadas al índice existente, en una transacción."""
+    ruta = os.path.join(base_dir, ARCHIVO_INDICE_BUSQUEDA)
+    with closing(_conectar(ruta)) as conexion:
+        with conexion:
+            for id_registro, evaluacion in registros:
+                _insertar(conexion, evaluacion, id_registro)
+
+
+def buscar(consulta: str, base_dir: str, limite: int = 20) -> list:
+    """
+    Busca en el historial y retorna los mejores resultados por BM25.
+
+    Returns:
+        list de dicts con id, nombre_iniciativa, equipo, fecha, puntaje_global,
+        nivel, emoji y puntuacion (mayor es más relevante)
+    """
+    terminos = set(tokenizar(consulta))
+    if not terminos:
+        return []
+
+    with closing(_abrir(base_dir)) as conexion:
+        estadisticas = dict(conexion.execute("SELECT clave, valor FROM estadisticas"))
+        n_documentos = estadisticas.get("documentos", 0)
+        if not n_documentos:
+            return []
+        longitud_media = estadisticas.get("longitud_total", 0) / n_documentos
+        k1_mas_1 = BM25_K1 + 1
+        base = BM25_K1 * (1 - BM25_B)
+        pendiente = BM25_K1 * BM25_B / longitud_media
+
+        puntuaciones = {}
+        for termino in terminos:
+            postings = conexion.execute(
+                "SELECT id, tf, longitud FROM postings WHERE token = ?", (termino,)
+            ).fetchall()
+            df = len(postings)
+            if not df:
+                continue
+            idf = math.log(1 + (n_documentos - df + 0.5) / (df + 0.5))
+            for id_reg, tf, longitud in postings:
+                puntuaciones[id_reg] = (
+                    puntuaciones.get(id_reg, 0.0)
+                    + idf * tf * k1_mas_1 / (tf + base + pendiente * longitud)
+                )
+        if not puntuaciones:
+            return []
+
+        mejores = heapq.nlargest(limite, puntuaciones.items(), key=lambda x: (x[1], -x[0]))
+        marcas = ",".join("?" * len(mejores))
+        filas = {
+            fila[0]: fila for fila in conexion.execute(
+                "SELECT id, nombre, equipo, fecha, puntaje, nivel, emoji "
+                f"FROM documentos WHERE id IN ({marcas})", [i for i, _ in mejores]
+            )
+        }
+
+    return [
+        {
+            "id": id_reg,
+            "nombre_iniciativa": filas[id_reg][1],
+            "equipo": filas[id_reg][2],
+            "fecha": filas[id_reg][3],
+            "puntaje_global": filas[id_reg][4],
+            "nivel": filas[id_reg][5],
+            "emoji": filas[id_reg][6],
+            "puntuacion": round(puntuacion, 3),
+        }
+        for id_reg, puntuacion in mejores
+    ]
+
+
+def mostrar_busqueda(consulta: str, base_dir: str, limite: int = 20) -> None:
+    """Muestra en consola los resultados de una búsqueda en el historial."""
+    resultados = buscar(consulta, base_dir, limite)
+
+    if not resultados:
+        print(f"\n  No se encontraron evaluaciones para \"{consulta}\".\n")
+        return
+
+    print(f"\n  {'─'*70}")
+    print(f"  🔎 RESULTADOS PARA \"{consulta}\" ({len(resultados)})")
+    print(f"  {'─'*70}")
+    print(f"  {'#':<4} {'Iniciativa':<28} {'Equipo':<18} {'Puntaje':>8}  {'Veredicto'}")
+    print(f"  {'─'*70}")
+
+    for r in resultados:
+        nombre = r["nombre_iniciativa"][:26]
+        equipo = r["equipo"][:16]
+        nivel = r["nivel"][:30]
+        print(f"  {r['id']:<4} {nombre:<28} {equipo:<18} {r['puntaje_global']:>6.1f}%  {r['emoji']} {nivel}")
+
+    print(f"  {'─'*70}\n")
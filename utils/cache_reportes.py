@@ -0,0 +1,202 @@
+"""
+Caché de reportes direccionada por contenido.
+
+Cada artefacto (Markdown, HTML, PDF) se nombra con un hash de la evaluación,
+las iniciativas similares y los percentiles incluidos, la versión del
+cuestionario y la versión de la plantilla. Si el archivo ya existe se reutiliza sin volver a
+renderizarlo; si algo de eso cambia, el hash cambia y se genera uno nuevo.
+
+Un manifiesto en el directorio de reportes lleva el tamaño y el último uso de
+cada artefacto; cuando el total supera `TAMANO_MAXIMO` se borran los menos
+usados recientemente (LRU). Solo se tocan archivos creados por la caché. El
+manifiesto vive en memoria y se persiste por lotes, así una exportación masiva
+no reescribe el JSON por cada reporte.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from core.metricas import CACHE_REPORTES, REGISTRO
+from core.preguntas import VERSION_CUESTIONARIO
+from .almacenamiento import replicar_reporte
+
+
+ARCHIVO_MANIFIESTO = ".cache_reportes.json"
+TAMANO_MAXIMO = 64 * 1024 * 1024     # bytes de artefactos en caché por directorio
+CAMBIOS_POR_ESCRITURA = 256          # el manifiesto se persiste por lotes
+
+_PATRON_ARTEFACTO = re.compile(r"^reporte_.*_[0-9a-f]{12}\.(md|html|pdf)$")
+
+_LOCK = threading.Lock()
+_MANIFIESTOS = {}       # directorio → {"archivos": {...}, "total": bytes, "pendientes": n}
+
+
+def clave_reporte(evaluacion: dict, similares: list = None, version_plantilla: int = 1,
+                  percentiles: dict = None) -> str:
+    """
+    Hash estable del contenido que determina un reporte.
+
+    Returns:
+        str: 20 caracteres hexadecimales (sha256 truncado)
+    """
+    partes = [VERSION_CUESTIONARIO, version_plantilla, evaluacion, similares or []]
+    if percentiles:
+        # Sin percentiles la clave es la de siempre: los artefactos ya generados siguen valiendo
+        partes.append(percentiles)
+    contenido = json.dumps(
+        partes, sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()[:20]
+
+
+def es_artefacto(nombre: str) -> bool:
+    """True si `nombre` es un reporte generado por la caché (no otro archivo del directorio)."""
+    return _PATRON_ARTEFACTO.match(nombre) is not None
+
+
+def nombre_artefacto(evaluacion: dict, clave: str, extension: str) -> str:
+    nombre_seguro = evaluacion["meta"]["nombre_iniciativa"].replace(" ", "_")[:30]
+    for caracter in '/\\:*?"<>|':
+        nombre_seguro = nombre_seguro.replace(caracter, "_")
+    return f"reporte_{nombre_seguro}_{clave[:12]}.{extension}"
+
+
+# ─── Manifiesto ────────────────────────────────────────────────────────────────
+def _manifiesto(directorio: str) -> dict:
+    """
+    Manifiesto en memoria del directorio (se lee una vez por proceso).
+
+    Los artefactos con nombre de caché que no figuran en el manifiesto (por
+    ejemplo, si el proceso terminó antes de persistirlo) se adoptan con su
+    fecha de modificación como último uso, para que sigan contando en el tope.
+    """
+    manifiesto = _MANIFIESTOS.get(directorio)
+    if manifiesto is not None:
+        return manifiesto
+    try:
+        with open(os.path.join(directorio, ARCHIVO_MANIFIESTO), encoding="utf-8") as f:
+            archivos = json.load(f)["archivos"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        archivos = {}
+    presentes = set()
+    for entrada in os.scandir(directorio):
+        if _PATRON_ARTEFACTO.match(entrada.name):
+            presentes.add(entrada.name)
+            if entrada.name not in archivos:
+                estado = entrada.stat()
+                archivos[entrada.name] = {"bytes": estado.st_size, "usado": estado.st_mtime}
+    for nombre in [n for n in archivos if n not in presentes]:
+        del archivos[nombre]
+    total = sum(entrada["bytes"] for entrada in archivos.values())
+    manifiesto = _MANIFIESTOS[directorio] = {"archivos": archivos, "total": total, "pendientes": 0}
+    return manifiesto
+
+
+def _escribir_manifiesto(directorio: str, manifiesto: dict) -> None:
+    ruta = os.path.join(directorio, ARCHIVO_MANIFIESTO)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"archivos": manifiesto["archivos"]}, f)
+    os.replace(temporal, ruta)
+    manifiesto["pendientes"] = 0
+
+
+def _registrar_cambio(directorio: str, manifiesto: dict) -> None:
+    manifiesto["pendientes"] += 1
+    if manifiesto["pendientes"] >= CAMBIOS_POR_ESCRITURA:
+        _escribir_manifiesto(directorio, manifiesto)
+
+
+def sincronizar_cache() -> None:
+    """Persiste los manifiestos con cambios pendientes (se llama también al salir)."""
+    with _LOCK:
+        for directorio, manifiesto in _MANIFIESTOS.items():
+            if manifiesto["pendientes"] and os.path.isdir(directorio):
+                _escribir_manifiesto(directorio, manifiesto)
+
+
+atexit.register(sincronizar_cache)
+
+
+def _desalojar(directorio: str, manifiesto: dict, tamano_maximo: int, conservar: str) -> None:
+    """
+    Borra artefactos por último uso hasta bajar al 90% del tope (el margen
+    evita ordenar el manifiesto en cada reporte nuevo una vez lleno).
+    """
+    if manifiesto["total"] <= tamano_maximo:
+        return
+    archivos = manifiesto["archivos"]
+    objetivo = tamano_maximo * 0.9
+    for nombre, entrada in sorted(archivos.items(), key=lambda item: item[1]["usado"]):
+        if manifiesto["total"] <= objetivo:
+            break
+        if nombre == conservar:
+            continue
+        try:
+            os.remove(os.path.join(directorio, nombre))
+        except FileNotFoundError:
+            pass
+        manifiesto["total"] -= entrada["bytes"]
+        del archivos[nombre]
+
+
+# ─── Consulta ──────────────────────────────────────────────────────────────────
+def obtener_reporte(evaluacion: dict, directorio_reportes: str, extension: str, generar,
+                    similares: list = None, version_plantilla: int = 1,
+                    tamano_maximo: int = TAMANO_MAXIMO, percentiles: dict = None) -> tuple:
+    """
+    Retorna el artefacto en caché o lo genera.
+
+    Args:
+        extension: "md", "html" o "pdf"
+        generar: función que recibe una ruta y escribe el artefacto en ella
+        tamano_maximo: tope en bytes de los artefactos de este directorio
+        percentiles: los que muestra el reporte (ver utils.cuantiles)
+
+    Returns:
+        tuple: (ruta del archivo, True si se reutilizó uno existente)
+    """
+    os.makedirs(directorio_reportes, exist_ok=True)
+    clave = clave_reporte(evaluacion, similares, version_plantilla, percentiles)
+    nombre = nombre_artefacto(evaluacion, clave, extension)
+    ruta = os.path.join(directorio_reportes, nombre)
+
+    with _LOCK:
+        manifiesto = _manifiesto(directorio_reportes)
+        entrada = manifiesto["archivos"].get(nombre)
+        if entrada is not None and os.path.exists(ruta):
+            entrada["usado"] = time.time()
+            _registrar_cambio(directorio_reportes, manifiesto)
+            if REGISTRO.activo:
+                CACHE_REPORTES.con("acierto").inc()
+            return ruta, True
+
+    # El renderizado va fuera del lock; dos hilos con la misma clave escriben
+    # el mismo contenido y el último os.replace gana.
+    temporal = f"{ruta}.{threading.get_ident()}.tmp"
+    try:
+        generar(temporal)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    replicar_reporte(ruta)
+
+    with _LOCK:
+        manifiesto = _manifiesto(directorio_reportes)
+        anterior = manifiesto["archivos"].get(nombre)
+        if anterior is not None:
+            manifiesto["total"] -= anterior["bytes"]
+        tamano = os.path.getsize(ruta)
+        manifiesto["archivos"][nombre] = {"bytes": tamano, "usado": time.time()}
+        manifiesto["total"] += tamano
+        _desalojar(directorio_reportes, manifiesto, tamano_maximo, nombre)
+        _registrar_cambio(directorio_reportes, manifiesto)
+    if REGISTRO.activo:
+        CACHE_REPORTES.con("fallo").inc()
+    return ruta, False
@@ -0,0 +1,325 @@
+"""
+Registro de cambios del historial (change data capture) para consumidores externos.
+
+Cada evaluación guardada, editada o borrada agrega un cambio con un número de
+secuencia que solo crece, en data/cambios/:
+
+    cambios.jsonl   un cambio por línea: {"seq": 41, "op": "alta", "id": 12, "instante": "...",
+                    "fila": {fecha, responsable, equipo, iniciativa, puntaje_global, ...}}
+    cambios.idx     posición de cada línea en el log (8 bytes por cambio)
+
+`op` es "alta", "edicion" o "baja" (las bajas no llevan fila); la fila tiene las
+columnas de resumen_evaluaciones.csv. Un consumidor guarda el último `seq` que
+procesó y pide los siguientes: con el índice, leer desde un cursor cuesta lo
+que se lee y no lo que mide el historial. Al crearse por primera vez, el log
+arranca con un alta por cada evaluación que ya estaba en el historial.
+
+El log es solo de agregado y se sincroniza a disco (fsync) en cada escritura.
+Si un corte deja una línea a medias, se descarta al volver a escribir y el
+índice se completa con las líneas que le falten. Las escrituras toman el
+candado del historial entre procesos (utils.candado).
+
+Anonimizar una evaluación borra el responsable también de sus cambios
+anteriores: cada línea afectada se reescribe con el mismo largo (rellena con
+espacios antes del salto de línea), así las posiciones del índice valen para
+el log anterior y el nuevo y el cambio es un solo `os.replace` del log. Los
+lectores verifican además que el `seq` de cada línea sea el de su posición en
+el índice.
+"""
+
+import json
+import os
+import shutil
+import struct
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .candado import ARCHIVO_CANDADO, candado
+
+
+DIRECTORIO_CAMBIOS = "data/cambios"
+ARCHIVO_LOG = "cambios.jsonl"
+ARCHIVO_POSICIONES = "cambios.idx"
+LIMITE_LOTE = 500               # cambios por lectura
+INTERVALO_SONDEO = 0.2          # segundos entre revisiones al esperar cambios nuevos
+ESPERA_MAXIMA = 60.0            # tope de la espera de un pedido HTTP (long-poll)
+REINTENTOS_LECTURA = 3          # relecturas si el log no coincide con el índice
+
+_POSICION = struct.Struct("<Q")
+
+_LOCK = threading.Lock()
+_REPARADOS = set()      # logs ya revisados tras un posible corte en este proceso
+
+
+def _candado(base_dir: str):
+    """El candado del historial: los cambios se registran junto con cada escritura del historial."""
+    return candado(os.path.join(base_dir, "data", ARCHIVO_CANDADO))
+
+
+def _rutas(base_dir: str) -> tuple:
+    directorio = os.path.join(base_dir, DIRECTORIO_CAMBIOS)
+    return os.path.join(directorio, ARCHIVO_LOG), os.path.join(directorio, ARCHIVO_POSICIONES)
+
+
+def _linea(seq: int, operacion: str, id_registro: int, fila: dict, instante: str) -> bytes:
+    cambio = {"seq": seq, "op": operacion, "id": id_registro, "instante": instante}
+    if fila is not None:
+        cambio["fila"] = fila
+    return (json.dumps(cambio, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _escribir_log(directorio: str, lineas) -> None:
+    """Escribe un log nuevo y su índice en `directorio`."""
+    posiciones, posicion = [], 0
+    with open(os.path.join(directorio, ARCHIVO_LOG), "wb") as f:
+        for linea in lineas:
+            posiciones.append(_POSICION.pack(posicion))
+            f.write(linea)
+            posicion += len(linea)
+        f.flush()
+        os.fsync(f.fileno())
+    with open(os.path.join(directorio, ARCHIVO_POSICIONES), "wb") as f:
+        f.write(b"".join(posiciones))
+
+
+# ─── Escritura ─────────────────────────────────────────────────────────────────
+def _crear(base_dir: str) -> None:
+    """Crea el log con un alta por cada evaluación que ya está en el historial."""
+    from .persistencia import fila_resumen, iterar_historial
+
+    directorio = os.path.join(base_dir, DIRECTORIO_CAMBIOS)
+    temporal = f"{directorio}.tmp"
+    if os.path.exists(temporal):
+        shutil.rmtree(temporal)
+    os.makedirs(temporal)
+    instante = datetime.now().isoformat()
+    _escribir_log(temporal, (
+        _linea(seq, "alta", id_registro, fila_resumen(evaluacion), instante)
+        for seq, (id_registro, evaluacion) in enumerate(iterar_historial(base_dir), 1)
+    ))
+    os.replace(temporal, directorio)
+
+
+def _reparar(ruta_log: str, ruta_indice: str) -> None:
+    """Descarta una línea a medio escribir e indexa las líneas que el índice no tenga."""
+    tamano_log = os.path.getsize(ruta_log)
+    with open(ruta_indice, "r+b") as indice, open(ruta_log, "r+b") as log:
+        n = os.path.getsize(ruta_indice) // _POSICION.size
+        fin = 0
+        while n:
+            indice.seek((n - 1) * _POSICION.size)
+            posicion = _POSICION.unpack(indice.read(_POSICION.size))[0]
+            log.seek(posicion)
+            linea = log.readline()
+            if linea.endswith(b"\n"):
+                fin = posicion + len(linea)
+                break
+            n -= 1
+        indice.truncate(n * _POSICION.size)
+        log.seek(fin)
+        indice.seek(n * _POSICION.size)
+        for linea in iter(log.readline, b""):
+            if not linea.endswith(b"\n"):
+                break
+            indice.write(_POSICION.pack(fin))
+            fin += len(linea)
+        if fin < tamano_log:
+            log.truncate(fin)
+
+
+def _reparar_una_vez(ruta_log: str, ruta_indice: str) -> None:
+    if ruta_log not in _REPARADOS:
+        _reparar(ruta_log, ruta_indice)
+        _REPARADOS.add(ruta_log)
+
+
+def registrar_cambios(base_dir: str, cambios: list) -> None:
+    """
+    Agrega al log [(operación, id, fila o None)] con secuencias consecutivas,
+    en una escritura.
+
+    La primera vez crea el log desde el historial, que ya refleja estos
+    cambios, así que no se agregan aparte.
+    """
+    ruta_log, ruta_indice = _rutas(base_dir)
+    with _candado(base_dir), _LOCK:
+        if not os.path.exists(ruta_indice):
+            _crear(base_dir)
+            return
+        _reparar_una_vez(ruta_log, ruta_indice)
+        seq = os.path.getsize(ruta_indice) // _POSICION.size
+        posicion = os.path.getsize(ruta_log)
+        instante = datetime.now().isoformat()
+        lineas, posiciones = [], []
+        for operacion, id_registro, fila in cambios:
+            seq += 1
+            lineas.append(_linea(seq, operacion, id_registro, fila, instante))
+            posiciones.append(_POSICION.pack(posicion))
+            posicion += len(lineas[-1])
+        # Primero el log (a disco) y después el índice: un lector solo ve cambios completos
+        with open(ruta_log, "ab") as f:
+            f.write(b"".join(lineas))
+            f.flush()
+            os.fsync(f.fileno())
+        with open(ruta_indice, "ab") as f:
+            f.write(b"".join(posiciones))
+
+
+def preparar_cambios(base_dir: str) -> None:
+    """Crea el log desde el historial si todavía no existe."""
+    with _candado(base_dir), _LOCK:
+        if not os.path.exists(_rutas(base_dir)[1]):
+            _crear(base_dir)
+
+
+def anonimizar_cambios(base_dir: str, id_registro: int) -> None:
+    """
+    Quita el responsable de los cambios ya registrados de la evaluación
+    #id_registro, sin mover ninguna línea del log (el índice no cambia).
+    """
+    ruta_log, ruta_indice = _rutas(base_dir)
+    with _candado(base_dir), _LOCK:
+        if not os.path.exists(ruta_indice):
+            return
+        _reparar_una_vez(ruta_log, ruta_indice)
+        temporal = f"{ruta_log}.tmp"
+        with open(ruta_log, "rb") as origen, open(temporal, "wb") as destino:
+            for linea in origen:
+                cambio = json.loads(linea)
+                if cambio["id"] == id_registro and cambio.get("fila", {}).get("responsable"):
+                    cambio["fila"]["responsable"] = ""
+                    nueva = json.dumps(cambio, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                    linea = nueva + b" " * (len(linea) - len(nueva) - 1) + b"\n"
+                destino.write(linea)
+            destino.flush()
+            os.fsync(destino.fileno())
+        os.replace(temporal, ruta_log)
+
+
+# ─── Lectura ───────────────────────────────────────────────────────────────────
+def ultimo_cambio(base_dir: str) -> int:
+    """Secuencia del último cambio registrado (0 si no hay ninguno)."""
+    try:
+        return os.path.getsize(_rutas(base_dir)[1]) // _POSICION.size
+    except FileNotFoundError:
+        return 0
+
+
+def leer_cambios(base_dir: str, desde: int = 0, limite: int = LIMITE_LOTE) -> list:
+    """
+    Cambios con secuencia mayor que `desde`, en orden, a lo sumo `limite`.
+
+    Args:
+        desde: último `seq` que el consumidor ya procesó (0 para empezar)
+
+    Raises:
+        ValueError: si el log no coincide con su índice tras `REINTENTOS_LECTURA` intentos
+    """
+    ruta_log, ruta_indice = _rutas(base_dir)
+    desde = max(desde, 0)
+    for _ in range(REINTENTOS_LECTURA):
+        try:
+            with open(ruta_indice, "rb") as f:
+                f.seek(desde * _POSICION.size)
+                posiciones = f.read(limite * _POSICION.size)
+        except FileNotFoundError:
+            return []
+        n = len(posiciones) // _POSICION.size
+        if not n:
+            return []
+        # Cada línea debe traer el seq de su posición: si el log se reemplazó
+        # entre leer el índice y abrirlo (p. ej. otro proceso lo recreó), se relee
+        with open(ruta_log, "rb") as f:
+            f.seek(_POSICION.unpack_from(posiciones)[0])
+            try:
+                cambios = [json.loads(f.readline()) for _ in range(n)]
+            except ValueError:
+                continue
+        if all(cambio.get("seq") == seq for seq, cambio in enumerate(cambios, desde + 1)):
+            return cambios
+    raise ValueError(f"El log de cambios no coincide con su índice desde el cambio {desde + 1}")
+
+
+def esperar_cambios(base_dir: str, desde: int = 0, espera: float = None, limite: int = LIMITE_LOTE) -> list:
+    """
+    Como `leer_cambios`, pero si no hay cambios nuevos espera hasta que los
+    haya o pasen `espera` segundos (None: sin límite). Retorna [] si no llegó
+    ninguno.
+    """
+    fin = None if espera is None else time.monotonic() + espera
+    while True:
+        if ultimo_cambio(base_dir) > desde:
+            return leer_cambios(base_dir, desde, limite)
+        if fin is not None and time.monotonic() >= fin:
+            return []
+        time.sleep(INTERVALO_SONDEO if fin is None else min(INTERVALO_SONDEO, max(fin - time.monotonic(), 0)))
+
+
+def seguir_cambios(base_dir: str, desde: int = 0, limite: int = LIMITE_LOTE):
+    """Itera lotes de cambios nuevos a medida que llegan, como tail -f (no termina)."""
+    while True:
+        lote = esperar_cambios(base_dir, desde, None, limite)
+        desde = lote[-1]["seq"]
+        yield lote
+
+
+def leer_cursor(ruta: str) -> int:
+    """Último `seq` procesado guardado en `ruta` (0 si el archivo no existe)."""
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def guardar_cursor(ruta: str, seq: int) -> None:
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(f"{seq}\n")
+    os.replace(temporal, ruta)
+
+
+# ─── Exposición ────────────────────────────────────────────────────────────────
+def iniciar_servidor_cambios(base_dir: str, puerto: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Expone GET /cambios?desde=N&limite=M&espera=S por HTTP en un hilo daemon
+    (usar .shutdown()). Si no hay cambios después de `desde`, la respuesta
+    espera hasta S segundos a que llegue alguno (long-poll). Responde
+    {"cambios": [...], "ultimo": seq}.
+    """
+
+    class _Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            ruta, _, consulta = self.path.partition("?")
+            if ruta not in ("/cambios", "/"):
+                self.send_error(404)
+                return
+            parametros = dict(urllib.parse.parse_qsl(consulta))
+            try:
+                desde = int(parametros.get("desde", 0))
+                limite = min(max(int(parametros.get("limite", LIMITE_LOTE)), 1), LIMITE_LOTE)
+                espera = min(max(float(parametros.get("espera", 0)), 0.0), ESPERA_MAXIMA)
+            except ValueError:
+                self.send_error(400, "desde, limite y espera deben ser números")
+                return
+            cambios = esperar_cambios(base_dir, desde, espera, limite)
+            cuerpo = json.dumps(
+                {"cambios": cambios, "ultimo": ultimo_cambio(base_dir)}, ensure_ascii=False
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    preparar_cambios(base_dir)
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="cambios-http", daemon=True).start()
+    return servidor
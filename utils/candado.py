@@ -0,0 +1,120 @@
+"""
+Candados de archivo entre procesos.
+
+Los `threading.Lock` de cada módulo solo ordenan los hilos de un mismo
+proceso. El historial puede tener más de un escritor a la vez (el trabajador
+de la cola de utils.trabajos y una evaluación que se guarda desde la
+terminal), así que cada escritura del historial y de sus índices toma además
+un candado sobre data/.historial.lock: `fcntl.flock` donde existe y
+`msvcrt.locking` en Windows.
+
+El candado es reentrante dentro de un hilo: una escritura que llama a otra
+(compactar → reconstruir los índices) no se bloquea a sí misma.
+"""
+
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:         # Windows
+    fcntl = None
+    import msvcrt
+
+
+ARCHIVO_CANDADO = ".historial.lock"     # junto al historial, en data/
+ESPERA_REINTENTO = 0.05                 # segundos entre intentos donde no hay espera bloqueante
+
+_CANDADOS = {}      # ruta absoluta → Candado
+_LOCK = threading.Lock()
+
+
+def _bloquear(archivo, esperar: bool) -> bool:
+    if fcntl is not None:
+        try:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX if esperar else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+    while True:
+        archivo.seek(0)
+        try:
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not esperar:
+                return False
+            time.sleep(ESPERA_REINTENTO)
+
+
+def _desbloquear(archivo) -> None:
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+    else:
+        archivo.seek(0)
+        msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class Candado:
+    """
+    Candado exclusivo sobre el archivo `ruta`, entre procesos y entre hilos.
+    Se usa con `with` o con `adquirir` / `liberar`.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._hilos = threading.RLock()
+        self._nivel = 0             # adquisiciones anidadas del hilo que lo tiene
+        self._archivo = None
+
+    def adquirir(self, esperar: bool = True) -> bool:
+        """Toma el candado; con esperar=False retorna False si otro lo tiene."""
+        if not self._hilos.acquire(blocking=esperar):
+            return False
+        if self._nivel == 0:
+            try:
+                os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+                archivo = open(self.ruta, "a+b")
+            except BaseException:
+                self._hilos.release()
+                raise
+            try:
+                tomado = _bloquear(archivo, esperar)
+            except BaseException:
+                archivo.close()
+                self._hilos.release()
+                raise
+            if not tomado:
+                archivo.close()
+                self._hilos.release()
+                return False
+            self._archivo = archivo
+        self._nivel += 1
+        return True
+
+    def liberar(self) -> None:
+        self._nivel -= 1
+        if self._nivel == 0:
+            archivo, self._archivo = self._archivo, None
+            try:
+                _desbloquear(archivo)
+            finally:
+                archivo.close()
+        self._hilos.release()
+
+    def __enter__(self):
+        self.adquirir()
+        return self
+
+    def __exit__(self, *_):
+        self.liberar()
+
+
+def candado(ruta: str) -> Candado:
+    """El candado de `ruta` (uno por archivo en cada proceso, para que sea reentrante)."""
+    ruta = os.path.abspath(ruta)
+    with _LOCK:
+        if ruta not in _CANDADOS:
+            _CANDADOS[ruta] = Candado(ruta)
+        return _CANDADOS[ruta]
@@ -0,0 +1,336 @@
+"""
+Consenso entre evaluadores de una misma iniciativa.
+
+Las evaluaciones de una iniciativa (mismo equipo y nombre, o --iniciativa;
+ver utils.linaje) hechas por distintos responsables se toman como
+evaluaciones independientes: de cada evaluador cuenta su última evaluación.
+Con dos o más evaluadores, por pregunta se calcula:
+
+  - conteo de cada opción y respuesta de consenso: la más elegida (moda) o la
+    de mayor peso sumado si se dan pesos por evaluador; si dos o más opciones
+    empatan, la pregunta queda sin consenso (None)
+  - puntos esperados: el promedio de los puntos de todos los evaluadores
+    (ponderado si hay pesos; sin responder cuenta 0, como en su puntaje)
+  - acuerdo: proporción de pares de evaluadores que eligieron la misma opción
+  - rango: diferencia de puntos entre la opción más alta y la más baja elegidas
+
+El consenso se puntúa con `calcular_puntaje` sobre los puntos esperados, así
+su puntaje es el promedio de los de los evaluadores y queda siempre entre el
+menor y el mayor (la moda sola puede quedar fuera: con tres evaluadores que
+discrepan cada uno en una pregunta distinta, gana siempre la mayoría). Para
+todo el portafolio, cada pregunta tiene además su kappa de Fleiss (acuerdo
+descontado el esperado por azar): las de kappa más bajo son las que los
+evaluadores interpretan distinto.
+
+Igual que el índice de similitud, las respuestas se ordenan como columnas de
+bytes (un código de letra por evaluador, los de cada iniciativa contiguos) y
+los conteos salen de `bytes.count` sobre el tramo de cada iniciativa: el costo
+en Python es por iniciativa y opción, no por evaluador.
+"""
+
+import json
+import time
+from itertools import repeat
+from operator import itemgetter
+
+from core.adaptativo import banda
+from core.evaluador import calcular_puntaje
+from core.modelo import NIVELES
+from core.preguntas import CATEGORIAS, PUNTOS
+from .fragmentos import clave_equipo
+from .linaje import cargar_catalogo, iniciativa_de
+from .similitud import letras_respuestas
+from .texto import normalizar
+
+
+MINIMO_EVALUADORES = 2
+LIMITE_LISTADO = 30             # iniciativas en el listado de --consenso
+PREGUNTAS_DESTACADAS = 5        # preguntas con más desacuerdo que se muestran
+
+_PREGUNTAS = []                 # por pregunta, en el orden de letras_respuestas: (id, texto, [(código, letra, puntos)])
+for _cat in CATEGORIAS:
+    for _preg in _cat["preguntas"]:
+        _opciones = [(ord(letra), letra, puntos) for letra, puntos in PUNTOS[_preg["id"]].items()]
+        _PREGUNTAS.append((_preg["id"], _preg["texto"], _opciones))
+_N = len(_PREGUNTAS)
+_TODAS = itemgetter(*(pid for pid, _, _ in _PREGUNTAS))
+_LETRA = itemgetter(0)
+
+
+def cargar_pesos(ruta: str) -> dict:
+    """
+    Lee un JSON {responsable: peso} para el consenso ponderado.
+
+    Raises:
+        ValueError: si no es un objeto o algún peso no es un número positivo
+    """
+    with open(ruta, encoding="utf-8") as f:
+        pesos = json.load(f)
+    if not isinstance(pesos, dict):
+        raise ValueError("el archivo de pesos debe ser un objeto {responsable: peso}")
+    for responsable, peso in pesos.items():
+        if isinstance(peso, bool) or not isinstance(peso, (int, float)) or peso <= 0:
+            raise ValueError(f"peso inválido para {responsable!r}: {peso!r} (debe ser un número positivo)")
+    return {_clave_evaluador(responsable): float(peso) for responsable, peso in pesos.items()}
+
+
+def _clave_evaluador(responsable: str) -> str:
+    return " ".join(normalizar(responsable or "").split())
+
+
+# ─── Agrupación ────────────────────────────────────────────────────────────────
+def _letras(evaluacion: dict) -> str:
+    """Como `letras_respuestas`, sin un paso en Python por pregunta si están todas respondidas."""
+    try:
+        return "".join(map(_LETRA, _TODAS(evaluacion["respuestas"])))
+    except KeyError:
+        return letras_respuestas(evaluacion)
+
+
+def _agrupar(base_dir: str, equipo: str = None) -> dict:
+    """
+    {iniciativa_id: {clave del evaluador: (id, evaluación)}} en una pasada
+    por el historial; la última evaluación de cada evaluador reemplaza a las
+    anteriores. Sin responsable, cada evaluación cuenta como un evaluador.
+    """
+    from .persistencia import iterar_historial
+
+    catalogo = cargar_catalogo(base_dir)
+    filtro = clave_equipo(equipo) if equipo else None
+    grupos = {}
+    for id_registro, evaluacion in iterar_historial(base_dir):
+        if filtro and clave_equipo(evaluacion["meta"].get("equipo")) != filtro:
+            continue
+        evaluador = _clave_evaluador(evaluacion["meta"].get("responsable")) or f"#{id_registro}"
+        grupos.setdefault(iniciativa_de(catalogo, evaluacion, id_registro), {})[evaluador] = (id_registro, evaluacion)
+    return grupos
+
+
+# ─── Cálculo ───────────────────────────────────────────────────────────────────
+def _elegir(votos: dict) -> str:
+    """Opción con más votos (o peso); None si dos o más empatan (sin consenso)."""
+    maximo = max(votos.values())
+    ganadoras = [letra for letra, v in votos.items() if v == maximo]
+    return ganadoras[0] if len(ganadoras) == 1 else None
+
+
+def _pregunta(i: int, conteos: tuple, evaluadores: int, ajustes: list = None) -> tuple:
+    """
+    (clave de orden, resumen, (respuesta de consenso, puntos esperados)) de la
+    pregunta i para los conteos por opción de `evaluadores` evaluadores.
+    `ajustes` es [(letra o "-", peso - 1)] de los evaluadores con peso propio.
+    """
+    pid, texto, opciones = _PREGUNTAS[i]
+    conteo = {letra: n for (_, letra, _), n in zip(opciones, conteos) if n}
+    puntos = {letra: p for _, letra, p in opciones}
+    n = sum(conteos)
+    acuerdo = sum(c * (c - 1) for c in conteos) / (n * (n - 1)) if n > 1 else None
+    votos = dict(conteo)
+    peso_total = evaluadores
+    for letra, ajuste in ajustes or ():
+        peso_total += ajuste
+        if letra in votos:
+            votos[letra] += ajuste
+    consenso = _elegir(votos)
+    esperado = sum(v * puntos[letra] for letra, v in votos.items()) / peso_total
+    elegidos = [puntos[letra] for letra in conteo]
+    rango = max(elegidos) - min(elegidos)
+    resumen = {"id": pid, "texto": texto, "conteo": conteo, "consenso": consenso, "acuerdo": acuerdo, "rango": rango}
+    return (1.0 if acuerdo is None else acuerdo, -rango), resumen, (consenso, esperado)
+
+
+def calcular_consenso(base_dir: str, pesos: dict = None, equipo: str = None,
+                      iniciativa_id: int = None) -> dict:
+    """
+    Consenso de cada iniciativa con al menos `MINIMO_EVALUADORES` evaluadores.
+
+    Args:
+        pesos: {responsable: peso} (ver `cargar_pesos`); sin pesos, consenso por moda
+        equipo: solo las iniciativas de este equipo
+        iniciativa_id: solo esta iniciativa
+
+    Returns:
+        dict con:
+          iniciativas: [{iniciativa_id, nombre, equipo, evaluadores, respuestas,
+              resultados, nivel, acuerdo, preguntas}], de menor a mayor acuerdo.
+              `evaluadores` es [{responsable, id, fecha, puntaje_global}];
+              `respuestas`, {pregunta_id: (consenso o None, puntos esperados)};
+              `preguntas`, [{id, texto, conteo, consenso, acuerdo, rango}] de
+              más a menos desacuerdo
+          preguntas: [{id, texto, kappa, acuerdo, iniciativas}] del portafolio,
+              de menor a mayor kappa
+          metodo: "moda" o "ponderada"
+          segundos
+    """
+    inicio = time.perf_counter()
+    grupos = _agrupar(base_dir, equipo)
+    if iniciativa_id is not None:
+        grupos = {iniciativa_id: grupos[iniciativa_id]} if iniciativa_id in grupos else {}
+    consenso = consensuar(grupos, pesos)
+    consenso["metodo"] = "ponderada" if pesos else "moda"
+    consenso["segundos"] = round(time.perf_counter() - inicio, 3)
+    return consenso
+
+
+def consensuar(grupos: dict, pesos: dict = None) -> dict:
+    """
+    Núcleo de `calcular_consenso` para {iniciativa_id: {clave del evaluador:
+    (id, evaluación)}}; retorna solo `iniciativas` y `preguntas`.
+
+    Los mismos conteos de una pregunta se repiten entre iniciativas, así que su
+    resumen se calcula una vez y se comparte (no modificar los de una
+    iniciativa).
+    """
+    pesos = pesos or {}
+
+    # ── Columnas: un byte por evaluador y pregunta, las iniciativas en tramos ──
+    tramos, filas = [], []
+    for id_iniciativa, evaluadores in grupos.items():
+        if len(evaluadores) < MINIMO_EVALUADORES:
+            continue
+        ordenados = sorted(evaluadores.values())        # (id, evaluación), ids únicos
+        tramos.append((id_iniciativa, len(filas), len(filas) + len(ordenados), ordenados))
+        filas.extend(_letras(evaluacion) for _, evaluacion in ordenados)
+    datos = "".join(filas).encode("ascii")
+    columnas = [datos[i::_N] for i in range(_N)]
+    codigos = [[codigo for codigo, _, _ in opciones] for _, _, opciones in _PREGUNTAS]
+
+    resumenes = {}                              # (pregunta, conteos, evaluadores) → _pregunta(...)
+    acuerdos_pregunta = [0.0] * _N              # para el kappa de Fleiss
+    conteos_pregunta = [[] for _ in range(_N)]
+    iniciativas = []
+    for id_iniciativa, desde, hasta, ordenados in tramos:
+        # Evaluadores con peso distinto de 1: solo ellos corrigen los conteos
+        ajustes = []
+        if pesos:
+            for j, (_, evaluacion) in enumerate(ordenados):
+                peso = pesos.get(_clave_evaluador(evaluacion["meta"].get("responsable")), 1.0)
+                if peso != 1.0:
+                    ajustes.append((filas[desde + j], peso - 1.0))
+        respuestas, preguntas, acuerdos = {}, [], []
+        for i, columna in enumerate(columnas):
+            conteos = tuple(map(columna.count, codigos[i], repeat(desde), repeat(hasta)))
+            if not any(conteos):
+                continue
+            if ajustes:
+                entrada = _pregunta(i, conteos, hasta - desde, [(letras[i], ajuste) for letras, ajuste in ajustes])
+            else:
+                entrada = resumenes.get((i, conteos, hasta - desde))
+                if entrada is None:
+                    entrada = resumenes[(i, conteos, hasta - desde)] = _pregunta(i, conteos, hasta - desde)
+            resumen = entrada[1]
+            respuestas[resumen["id"]] = entrada[2]
+            preguntas.append(entrada)
+            if resumen["acuerdo"] is not None:
+                acuerdos.append(resumen["acuerdo"])
+                acuerdos_pregunta[i] += resumen["acuerdo"]
+                conteos_pregunta[i].append(conteos)
+
+        resultados = calcular_puntaje(respuestas, registrar_metricas=False)
+        preguntas.sort(key=itemgetter(0))
+        ultima = ordenados[-1][1]["meta"]
+        iniciativas.append({
+            "iniciativa_id": id_iniciativa,
+            "nombre": ultima.get("nombre_iniciativa", ""),
+            "equipo": ultima.get("equipo", ""),
+            "evaluadores": [
+                {
+                    "responsable": evaluacion["meta"].get("responsable") or f"#{id_registro}",
+                    "id": id_registro,
+                    "fecha": evaluacion["meta"].get("fecha", ""),
+                    "puntaje_global": evaluacion["resultados"]["puntaje_global"],
+                }
+                for id_registro, evaluacion in ordenados
+            ],
+            "respuestas": respuestas,
+            "resultados": resultados,
+            "nivel": NIVELES[banda(resultados["puntaje_global"])],
+            "acuerdo": sum(acuerdos) / len(acuerdos) if acuerdos else None,
+            "preguntas": [resumen for _, resumen, _ in preguntas],
+        })
+    iniciativas.sort(key=lambda c: (1.0 if c["acuerdo"] is None else c["acuerdo"], c["iniciativa_id"]))
+    return {"iniciativas": iniciativas, "preguntas": _kappas(acuerdos_pregunta, conteos_pregunta)}
+
+
+def _kappas(acuerdos: list, conteos: list) -> list:
+    """
+    Kappa de Fleiss por pregunta sobre las iniciativas con dos o más
+    respuestas: suma de acuerdos y lista de conteos por opción de cada una.
+    """
+    preguntas = []
+    for (pid, texto, _), suma, lista in zip(_PREGUNTAS, acuerdos, conteos):
+        if not lista:
+            continue
+        observado = suma / len(lista)
+        totales = [sum(columna) for columna in zip(*lista)]
+        n = sum(totales)
+        esperado = sum((c / n) ** 2 for c in totales)
+        kappa = (observado - esperado) / (1 - esperado) if esperado < 1 else 1.0
+        preguntas.append({"id": pid, "texto": texto, "kappa": kappa, "acuerdo": observado, "iniciativas": len(lista)})
+    preguntas.sort(key=lambda p: p["kappa"])
+    return preguntas
+
+
+# ─── Consola ───────────────────────────────────────────────────────────────────
+def _porcentaje(valor: float) -> str:
+    return "—" if valor is None else f"{valor * 100:.0f}%"
+
+
+def mostrar_consenso(base_dir: str, iniciativa_id: int = None, pesos: dict = None, equipo: str = None) -> None:
+    """Muestra el consenso del portafolio o, con `iniciativa_id`, el detalle de una iniciativa."""
+    consenso = calcular_consenso(base_dir, pesos, equipo, iniciativa_id)
+    if iniciativa_id is not None:
+        if not consenso["iniciativas"]:
+            print(f"\n  La iniciativa #{iniciativa_id} no tiene evaluaciones de {MINIMO_EVALUADORES} "
+                  f"o más responsables distintos.\n")
+            return
+        _mostrar_iniciativa(consenso["iniciativas"][0], consenso["metodo"])
+        return
+
+    iniciativas = consenso["iniciativas"]
+    if not iniciativas:
+        print(f"\n  No hay iniciativas evaluadas por {MINIMO_EVALUADORES} o más responsables distintos.\n")
+        return
+    print(f"\n  {'─'*78}")
+    print(f"  🤝 CONSENSO ENTRE EVALUADORES ({len(iniciativas)} iniciativas, {consenso['metodo']}, "
+          f"{consenso['segundos']} s)")
+    print(f"  {'─'*78}")
+    print(f"  {'#':<6} {'Iniciativa':<28} {'Equipo':<14}{'Eval.':>6}{'Consenso':>10}{'Rango':>13}{'Acuerdo':>9}")
+    print(f"  {'─'*78}")
+    for c in iniciativas[:LIMITE_LISTADO]:
+        individuales = [e["puntaje_global"] for e in c["evaluadores"]]
+        rango = f"{min(individuales):.0f}–{max(individuales):.0f}%"
+        print(f"  {c['iniciativa_id']:<6} {c['nombre'][:27]:<28} {c['equipo'][:13]:<14}{len(c['evaluadores']):>6}"
+              f"{c['resultados']['puntaje_global']:>9.1f}%{rango:>13}{_porcentaje(c['acuerdo']):>9}")
+    if len(iniciativas) > LIMITE_LISTADO:
+        print(f"  ... y {len(iniciativas) - LIMITE_LISTADO} más (de menor a mayor acuerdo)")
+    print(f"  {'─'*78}")
+    print("  Preguntas con más desacuerdo en el portafolio (kappa de Fleiss):")
+    for p in consenso["preguntas"][:PREGUNTAS_DESTACADAS]:
+        print(f"    {p['id']:<6} κ={p['kappa']:+.2f}  acuerdo {_porcentaje(p['acuerdo']):>4}  "
+              f"({p['iniciativas']} iniciativas)  {p['texto'][:40]}")
+    print("  Detalle de una iniciativa: python main.py --consenso ID\n")
+
+
+def _mostrar_iniciativa(c: dict, metodo: str) -> None:
+    print(f"\n  {'─'*78}")
+    print(f"  🤝 CONSENSO DE LA INICIATIVA #{c['iniciativa_id']}: {c['nombre'][:40]} ({c['equipo'][:20]})")
+    print(f"  {'─'*78}")
+    for e in c["evaluadores"]:
+        print(f"  #{e['id']:<6} {e['fecha'][:10]:<11} {e['responsable'][:30]:<31}{e['puntaje_global']:>6.1f}%")
+    print(f"  {'─'*78}")
+    print(f"  Consenso ({metodo}): {c['resultados']['puntaje_global']:.1f}% → {c['nivel']}  "
+          f"(acuerdo medio {_porcentaje(c['acuerdo'])})")
+    for cat in c["resultados"]["categorias"]:
+        print(f"    {cat['nombre'].split(': ', 1)[-1][:40]:<42}{cat['porcentaje']:>6.1f}%")
+    desacuerdos = [p for p in c["preguntas"] if p["acuerdo"] is not None and p["acuerdo"] < 1]
+    if not desacuerdos:
+        print("\n  Los evaluadores coincidieron en todas las preguntas.\n")
+        return
+    print("\n  Preguntas con más desacuerdo:")
+    for p in desacuerdos[:PREGUNTAS_DESTACADAS]:
+        conteo = ", ".join(f"{letra}×{n}" for letra, n in sorted(p["conteo"].items()))
+        consenso = p["consenso"] or "sin consenso"
+        print(f"    {p['id']:<6} acuerdo {_porcentaje(p['acuerdo']):>4}  {conteo:<18} → {consenso:<12} "
+              f"{p['texto'][:28]}")
+    print()
@@ -0,0 +1,359 @@
+"""
+Percentil de cada evaluación respecto del historial, con bosquejos de cuantiles.
+
+Para decir "esta iniciativa está en el percentil 82 de todas las evaluaciones
+(60 dentro de su equipo)" no se reordena el historial: se mantiene un bosquejo
+KLL por métrica (puntaje global y porcentaje de cada categoría), uno global y
+otro por equipo, en data/cuantiles.json:
+
+    {"k": 200, "global": {"n": 1234, "metricas": {"puntaje_global": {...}, "viabilidad": {...}}},
+     "equipos": {"finanzas": {"equipo": "Finanzas", "n": 40, "metricas": {...}}}}
+
+Cada bosquejo guarda a lo sumo unos 3·k valores aunque el historial crezca, con
+un error de rango de alrededor de 1.7/k (±1 punto de percentil con k=200), y es
+exacto mientras la métrica tenga menos de k valores. Dos bosquejos se fusionan
+en uno que resume la unión, así que los de otros fragmentos o máquinas se
+combinan sin volver a leer sus historiales (`fusionar_cuantiles`).
+
+Como los demás índices derivados, se actualiza al guardar, se invalida con los
+borrados y ediciones y se reconstruye desde el historial si falta.
+"""
+
+import json
+import math
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from .fragmentos import clave_equipo
+
+
+ARCHIVO_CUANTILES = "data/cuantiles.json"
+K = 200                         # tamaño del bosquejo: más grande, más exacto y más pesado
+MINIMO_EVALUACIONES = 5         # con menos, un percentil dice poco y no se muestra
+METRICA_GLOBAL = "puntaje_global"
+
+_CACHE = {}     # ruta → (mtime_ns, cuantiles)
+_LOCK = threading.Lock()
+
+
+# ─── Bosquejo KLL ──────────────────────────────────────────────────────────────
+class BosquejoCuantiles:
+    """
+    Bosquejo KLL (Karnin, Lang y Liberty) de una distribución de números.
+
+    Los valores entran al nivel 0; cuando un nivel se llena se ordena y la
+    mitad de sus valores (los pares o los impares) sube al nivel siguiente,
+    donde cada uno representa el doble de valores originales. Los niveles
+    altos tienen más capacidad que los bajos, y el total nunca pasa de ~3·k.
+
+        bosquejo = BosquejoCuantiles()
+        for puntaje in puntajes:
+            bosquejo.agregar(puntaje)
+        bosquejo.percentil(72.5)   # → 0.81
+    """
+
+    def __init__(self, k: int = K):
+        self.k = k
+        self.n = 0
+        self.niveles = [[]]
+        self._tamano = 0
+        self._tabla = None        # (valores ordenados, pesos acumulados) para las consultas
+
+    def _capacidad(self, nivel: int) -> int:
+        profundidad = len(self.niveles) - nivel - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** profundidad)))
+
+    def _capacidad_total(self) -> int:
+        return sum(self._capacidad(nivel) for nivel in range(len(self.niveles)))
+
+    def _compactar(self) -> None:
+        for nivel in range(len(self.niveles)):
+            if len(self.niveles[nivel]) < self._capacidad(nivel):
+                continue
+            if nivel + 1 == len(self.niveles):
+                self.niveles.append([])
+            valores = sorted(self.niveles[nivel])
+            resto = [valores.pop()] if len(valores) % 2 else []
+            # Moneda determinista (hash de n y el nivel): reconstruir el bosquejo
+            # con el mismo historial da los mismos percentiles
+            moneda = (((self.n + nivel) * 2654435761) >> 16) & 1
+            self.niveles[nivel + 1].extend(valores[moneda::2])
+            self.niveles[nivel] = resto
+            self._tamano = sum(len(valores) for valores in self.niveles)
+            if self._tamano < self._capacidad_total():
+                return
+
+    def agregar(self, valor: float) -> None:
+        self.niveles[0].append(valor)
+        self.n += 1
+        self._tamano += 1
+        self._tabla = None
+        if self._tamano >= self._capacidad_total():
+            self._compactar()
+
+    def fusionar(self, otro: "BosquejoCuantiles") -> "BosquejoCuantiles":
+        """Suma a este bosquejo los valores que resume `otro` (que no cambia)."""
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append([])
+        for nivel, valores in enumerate(otro.niveles):
+            self.niveles[nivel].extend(valores)
+        self.n += otro.n
+        self._tamano = sum(len(valores) for valores in self.niveles)
+        self._tabla = None
+        while self._tamano >= self._capacidad_total():
+            self._compactar()
+        return self
+
+    # ── Consultas ─────────────────────────────────────────────────────────────
+    def _ordenados(self) -> tuple:
+        if self._tabla is None:
+            pares = sorted(
+                (valor, 1 << nivel) for nivel, valores in enumerate(self.niveles) for valor in valores
+            )
+            self._tabla = ([valor for valor, _ in pares], list(accumulate(peso for _, peso in pares)))
+        return self._tabla
+
+    def percentil(self, valor: float, descontar: int = 0) -> float:
+        """
+        Fracción (0 a 1) de los valores menores que `valor`, contando la mitad
+        de los iguales, o None si el bosquejo está vacío.
+
+        Args:
+            descontar: valores iguales a `valor` que no se cuentan (1 para
+                ubicar una evaluación que ya está en el bosquejo)
+        """
+        valores, acumulados = self._ordenados()
+        total = self.n - descontar
+        if total <= 0:
+            return None
+        desde, hasta = bisect_left(valores, valor), bisect_right(valores, valor)
+        menores = acumulados[desde - 1] if desde else 0
+        iguales = max((acumulados[hasta - 1] if hasta else 0) - menores - descontar, 0)
+        return min((menores + iguales / 2) / total, 1.0)
+
+    def cuantil(self, fraccion: float) -> float:
+        """Valor bajo el cual queda `fraccion` (0 a 1) de los valores, o None si está vacío."""
+        valores, acumulados = self._ordenados()
+        if not valores:
+            return None
+        return valores[min(bisect_left(acumulados, fraccion * self.n), len(valores) - 1)]
+
+    # ── Serialización ─────────────────────────────────────────────────────────
+    def a_dict(self) -> dict:
+        return {"n": self.n, "niveles": self.niveles}
+
+    @classmethod
+    def desde_dict(cls, datos: dict, k: int = K) -> "BosquejoCuantiles":
+        bosquejo = cls(k)
+        bosquejo.n = datos["n"]
+        bosquejo.niveles = [list(valores) for valores in datos["niveles"]] or [[]]
+        bosquejo._tamano = sum(len(valores) for valores in bosquejo.niveles)
+        return bosquejo
+
+
+# ─── Cuantiles del historial ───────────────────────────────────────────────────
+def valores_evaluacion(evaluacion: dict) -> dict:
+    """{métrica: valor}: puntaje global y porcentaje de cada categoría (por id)."""
+    resultados = evaluacion["resultados"]
+    valores = {METRICA_GLOBAL: resultados["puntaje_global"]}
+    for categoria in resultados["categorias"]:
+        valores[categoria["id"]] = categoria["porcentaje"]
+    return valores
+
+
+def _grupo_vacio() -> dict:
+    return {"n": 0, "metricas": {}}
+
+
+def _agregar_a_grupo(grupo: dict, valores: dict, k: int) -> None:
+    grupo["n"] += 1
+    for metrica, valor in valores.items():
+        bosquejo = grupo["metricas"].get(metrica)
+        if bosquejo is None:
+            bosquejo = grupo["metricas"][metrica] = BosquejoCuantiles(k)
+        bosquejo.agregar(valor)
+
+
+def _agregar(cuantiles: dict, registros: list) -> None:
+    k = cuantiles["k"]
+    for _, evaluacion in registros:
+        valores = valores_evaluacion(evaluacion)
+        _agregar_a_grupo(cuantiles["global"], valores, k)
+        equipo = evaluacion["meta"].get("equipo") or ""
+        grupo = cuantiles["equipos"].get(clave_equipo(equipo))
+        if grupo is None:
+            grupo = cuantiles["equipos"][clave_equipo(equipo)] = dict(_grupo_vacio(), equipo=equipo)
+        _agregar_a_grupo(grupo, valores, k)
+
+
+def _a_json(cuantiles: dict) -> dict:
+    def grupo(datos: dict) -> dict:
+        return dict(datos, metricas={m: b.a_dict() for m, b in datos["metricas"].items()})
+
+    return {
+        "k": cuantiles["k"],
+        "global": grupo(cuantiles["global"]),
+        "equipos": {clave: grupo(datos) for clave, datos in cuantiles["equipos"].items()},
+    }
+
+
+def _desde_json(datos: dict) -> dict:
+    k = datos["k"]
+
+    def grupo(g: dict) -> dict:
+        return dict(g, metricas={m: BosquejoCuantiles.desde_dict(b, k) for m, b in g["metricas"].items()})
+
+    return {
+        "k": k,
+        "global": grupo(datos["global"]),
+        "equipos": {clave: grupo(g) for clave, g in datos["equipos"].items()},
+    }
+
+
+def _escribir(ruta: str, cuantiles: dict) -> None:
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(_a_json(cuantiles), f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporal, ruta)
+
+
+def _reconstruir(base_dir: str, ruta: str) -> None:
+    from .persistencia import iterar_historial
+
+    cuantiles = {"k": K, "global": _grupo_vacio(), "equipos": {}}
+    _agregar(cuantiles, iterar_historial(base_dir))
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    _escribir(ruta, cuantiles)
+
+
+def cargar_cuantiles(base_dir: str) -> dict:
+    """Bosquejos del historial; si no existen se construyen desde el historial."""
+    ruta = os.path.join(base_dir, ARCHIVO_CUANTILES)
+    with _LOCK:
+        if not os.path.exists(ruta):
+            _reconstruir(base_dir, ruta)
+        version = os.stat(ruta).st_mtime_ns
+        entrada = _CACHE.get(ruta)
+        if entrada is None or entrada[0] != version:
+            with open(ruta, encoding="utf-8") as f:
+                entrada = _CACHE[ruta] = (version, _desde_json(json.load(f)))
+        return entrada[1]
+
+
+def indexar_cuantiles_lote(registros: list, base_dir: str) -> None:
+    """Suma [(id, evaluación)] recién guardadas a los bosquejos global y de su equipo."""
+    ruta = os.path.join(base_dir, ARCHIVO_CUANTILES)
+    cuantiles = cargar_cuantiles(base_dir)
+    with _LOCK:
+        _agregar(cuantiles, registros)
+        _escribir(ruta, cuantiles)
+        _CACHE[ruta] = (os.stat(ruta).st_mtime_ns, cuantiles)
+
+
+def invalidar_cuantiles(base_dir: str) -> None:
+    ruta = os.path.join(base_dir, ARCHIVO_CUANTILES)
+    with _LOCK:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        _CACHE.pop(ruta, None)
+
+
+def fusionar_cuantiles(*rutas: str) -> dict:
+    """
+    Combina los data/cuantiles.json de varios historiales (fragmentos,
+    máquinas) en uno que resume todas sus evaluaciones.
+
+    Returns:
+        dict con la misma forma que `cargar_cuantiles`
+    """
+    fusion = {"k": K, "global": _grupo_vacio(), "equipos": {}}
+    for ruta in rutas:
+        with open(ruta, encoding="utf-8") as f:
+            cuantiles = _desde_json(json.load(f))
+        grupos = [(fusion["global"], cuantiles["global"])]
+        for clave, grupo in cuantiles["equipos"].items():
+            destino = fusion["equipos"].setdefault(clave, dict(_grupo_vacio(), equipo=grupo.get("equipo", "")))
+            grupos.append((destino, grupo))
+        for destino, origen in grupos:
+            destino["n"] += origen["n"]
+            for metrica, bosquejo in origen["metricas"].items():
+                if metrica in destino["metricas"]:
+                    destino["metricas"][metrica].fusionar(bosquejo)
+                else:
+                    destino["metricas"][metrica] = bosquejo
+    return fusion
+
+
+# ─── Percentiles de una evaluación ─────────────────────────────────────────────
+def _percentiles_grupo(grupo: dict, valores: dict, descontar: int) -> dict:
+    if grupo is None or grupo["n"] - descontar < MINIMO_EVALUACIONES:
+        return None
+    percentiles = {}
+    for metrica, valor in valores.items():
+        bosquejo = grupo["metricas"].get(metrica)
+        fraccion = bosquejo.percentil(valor, descontar) if bosquejo is not None else None
+        if fraccion is not None:
+            percentiles[metrica] = round(fraccion * 100)
+    return {
+        "evaluaciones": grupo["n"] - descontar,
+        METRICA_GLOBAL: percentiles.pop(METRICA_GLOBAL, None),
+        "categorias": percentiles,
+    }
+
+
+def percentiles_evaluacion(evaluacion: dict, base_dir: str, en_historial: bool = False) -> dict:
+    """
+    Percentil (0 a 100) del puntaje global y de cada categoría de la
+    evaluación, entre todas las del historial y entre las de su equipo.
+
+    Args:
+        en_historial: True si la evaluación ya está guardada (--ver), para no
+            compararla consigo misma
+
+    Returns:
+        dict {"global": {...}, "equipo": {...}} donde cada parte tiene
+        evaluaciones, puntaje_global y categorias {id: percentil}; una parte es
+        None si hay menos de MINIMO_EVALUACIONES con qué comparar. None si
+        ninguna de las dos alcanza.
+    """
+    cuantiles = cargar_cuantiles(base_dir)
+    valores = valores_evaluacion(evaluacion)
+    descontar = 1 if en_historial else 0
+    equipo = evaluacion["meta"].get("equipo") or ""
+    with _LOCK:
+        percentiles = {
+            "global": _percentiles_grupo(cuantiles["global"], valores, descontar),
+            "equipo": _percentiles_grupo(cuantiles["equipos"].get(clave_equipo(equipo)), valores, descontar),
+        }
+    if percentiles["equipo"] is not None:
+        percentiles["equipo"]["nombre"] = equipo
+    return percentiles if percentiles["global"] or percentiles["equipo"] else None
+
+
+def describir_percentiles(percentiles: dict) -> str:
+    """ "Percentil 82 de 1,234 evaluaciones · percentil 60 en Finanzas (40)" """
+    partes = []
+    if percentiles.get("global"):
+        g = percentiles["global"]
+        partes.append(f"Percentil {g[METRICA_GLOBAL]} de {g['evaluaciones']:,} evaluaciones")
+    if percentiles.get("equipo"):
+        e = percentiles["equipo"]
+        partes.append(f"percentil {e[METRICA_GLOBAL]} en {e['nombre']} ({e['evaluaciones']:,})")
+    texto = " · ".join(partes)
+    return texto[:1].upper() + texto[1:]
+
+
+def percentil_categoria(percentiles: dict, id_categoria: str) -> str:
+    """ "P71 (equipo P60)" para la columna de una categoría, o "" si no hay datos."""
+    if not percentiles:
+        return ""
+    partes = []
+    if percentiles.get("global") and id_categoria in percentiles["global"]["categorias"]:
+        partes.append(f"P{percentiles['global']['categorias'][id_categoria]}")
+    if percentiles.get("equipo") and id_categoria in percentiles["equipo"]["categorias"]:
+        partes.append(f"equipo P{percentiles['equipo']['categorias'][id_categoria]}")
+    if len(partes) == 2:
+        return f"{partes[0]} ({partes[1]})"
+    return partes[0] if partes else ""
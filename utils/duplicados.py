@@ -0,0 +1,192 @@
+"""
+Detección de iniciativas casi duplicadas al momento de guardar.
+
+Cada evaluación se resume en dos huellas:
+  - hash exacto del vector de respuestas (64 bits);
+  - SimHash de 64 bits sobre trigramas de caracteres del nombre, equipo y
+    descripción normalizados (sin tildes ni mayúsculas).
+
+Dos evaluaciones son posibles duplicados si tienen exactamente las mismas
+respuestas y sus SimHash difieren en pocos bits. El índice es un archivo
+binario en data/: una cabecera con la generación del archivo (cambia en cada
+reconstrucción, así un proceso nota que otro lo reconstruyó y no sigue leyendo
+desde una posición que ya no vale) y registros de 20 bytes (id, hash de
+respuestas, SimHash); en memoria se ordena por hash de respuestas para que cada consulta sea una
+búsqueda binaria más una comparación de bits sobre el bucket.
+"""
+
+import hashlib
+import os
+import re
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .similitud import letras_respuestas
+from .texto import normalizar
+
+
+ARCHIVO_INDICE_DUPLICADOS = "data/indice_duplicados.bin"
+
+DISTANCIA_MAXIMA = 12           # bits distintos de SimHash para considerar duplicado
+_REGISTRO = struct.Struct("<IQQ")   # id, hash de respuestas, SimHash
+_CABECERA = struct.Struct("<8s8s")  # formato, generación
+_MAGIA = b"EVDUP\x00\x00\x01"
+_PATRON_PALABRA = re.compile(r"[a-z0-9]+")
+
+
+def _hash64(datos: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(datos, digest_size=8).digest(), "little")
+
+
+def hash_respuestas(evaluacion: dict) -> int:
+    """Hash de 64 bits del vector exacto de respuestas."""
+    return _hash64(letras_respuestas(evaluacion).encode("ascii"))
+
+
+def simhash(texto: str) -> int:
+    """SimHash de 64 bits sobre trigramas de caracteres del texto normalizado."""
+    texto = " ".join(_PATRON_PALABRA.findall(normalizar(texto)))
+    pesos = {}
+    for i in range(len(texto) - 2):
+        trigrama = texto[i:i + 3]
+        pesos[trigrama] = pesos.get(trigrama, 0) + 1
+
+    acumulado = [0] * 64
+    for trigrama, peso in pesos.items():
+        h = _hash64(trigrama.encode("utf-8"))
+        for bit in range(64):
+            acumulado[bit] += peso if (h >> bit) & 1 else -peso
+    return sum(1 << bit for bit in range(64) if acumulado[bit] > 0)
+
+
+def huella_texto(evaluacion: dict) -> int:
+    meta = evaluacion.get("meta", {})
+    return simhash(" | ".join((
+        meta.get("nombre_iniciativa", ""),
+        meta.get("equipo", ""),
+        meta.get("descripcion", ""),
+    )))
+
+
+def _bits_distintos(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class IndiceDuplicados:
+    """
+    Buckets por hash de respuestas. La parte cargada desde disco vive en
+    arreglos compactos ordenados (20 bytes por registro); lo agregado después
+    va a un dict pequeño hasta la próxima carga.
+    """
+
+    def __init__(self, registros: list = ()):
+        registros = sorted(registros, key=lambda r: r[1])
+        self._claves = array("Q", (r[1] for r in registros))
+        self._huellas = array("Q", (r[2] for r in registros))
+        self._ids = array("I", (r[0] for r in registros))
+        self._recientes = {}    # hash de respuestas → [(id, simhash)]
+
+    def __len__(self):
+        return len(self._ids) + sum(len(v) for v in self._recientes.values())
+
+    def agregar(self, id_registro: int, clave: int, huella: int) -> None:
+        self._recientes.setdefault(clave, []).append((id_registro, huella))
+
+    def buscar(self, clave: int, huella: int, distancia_maxima: int = DISTANCIA_MAXIMA) -> list:
+        """Retorna [(bits distintos, id)] ordenado de los posibles duplicados."""
+        encontrados = []
+        inicio = bisect_left(self._claves, clave)
+        fin = bisect_right(self._claves, clave, inicio)
+        for i in range(inicio, fin):
+            distancia = _bits_distintos(huella, self._huellas[i])
+            if distancia <= distancia_maxima:
+                encontrados.append((distancia, self._ids[i]))
+        for id_registro, otra in self._recientes.get(clave, ()):
+            distancia = _bits_distintos(huella, otra)
+            if distancia <= distancia_maxima:
+                encontrados.append((distancia, id_registro))
+        return sorted(encontrados)
+
+
+# ─── Persistencia del índice ───────────────────────────────────────────────────
+_CACHE = {}     # ruta → [IndiceDuplicados, bytes leídos, cabecera]
+_LOCK = threading.Lock()
+
+
+def _sincronizar(ruta: str) -> IndiceDuplicados:
+    """
+    Pone al día el índice en memoria con los registros agregados desde la
+    última lectura, o lo carga entero si el archivo es de otra generación.
+    Retorna None si el archivo no tiene cabecera (de una versión anterior).
+    """
+    with open(ruta, "rb") as f:
+        cabecera = f.read(_CABECERA.size)
+        if len(cabecera) < _CABECERA.size or _CABECERA.unpack(cabecera)[0] != _MAGIA:
+            return None
+        entrada = _CACHE.get(ruta)
+        nueva = entrada is None or entrada[2] != cabecera
+        f.seek(_CABECERA.size if nueva else entrada[1])
+        datos = f.read()
+    completos = len(datos) - len(datos) % _REGISTRO.size
+    registros = _REGISTRO.iter_unpack(datos[:completos])
+    if nueva:
+        entrada = _CACHE[ruta] = [IndiceDuplicados(registros), _CABECERA.size, cabecera]
+    else:
+        for registro in registros:
+            entrada[0].agregar(*registro)
+    entrada[1] += completos
+    return entrada[0]
+
+
+def _reconstruir(base_dir: str, ruta: str) -> None:
+    from .persistencia import iterar_historial
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(_CABECERA.pack(_MAGIA, os.urandom(8)))
+        for i, ev in iterar_historial(base_dir):
+            f.write(_REGISTRO.pack(i, hash_respuestas(ev), huella_texto(ev)))
+    os.replace(temporal, ruta)
+    _CACHE.pop(ruta, None)
+
+
+def cargar_indice_duplicados(base_dir: str) -> IndiceDuplicados:
+    """Retorna el índice en memoria, leyendo solo lo agregado desde la última carga."""
+    ruta = os.path.join(base_dir, ARCHIVO_INDICE_DUPLICADOS)
+    with _LOCK:
+        indice = _sincronizar(ruta) if os.path.exists(ruta) else None
+        if indice is None:
+            _reconstruir(base_dir, ruta)
+            indice = _sincronizar(ruta)
+        return indice
+
+
+def buscar_duplicados(evaluacion: dict, base_dir: str) -> list:
+    """Ids de evaluaciones previas con las mismas respuestas y texto casi igual (más parecida primero)."""
+    indice = cargar_indice_duplicados(base_dir)
+    return [i for _, i in indice.buscar(hash_respuestas(evaluacion), huella_texto(evaluacion))]
+
+
+def indexar_duplicados_lote(registros: list, base_dir: str, huellas: list = None) -> None:
+    """
+    Agrega las huellas de [(id, evaluación)] recién guardadas al índice
+    existente (en disco y en memoria), con una sola escritura.
+
+    Args:
+        huellas: [(hash de respuestas, SimHash)] ya calculadas para cada registro
+    """
+    ruta = os.path.join(base_dir, ARCHIVO_INDICE_DUPLICADOS)
+    if huellas is None:
+        huellas = [(hash_respuestas(ev), huella_texto(ev)) for _, ev in registros]
+    datos = b"".join(
+        _REGISTRO.pack(id_registro, clave, huella)
+        for (id_registro, _), (clave, huella) in zip(registros, huellas)
+    )
+    with _LOCK:
+        with open(ruta, "ab") as f:
+            f.write(datos)
+        if ruta in _CACHE:
+            _sincronizar(ruta)
@@ -0,0 +1,130 @@
+"""
+Escritor en segundo plano para la persistencia y los reportes.
+
+Un único hilo consume una cola acotada de tareas (buscar similares, guardar la
+evaluación, renderizar reportes), así la terminal muestra los resultados sin
+esperar al disco ni al PDF. Al haber un solo hilo, las tareas corren en el
+orden en que se encolaron: un reporte encolado después de guardar ve la
+evaluación ya marcada como duplicado si corresponde. Si la cola se llena,
+`enviar` espera (contrapresión) en lugar de acumular trabajo sin límite.
+
+Al salir (fin normal, excepción, Ctrl+C o SIGTERM) se termina lo encolado
+antes de cerrar el proceso, y los errores quedan guardados para informarlos.
+"""
+
+import atexit
+import queue
+import signal
+import sys
+import threading
+from concurrent.futures import Future
+
+from core.metricas import PROFUNDIDAD_COLA, REGISTRO
+
+
+TAMANO_COLA = 32
+
+_FIN = object()
+_ESCRITOR = None
+_LOCK = threading.Lock()
+
+
+class EscritorSegundoPlano:
+    """
+    Hilo de E/S con cola FIFO acotada.
+
+        escritor = EscritorSegundoPlano()
+        tarea = escritor.enviar("guardar la evaluación", guardar_evaluacion, ev, base_dir)
+        ...
+        id_registro = tarea.result()
+    """
+
+    def __init__(self, tamano_cola: int = TAMANO_COLA):
+        self._cola = queue.Queue(maxsize=tamano_cola)
+        self._fallos = []
+        self._lock = threading.Lock()
+        self._cerrado = False
+        self._hilo = threading.Thread(target=self._trabajar, name="escritor", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, descripcion: str, funcion, *args, **kwargs) -> Future:
+        """
+        Encola `funcion(*args, **kwargs)`.
+
+        Args:
+            descripcion: texto para informar el error si la tarea falla
+
+        Returns:
+            Future con el resultado de la función
+        """
+        if self._cerrado:
+            raise RuntimeError("El escritor en segundo plano ya se cerró")
+        futuro = Future()
+        if REGISTRO.activo:
+            PROFUNDIDAD_COLA.inc()
+        self._cola.put((descripcion, futuro, funcion, args, kwargs))
+        return futuro
+
+    def _trabajar(self) -> None:
+        while True:
+            tarea = self._cola.get()
+            if tarea is _FIN:
+                self._cola.task_done()
+                return
+            descripcion, futuro, funcion, args, kwargs = tarea
+            try:
+                if futuro.set_running_or_notify_cancel():
+                    futuro.set_result(funcion(*args, **kwargs))
+            except Exception as error:
+                with self._lock:
+                    self._fallos.append((descripcion, error))
+                futuro.set_exception(error)
+            finally:
+                if REGISTRO.activo:
+                    PROFUNDIDAD_COLA.dec()
+                self._cola.task_done()
+
+    def esperar(self) -> None:
+        """Bloquea hasta que se completen todas las tareas encoladas."""
+        self._cola.join()
+
+    def tomar_fallos(self) -> list:
+        """Errores aún no informados, como lista de (descripción, excepción)."""
+        with self._lock:
+            fallos, self._fallos = self._fallos, []
+        return fallos
+
+    def cerrar(self, timeout: float = None) -> list:
+        """Termina lo encolado, detiene el hilo y retorna los fallos pendientes."""
+        if not self._cerrado:
+            self._cerrado = True
+            self._cola.put(_FIN)
+            self._hilo.join(timeout)
+        return self.tomar_fallos()
+
+
+# ─── Escritor del proceso ──────────────────────────────────────────────────────
+def obtener_escritor() -> EscritorSegundoPlano:
+    """
+    Escritor compartido del proceso. La primera llamada lo crea, registra el
+    vaciado de la cola al salir y convierte SIGTERM en una salida normal para
+    que ese vaciado también ocurra.
+    """
+    global _ESCRITOR
+    with _LOCK:
+        if _ESCRITOR is None:
+            _ESCRITOR = EscritorSegundoPlano()
+            atexit.register(_vaciar_al_salir)
+            if (threading.current_thread() is threading.main_thread()
+                    and signal.getsignal(signal.SIGTERM) is signal.SIG_DFL):
+                signal.signal(signal.SIGTERM, _terminar)
+        return _ESCRITOR
+
+
+def _terminar(numero_senal, _marco) -> None:
+    sys.exit(128 + numero_senal)
+
+
+def _vaciar_al_salir() -> None:
+    for descripcion, error in _ESCRITOR.cerrar():
+        print(f"⚠️  No se pudo {descripcion}: {error}", file=sys.stderr)
@@ -0,0 +1,219 @@
+"""
+Historial particionado por equipo y mes.
+
+data/fragmentos/ guarda una copia del historial repartida en un fragmento por
+equipo (meta.equipo, sin distinguir tildes ni mayúsculas) y mes (meta.fecha),
+más un catálogo que describe cada fragmento:
+
+    catalogo.json           {"fragmentos": {"finanzas/2026-03": {equipo, mes, archivo, registros, id_min, id_max}}}
+    finanzas/2026-03.seg    id global + evaluación, en el formato de utils.segmento
+
+Como los demás índices derivados, se actualiza al guardar, se invalida con los
+borrados y ediciones y se reconstruye desde el historial si falta. Una consulta
+descarta con el catálogo los fragmentos que no cumplen el predicado (equipo,
+rango de meses) y lee los que quedan en paralelo, de modo que lo que cuesta
+depende de los datos del equipo y no del historial completo.
+"""
+
+import json
+import os
+import re
+import shutil
+import struct
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from .segmento import agregar_registros, codificar_registro, decodificar_registro, escribir_registros, iterar_registros
+from .texto import normalizar
+
+
+DIRECTORIO_FRAGMENTOS = "data/fragmentos"
+ARCHIVO_CATALOGO = "catalogo.json"
+SIN_FECHA = "sin-fecha"
+TRABAJADORES_MAXIMOS = 8
+
+_ID = struct.Struct("<I")
+_PATRON_MES = re.compile(r"^\d{4}-\d{2}")
+
+_CACHE = {}     # ruta del catálogo → (mtime_ns, catálogo)
+_LOCK = threading.Lock()
+
+
+# ─── Claves de partición ───────────────────────────────────────────────────────
+def clave_equipo(equipo: str) -> str:
+    """Nombre de directorio del equipo: "Finanzas Perú" → "finanzas-peru"."""
+    return re.sub(r"[^a-z0-9]+", "-", normalizar(equipo or "")).strip("-") or "sin-equipo"
+
+
+def mes_evaluacion(evaluacion: dict) -> str:
+    fecha = evaluacion["meta"].get("fecha") or ""
+    return fecha[:7] if _PATRON_MES.match(fecha) else SIN_FECHA
+
+
+def _clave_fragmento(evaluacion: dict) -> str:
+    return f"{clave_equipo(evaluacion['meta'].get('equipo'))}/{mes_evaluacion(evaluacion)}"
+
+
+# ─── Catálogo ──────────────────────────────────────────────────────────────────
+def _escribir_catalogo(directorio: str, catalogo: dict) -> None:
+    ruta = os.path.join(directorio, ARCHIVO_CATALOGO)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(catalogo, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporal, ruta)
+
+
+def _agregar(directorio: str, catalogo: dict, registros: list) -> None:
+    """Agrega [(id, evaluación)] a sus fragmentos, una escritura por fragmento."""
+    grupos = defaultdict(list)
+    for id_registro, evaluacion in registros:
+        grupos[_clave_fragmento(evaluacion)].append((id_registro, evaluacion))
+    fragmentos = catalogo["fragmentos"]
+    for clave, grupo in grupos.items():
+        datos = [_ID.pack(id_registro) + codificar_registro(ev) for id_registro, ev in grupo]
+        entrada = fragmentos.get(clave)
+        if entrada is None:
+            primera = grupo[0][1]["meta"]
+            entrada = fragmentos[clave] = {
+                "equipo": primera.get("equipo") or "", "mes": clave.split("/")[1],
+                "archivo": f"{clave}.seg", "registros": 0,
+                "id_min": grupo[0][0], "id_max": grupo[0][0],
+            }
+            ruta = os.path.join(directorio, entrada["archivo"])
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            escribir_registros(ruta, datos)
+        else:
+            agregar_registros(os.path.join(directorio, entrada["archivo"]), datos)
+        entrada["registros"] += len(grupo)
+        entrada["id_min"] = min(entrada["id_min"], grupo[0][0])
+        entrada["id_max"] = max(entrada["id_max"], grupo[-1][0])
+
+
+def _reconstruir(base_dir: str, directorio: str) -> None:
+    from .persistencia import iterar_historial
+
+    temporal = f"{directorio}.tmp"
+    if os.path.exists(temporal):
+        shutil.rmtree(temporal)
+    os.makedirs(temporal)
+    catalogo = {"fragmentos": {}}
+    lote = []
+    for registro in iterar_historial(base_dir):
+        lote.append(registro)
+        if len(lote) == 5000:
+            _agregar(temporal, catalogo, lote)
+            lote = []
+    _agregar(temporal, catalogo, lote)
+    _escribir_catalogo(temporal, catalogo)
+    if os.path.exists(directorio):
+        shutil.rmtree(directorio)
+    os.replace(temporal, directorio)
+
+
+def cargar_catalogo(base_dir: str) -> dict:
+    """Catálogo de fragmentos; si no existe se construye desde el historial."""
+    directorio = os.path.join(base_dir, DIRECTORIO_FRAGMENTOS)
+    ruta = os.path.join(directorio, ARCHIVO_CATALOGO)
+    with _LOCK:
+        if not os.path.exists(ruta):
+            _reconstruir(base_dir, directorio)
+        version = os.stat(ruta).st_mtime_ns
+        entrada = _CACHE.get(ruta)
+        if entrada is None or entrada[0] != version:
+            with open(ruta, encoding="utf-8") as f:
+                entrada = _CACHE[ruta] = (version, json.load(f))
+        return entrada[1]
+
+
+def indexar_fragmentos_lote(registros: list, base_dir: str) -> None:
+    """Agrega [(id, evaluación)] recién guardadas a sus fragmentos."""
+    directorio = os.path.join(base_dir, DIRECTORIO_FRAGMENTOS)
+    catalogo = cargar_catalogo(base_dir)
+    with _LOCK:
+        _agregar(directorio, catalogo, registros)
+        _escribir_catalogo(directorio, catalogo)
+        _CACHE.pop(os.path.join(directorio, ARCHIVO_CATALOGO), None)
+
+
+def invalidar_fragmentos(base_dir: str) -> None:
+    directorio = os.path.join(base_dir, DIRECTORIO_FRAGMENTOS)
+    with _LOCK:
+        if os.path.exists(directorio):
+            shutil.rmtree(directorio)
+        _CACHE.pop(os.path.join(directorio, ARCHIVO_CATALOGO), None)
+
+
+# ─── Consultas ─────────────────────────────────────────────────────────────────
+def podar_fragmentos(catalogo: dict, equipo: str = None, desde: str = None, hasta: str = None) -> list:
+    """
+    Entradas del catálogo que pueden contener evaluaciones del predicado.
+
+    Args:
+        equipo: nombre del equipo (se compara sin tildes ni mayúsculas)
+        desde, hasta: meses "AAAA-MM" inclusive; con un rango, los registros
+            sin fecha quedan fuera
+    """
+    clave = clave_equipo(equipo) if equipo is not None else None
+    seleccion = []
+    for nombre, entrada in catalogo["fragmentos"].items():
+        if clave is not None and nombre.split("/")[0] != clave:
+            continue
+        mes = entrada["mes"]
+        if (desde or hasta) and mes == SIN_FECHA:
+            continue
+        if (desde and mes < desde) or (hasta and mes > hasta):
+            continue
+        seleccion.append(entrada)
+    return seleccion
+
+
+def _leer_fragmento(ruta: str, filtro) -> list:
+    filas = []
+    for datos in iterar_registros(ruta):
+        evaluacion = decodificar_registro(datos[_ID.size:])
+        if evaluacion is not None and (filtro is None or filtro(evaluacion)):
+            filas.append((_ID.unpack_from(datos)[0], evaluacion))
+    return filas
+
+
+def consultar_historial(base_dir: str, equipo: str = None, desde: str = None, hasta: str = None,
+                        filtro=None, trabajadores: int = None) -> list:
+    """
+    Evaluaciones del historial que cumplen el predicado, leyendo solo los
+    fragmentos que pueden contenerlas.
+
+    Args:
+        equipo, desde, hasta: ver `podar_fragmentos`
+        filtro: función opcional evaluación → bool aplicada a cada registro leído
+        trabajadores: hilos para leer fragmentos en paralelo (por defecto, uno
+            por fragmento hasta `TRABAJADORES_MAXIMOS`)
+
+    Returns:
+        list de (id, evaluación) ordenada por id
+    """
+    directorio = os.path.join(base_dir, DIRECTORIO_FRAGMENTOS)
+    fragmentos = podar_fragmentos(cargar_catalogo(base_dir), equipo, desde, hasta)
+    rutas = [os.path.join(directorio, entrada["archivo"]) for entrada in fragmentos]
+    if not rutas:
+        return []
+    trabajadores = min(trabajadores or TRABAJADORES_MAXIMOS, len(rutas))
+    if trabajadores == 1:
+        partes = [_leer_fragmento(ruta, filtro) for ruta in rutas]
+    else:
+        with ThreadPoolExecutor(max_workers=trabajadores) as pool:
+            partes = list(pool.map(lambda ruta: _leer_fragmento(ruta, filtro), rutas))
+    filas = [fila for parte in partes for fila in parte]
+    filas.sort(key=lambda fila: fila[0])
+    return filas
+
+
+def equipos_historial(base_dir: str) -> list:
+    """[(equipo, evaluaciones)] según el catálogo, de mayor a menor."""
+    totales = defaultdict(int)
+    nombres = {}
+    for clave, entrada in cargar_catalogo(base_dir)["fragmentos"].items():
+        equipo = clave.split("/")[0]
+        totales[equipo] += entrada["registros"]
+        nombres.setdefault(equipo, entrada["equipo"])
+    return sorted(((nombres[e], n) for e, n in totales.items()), key=lambda par: -par[1])
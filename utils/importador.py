@@ -0,0 +1,368 @@
+"""
+Importación masiva de cuestionarios respondidos fuera de la terminal
+(exportaciones CSV de Google Forms o Excel, o JSON Lines).
+
+Cada columna se asigna a un campo con un mapa de columnas: un `pregunta_id`
+de CATEGORIAS (p1_1, p2_3, ...) o un campo de meta (nombre_iniciativa,
+equipo, responsable, descripcion, fecha). Sin mapa explícito se reconocen
+encabezados iguales al id, al texto de la pregunta (como los exporta Google
+Forms) o a los nombres habituales de los campos de meta.
+
+El archivo se lee en streaming y se procesa por lotes: cada lote se valida
+(con errores precisos por fila y columna), se puntúa en un pool de procesos y
+se guarda con `guardar_evaluaciones` (una escritura por archivo por lote).
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from core.evaluador import calcular_puntaje, generar_veredicto, motor_reglas
+from core.incertidumbre import (
+    interpretar_distribucion, opcion_mas_probable, parece_distribucion, resumir_incertidumbre,
+    validar_distribucion,
+)
+from core.metricas import EVALUACIONES_PUNTUADAS, PUNTAJE_GLOBAL, REGISTRO, VEREDICTOS
+from core.preguntas import CATEGORIAS, PUNTOS
+from .texto import normalizar
+
+
+FILAS_POR_LOTE = 500
+CAMPOS_META = ("nombre_iniciativa", "equipo", "responsable", "descripcion", "fecha")
+VALORES_POR_DEFECTO = {          # los mismos que usa la terminal si se deja vacío
+    "equipo": "No especificado",
+    "responsable": "Anónimo",
+    "descripcion": "No especificada",
+}
+FORMATOS_FECHA = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+_PREGUNTAS = {p["id"]: p for c in CATEGORIAS for p in c["preguntas"]}
+_OPCIONES = {       # pregunta_id → {letra o texto normalizado de la opción: (letra, puntaje)}
+    pid: {
+        clave: (letra, PUNTOS[pid][letra])
+        for letra, texto, _ in p["opciones"]
+        for clave in (letra, normalizar(texto).strip())
+    }
+    for pid, p in _PREGUNTAS.items()
+}
+
+_ALIAS = {
+    "nombre_iniciativa": "nombre_iniciativa", "nombre de la iniciativa": "nombre_iniciativa",
+    "iniciativa": "nombre_iniciativa", "nombre": "nombre_iniciativa",
+    "equipo": "equipo", "empresa": "equipo", "equipo o empresa": "equipo", "equipo / empresa": "equipo",
+    "responsable": "responsable", "tu nombre / responsable": "responsable",
+    "descripcion": "descripcion", "descripción": "descripcion",
+    "fecha": "fecha", "marca temporal": "fecha", "timestamp": "fecha",
+}
+_ALIAS = {normalizar(k): v for k, v in _ALIAS.items()}
+_ALIAS.update({pid: pid for pid in _PREGUNTAS})
+_ALIAS.update({normalizar(p["texto"]).strip(): pid for pid, p in _PREGUNTAS.items()})
+
+
+class ErrorFila(ValueError):
+    """Valor inválido en una celda del archivo importado."""
+
+    def __init__(self, fila: int, columna: str, mensaje: str):
+        super().__init__(f"Fila {fila}, columna '{columna}': {mensaje}")
+        self.fila = fila
+        self.columna = columna
+        self.mensaje = mensaje
+
+
+# ─── Mapa de columnas ──────────────────────────────────────────────────────────
+def cargar_mapa_columnas(ruta: str) -> dict:
+    """Lee un mapa {encabezado del archivo: pregunta_id o campo de meta} en JSON."""
+    with open(ruta, encoding="utf-8") as f:
+        mapa = json.load(f)
+    desconocidos = [v for v in mapa.values() if v not in _PREGUNTAS and v not in CAMPOS_META]
+    if desconocidos:
+        raise ValueError(f"El mapa de columnas apunta a campos inexistentes: {', '.join(desconocidos)}")
+    return mapa
+
+
+def resolver_columnas(encabezados: list, mapa: dict = None) -> dict:
+    """
+    Asigna cada encabezado a un campo. Las columnas no reconocidas se ignoran.
+
+    Returns:
+        dict {encabezado: campo}
+
+    Raises:
+        ValueError: si faltan preguntas o el nombre de la iniciativa, o si dos
+                    columnas apuntan al mismo campo
+    """
+    columnas = {}
+    for encabezado in encabezados:
+        if mapa is not None:
+            campo = mapa.get(encabezado)
+        else:
+            campo = _ALIAS.get(normalizar(encabezado or "").strip())
+        if campo is None:
+            continue
+        if campo in columnas.values():
+            otra = next(c for c, v in columnas.items() if v == campo)
+            raise ValueError(f"Las columnas '{otra}' y '{encabezado}' apuntan ambas a {campo}")
+        columnas[encabezado] = campo
+
+    asignados = set(columnas.values())
+    faltantes = [pid for pid in _PREGUNTAS if pid not in asignados]
+    if "nombre_iniciativa" not in asignados:
+        faltantes.insert(0, "nombre_iniciativa")
+    if faltantes:
+        raise ValueError(f"Faltan columnas para: {', '.join(faltantes)}")
+    return columnas
+
+
+# ─── Validación ────────────────────────────────────────────────────────────────
+def _opcion(valor: str, pid: str):
+    """
+    (letra, puntaje) de la opción elegida, o None. Acepta "b", "B) texto",
+    "B. texto" o el texto de la opción (sin distinguir mayúsculas ni tildes).
+    """
+    opciones = _OPCIONES[pid]
+    elegida = opciones.get(valor.upper())
+    if elegida is None and len(valor) > 1 and valor[1] in ").-:":
+        elegida = opciones.get(valor[0].upper())
+    if elegida is None:
+        elegida = opciones.get(normalizar(valor))
+    return elegida
+
+
+def _fecha(valor: str) -> str:
+    valor = valor.strip()
+    try:
+        return datetime.fromisoformat(valor).isoformat()
+    except ValueError:
+        pass
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(valor, formato).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _distribucion(valor, pid: str):
+    """
+    {letra: probabilidad} si la celda reparte la respuesta entre opciones
+    ("A:70 B:30" o, en JSON, {"A": 0.7, "B": 0.3}); None si no lo intenta.
+
+    Raises:
+        ValueError: si lo intenta pero la distribución no es válida
+    """
+    if isinstance(valor, dict):
+        return validar_distribucion(valor, pid)
+    if parece_distribucion(valor):
+        return interpretar_distribucion(valor, pid)
+    return None
+
+
+def validar_fila(fila: dict, columnas: dict, numero: int) -> tuple:
+    """
+    Convierte una fila del archivo en (meta, respuestas, distribuciones)
+    listos para puntuar. `distribuciones` tiene las preguntas respondidas con
+    duda; en `respuestas` queda su opción más probable.
+
+    Raises:
+        ErrorFila: en la primera celda inválida
+    """
+    meta = dict(VALORES_POR_DEFECTO)
+    respuestas = {}
+    distribuciones = {}
+    for encabezado, campo in columnas.items():
+        valor = fila.get(encabezado)
+        pregunta = _PREGUNTAS.get(campo)
+        if not isinstance(valor, dict):
+            valor = "" if valor is None else str(valor).strip()
+        if pregunta is not None:
+            if not valor:
+                raise ErrorFila(numero, encabezado, f"falta la respuesta de {campo}")
+            try:
+                distribucion = _distribucion(valor, campo)
+            except ValueError as e:
+                raise ErrorFila(numero, encabezado, f"'{valor}': {e}")
+            if distribucion is not None:
+                elegida = opcion_mas_probable(distribucion, campo)
+                if len(distribucion) > 1:
+                    distribuciones[campo] = distribucion
+            else:
+                elegida = _opcion(valor, campo)
+            if elegida is None:
+                validas = ", ".join(op[0] for op in pregunta["opciones"])
+                raise ErrorFila(numero, encabezado, f"'{valor}' no es una opción de {campo} ({validas})")
+            respuestas[campo] = list(elegida)
+        elif isinstance(valor, dict):
+            raise ErrorFila(numero, encabezado, "se esperaba texto")
+        elif campo == "fecha":
+            if valor:
+                fecha = _fecha(valor)
+                if fecha is None:
+                    raise ErrorFila(numero, encabezado, f"fecha no reconocida: '{valor}'")
+                meta["fecha"] = fecha
+        elif valor:
+            meta[campo] = valor
+    if not meta.get("nombre_iniciativa"):
+        columna = next(c for c, v in columnas.items() if v == "nombre_iniciativa")
+        raise ErrorFila(numero, columna, "falta el nombre de la iniciativa")
+    meta.setdefault("fecha", datetime.now().isoformat())
+    # Mismo orden de claves que recoger_metadatos
+    meta = {campo: meta[campo] for campo in CAMPOS_META}
+    return meta, respuestas, distribuciones
+
+
+# ─── Lectura en streaming ──────────────────────────────────────────────────────
+def _delimitador(muestra: str) -> str:
+    """
+    Separador del CSV: el que da la misma cantidad de columnas (y la mayor)
+    en las primeras líneas. Excel en configuración regional española usa ";".
+    """
+    lineas = muestra.splitlines()[:-1] or muestra.splitlines()
+    mejor, mejor_columnas = ",", 1
+    for candidato in (",", ";", "\t"):
+        anchos = {len(fila) for fila in csv.reader(lineas[:20], delimiter=candidato)}
+        if len(anchos) == 1 and anchos.pop() > mejor_columnas:
+            mejor, mejor_columnas = candidato, len(next(csv.reader(lineas[:1], delimiter=candidato)))
+    return mejor
+
+
+def leer_filas(ruta: str):
+    """
+    Itera (número de fila, dict) del archivo. CSV (el separador se detecta) y
+    JSON Lines se leen en streaming; un .json con un arreglo se carga entero.
+    Los números de fila del CSV son los de la planilla (el encabezado es la 1).
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".jsonl":
+        with open(ruta, encoding="utf-8") as f:
+            for numero, linea in enumerate(f, 1):
+                if linea.strip():
+                    yield numero, json.loads(linea)
+    elif extension == ".json":
+        with open(ruta, encoding="utf-8") as f:
+            yield from enumerate(json.load(f), 1)
+    else:
+        # utf-8-sig: Excel agrega BOM al exportar CSV UTF-8
+        with open(ruta, newline="", encoding="utf-8-sig") as f:
+            muestra = f.read(65536)
+            f.seek(0)
+            lector = csv.DictReader(f, delimiter=_delimitador(muestra))
+            for numero, fila in enumerate(lector, 2):
+                yield numero, fila
+
+
+def encabezados_archivo(ruta: str) -> list:
+    """Encabezados (o claves del primer objeto, en JSON) del archivo."""
+    for _, fila in leer_filas(ruta):
+        return list(fila.keys())
+    return []
+
+
+# ─── Puntuación ────────────────────────────────────────────────────────────────
+def puntuar_lote(lote: list, motor=None) -> list:
+    """
+    [(meta, respuestas, distribuciones)] → evaluaciones completas. Corre en los
+    procesos del pool, que reciben el motor de reglas del proceso que importa.
+    """
+    evaluaciones = []
+    for meta, respuestas, distribuciones in lote:
+        resultados = calcular_puntaje(respuestas, registrar_metricas=False)
+        veredicto = generar_veredicto(
+            resultados["puntaje_global"], resultados["categorias"], registrar_metricas=False, motor=motor
+        )
+        evaluacion = {"meta": meta, "respuestas": respuestas, "resultados": resultados, "veredicto": veredicto}
+        if distribuciones:
+            evaluacion["incertidumbre"] = resumir_incertidumbre(respuestas, distribuciones)
+        evaluaciones.append(evaluacion)
+    return evaluaciones
+
+
+def _registrar_metricas(evaluaciones: list) -> None:
+    # Las métricas de los procesos del pool no llegan al registro del padre
+    if not REGISTRO.activo:
+        return
+    EVALUACIONES_PUNTUADAS.inc(len(evaluaciones))
+    for evaluacion in evaluaciones:
+        PUNTAJE_GLOBAL.observar(evaluacion["resultados"]["puntaje_global"])
+        VEREDICTOS.con(evaluacion["veredicto"]["nivel"]).inc()
+
+
+def importar_respuestas(ruta: str, base_dir: str, mapa: dict = None, simular: bool = False,
+                        omitir_duplicados: bool = False, trabajadores: int = None,
+                        filas_por_lote: int = FILAS_POR_LOTE) -> dict:
+    """
+    Importa un archivo de respuestas al historial.
+
+    Las filas inválidas no se importan y se reportan; el resto sí.
+
+    Args:
+        mapa: {encabezado: pregunta_id o campo de meta}; None para reconocer
+              los encabezados automáticamente
+        simular: valida y puntúa sin guardar nada
+        omitir_duplicados: no guardar las filas detectadas como duplicado
+        trabajadores: procesos del pool de puntuación (1 = en este proceso)
+
+    Returns:
+        dict con leidas, importadas, duplicadas, omitidas, errores (lista de
+        ErrorFila), ids y segundos
+
+    Raises:
+        ValueError: si las columnas del archivo no cubren el cuestionario
+    """
+    from .persistencia import guardar_evaluaciones
+
+    inicio = time.perf_counter()
+    columnas = resolver_columnas(encabezados_archivo(ruta), mapa)
+    trabajadores = trabajadores or os.cpu_count() or 1
+    motor = motor_reglas()
+    resumen = {"leidas": 0, "importadas": 0, "duplicadas": 0, "omitidas": 0, "errores": [], "ids": []}
+
+    def persistir(evaluaciones: list) -> None:
+        _registrar_metricas(evaluaciones)
+        if simular:
+            resumen["importadas"] += len(evaluaciones)
+            return
+        ids = guardar_evaluaciones(evaluaciones, base_dir, omitir_duplicados)
+        for id_registro, evaluacion in zip(ids, evaluaciones):
+            if id_registro is None:
+                resumen["omitidas"] += 1
+                continue
+            resumen["importadas"] += 1
+            resumen["ids"].append(id_registro)
+            if "duplicado_de" in evaluacion["meta"]:
+                resumen["duplicadas"] += 1
+
+    def lotes():
+        lote = []
+        for numero, fila in leer_filas(ruta):
+            resumen["leidas"] += 1
+            try:
+                lote.append(validar_fila(fila, columnas, numero))
+            except ErrorFila as error:
+                resumen["errores"].append(error)
+                continue
+            if len(lote) == filas_por_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    if trabajadores == 1:
+        for lote in lotes():
+            persistir(puntuar_lote(lote, motor))
+    else:
+        # Como mucho 2 lotes por proceso en vuelo: la memoria no depende del
+        # tamaño del archivo y los lotes se guardan en el orden del archivo.
+        with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+            pendientes = []
+            for lote in lotes():
+                pendientes.append(pool.submit(puntuar_lote, lote, motor))
+                if len(pendientes) >= 2 * trabajadores:
+                    persistir(pendientes.pop(0).result())
+            for futuro in pendientes:
+                persistir(futuro.result())
+
+    resumen["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resumen
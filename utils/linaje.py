@@ -0,0 +1,383 @@
+"""
+Linaje de iniciativas: las re-evaluaciones de una misma iniciativa como una
+cadena de versiones.
+
+Cada iniciativa tiene un id estable: el # de su primera evaluación. Una
+evaluación nueva se asocia a una iniciativa existente si trae
+meta["iniciativa_id"] (--iniciativa) o si coinciden equipo y nombre (sin
+distinguir tildes, mayúsculas ni puntuación); si no, inicia una iniciativa.
+
+data/linaje/ guarda una cadena por iniciativa, más un catálogo:
+
+    iniciativas.json    {"iniciativas": {"12": {nombre, equipo, versiones, ultimo_id,
+                         ultimos_cambios, instantanea}}, "claves": {"equipo/nombre": 12}}
+    12.jsonl            una versión por línea
+
+La versión 1 y cada `INTERVALO_INSTANTANEA` versiones se guarda una copia
+completa (letras y meta); las demás, solo las respuestas y campos de meta que
+cambiaron respecto de la anterior. Reconstruir una versión lee como máximo
+`INTERVALO_INSTANTANEA` líneas desde la copia completa anterior. Toda línea
+lleva además el puntaje global, el porcentaje por categoría y el nivel con que
+se guardó la evaluación, así la trayectoria sale de recorrer la cadena sin leer
+el historial y sin volver a puntuar con el cuestionario o las reglas actuales.
+
+Como los demás índices derivados, se actualiza al guardar, se invalida con los
+borrados y ediciones y se reconstruye desde el historial si falta.
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+
+from core.adaptativo import banda
+from core.modelo import EMOJI_NIVEL, NIVELES
+from core.preguntas import CATEGORIAS
+from .fragmentos import clave_equipo
+from .similitud import letras_respuestas
+from .texto import normalizar
+
+
+DIRECTORIO_LINAJE = "data/linaje"
+ARCHIVO_CATALOGO = "iniciativas.json"
+FORMATO_LINAJE = 2                  # cambia con el formato de las líneas (se reconstruye)
+INTERVALO_INSTANTANEA = 8           # cada cuántas versiones se guarda una copia completa
+CAMPOS_META = ("nombre_iniciativa", "equipo", "responsable", "descripcion")
+SIN_RESPONDER = "-"
+
+_ORDEN = [preg["id"] for cat in CATEGORIAS for preg in cat["preguntas"]]
+_POSICION = {pid: i for i, pid in enumerate(_ORDEN)}
+
+_CACHE = {}     # ruta del catálogo → (mtime_ns, catálogo)
+_LOCK = threading.Lock()
+
+
+# ─── Identidad de la iniciativa ────────────────────────────────────────────────
+def clave_iniciativa(meta: dict) -> str:
+    """Clave de coincidencia: "Finanzas Perú", "OCR de Facturas!" → "finanzas-peru/ocr de facturas"."""
+    nombre = re.sub(r"[^a-z0-9]+", " ", normalizar(meta.get("nombre_iniciativa") or "")).strip()
+    return f"{clave_equipo(meta.get('equipo'))}/{nombre}"
+
+
+def iniciativa_de(catalogo: dict, evaluacion: dict, id_registro: int) -> int:
+    meta = evaluacion["meta"]
+    if isinstance(meta.get("iniciativa_id"), int):
+        return meta["iniciativa_id"]
+    return catalogo["claves"].get(clave_iniciativa(meta), id_registro)
+
+
+# ─── Versiones ─────────────────────────────────────────────────────────────────
+def _version(numero: int, id_registro: int, evaluacion: dict, anterior: tuple) -> tuple:
+    """
+    (línea de la versión, letras, meta, respuestas cambiadas). `anterior` es
+    (letras, meta) de la versión previa, o None para la primera.
+    """
+    letras = letras_respuestas(evaluacion)
+    meta = {campo: evaluacion["meta"].get(campo, "") for campo in CAMPOS_META}
+    resultados = evaluacion["resultados"]
+    nivel = evaluacion["veredicto"]["nivel"]
+    linea = {
+        "v": numero, "id": id_registro, "fecha": evaluacion["meta"].get("fecha", ""),
+        "puntaje": resultados["puntaje_global"],
+        "categorias": {cat["id"]: cat["porcentaje"] for cat in resultados["categorias"]},
+        "nivel": NIVELES.index(nivel) if nivel in NIVELES else banda(resultados["puntaje_global"]),
+    }
+    cambios = {} if anterior is None else _cambios(anterior[0], letras)
+    if (numero - 1) % INTERVALO_INSTANTANEA == 0:
+        linea["letras"] = letras
+        linea["meta"] = meta
+    else:
+        linea["cambios"] = cambios
+        cambios_meta = _cambios_meta(anterior[1], meta)
+        if cambios_meta:
+            linea["meta"] = cambios_meta
+    return linea, letras, meta, len(cambios)
+
+
+def _cambios(anteriores: str, letras: str) -> dict:
+    return {_ORDEN[i]: nueva for i, (vieja, nueva) in enumerate(zip(anteriores, letras)) if vieja != nueva}
+
+
+def _cambios_meta(anterior: dict, meta: dict) -> dict:
+    return {campo: valor for campo, valor in meta.items() if anterior.get(campo) != valor}
+
+
+def _aplicar(estado: tuple, linea: dict) -> tuple:
+    """(letras, meta) tras aplicar una línea a (letras, meta) de la versión anterior."""
+    if "letras" in linea:
+        return linea["letras"], dict(linea["meta"])
+    letras = list(estado[0])
+    for pid, letra in linea["cambios"].items():
+        letras[_POSICION[pid]] = letra
+    meta = dict(estado[1])
+    meta.update(linea.get("meta", {}))
+    return "".join(letras), meta
+
+
+def _leer_lineas(ruta: str, desde: int = 0) -> list:
+    with open(ruta, "rb") as f:
+        f.seek(desde)
+        return [json.loads(linea) for linea in f.read().splitlines() if linea]
+
+
+def _estado_actual(directorio: str, iniciativa_id: int, entrada: dict) -> tuple:
+    """(letras, meta) de la última versión, desde la última copia completa."""
+    estado = None
+    for linea in _leer_lineas(os.path.join(directorio, f"{iniciativa_id}.jsonl"), entrada["instantanea"]):
+        estado = _aplicar(estado, linea)
+    return estado
+
+
+# ─── Catálogo ──────────────────────────────────────────────────────────────────
+def _escribir_catalogo(directorio: str, catalogo: dict) -> None:
+    ruta = os.path.join(directorio, ARCHIVO_CATALOGO)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(catalogo, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporal, ruta)
+
+
+def _agregar(directorio: str, catalogo: dict, registros: list, estados: dict = None) -> None:
+    """
+    Agrega [(id, evaluación)] a las cadenas de sus iniciativas, una escritura
+    por iniciativa. `estados` (iniciativa → (letras, meta)) evita releer la
+    última versión de cada cadena; se actualiza con lo agregado.
+    """
+    estados = {} if estados is None else estados
+    iniciativas = catalogo["iniciativas"]
+    pendientes = {}         # iniciativa → [bytes de cada línea nueva]
+    for id_registro, evaluacion in registros:
+        iniciativa_id = iniciativa_de(catalogo, evaluacion, id_registro)
+        entrada = iniciativas.get(str(iniciativa_id))
+        if entrada is None:
+            entrada = iniciativas[str(iniciativa_id)] = {"versiones": 0, "bytes": 0, "instantanea": 0}
+            anterior = None
+        elif iniciativa_id in estados:
+            anterior = estados[iniciativa_id]
+        else:
+            anterior = _estado_actual(directorio, iniciativa_id, entrada)
+        linea, letras, meta, cambiadas = _version(entrada["versiones"] + 1, id_registro, evaluacion, anterior)
+        datos = (json.dumps(linea, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        if "letras" in linea:
+            entrada["instantanea"] = entrada["bytes"]
+        entrada.update(
+            nombre=meta["nombre_iniciativa"], equipo=meta["equipo"], versiones=linea["v"],
+            ultimo_id=id_registro, ultimos_cambios=cambiadas, bytes=entrada["bytes"] + len(datos),
+        )
+        catalogo["claves"][clave_iniciativa(meta)] = iniciativa_id
+        estados[iniciativa_id] = (letras, meta)
+        pendientes.setdefault(iniciativa_id, []).append(datos)
+    for iniciativa_id, lineas in pendientes.items():
+        with open(os.path.join(directorio, f"{iniciativa_id}.jsonl"), "ab") as f:
+            f.write(b"".join(lineas))
+
+
+def _reconstruir(base_dir: str, directorio: str) -> None:
+    from .persistencia import iterar_historial
+
+    temporal = f"{directorio}.tmp"
+    if os.path.exists(temporal):
+        shutil.rmtree(temporal)
+    os.makedirs(temporal)
+    catalogo = {"formato": FORMATO_LINAJE, "iniciativas": {}, "claves": {}}
+    estados = {}
+    lote = []
+    for registro in iterar_historial(base_dir):
+        lote.append(registro)
+        if len(lote) == 5000:
+            _agregar(temporal, catalogo, lote, estados)
+            lote = []
+    _agregar(temporal, catalogo, lote, estados)
+    _escribir_catalogo(temporal, catalogo)
+    if os.path.exists(directorio):
+        shutil.rmtree(directorio)
+    os.replace(temporal, directorio)
+
+
+def cargar_catalogo(base_dir: str) -> dict:
+    """
+    Catálogo de iniciativas; si no existe, o es de un formato anterior, se
+    construye desde el historial.
+    """
+    directorio = os.path.join(base_dir, DIRECTORIO_LINAJE)
+    ruta = os.path.join(directorio, ARCHIVO_CATALOGO)
+    with _LOCK:
+        if not os.path.exists(ruta):
+            _reconstruir(base_dir, directorio)
+        version = os.stat(ruta).st_mtime_ns
+        entrada = _CACHE.get(ruta)
+        if entrada is None or entrada[0] != version:
+            with open(ruta, encoding="utf-8") as f:
+                catalogo = json.load(f)
+            if catalogo.get("formato") != FORMATO_LINAJE:
+                _reconstruir(base_dir, directorio)
+                version = os.stat(ruta).st_mtime_ns
+                with open(ruta, encoding="utf-8") as f:
+                    catalogo = json.load(f)
+            entrada = _CACHE[ruta] = (version, catalogo)
+        return entrada[1]
+
+
+def asignar_iniciativas(evaluaciones: list, base_dir: str) -> None:
+    """
+    Antes de guardar: anota meta["iniciativa_id"] en las evaluaciones que
+    coinciden (equipo y nombre) con una iniciativa existente. Las demás
+    inician la suya al guardarse (ver también `enlazar_lote`).
+    """
+    claves = cargar_catalogo(base_dir)["claves"]
+    for evaluacion in evaluaciones:
+        meta = evaluacion["meta"]
+        if "iniciativa_id" not in meta:
+            iniciativa_id = claves.get(clave_iniciativa(meta))
+            if iniciativa_id is not None:
+                meta["iniciativa_id"] = iniciativa_id
+
+
+def enlazar_lote(registros: list) -> None:
+    """
+    Para [(id, evaluación)] de un mismo lote, ya con sus ids definitivos: las
+    evaluaciones sin iniciativa que comparten equipo y nombre con una anterior
+    del lote quedan como re-evaluaciones de esa. Así el id queda anotado en el
+    registro y el linaje no depende de la primera si luego se borra.
+    """
+    primeras = {}
+    for id_registro, evaluacion in registros:
+        meta = evaluacion["meta"]
+        if "iniciativa_id" in meta:
+            continue
+        clave = clave_iniciativa(meta)
+        if clave in primeras:
+            meta["iniciativa_id"] = primeras[clave]
+        else:
+            primeras[clave] = id_registro
+
+
+def indexar_linaje_lote(registros: list, base_dir: str) -> None:
+    """Agrega [(id, evaluación)] recién guardadas a la cadena de su iniciativa."""
+    directorio = os.path.join(base_dir, DIRECTORIO_LINAJE)
+    catalogo = cargar_catalogo(base_dir)
+    with _LOCK:
+        _agregar(directorio, catalogo, registros)
+        _escribir_catalogo(directorio, catalogo)
+        _CACHE.pop(os.path.join(directorio, ARCHIVO_CATALOGO), None)
+
+
+def invalidar_linaje(base_dir: str) -> None:
+    directorio = os.path.join(base_dir, DIRECTORIO_LINAJE)
+    with _LOCK:
+        if os.path.exists(directorio):
+            shutil.rmtree(directorio)
+        _CACHE.pop(os.path.join(directorio, ARCHIVO_CATALOGO), None)
+
+
+# ─── Consultas ─────────────────────────────────────────────────────────────────
+def obtener_iniciativa(iniciativa_id: int, base_dir: str) -> dict:
+    """Entrada del catálogo de la iniciativa (nombre, equipo, versiones, ...), o None."""
+    return cargar_catalogo(base_dir)["iniciativas"].get(str(iniciativa_id))
+
+
+def resolver_iniciativa(id_registro: int, base_dir: str) -> int:
+    """
+    Id de iniciativa a partir de un id de iniciativa o del # de cualquiera de
+    sus evaluaciones; None si no corresponde a ninguna.
+    """
+    from .persistencia import obtener_evaluacion
+
+    catalogo = cargar_catalogo(base_dir)
+    if str(id_registro) in catalogo["iniciativas"]:
+        return id_registro
+    evaluacion = obtener_evaluacion(id_registro, base_dir)
+    if evaluacion is None:
+        return None
+    iniciativa_id = iniciativa_de(catalogo, evaluacion, id_registro)
+    return iniciativa_id if str(iniciativa_id) in catalogo["iniciativas"] else None
+
+
+def version_iniciativa(iniciativa_id: int, version: int, base_dir: str) -> tuple:
+    """
+    (letras, meta) de una versión de la iniciativa, aplicando los cambios
+    desde la copia completa anterior.
+
+    Raises:
+        KeyError: si la iniciativa o la versión no existen
+    """
+    entrada = obtener_iniciativa(iniciativa_id, base_dir)
+    if entrada is None or not 1 <= version <= entrada["versiones"]:
+        raise KeyError(f"iniciativa #{iniciativa_id} versión {version}")
+    ruta = os.path.join(base_dir, DIRECTORIO_LINAJE, f"{iniciativa_id}.jsonl")
+    primera = (version - 1) // INTERVALO_INSTANTANEA * INTERVALO_INSTANTANEA
+    estado = None
+    with open(ruta, "rb") as f:
+        for numero, linea in enumerate(f):
+            if numero >= primera:
+                estado = _aplicar(estado, json.loads(linea))
+            if numero == version - 1:
+                break
+    return estado
+
+
+def evolucion_iniciativa(iniciativa_id: int, base_dir: str) -> list:
+    """
+    Trayectoria de la iniciativa, versión por versión, con los puntajes y el
+    nivel tal como se guardaron.
+
+    Returns:
+        list de dicts con version, id, fecha, puntaje_global, categorias
+        (porcentaje por categoría en el orden del cuestionario; None si la
+        versión no tenía esa categoría), nivel, cambios ({pregunta_id: letra
+        nueva}) y meta (campos que cambiaron); [] si la iniciativa no existe
+    """
+    if obtener_iniciativa(iniciativa_id, base_dir) is None:
+        return []
+    estado = (SIN_RESPONDER * len(_ORDEN), {})
+    trayectoria = []
+    for linea in _leer_lineas(os.path.join(base_dir, DIRECTORIO_LINAJE, f"{iniciativa_id}.jsonl")):
+        letras, meta = _aplicar(estado, linea)
+        cambios = linea["cambios"] if "cambios" in linea else _cambios(estado[0], letras)
+        trayectoria.append({
+            "version": linea["v"],
+            "id": linea["id"],
+            "fecha": linea["fecha"],
+            "puntaje_global": linea["puntaje"],
+            "categorias": [linea["categorias"].get(cat["id"]) for cat in CATEGORIAS],
+            "nivel": NIVELES[linea["nivel"]],
+            "cambios": cambios if linea["v"] > 1 else {},
+            "meta": _cambios_meta(estado[1], meta) if linea["v"] > 1 else {},
+        })
+        estado = (letras, meta)
+    return trayectoria
+
+
+def mostrar_evolucion(iniciativa_id: int, base_dir: str) -> None:
+    """Muestra en consola la trayectoria de puntajes de una iniciativa."""
+    entrada = obtener_iniciativa(iniciativa_id, base_dir)
+    if entrada is None:
+        print(f"\n  No existe la iniciativa #{iniciativa_id}.\n")
+        return
+    trayectoria = evolucion_iniciativa(iniciativa_id, base_dir)
+
+    print(f"\n  {'─'*78}")
+    print(f"  🧬 EVOLUCIÓN DE LA INICIATIVA #{iniciativa_id}: {entrada['nombre'][:40]} ({entrada['equipo'][:20]})")
+    print(f"  {'─'*78}")
+    columnas = "".join(f"{f'C{i}':>6}" for i in range(1, len(CATEGORIAS) + 1))
+    print(f"  {'Ver':<4} {'#':<6} {'Fecha':<11}{'Puntaje':>8}{'Δ':>7}{columnas}{'Cambios':>9}")
+    print(f"  {'─'*78}")
+
+    anterior = None
+    for v in trayectoria:
+        delta = "" if anterior is None else f"{v['puntaje_global'] - anterior:+.1f}"
+        porcentajes = "".join(f"{'-':>6}" if p is None else f"{p:>6.0f}" for p in v["categorias"])
+        cambios = "" if v["version"] == 1 else str(len(v["cambios"]))
+        print(f"  {v['version']:<4} {v['id']:<6} {v['fecha'][:10]:<11}{v['puntaje_global']:>7.1f}%{delta:>7}"
+              f"{porcentajes}{cambios:>9}  {EMOJI_NIVEL[v['nivel']]}")
+        anterior = v["puntaje_global"]
+
+    print(f"  {'─'*78}")
+    print("  " + " · ".join(f"C{i} {cat['nombre'].split(': ', 1)[-1]}" for i, cat in enumerate(CATEGORIAS, 1)))
+    for v in trayectoria[1:]:
+        detalle = [f"{pid}→{letra}" for pid, letra in v["cambios"].items()]
+        detalle += [f"{campo} → {valor}" for campo, valor in v["meta"].items()]
+        if detalle:
+            print(f"  v{v['version']}: {', '.join(detalle)}")
+    print(f"  Veredicto actual: {trayectoria[-1]['nivel']} ({trayectoria[-1]['puntaje_global']:.1f}%)\n")
@@ -0,0 +1,766 @@
+"""
+Interfaz de pantalla completa (curses) para el cuestionario, los resultados y
+el historial.
+
+El modo de línea de main.py imprime cada bloque con print y limpia la pantalla
+entre fases, lo que sobre SSH se ve como parpadeo y bytes de más. Aquí cada
+pantalla se arma en regiones (encabezado, cuerpo, panel de puntaje y pie) que
+recuerdan las líneas que dibujaron: una región solo se vuelve a escribir si su
+contenido cambió, y todas se vuelcan juntas con un único doupdate(), que envía
+a la terminal solo las celdas que difieren de lo que ya muestra.
+
+En el cuestionario las flechas permiten volver a respuestas anteriores y
+cambiarlas; el panel de puntaje se recalcula con cada cambio (y con la opción
+bajo el cursor, antes de elegirla). Sin TTY, o sin el módulo curses, main.py
+sigue en el modo de línea (ver `disponible`).
+"""
+
+import locale
+import os
+import sys
+import textwrap
+from datetime import datetime
+
+try:
+    import curses
+except ImportError:         # Windows sin windows-curses
+    curses = None
+
+from core.adaptativo import CotasPuntaje
+from core.evaluador import calcular_puntaje
+from core.incertidumbre import interpretar_distribucion, opcion_mas_probable
+from core.preguntas import CATEGORIAS
+from .persistencia import POR_PAGINA, pagina_historial
+from .cuantiles import describir_percentiles, percentil_categoria, percentiles_evaluacion
+from .similitud import buscar_similares
+
+
+ANCHO_PANEL = 34                # panel de puntaje a la derecha
+ANCHO_MINIMO_PANEL = 96         # más angosto, el puntaje va en el encabezado
+FILAS_POR_PAGINA = 100          # evaluaciones que se leen por vez al recorrer el historial
+ESPERA_SIMILARES_MS = 150       # cada cuánto se revisa si ya están las iniciativas similares
+
+_ENTER = ("\n", "\r", 10, 13)
+_BORRAR = ("\x7f", "\b", 8, 127)
+_ESCAPE = "\x1b"
+_TONOS = ("verde", "amarillo", "rojo", "azul", "cian")
+
+_PREGUNTAS = [(cat, preg) for cat in CATEGORIAS for preg in cat["preguntas"]]
+_CAMPOS_META = (
+    ("nombre_iniciativa", "Nombre de la iniciativa"),
+    ("equipo", "Equipo o empresa"),
+    ("responsable", "Tu nombre / responsable"),
+    ("descripcion", "Describe el problema que quieres resolver"),
+)
+_POR_DEFECTO = {"equipo": "No especificado", "responsable": "Anónimo", "descripcion": "No especificada"}
+
+
+def disponible() -> bool:
+    """True si se puede usar la pantalla completa: curses y una terminal interactiva."""
+    return (
+        curses is not None
+        and sys.stdin.isatty() and sys.stdout.isatty()
+        and os.environ.get("TERM", "dumb") not in ("", "dumb")
+    )
+
+
+# ─── Barras ────────────────────────────────────────────────────────────────────
+def tono_puntaje(porcentaje: float) -> str:
+    """Color de un porcentaje según las bandas de veredicto: verde, amarillo o rojo."""
+    if porcentaje >= 70:
+        return "verde"
+    if porcentaje >= 45:
+        return "amarillo"
+    return "rojo"
+
+
+def partes_barra(porcentaje: float, ancho: int) -> tuple:
+    """(celdas llenas, celdas vacías, tono) de una barra de progreso de `ancho` celdas."""
+    llenos = int(porcentaje / 100 * ancho)
+    return llenos, ancho - llenos, tono_puntaje(porcentaje)
+
+
+def _sin_emoji(nombre: str) -> str:
+    """"🔍 Categoría 1: Naturaleza del Problema" → "Categoría 1: Naturaleza del Problema"."""
+    primera, _, resto = nombre.partition(" ")
+    return resto if resto and not primera.isalnum() else nombre
+
+
+def _corto(nombre: str) -> str:
+    """"🔍 Categoría 1: Naturaleza del Problema" → "Naturaleza del Problema"."""
+    return _sin_emoji(nombre).split(": ", 1)[-1]
+
+
+# ─── Regiones ──────────────────────────────────────────────────────────────────
+class _Region:
+    """
+    Ventana que recuerda lo último que dibujó. Cada línea es una lista de
+    segmentos (texto, atributo); si las líneas no cambiaron no se toca nada.
+    """
+
+    def __init__(self, alto: int, ancho: int, y: int, x: int):
+        self.alto, self.ancho = max(alto, 1), max(ancho, 1)
+        self.ventana = curses.newwin(self.alto, self.ancho, y, x)
+        self._lineas = None
+
+    def dibujar(self, lineas: list) -> None:
+        lineas = lineas[:self.alto]
+        if lineas == self._lineas:
+            return
+        self._lineas = lineas
+        self.ventana.erase()
+        for y, segmentos in enumerate(lineas):
+            x = 0
+            for texto, atributo in segmentos:
+                texto = texto[:self.ancho - x]
+                if not texto:
+                    break
+                try:
+                    self.ventana.addstr(y, x, texto, atributo)
+                except curses.error:
+                    pass        # escribir en la última celda de la ventana siempre "falla"
+                x += len(texto)
+        self.ventana.noutrefresh()
+
+
+class PantallaCompleta:
+    """
+    Sesión de curses. Se usa como contexto:
+
+        with PantallaCompleta() as pantalla:
+            meta = pantalla.metadatos()
+            respuestas, distribuciones = pantalla.cuestionario()
+    """
+
+    def __init__(self):
+        self.pantalla = None
+        self._atributos = {}
+
+    # ── Sesión ────────────────────────────────────────────────────────────────
+    def __enter__(self) -> "PantallaCompleta":
+        locale.setlocale(locale.LC_ALL, "")
+        os.environ.setdefault("ESCDELAY", "25")
+        self.pantalla = curses.initscr()
+        try:
+            curses.noecho()
+            curses.cbreak()
+            self._preparar_colores()
+            self._disenar()
+        except Exception:
+            curses.endwin()
+            raise
+        return self
+
+    def __exit__(self, *exc) -> None:
+        curses.nocbreak()
+        curses.echo()
+        curses.endwin()
+
+    def _preparar_colores(self) -> None:
+        negrita = curses.A_BOLD
+        self._atributos = {"normal": 0, "negrita": negrita, "tenue": curses.A_DIM,
+                           "invertido": curses.A_REVERSE}
+        colores = (curses.COLOR_GREEN, curses.COLOR_YELLOW, curses.COLOR_RED, curses.COLOR_BLUE, curses.COLOR_CYAN)
+        if curses.has_colors():
+            curses.start_color()
+            try:
+                curses.use_default_colors()
+                fondo = -1
+            except curses.error:
+                fondo = curses.COLOR_BLACK
+            for par, (tono, color) in enumerate(zip(_TONOS, colores), 1):
+                curses.init_pair(par, color, fondo)
+                self._atributos[tono] = curses.color_pair(par)
+        else:
+            self._atributos.update({tono: negrita for tono in _TONOS})
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+
+    def _disenar(self) -> None:
+        """Crea las regiones según el tamaño actual de la terminal."""
+        alto, ancho = self.pantalla.getmaxyx()
+        self.alto, self.ancho = alto, ancho
+        self.con_panel = ancho >= ANCHO_MINIMO_PANEL
+        ancho_cuerpo = ancho - ANCHO_PANEL - 1 if self.con_panel else ancho
+        alto_cuerpo = max(alto - 5, 1)
+        self.encabezado = _Region(2, ancho, 0, 0)
+        self.cuerpo = _Region(alto_cuerpo, ancho_cuerpo, 2, 0)
+        self.panel = _Region(alto_cuerpo, ANCHO_PANEL, 2, ancho - ANCHO_PANEL) if self.con_panel else None
+        self.pie = _Region(3, ancho, max(alto - 3, 0), 0)
+        self.pie.ventana.keypad(True)
+        self.pantalla.erase()
+        self.pantalla.noutrefresh()
+
+    def _a(self, *nombres) -> int:
+        atributo = 0
+        for nombre in nombres:
+            atributo |= self._atributos.get(nombre, 0)
+        return atributo
+
+    def _volcar(self, cursor: tuple = None) -> None:
+        """Escribe en la terminal lo que cambió desde el último volcado (una sola escritura)."""
+        if cursor is not None:
+            region, y, x = cursor
+            try:
+                curses.curs_set(1)
+                region.ventana.move(y, min(x, region.ancho - 1))
+            except curses.error:
+                pass
+            region.ventana.noutrefresh()
+        else:
+            try:
+                curses.curs_set(0)
+            except curses.error:
+                pass
+        curses.doupdate()
+
+    def _tecla(self, espera_ms: int = -1):
+        """
+        Siguiente tecla (str o código de curses), o None si pasó `espera_ms`
+        sin teclas. Con un cambio de tamaño rediseña las regiones y retorna KEY_RESIZE.
+        """
+        self.pie.ventana.timeout(espera_ms)
+        try:
+            tecla = self.pie.ventana.get_wch()
+        except curses.error:
+            return None
+        if tecla == curses.KEY_RESIZE:
+            curses.update_lines_cols()
+            self._disenar()
+        return tecla
+
+    # ── Piezas de dibujo ──────────────────────────────────────────────────────
+    def _envolver(self, texto: str, ancho: int, atributo: int = 0, sangria: str = "  ") -> list:
+        return [[(linea, atributo)] for linea in textwrap.wrap(
+            texto, max(ancho, 10), initial_indent=sangria, subsequent_indent=sangria
+        )] or [[("", 0)]]
+
+    def _barra(self, porcentaje: float, ancho: int) -> list:
+        llenos, vacios, tono = partes_barra(porcentaje, ancho)
+        return [("█" * llenos, self._a(tono)), ("░" * vacios, self._a("tenue"))]
+
+    def _dibujar_encabezado(self, titulo: str, detalle: str = "") -> None:
+        self.encabezado.dibujar([
+            [(f" EVALUADOR DE INICIATIVAS DE AGENTES DE IA · {titulo}", self._a("negrita", "azul"))],
+            [(f" {detalle}", self._a("tenue"))],
+        ])
+
+    def _dibujar_pie(self, ayuda: str, mensaje: str = "", tono: str = "rojo") -> None:
+        self.pie.dibujar([
+            [("─" * self.ancho, self._a("tenue"))],
+            [(f" {ayuda}", self._a("tenue"))],
+            [(f" {mensaje}", self._a(tono, "negrita"))],
+        ])
+
+    def _editar(self, ayuda: str, etiqueta: str, inicial: str = "") -> str:
+        """Línea de texto editable en el pie; Enter confirma. Retorna el texto."""
+        texto, posicion = list(inicial), len(inicial)
+        while True:
+            visible = "".join(texto)
+            self.pie.dibujar([
+                [("─" * self.ancho, self._a("tenue"))],
+                [(f" {ayuda}", self._a("tenue"))],
+                [(f" {etiqueta}", self._a("negrita")), (visible, 0)],
+            ])
+            self._volcar((self.pie, 2, 1 + len(etiqueta) + posicion))
+            tecla = self._tecla()
+            if tecla == _ESCAPE:
+                return ""
+            if tecla in _ENTER or tecla == curses.KEY_ENTER:
+                return visible.strip()
+            texto, posicion = self._editar_tecla(texto, posicion, tecla)
+
+    @staticmethod
+    def _editar_tecla(texto: list, posicion: int, tecla) -> tuple:
+        if tecla in _BORRAR or tecla == curses.KEY_BACKSPACE:
+            if posicion > 0:
+                del texto[posicion - 1]
+                posicion -= 1
+        elif tecla == curses.KEY_DC:
+            if posicion < len(texto):
+                del texto[posicion]
+        elif tecla == curses.KEY_LEFT:
+            posicion = max(0, posicion - 1)
+        elif tecla == curses.KEY_RIGHT:
+            posicion = min(len(texto), posicion + 1)
+        elif tecla == curses.KEY_HOME:
+            posicion = 0
+        elif tecla == curses.KEY_END:
+            posicion = len(texto)
+        elif isinstance(tecla, str) and tecla.isprintable():
+            texto.insert(posicion, tecla)
+            posicion += 1
+        return texto, posicion
+
+    # ── Metadatos ─────────────────────────────────────────────────────────────
+    def metadatos(self, iniciales: dict = None) -> dict:
+        """
+        Formulario con los datos de la iniciativa (los mismos que
+        `recoger_metadatos` en el modo de línea).
+
+        Args:
+            iniciales: valores precargados, p. ej. al re-evaluar una iniciativa
+
+        Raises:
+            KeyboardInterrupt: con Esc o Ctrl+C
+        """
+        iniciales = iniciales or {}
+        valores = [list(iniciales.get(campo, "")) for campo, _ in _CAMPOS_META]
+        activo, posicion, mensaje = 0, len(valores[0]), ""
+        while True:
+            ancho_campo = max(self.cuerpo.ancho - 6, 10)
+            lineas = [
+                [("  INFORMACIÓN DE LA INICIATIVA", self._a("negrita", "azul"))],
+                [("  Antes de comenzar, cuéntanos un poco sobre tu iniciativa.", self._a("tenue"))],
+                [("", 0)],
+            ]
+            cursor = None
+            for i, (campo, etiqueta) in enumerate(_CAMPOS_META):
+                texto = "".join(valores[i])
+                inicio = max(0, posicion - ancho_campo + 1) if i == activo else 0
+                lineas.append([(f"  {etiqueta}:", self._a("negrita") if i == activo else 0)])
+                marco = self._a("cian") if i == activo else self._a("tenue")
+                lineas.append([("  › ", marco), (texto[inicio:inicio + ancho_campo], 0)])
+                lineas.append([("", 0)])
+                if i == activo:
+                    cursor = (self.cuerpo, len(lineas) - 2, 4 + posicion - inicio)
+            self._dibujar_encabezado("Nueva evaluación", "Paso 1 de 2: datos de la iniciativa")
+            self.cuerpo.dibujar(lineas)
+            if self.panel:
+                self.panel.dibujar([])
+            self._dibujar_pie("↑↓ / Tab cambiar de campo · Enter siguiente · Esc salir", mensaje)
+            self._volcar(cursor)
+
+            tecla = self._tecla()
+            if tecla == _ESCAPE:
+                raise KeyboardInterrupt
+            if tecla == curses.KEY_RESIZE:
+                continue
+            mensaje = ""
+            if tecla in ("\t", curses.KEY_DOWN) or tecla in _ENTER or tecla == curses.KEY_ENTER:
+                if (tecla in _ENTER or tecla == curses.KEY_ENTER) and activo == len(_CAMPOS_META) - 1:
+                    if not "".join(valores[0]).strip():
+                        activo, mensaje = 0, "Por favor ingresa un nombre para la iniciativa."
+                        posicion = len(valores[0])
+                        continue
+                    meta = {
+                        campo: "".join(valores[i]).strip() or _POR_DEFECTO.get(campo, "")
+                        for i, (campo, _) in enumerate(_CAMPOS_META)
+                    }
+                    meta["fecha"] = datetime.now().isoformat()
+                    return meta
+                activo = min(activo + 1, len(_CAMPOS_META) - 1)
+                posicion = len(valores[activo])
+            elif tecla in (curses.KEY_UP, curses.KEY_BTAB):
+                activo = max(activo - 1, 0)
+                posicion = len(valores[activo])
+            else:
+                valores[activo], posicion = self._editar_tecla(valores[activo], posicion, tecla)
+
+    # ── Cuestionario ──────────────────────────────────────────────────────────
+    def cuestionario(self) -> tuple:
+        """
+        Cuestionario completo con navegación: ↑↓ eligen opción, Enter o la
+        letra responden, ← vuelve a la pregunta anterior, → avanza a una ya
+        respondida y ? permite responder con duda ("A:70 B:30").
+
+        Returns:
+            tuple: (respuestas, distribuciones), como `ejecutar_cuestionario`
+
+        Raises:
+            KeyboardInterrupt: con Esc o Ctrl+C
+        """
+        respuestas, distribuciones = {}, {}
+        cursores = {}
+        indice, mensaje = 0, ""
+        total = len(_PREGUNTAS)
+        while True:
+            if indice == total:
+                self._dibujar_resumen(respuestas, distribuciones)
+            else:
+                self._dibujar_pregunta(indice, respuestas, distribuciones, cursores, mensaje)
+            self._volcar()
+
+            tecla = self._tecla()
+            if tecla == _ESCAPE:
+                raise KeyboardInterrupt
+            if tecla == curses.KEY_RESIZE:
+                continue
+            mensaje = ""
+            if tecla in (curses.KEY_LEFT, curses.KEY_PPAGE):
+                indice = max(indice - 1, 0)
+                continue
+            if indice == total:
+                if tecla in _ENTER or tecla == curses.KEY_ENTER:
+                    return respuestas, distribuciones
+                continue
+
+            _, pregunta = _PREGUNTAS[indice]
+            pid = pregunta["id"]
+            letras = [op[0] for op in pregunta["opciones"]]
+            cursor = cursores.get(pid, letras.index(respuestas[pid][0]) if pid in respuestas else 0)
+            elegida = None
+            if tecla == curses.KEY_UP:
+                cursores[pid] = (cursor - 1) % len(letras)
+            elif tecla == curses.KEY_DOWN:
+                cursores[pid] = (cursor + 1) % len(letras)
+            elif tecla in (curses.KEY_RIGHT, curses.KEY_NPAGE):
+                if pid in respuestas:
+                    indice += 1
+                else:
+                    mensaje = "Responde esta pregunta para avanzar."
+            elif tecla in _ENTER or tecla == curses.KEY_ENTER:
+                elegida = letras[cursor]
+            elif isinstance(tecla, str) and tecla.upper() in letras:
+                elegida = tecla.upper()
+            elif tecla == "?":
+                texto = self._editar("Reparte la probabilidad entre opciones · Enter confirmar · Esc cancelar",
+                                     "Si dudas (p. ej. A:70 B:30): ")
+                if not texto:
+                    continue
+                try:
+                    distribucion = interpretar_distribucion(texto, pid)
+                except ValueError as e:
+                    mensaje = str(e)
+                    continue
+                letra, puntaje = opcion_mas_probable(distribucion, pid)
+                respuestas[pid] = (letra, puntaje)
+                distribuciones.pop(pid, None)
+                if len(distribucion) > 1:
+                    distribuciones[pid] = distribucion
+                cursores[pid] = letras.index(letra)
+                indice += 1
+            if elegida is not None:
+                puntaje = next(op[2] for op in pregunta["opciones"] if op[0] == elegida)
+                respuestas[pid] = (elegida, puntaje)
+                distribuciones.pop(pid, None)
+                cursores[pid] = letras.index(elegida)
+                indice += 1
+                # Tras cambiar una respuesta al revisar, sigue en la próxima sin responder
+                while indice < total and _PREGUNTAS[indice][1]["id"] in respuestas:
+                    indice += 1
+
+    def _dibujar_pregunta(self, indice: int, respuestas: dict, distribuciones: dict,
+                          cursores: dict, mensaje: str) -> None:
+        categoria, pregunta = _PREGUNTAS[indice]
+        pid = pregunta["id"]
+        letras = [op[0] for op in pregunta["opciones"]]
+        cursor = cursores.get(pid, letras.index(respuestas[pid][0]) if pid in respuestas else 0)
+        ancho = self.cuerpo.ancho - 4
+
+        lineas = [[(f"  {_sin_emoji(categoria['nombre'])}", self._a("negrita", "azul"))]]
+        lineas += self._envolver(categoria["descripcion"], ancho, self._a("tenue"))
+        lineas += [[("", 0)], [(f"  Pregunta {indice + 1}/{len(_PREGUNTAS)}", self._a("negrita", "cian"))]]
+        lineas += self._envolver(pregunta["texto"], ancho, self._a("negrita"))
+        if "ayuda" in pregunta:
+            lineas += self._envolver(f"Ayuda: {pregunta['ayuda']}", ancho, self._a("tenue"))
+        lineas.append([("", 0)])
+        elegida = respuestas.get(pid, (None,))[0]
+        for i, (letra, texto, _) in enumerate(pregunta["opciones"]):
+            marca = "●" if letra == elegida else " "
+            atributo = self._a("invertido") if i == cursor else 0
+            partes = textwrap.wrap(texto, max(ancho - 8, 10)) or [""]
+            lineas.append([(f"  {marca} ", self._a("verde")), (f"[{letra}] ", self._a("negrita", "amarillo")),
+                           (partes[0], atributo)])
+            lineas += [[("        ", 0), (parte, atributo)] for parte in partes[1:]]
+        if pid in distribuciones:
+            reparto = " · ".join(f"{l} {p * 100:.0f}%" for l, p in distribuciones[pid].items())
+            lineas += [[("", 0)], [(f"  Con duda: {reparto}", self._a("cian"))]]
+
+        hipotesis = dict(respuestas)
+        hipotesis[pid] = (letras[cursor], pregunta["opciones"][cursor][2])
+        respondidas = len(respuestas)
+        self._dibujar_encabezado(
+            f"Pregunta {indice + 1}/{len(_PREGUNTAS)}",
+            f"{respondidas} de {len(_PREGUNTAS)} respondidas" + ("" if self.con_panel else
+                                                                 " · " + self._resumen_puntaje(respuestas)),
+        )
+        self.cuerpo.dibujar(lineas)
+        self._dibujar_panel(respuestas, hipotesis, letras[cursor])
+        self._dibujar_pie(
+            "↑↓ opción · Enter o letra responder · ← anterior · → siguiente · ? con duda · Esc salir", mensaje
+        )
+
+    def _resumen_puntaje(self, respuestas: dict) -> str:
+        cotas = self._cotas(respuestas)
+        return f"puntaje parcial {cotas.minimo:.1f}% (alcanzable hasta {cotas.maximo:.1f}%)"
+
+    @staticmethod
+    def _cotas(respuestas: dict) -> CotasPuntaje:
+        cotas = CotasPuntaje()
+        for pid, (_, puntaje) in respuestas.items():
+            cotas.responder(pid, puntaje)
+        return cotas
+
+    def _dibujar_panel(self, respuestas: dict, hipotesis: dict = None, letra: str = None) -> None:
+        """Puntaje parcial, rango alcanzable y porcentaje de cada categoría."""
+        if not self.panel:
+            return
+        resultados = calcular_puntaje(respuestas, registrar_metricas=False)
+        cotas = self._cotas(respuestas)
+        puntaje = resultados["puntaje_global"]
+        lineas = [
+            [(" PUNTAJE PARCIAL", self._a("negrita", "azul"))],
+            [(" ", 0)] + self._barra(puntaje, 22) + [(f" {puntaje:5.1f}%", self._a(tono_puntaje(puntaje)))],
+            [(f" alcanzable {cotas.minimo:.1f}–{cotas.maximo:.1f}%", self._a("tenue"))],
+        ]
+        if cotas.decidida:
+            lineas.append([(" veredicto ya fijo", self._a("verde"))])
+        if hipotesis is not None and hipotesis != respuestas:
+            con = calcular_puntaje(hipotesis, registrar_metricas=False)["puntaje_global"]
+            lineas.append([(f" eligiendo {letra}: {con:.1f}% ({con - puntaje:+.1f})", self._a("cian"))])
+        lineas.append([("", 0)])
+        for cat in resultados["categorias"]:
+            lineas.append([(f" {_corto(cat['nombre'])[:ANCHO_PANEL - 2]}", 0)])
+            lineas.append([(" ", 0)] + self._barra(cat["porcentaje"], 22) + [(f" {cat['porcentaje']:5.1f}%", 0)])
+        self.panel.dibujar(lineas)
+
+    def _dibujar_resumen(self, respuestas: dict, distribuciones: dict) -> None:
+        lineas = [
+            [("  ✓ Todas las preguntas respondidas", self._a("negrita", "verde"))],
+            [("  Revisa tus respuestas con ← o presiona Enter para ver los resultados.", self._a("tenue"))],
+            [("", 0)],
+        ]
+        for categoria in CATEGORIAS:
+            elegidas = "  ".join(
+                f"{preg['id']}:{respuestas[preg['id']][0]}{'?' if preg['id'] in distribuciones else ''}"
+                for preg in categoria["preguntas"]
+            )
+            lineas.append([(f"  {_corto(categoria['nombre'])[:30]:<30} ", 0), (elegidas, self._a("negrita"))])
+        if distribuciones:
+            lineas += [[("", 0)], [("  ? = respondida con duda", self._a("tenue"))]]
+        self._dibujar_encabezado("Revisión", self._resumen_puntaje(respuestas))
+        self.cuerpo.dibujar(lineas)
+        self._dibujar_panel(respuestas)
+        self._dibujar_pie("Enter ver resultados · ← volver a la última pregunta · Esc salir")
+
+    # ── Resultados ────────────────────────────────────────────────────────────
+    def _lineas_resultados(self, evaluacion: dict, similares: list, percentiles: dict, ancho: int) -> list:
+        resultados, veredicto = evaluacion["resultados"], evaluacion["veredicto"]
+        puntaje = resultados["puntaje_global"]
+        if veredicto["construir_agente"]:
+            tono = "verde"
+        elif puntaje >= 45:
+            tono = "amarillo"
+        else:
+            tono = "rojo"
+        lineas = [
+            [(f"  {veredicto['nivel']}", self._a("negrita", tono))],
+            [("", 0)],
+            [("  Puntaje Global: ", self._a("negrita")), (f"{puntaje}% / 100%", self._a("negrita", tono))],
+            [("  ", 0)] + self._barra(puntaje, 35) + [(f"  {puntaje:.1f}%", self._a(tono))],
+        ]
+        if percentiles:
+            lineas.append([(f"  {describir_percentiles(percentiles)}", self._a("cian"))])
+        incertidumbre = evaluacion.get("incertidumbre")
+        if incertidumbre:
+            bajo, alto = incertidumbre["intervalo"]
+            lineas += [
+                [("", 0)],
+                [(f"  Con duda en {len(incertidumbre['respuestas'])} pregunta(s). Probabilidad de "
+                  f"AGENTE RECOMENDADO: {incertidumbre['prob_agente_recomendado'] * 100:.0f}%", self._a("negrita"))],
+                [(f"  Puntaje esperado {incertidumbre['puntaje_esperado']}%, 90% entre {bajo}% y {alto}%",
+                  self._a("tenue"))],
+            ]
+        lineas += [[("", 0)], [("  Sustento:", self._a("negrita"))]]
+        lineas += self._envolver(veredicto["sustento"], ancho)
+        if veredicto.get("alertas"):
+            lineas += [[("", 0)], [("  Señales de alerta:", self._a("negrita", "amarillo"))]]
+            for alerta in veredicto["alertas"]:
+                lineas += self._envolver(alerta, ancho, self._a("amarillo"))
+        lineas += [[("", 0)], [("  Resultados por Categoría:", self._a("negrita"))]]
+        for cat in resultados["categorias"]:
+            lineas.append([(f"  {_sin_emoji(cat['nombre'])}", 0)])
+            lineas.append([("  ", 0)] + self._barra(cat["porcentaje"], 25) + [
+                (f"  {cat['porcentaje']:.1f}%  ({cat['puntaje_obtenido']}/{cat['puntaje_maximo']} pts)", 0),
+                (f"  {percentil_categoria(percentiles, cat['id'])}", self._a("tenue")),
+            ])
+        if veredicto.get("recomendaciones_construccion"):
+            lineas += [[("", 0)], [("  Recomendaciones para proceder:", self._a("negrita", "verde"))]]
+            for rec in veredicto["recomendaciones_construccion"]:
+                lineas += self._envolver(f"→ {rec}", ancho)
+        if veredicto.get("alternativas"):
+            lineas += [[("", 0)], [("  Alternativas Recomendadas:", self._a("negrita", "cian"))]]
+            for i, alt in enumerate(veredicto["alternativas"], 1):
+                lineas.append([(f"  {i}. {alt['nombre']}", self._a("negrita", "cian"))])
+                lineas += self._envolver(alt["descripcion"], ancho)
+                lineas += self._envolver(f"Herramientas: {', '.join(alt['herramientas'])}", ancho, self._a("tenue"))
+        lineas += [[("", 0)], [("  Iniciativas similares en el historial:", self._a("negrita"))]]
+        if similares is None:
+            lineas.append([("  buscando...", self._a("tenue"))])
+        elif not similares:
+            lineas.append([("  ninguna", self._a("tenue"))])
+        for sim in similares or []:
+            lineas.append([
+                (f"  #{sim['id']:<5}", self._a("negrita")),
+                (f"{sim['nombre_iniciativa'][:30]:<31}{sim['equipo'][:16]:<17}{sim['puntaje_global']:>5.1f}%  ", 0),
+                (f"{sim['similitud']:.0f}% similar", self._a("cian")),
+            ])
+        return lineas
+
+    def resultados(self, evaluacion: dict, similares=None, exportar=None, titulo: str = "Resultados",
+                   percentiles: dict = None) -> str:
+        """
+        Resultados con desplazamiento y opciones de exportación.
+
+        Args:
+            similares: lista de iniciativas similares, o un Future que la
+                entrega (se muestran apenas estén, sin redibujar el resto)
+            exportar: función (opcion, evaluacion, similares, percentiles) →
+                [(etiqueta, ruta)]; si se pasa, el reporte se genera aquí y se
+                sigue en la pantalla, si no se retorna la opción elegida
+            percentiles: ver utils.cuantiles.percentiles_evaluacion
+
+        Returns:
+            str: "M", "H" o "P" si se eligió exportar (y no se pasó `exportar`), si no None
+        """
+        desplazamiento, mensaje, tono = 0, "", "verde"
+        while True:
+            pendiente = similares is not None and hasattr(similares, "done") and not similares.done()
+            lista = None if pendiente else self._similares(similares)
+            lineas = self._lineas_resultados(evaluacion, lista, percentiles, self.cuerpo.ancho - 4)
+            maximo = max(len(lineas) - self.cuerpo.alto, 0)
+            desplazamiento = min(desplazamiento, maximo)
+            meta = evaluacion["meta"]
+            self._dibujar_encabezado(
+                titulo, f"{meta.get('nombre_iniciativa', '')} · {meta.get('equipo', '')}"
+                        + (f" · líneas {desplazamiento + 1}-{desplazamiento + self.cuerpo.alto} de {len(lineas)}"
+                           if maximo else ""),
+            )
+            self.cuerpo.dibujar(lineas[desplazamiento:])
+            self._dibujar_panel_respuestas(evaluacion)
+            self._dibujar_pie("↑↓ PgUp PgDn desplazar · M Markdown · H HTML · P Markdown + PDF · "
+                              "Q " + ("volver" if exportar else "terminar sin exportar"), mensaje, tono)
+            self._volcar()
+
+            tecla = self._tecla(ESPERA_SIMILARES_MS if pendiente else -1)
+            if tecla is None or tecla == curses.KEY_RESIZE:
+                continue
+            mensaje = ""
+            if tecla == curses.KEY_UP:
+                desplazamiento = max(desplazamiento - 1, 0)
+            elif tecla == curses.KEY_DOWN:
+                desplazamiento = min(desplazamiento + 1, maximo)
+            elif tecla == curses.KEY_PPAGE:
+                desplazamiento = max(desplazamiento - self.cuerpo.alto + 1, 0)
+            elif tecla in (curses.KEY_NPAGE, " "):
+                desplazamiento = min(desplazamiento + self.cuerpo.alto - 1, maximo)
+            elif tecla == curses.KEY_HOME:
+                desplazamiento = 0
+            elif tecla == curses.KEY_END:
+                desplazamiento = maximo
+            elif isinstance(tecla, str) and tecla.upper() in ("M", "H", "P"):
+                if exportar is None:
+                    return tecla.upper()
+                self._dibujar_pie("", "Generando el reporte...", "cian")
+                self._volcar()
+                try:
+                    archivos = exportar(tecla.upper(), evaluacion, lista, percentiles)
+                    mensaje, tono = " · ".join(f"{e}: {r}" for e, r in archivos if r), "verde"
+                    if not all(r for _, r in archivos):
+                        mensaje, tono = "PDF no disponible. Instala: pip install weasyprint markdown", "amarillo"
+                except OSError as e:
+                    mensaje, tono = f"No se pudo generar el reporte: {e}", "rojo"
+            elif tecla in ("q", "Q", _ESCAPE) or tecla in _ENTER or tecla == curses.KEY_ENTER:
+                return None
+
+    @staticmethod
+    def _similares(similares) -> list:
+        if similares is None or isinstance(similares, list):
+            return similares or []
+        return [] if similares.exception() else similares.result()
+
+    def _dibujar_panel_respuestas(self, evaluacion: dict) -> None:
+        if not self.panel:
+            return
+        respuestas = evaluacion.get("respuestas", {})
+        lineas = [[(" RESPUESTAS", self._a("negrita", "azul"))], [("", 0)]]
+        for categoria in CATEGORIAS:
+            lineas.append([(f" {_corto(categoria['nombre'])[:ANCHO_PANEL - 2]}", self._a("tenue"))])
+            lineas.append([(" " + "  ".join(
+                f"{preg['id']}:{respuestas[preg['id']][0] if preg['id'] in respuestas else '-'}"
+                for preg in categoria["preguntas"]
+            ), 0)])
+        self.panel.dibujar(lineas)
+
+    # ── Historial ─────────────────────────────────────────────────────────────
+    def historial(self, base_dir: str, filtros: dict = None, pagina: int = None, exportar=None) -> None:
+        """
+        Recorre el historial: ↑↓ PgUp PgDn Inicio Fin mueven la selección y
+        Enter abre la evaluación. Las filas se leen de a `FILAS_POR_PAGINA`
+        a medida que se necesitan.
+
+        Args:
+            filtros: equipo, desde, hasta (como --historial)
+            pagina: página de POR_PAGINA registros en la que empezar (--pagina)
+            exportar: como en `resultados`, para regenerar el reporte de la
+                evaluación abierta
+        """
+        paginas = {}
+
+        def fila(i: int):
+            numero = i // FILAS_POR_PAGINA
+            if numero not in paginas:
+                paginas[numero] = pagina_historial(base_dir, numero + 1, FILAS_POR_PAGINA, filtros)[1]
+            filas = paginas[numero]
+            return filas[i % FILAS_POR_PAGINA] if i % FILAS_POR_PAGINA < len(filas) else None
+
+        total = pagina_historial(base_dir, 1, 1, filtros)[0]
+        seleccion = min(max(((pagina or 1) - 1) * POR_PAGINA, 0), max(total - 1, 0))
+        inicio = seleccion
+        while True:
+            alto = self.cuerpo.alto - 2
+            inicio = min(max(inicio, seleccion - alto + 1), seleccion)
+            lineas = [
+                [(f"  {'#':<6}{'Iniciativa':<30}{'Equipo':<18}{'Puntaje':>8}  Veredicto", self._a("negrita"))],
+                [("  " + "─" * (self.cuerpo.ancho - 4), self._a("tenue"))],
+            ]
+            for i in range(inicio, min(inicio + alto, total)):
+                registro = fila(i)
+                if registro is None:
+                    break
+                id_registro, ev = registro
+                meta, res, ver = ev.get("meta", {}), ev.get("resultados", {}), ev.get("veredicto", {})
+                puntaje = res.get("puntaje_global", 0)
+                atributo = self._a("invertido") if i == seleccion else 0
+                lineas.append([
+                    (f"  {id_registro:<6}{meta.get('nombre_iniciativa', '—')[:28]:<30}"
+                     f"{meta.get('equipo', '—')[:16]:<18}{puntaje:>7.1f}%  ", atributo),
+                    (ver.get("nivel", "—")[:36], atributo | self._a(tono_puntaje(puntaje))),
+                ])
+            if not total:
+                lineas.append([("  No hay evaluaciones que mostrar.", self._a("tenue"))])
+            detalle = f"{total} registros" + ("".join(f" · {k} {v}" for k, v in (filtros or {}).items()))
+            self._dibujar_encabezado("Historial", detalle)
+            self.cuerpo.dibujar(lineas)
+            if self.panel:
+                actual = fila(seleccion) if total else None
+                if actual is not None:
+                    self._dibujar_panel_respuestas(actual[1])
+                else:
+                    self.panel.dibujar([])
+            self._dibujar_pie("↑↓ PgUp PgDn Inicio Fin moverse · Enter ver evaluación · Q / Esc salir")
+            self._volcar()
+
+            tecla = self._tecla()
+            if tecla == curses.KEY_UP:
+                seleccion = max(seleccion - 1, 0)
+            elif tecla == curses.KEY_DOWN:
+                seleccion = min(seleccion + 1, max(total - 1, 0))
+            elif tecla == curses.KEY_PPAGE:
+                seleccion = max(seleccion - alto, 0)
+            elif tecla in (curses.KEY_NPAGE, " "):
+                seleccion = min(seleccion + alto, max(total - 1, 0))
+            elif tecla == curses.KEY_HOME:
+                seleccion = 0
+            elif tecla == curses.KEY_END:
+                seleccion = max(total - 1, 0)
+            elif (tecla in _ENTER or tecla == curses.KEY_ENTER) and total:
+                id_registro, ev = fila(seleccion)
+                similares = buscar_similares(ev, base_dir, k=3, excluir_id=id_registro)
+                percentiles = percentiles_evaluacion(ev, base_dir, en_historial=True)
+                self.resultados(ev, similares, exportar, titulo=f"Evaluación #{id_registro}", percentiles=percentiles)
+            elif tecla in ("q", "Q", _ESCAPE):
+                return
@@ -0,0 +1,181 @@
+"""
+Escritor mínimo de PDF en Python puro (sin weasyprint ni GTK).
+
+Alcanza para el diseño simple de los reportes: texto con ajuste de línea en
+Helvetica / Helvetica-Bold (fuentes estándar, no se incrustan), barras
+rellenas y líneas separadoras, en páginas A4 con salto automático. El texto
+se codifica en WinAnsi (cp1252): los emojis y símbolos fuera de ese juego se
+omiten o se reemplazan por un equivalente ASCII.
+"""
+
+import unicodedata
+import zlib
+
+
+ANCHO_PAGINA, ALTO_PAGINA = 595, 842        # A4 en puntos
+MARGEN = 50
+
+# Anchos de Helvetica (AFM, milésimas de em) para ASCII 32..126
+_ANCHOS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_FACTOR_NEGRITA = 1.06      # aproximación de Helvetica-Bold para ajustar líneas
+
+_REEMPLAZOS = str.maketrans({"→": "->", "←": "<-", "≥": ">=", "≤": "<=", "✓": "v", "✔": "v"})
+
+
+def _a_winansi(texto: str) -> str:
+    """Deja solo caracteres representables en cp1252."""
+    texto = texto.translate(_REEMPLAZOS).encode("cp1252", "ignore").decode("cp1252")
+    return " ".join(texto.split())
+
+
+def _ancho_caracter(c: str) -> int:
+    codigo = ord(unicodedata.normalize("NFKD", c)[:1] or c)     # á → a
+    return _ANCHOS[codigo - 32] if 32 <= codigo <= 126 else 556
+
+
+_ANCHOS_CP1252 = {c: _ancho_caracter(c) for c in bytes(range(32, 256)).decode("cp1252", "ignore")}
+
+
+def _ancho(texto: str, tamano: float, negrita: bool = False) -> float:
+    total = sum(_ANCHOS_CP1252.get(c, 556) for c in texto)
+    return total * tamano / 1000 * (_FACTOR_NEGRITA if negrita else 1)
+
+
+def _escapar(texto: str) -> bytes:
+    datos = texto.encode("cp1252")
+    return datos.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class DocumentoPDF:
+    """
+    Documento de flujo simple: cada llamada escribe debajo de la anterior.
+
+        doc = DocumentoPDF()
+        doc.texto("Título", tamano=18, negrita=True)
+        doc.barra(72.5)
+        doc.guardar("reporte.pdf")
+    """
+
+    def __init__(self, titulo: str = ""):
+        self.titulo = titulo
+        self._paginas = []
+        self._nueva_pagina()
+
+    def _nueva_pagina(self) -> None:
+        self._paginas.append([])
+        self._y = ALTO_PAGINA - MARGEN
+
+    def _reservar(self, alto: float) -> None:
+        if self._y - alto < MARGEN:
+            self._nueva_pagina()
+
+    def espacio(self, alto: float = 6) -> None:
+        self._y -= alto
+
+    def texto(self, texto: str, tamano: float = 10, negrita: bool = False,
+              color: tuple = (0.2, 0.2, 0.2), sangria: float = 0) -> None:
+        """Escribe un párrafo con ajuste de línea al ancho útil."""
+        texto = _a_winansi(texto)
+        if not texto:
+            return
+        ancho_util = ANCHO_PAGINA - 2 * MARGEN - sangria
+        interlineado = tamano * 1.35
+        fuente = "F2" if negrita else "F1"
+        ancho_espacio = _ancho(" ", tamano, negrita)
+        lineas = []
+        linea, ancho_linea = [], 0.0
+        for palabra in texto.split(" "):
+            ancho_palabra = _ancho(palabra, tamano, negrita)
+            if linea and ancho_linea + ancho_espacio + ancho_palabra > ancho_util:
+                lineas.append(" ".join(linea))
+                linea, ancho_linea = [], 0.0
+            ancho_linea += (ancho_espacio if linea else 0) + ancho_palabra
+            linea.append(palabra)
+        lineas.append(" ".join(linea))
+
+        for linea in lineas:
+            self._reservar(interlineado)
+            self._y -= interlineado
+            r, g, b = color
+            self._paginas[-1].append(
+                b"BT /%s %.1f Tf %.3f %.3f %.3f rg %.1f %.1f Td (%s) Tj ET" % (
+                    fuente.encode(), tamano, r, g, b, MARGEN + sangria, self._y, _escapar(linea),
+                )
+            )
+
+    def barra(self, porcentaje: float, ancho: float = 300, alto: float = 10,
+              color: tuple = (0.29, 0.56, 0.85), sangria: float = 0) -> None:
+        """Barra horizontal rellena hasta `porcentaje` (0-100)."""
+        self._reservar(alto + 4)
+        self._y -= alto + 4
+        lleno = max(0.0, min(porcentaje, 100)) / 100 * ancho
+        x = MARGEN + sangria
+        r, g, b = color
+        self._paginas[-1].append(
+            b"0.914 0.925 0.937 rg %.1f %.1f %.1f %.1f re f %.3f %.3f %.3f rg %.1f %.1f %.1f %.1f re f" % (
+                x, self._y, ancho, alto, r, g, b, x, self._y, lleno, alto,
+            )
+        )
+
+    def separador(self) -> None:
+        self._reservar(12)
+        self._y -= 8
+        self._paginas[-1].append(
+            b"0.8 0.8 0.8 RG 0.5 w %.1f %.1f m %.1f %.1f l S" % (
+                MARGEN, self._y, ANCHO_PAGINA - MARGEN, self._y,
+            )
+        )
+        self._y -= 4
+
+    def a_bytes(self) -> bytes:
+        """Serializa el documento (streams comprimidos con Flate)."""
+        objetos = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            None,   # árbol de páginas, se completa abajo
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+            b"<< /Title (%s) /Producer (Evaluador de Iniciativas de Agentes de IA) >>" % _escapar(
+                _a_winansi(self.titulo)
+            ),
+        ]
+        hijos = []
+        for operaciones in self._paginas:
+            contenido = zlib.compress(b"\n".join(operaciones))
+            objetos.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (
+                len(contenido), contenido,
+            ))
+            id_contenido = len(objetos)
+            objetos.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>" % (
+                    ANCHO_PAGINA, ALTO_PAGINA, id_contenido,
+                )
+            )
+            hijos.append(b"%d 0 R" % len(objetos))
+        objetos[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(hijos), len(hijos))
+
+        salida = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        posiciones = []
+        for i, objeto in enumerate(objetos, 1):
+            posiciones.append(len(salida))
+            salida += b"%d 0 obj\n%s\nendobj\n" % (i, objeto)
+        inicio_xref = len(salida)
+        salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+        for posicion in posiciones:
+            salida += b"%010d 00000 n \n" % posicion
+        salida += b"trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objetos) + 1, inicio_xref,
+        )
+        return bytes(salida)
+
+    def guardar(self, ruta: str) -> str:
+        with open(ruta, "wb") as f:
+            f.write(self.a_bytes())
+        return ruta
@@ -1,51 +1,304 @@
 """
 Sistema de persistencia para evaluaciones realizadas.
-Guarda historial en JSON y exporta resumen a CSV.
+Guarda historial en JSON (o, migrado, en el almacén de segmentos de
+utils.almacen) y exporta resumen a CSV. Si se configuró un almacenamiento
+remoto (utils.almacenamiento), cada evaluación guardada, editada o borrada se
+replica allí en segundo plano.
 """
 
 import csv
 import json
 import os
+import shutil
+import threading
+import time
 from datetime import datetime
+from functools import partial
+
+from core.metricas import LATENCIA_PERSISTENCIA, REGISTRO
+from core.modelo import EvaluacionCompacta
+from .almacen import AlmacenHistorial
+from .almacenamiento import replicar_borrado, replicar_evaluaciones
+from .busqueda import ARCHIVO_INDICE_BUSQUEDA, indexar_busqueda_lote, preparar_indice_busqueda
+from .cambios import anonimizar_cambios, registrar_cambios
+from .candado import ARCHIVO_CANDADO, candado
+from .cuantiles import ARCHIVO_CUANTILES, cargar_cuantiles, indexar_cuantiles_lote, invalidar_cuantiles
+from .duplicados import (
+    ARCHIVO_INDICE_DUPLICADOS, IndiceDuplicados, buscar_duplicados, cargar_indice_duplicados,
+    hash_respuestas, huella_texto, indexar_duplicados_lote,
+)
+from .fragmentos import (
+    ARCHIVO_CATALOGO as CATALOGO_FRAGMENTOS, DIRECTORIO_FRAGMENTOS, cargar_catalogo, consultar_historial,
+    indexar_fragmentos_lote, invalidar_fragmentos,
+)
+from .linaje import (
+    ARCHIVO_CATALOGO as CATALOGO_LINAJE, DIRECTORIO_LINAJE, asignar_iniciativas,
+    cargar_catalogo as cargar_catalogo_linaje, enlazar_lote, indexar_linaje_lote, invalidar_linaje,
+)
+from .segmento import escribir_segmento
+from .similitud import ARCHIVO_INDICE_SIMILITUD, cargar_indice_similitud, indexar_similitud_lote
 
 
 ARCHIVO_JSON = "data/historial_evaluaciones.json"
 ARCHIVO_CSV = "data/resumen_evaluaciones.csv"
+DIRECTORIO_SEGMENTOS = "data/segmentos"
+ARCHIVO_SEGMENTO = "data/historial.seg"     # segmento único de versiones anteriores
+POR_PAGINA = 20
 
 
-def cargar_historial(base_dir: str) -> list:
-    """Carga el historial de evaluaciones desde JSON."""
+def _candado_historial(base_dir: str):
+    """
+    Candado de escritura del historial y sus índices, entre procesos
+    (utils.candado): el trabajador de la cola y un guardado desde la terminal
+    no pueden asignar el mismo id ni intercalar sus escrituras.
+    """
+    return candado(os.path.join(base_dir, "data", ARCHIVO_CANDADO))
+
+
+def _almacen(base_dir: str) -> AlmacenHistorial:
+    """El almacén de segmentos si el historial está migrado, si no None."""
+    almacen = AlmacenHistorial(os.path.join(base_dir, DIRECTORIO_SEGMENTOS))
+    ruta_segmento = os.path.join(base_dir, ARCHIVO_SEGMENTO)
+    if os.path.exists(ruta_segmento) and not almacen.existe():
+        almacen.adoptar(ruta_segmento)
+    return almacen if almacen.existe() else None
+
+
+def iterar_historial(base_dir: str):
+    """
+    Itera (id, evaluación) del historial en orden. Los ids son estables: las
+    evaluaciones borradas no aparecen, pero no corren el id de las siguientes.
+    """
+    almacen = _almacen(base_dir)
+    if almacen is not None:
+        yield from almacen.iterar()
+        return
     ruta = os.path.join(base_dir, ARCHIVO_JSON)
     if os.path.exists(ruta):
-        with open(ruta, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                historial = json.load(f)
+        except json.JSONDecodeError:
+            # Otro proceso está agregando un lote en el lugar (_agregar_a_json):
+            # se relee cuando termina
+            with _candado_historial(base_dir), open(ruta, "r", encoding="utf-8") as f:
+                historial = json.load(f)
+        yield from enumerate(historial, 1)
 
 
-def guardar_evaluacion(evaluacion: dict, base_dir: str) -> None:
+def cargar_historial(base_dir: str) -> list:
+    """Carga el historial de evaluaciones (del almacén de segmentos si se migró, si no del JSON)."""
+    return [ev for _, ev in iterar_historial(base_dir)]
+
+
+def cargar_historial_compacto(base_dir: str) -> list:
     """
-    Guarda una evaluación completa en el historial JSON
-    y actualiza el CSV de resumen.
+    Carga el historial como lista de `EvaluacionCompacta` (core.modelo):
+    mismos datos que `cargar_historial`, varias veces menos memoria.
     """
-    # ── Guardar JSON completo ──────────────────────────────────────────────────
-    os.makedirs(os.path.join(base_dir, "data"), exist_ok=True)
-    ruta_json = os.path.join(base_dir, ARCHIVO_JSON)
-
     historial = cargar_historial(base_dir)
-    historial.append(evaluacion)
+    historial.reverse()
+    compacto = []
+    while historial:
+        # Se consume la lista para liberar cada dict apenas se convierte
+        compacto.append(EvaluacionCompacta.desde_dict(historial.pop()))
+    return compacto
 
-    with open(ruta_json, "w", encoding="utf-8") as f:
-        json.dump(historial, f, ensure_ascii=False, indent=2)
 
-    # ── Actualizar CSV de resumen ──────────────────────────────────────────────
-    ruta_csv = os.path.join(base_dir, ARCHIVO_CSV)
-    encabezados = [
-        "fecha", "responsable", "equipo", "iniciativa",
-        "puntaje_global", "veredicto", "construir_agente",
-        "alertas_count"
-    ]
+def guardar_evaluacion(evaluacion: dict, base_dir: str, omitir_duplicados: bool = False) -> int:
+    """
+    Guarda una evaluación completa en el historial JSON,
+    actualiza el CSV de resumen y los índices derivados.
+
+    Si el historial ya tiene una evaluación con las mismas respuestas y un
+    nombre/equipo/descripción casi igual, se anota su id en
+    meta["duplicado_de"]. Con omitir_duplicados=True no se guarda. Si es una
+    re-evaluación de una iniciativa ya registrada (mismo equipo y nombre), se
+    anota en meta["iniciativa_id"] (utils.linaje).
+
+    Returns:
+        int: id del registro (posición 1-based en el historial, el # de --historial),
+             o None si se omitió por ser duplicado
+    """
+    inicio = time.perf_counter()
+
+    with _candado_historial(base_dir):
+        # ── Detección de duplicados ────────────────────────────────────────────
+        duplicados = buscar_duplicados(evaluacion, base_dir)
+        if duplicados:
+            if omitir_duplicados:
+                return None
+            evaluacion["meta"]["duplicado_de"] = duplicados[0]
+        asignar_iniciativas([evaluacion], base_dir)
+
+        # ── Guardar JSON completo (o agregar al almacén de segmentos) ─────────
+        os.makedirs(os.path.join(base_dir, "data"), exist_ok=True)
+        almacen = _almacen(base_dir)
+
+        if almacen is not None:
+            id_registro = almacen.agregar(evaluacion)
+        else:
+            ruta_json = os.path.join(base_dir, ARCHIVO_JSON)
+            historial = cargar_historial(base_dir)
+            historial.append(evaluacion)
+            id_registro = len(historial)
+
+            # Archivo temporal + os.replace: quien lee el historial a la vez
+            # ve el JSON anterior completo o el nuevo, nunca uno a medio escribir
+            temporal = f"{ruta_json}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(historial, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, ruta_json)
+
+        # ── Actualizar CSV de resumen ──────────────────────────────────────────
+        ruta_csv = os.path.join(base_dir, ARCHIVO_CSV)
+        archivo_existe = os.path.exists(ruta_csv)
+        with open(ruta_csv, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ENCABEZADOS_CSV)
+            if not archivo_existe:
+                writer.writeheader()
+            writer.writerow(fila_resumen(evaluacion))
+
+        # ── Índices derivados y copia remota ───────────────────────────────────
+        _actualizar_indices([(id_registro, evaluacion)], base_dir)
+        replicar_evaluaciones([(id_registro, evaluacion)])
+        registrar_cambios(base_dir, [("alta", id_registro, fila_resumen(evaluacion))])
+
+    if almacen is not None and almacen.necesita_compactar():
+        compactar_en_segundo_plano(base_dir)
+
+    if REGISTRO.activo:
+        LATENCIA_PERSISTENCIA.observar(time.perf_counter() - inicio)
 
-    fila = {
+    return id_registro
+
+
+def guardar_evaluaciones(evaluaciones: list, base_dir: str, omitir_duplicados: bool = False) -> list:
+    """
+    Guarda un lote de evaluaciones con una escritura por archivo: un bloque en
+    el almacén de segmentos (o una reescritura del JSON), un append al CSV y
+    una actualización por índice derivado. Es lo que usa la importación
+    masiva en lugar de llamar a `guardar_evaluacion` por fila.
+
+    La detección de duplicados considera el historial y también las
+    evaluaciones anteriores del mismo lote.
+
+    Returns:
+        list: id de cada evaluación, en el orden recibido (None si se omitió
+              por ser duplicado)
+    """
+    if not evaluaciones:
+        return []
+    with _candado_historial(base_dir):
+        indice = cargar_indice_duplicados(base_dir)
+        asignar_iniciativas(evaluaciones, base_dir)
+        huellas = [(hash_respuestas(ev), huella_texto(ev)) for ev in evaluaciones]
+        ids = [None] * len(evaluaciones)
+        guardadas, huellas_guardadas = [], []
+
+        def preparar(primer_id: int) -> list:
+            del guardadas[:], huellas_guardadas[:]
+            lote = IndiceDuplicados()
+            for i, (evaluacion, (clave, huella)) in enumerate(zip(evaluaciones, huellas)):
+                evaluacion["meta"].pop("duplicado_de", None)
+                ids[i] = None
+                encontrados = sorted(indice.buscar(clave, huella) + lote.buscar(clave, huella))
+                if encontrados:
+                    if omitir_duplicados:
+                        continue
+                    evaluacion["meta"]["duplicado_de"] = encontrados[0][1]
+                ids[i] = primer_id + len(guardadas)
+                lote.agregar(ids[i], clave, huella)
+                guardadas.append(evaluacion)
+                huellas_guardadas.append((clave, huella))
+            enlazar_lote([(i, ev) for i, ev in zip(ids, evaluaciones) if i is not None])
+            return guardadas
+
+        # ── Historial ──────────────────────────────────────────────────────────
+        os.makedirs(os.path.join(base_dir, "data"), exist_ok=True)
+        almacen = _almacen(base_dir)
+        if almacen is not None:
+            almacen.agregar_lote(preparar)
+        else:
+            ruta_json = os.path.join(base_dir, ARCHIVO_JSON)
+            _agregar_a_json(ruta_json, preparar(_contar_json(ruta_json) + 1))
+        if not guardadas:
+            return ids
+
+        # ── CSV de resumen ─────────────────────────────────────────────────────
+        ruta_csv = os.path.join(base_dir, ARCHIVO_CSV)
+        archivo_existe = os.path.exists(ruta_csv)
+        with open(ruta_csv, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ENCABEZADOS_CSV)
+            if not archivo_existe:
+                writer.writeheader()
+            writer.writerows(fila_resumen(ev) for ev in guardadas)
+
+        # ── Índices derivados y copia remota ───────────────────────────────────
+        registros = [(i, ev) for i, ev in zip(ids, evaluaciones) if i is not None]
+        _actualizar_indices(registros, base_dir, huellas_guardadas)
+        replicar_evaluaciones(registros)
+        registrar_cambios(base_dir, [("alta", i, fila_resumen(ev)) for i, ev in registros])
+
+    if almacen is not None and almacen.necesita_compactar():
+        compactar_en_segundo_plano(base_dir)
+    return ids
+
+
+# ─── Historial JSON por lotes ──────────────────────────────────────────────────
+_CONTEOS_JSON = {}      # ruta → (tamaño, mtime_ns, cantidad de evaluaciones)
+
+
+def _contar_json(ruta_json: str) -> int:
+    """Evaluaciones del JSON; se parsea solo si cambió desde el último lote propio."""
+    if not os.path.exists(ruta_json):
+        return 0
+    estado = os.stat(ruta_json)
+    conteo = _CONTEOS_JSON.get(ruta_json)
+    if conteo is not None and conteo[:2] == (estado.st_size, estado.st_mtime_ns):
+        return conteo[2]
+    with open(ruta_json, "r", encoding="utf-8") as f:
+        n = len(json.load(f))
+    _CONTEOS_JSON[ruta_json] = (estado.st_size, estado.st_mtime_ns, n)
+    return n
+
+
+def _agregar_a_json(ruta_json: str, evaluaciones: list) -> None:
+    """
+    Agrega evaluaciones al arreglo JSON sin reescribir las anteriores: se
+    reemplaza el "]" final por las nuevas (una por línea) y se vuelve a cerrar.
+    """
+    if not evaluaciones:
+        return
+    n = _contar_json(ruta_json)
+    nuevas = ",\n".join("  " + json.dumps(ev, ensure_ascii=False) for ev in evaluaciones)
+    if n == 0:
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            f.write("[\n" + nuevas + "\n]")
+    else:
+        with open(ruta_json, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            fin = f.tell()
+            f.seek(max(0, fin - 64))
+            cola = f.read()
+            cierre = fin - len(cola) + len(cola.rstrip()) - 1     # posición del "]"
+            f.seek(cierre)
+            f.truncate()
+            f.write((",\n" + nuevas + "\n]").encode("utf-8"))
+    estado = os.stat(ruta_json)
+    _CONTEOS_JSON[ruta_json] = (estado.st_size, estado.st_mtime_ns, n + len(evaluaciones))
+
+
+ENCABEZADOS_CSV = [
+    "fecha", "responsable", "equipo", "iniciativa",
+    "puntaje_global", "veredicto", "construir_agente",
+    "alertas_count"
+]
+
+
+def fila_resumen(evaluacion: dict) -> dict:
+    """Fila del CSV de resumen (también la que lleva cada cambio de utils.cambios)."""
+    return {
         "fecha": evaluacion["meta"]["fecha"],
         "responsable": evaluacion["meta"]["responsable"],
         "equipo": evaluacion["meta"]["equipo"],
@@ -56,29 +309,287 @@ def guardar_evaluacion(evaluacion: dict, base_dir: str) -> None:
         "alertas_count": len(evaluacion["veredicto"].get("alertas", [])),
     }
 
-    archivo_existe = os.path.exists(ruta_csv)
-    with open(ruta_csv, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=encabezados)
-        if not archivo_existe:
-            writer.writeheader()
-        writer.writerow(fila)
+
+def _indexar(ruta: str, reconstruir, agregar) -> None:
+    """
+    Actualiza un índice derivado con lo recién guardado: `agregar()` si el
+    índice existe; si no, `reconstruir()` lo construye desde el historial, que
+    ya incluye esos registros.
+    """
+    if os.path.exists(ruta):
+        agregar()
+    else:
+        reconstruir()
 
 
-def mostrar_historial(base_dir: str) -> None:
-    """Muestra un resumen del historial de evaluaciones en consola."""
+def _actualizar_indices(registros: list, base_dir: str, huellas: list = None) -> None:
+    """
+    Actualiza incrementalmente con [(id, evaluación)] recién guardadas los
+    índices que se derivan del historial.
+
+    Args:
+        huellas: [(hash de respuestas, SimHash)] de cada registro, si ya se calcularon
+    """
+    indices = (
+        (ARCHIVO_INDICE_SIMILITUD, cargar_indice_similitud, indexar_similitud_lote),
+        (ARCHIVO_INDICE_DUPLICADOS, cargar_indice_duplicados, partial(indexar_duplicados_lote, huellas=huellas)),
+        (ARCHIVO_INDICE_BUSQUEDA, preparar_indice_busqueda, indexar_busqueda_lote),
+        (os.path.join(DIRECTORIO_FRAGMENTOS, CATALOGO_FRAGMENTOS), cargar_catalogo, indexar_fragmentos_lote),
+        (os.path.join(DIRECTORIO_LINAJE, CATALOGO_LINAJE), cargar_catalogo_linaje, indexar_linaje_lote),
+        (ARCHIVO_CUANTILES, cargar_cuantiles, indexar_cuantiles_lote),
+    )
+    for archivo, reconstruir, agregar in indices:
+        _indexar(os.path.join(base_dir, archivo), partial(reconstruir, base_dir), partial(agregar, registros, base_dir))
+
+
+def _tamano(ruta: str) -> int:
+    if os.path.isdir(ruta):
+        return sum(os.path.getsize(os.path.join(ruta, n)) for n in os.listdir(ruta))
+    return os.path.getsize(ruta) if os.path.exists(ruta) else 0
+
+
+def migrar_historial(base_dir: str, formato: str = "zlib") -> dict:
+    """
+    Convierte el historial entre el JSON y el almacén de segmentos.
+
+    Args:
+        formato: "ninguno", "zlib" o "lzma" para migrar a segmentos con ese
+                 codec (o recomprimir si ya está migrado); "json" para volver
+                 al archivo JSON (los ids se renumeran si hubo borrados)
+    Returns:
+        dict con registros, bytes_antes y bytes_despues
+    """
+    ruta_json = os.path.join(base_dir, ARCHIVO_JSON)
+    directorio = os.path.join(base_dir, DIRECTORIO_SEGMENTOS)
+    with _candado_historial(base_dir):
+        almacen = _almacen(base_dir)
+        bytes_antes = _tamano(directorio if almacen is not None else ruta_json)
+        os.makedirs(os.path.join(base_dir, "data"), exist_ok=True)
+
+        if formato == "json":
+            historial = cargar_historial(base_dir)
+            temporal = f"{ruta_json}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(historial, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, ruta_json)
+            if almacen is not None:
+                shutil.rmtree(directorio)
+                reconstruir_indices(base_dir)
+            registros = len(historial)
+        elif almacen is not None:
+            almacen.cambiar_codec(formato)
+            almacen.compactar(completa=True)
+            registros = sum(1 for _ in almacen.iterar())
+        else:
+            historial = cargar_historial(base_dir)
+            # Se escribe como segmento único y el almacén lo adopta como primer segmento
+            ruta_segmento = os.path.join(base_dir, ARCHIVO_SEGMENTO)
+            escribir_segmento(ruta_segmento, historial, codec=formato)
+            AlmacenHistorial(directorio, codec=formato).adoptar(ruta_segmento)
+            # El JSON queda como respaldo y deja de leerse mientras exista el almacén
+            if os.path.exists(ruta_json):
+                os.replace(ruta_json, f"{ruta_json}.migrado")
+            registros = len(historial)
+
+    return {
+        "registros": registros,
+        "bytes_antes": bytes_antes,
+        "bytes_despues": _tamano(ruta_json if formato == "json" else directorio),
+    }
+
+
+def obtener_evaluacion(id_registro: int, base_dir: str) -> dict:
+    """
+    Retorna la evaluación #id_registro (el # de --historial), o None si no
+    existe o fue borrada. Con el historial migrado es un acceso directo por el
+    índice de posiciones del segmento; con el JSON hay que cargarlo completo.
+    """
+    almacen = _almacen(base_dir)
+    if almacen is not None:
+        return almacen.evaluacion(id_registro)
     historial = cargar_historial(base_dir)
+    return historial[id_registro - 1] if 1 <= id_registro <= len(historial) else None
+
+
+def pagina_historial(base_dir: str, pagina: int, por_pagina: int, filtros: dict = None) -> tuple:
+    """
+    (total de ids, [(id, evaluación)]) de la página pedida; pagina=None = todo.
+    Con filtros (equipo, desde, hasta) se leen solo los fragmentos que los cumplen.
+    """
+    if filtros:
+        filas = consultar_historial(base_dir, **filtros)
+        total = len(filas)
+        if pagina is not None:
+            filas = filas[(pagina - 1) * por_pagina:pagina * por_pagina]
+        return total, filas
+    almacen = _almacen(base_dir)
+    if almacen is not None:
+        total = len(almacen)
+        if pagina is None:
+            return total, list(almacen.iterar())
+        return total, almacen.pagina((pagina - 1) * por_pagina + 1, por_pagina)
+    filas = list(iterar_historial(base_dir))
+    total = len(filas)
+    if pagina is not None:
+        filas = filas[(pagina - 1) * por_pagina:pagina * por_pagina]
+    return total, filas
+
+
+# ─── Borrado, edición y compactación ───────────────────────────────────────────
+def _almacen_para_modificar(base_dir: str) -> AlmacenHistorial:
+    almacen = _almacen(base_dir)
+    if almacen is None:
+        raise ValueError(
+            "Borrar o editar registros requiere el historial migrado a segmentos "
+            "(python main.py --migrar zlib)"
+        )
+    return almacen
+
+
+def borrar_evaluacion(id_registro: int, base_dir: str) -> threading.Thread:
+    """
+    Borra la evaluación #id_registro (lápida) y lanza la compactación en segundo
+    plano, que la elimina de los segmentos, del CSV y de los índices.
+
+    Returns:
+        threading.Thread de la compactación, o None si el id no existe
+    """
+    with _candado_historial(base_dir):
+        if not _almacen_para_modificar(base_dir).borrar(id_registro):
+            return None
+        replicar_borrado(id_registro)
+        registrar_cambios(base_dir, [("baja", id_registro, None)])
+        _invalidar_indices(base_dir)
+    return compactar_en_segundo_plano(base_dir)
+
+
+def editar_evaluacion(id_registro: int, evaluacion: dict, base_dir: str) -> threading.Thread:
+    """Reemplaza la evaluación #id_registro; igual que `borrar_evaluacion` para lo demás."""
+    with _candado_historial(base_dir):
+        if not _almacen_para_modificar(base_dir).editar(id_registro, evaluacion):
+            return None
+        replicar_evaluaciones([(id_registro, evaluacion)])
+        registrar_cambios(base_dir, [("edicion", id_registro, fila_resumen(evaluacion))])
+        _invalidar_indices(base_dir)
+    return compactar_en_segundo_plano(base_dir)
+
+
+def anonimizar_evaluacion(id_registro: int, base_dir: str) -> threading.Thread:
+    """
+    Quita el responsable de la evaluación #id_registro (pedidos de protección de
+    datos), también de sus cambios ya registrados en utils.cambios.
+    """
+    with _candado_historial(base_dir):
+        evaluacion = obtener_evaluacion(id_registro, base_dir)
+        if evaluacion is None:
+            return None
+        evaluacion["meta"]["responsable"] = ""
+        hilo = editar_evaluacion(id_registro, evaluacion, base_dir)
+        anonimizar_cambios(base_dir, id_registro)
+    return hilo
+
+
+def compactar_historial(base_dir: str, completa: bool = False) -> dict:
+    """
+    Compacta el almacén de segmentos (con completa=True reescribe todos, ver
+    `AlmacenHistorial.compactar`); si se aplicaron borrados o ediciones,
+    reescribe el CSV de resumen y reconstruye los índices.
+
+    Returns:
+        dict con el resumen de la compactación, o None si no aplica o ya hay una en curso
+    """
+    almacen = _almacen(base_dir)
+    if almacen is None:
+        return None
+    resumen = almacen.compactar(completa)
+    if resumen and resumen["mutaciones"]:
+        with _candado_historial(base_dir):
+            _reescribir_csv(base_dir)
+            reconstruir_indices(base_dir)
+    return resumen
+
+
+def compactar_en_segundo_plano(base_dir: str) -> threading.Thread:
+    """
+    Lanza `compactar_historial` en un hilo. No es daemon: al salir, el proceso
+    espera a que termine en vez de cortarla a la mitad.
+    """
+    hilo = threading.Thread(
+        target=compactar_historial, args=(base_dir,), name="compactacion-historial"
+    )
+    hilo.start()
+    return hilo
+
+
+def _reescribir_csv(base_dir: str) -> None:
+    ruta_csv = os.path.join(base_dir, ARCHIVO_CSV)
+    temporal = f"{ruta_csv}.tmp"
+    with open(temporal, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=ENCABEZADOS_CSV)
+        writer.writeheader()
+        for _, evaluacion in iterar_historial(base_dir):
+            writer.writerow(fila_resumen(evaluacion))
+    os.replace(temporal, ruta_csv)
+
+
+def _invalidar_indices(base_dir: str) -> None:
+    for archivo in (ARCHIVO_INDICE_SIMILITUD, ARCHIVO_INDICE_DUPLICADOS, ARCHIVO_INDICE_BUSQUEDA):
+        ruta = os.path.join(base_dir, archivo)
+        if os.path.exists(ruta):
+            os.remove(ruta)
+    invalidar_fragmentos(base_dir)
+    invalidar_linaje(base_dir)
+    invalidar_cuantiles(base_dir)
+
+
+def reconstruir_indices(base_dir: str) -> None:
+    """
+    Reconstruye desde el historial los índices de similitud, duplicados y
+    búsqueda, los fragmentos, el linaje y los bosquejos de percentiles.
+    """
+    with _candado_historial(base_dir):
+        _invalidar_indices(base_dir)
+        cargar_indice_similitud(base_dir)
+        cargar_indice_duplicados(base_dir)
+        preparar_indice_busqueda(base_dir)
+        cargar_catalogo(base_dir)
+        cargar_catalogo_linaje(base_dir)
+        cargar_cuantiles(base_dir)
+
+
+def mostrar_historial(base_dir: str, pagina: int = None, por_pagina: int = POR_PAGINA,
+                      equipo: str = None, desde: str = None, hasta: str = None) -> None:
+    """
+    Muestra un resumen del historial de evaluaciones en consola.
+
+    Args:
+        pagina: número de página (1-based); None muestra el historial completo
+        equipo, desde, hasta: filtros por equipo y rango de meses "AAAA-MM"
+    """
+    filtros = {k: v for k, v in (("equipo", equipo), ("desde", desde), ("hasta", hasta)) if v}
+    total, filas = pagina_historial(base_dir, pagina, por_pagina, filtros)
 
-    if not historial:
-        print("\n  No hay evaluaciones previas registradas.\n")
+    if not total:
+        if filtros:
+            print("\n  No hay evaluaciones que cumplan el filtro.\n")
+        else:
+            print("\n  No hay evaluaciones previas registradas.\n")
         return
 
     print(f"\n  {'─'*70}")
-    print(f"  📋 HISTORIAL DE EVALUACIONES ({len(historial)} registros)")
+    titulo = f"HISTORIAL DE EVALUACIONES ({total} registros)"
+    if filtros:
+        titulo += " · " + " ".join(f"{k} {v}" for k, v in filtros.items())
+    if pagina is None:
+        print(f"  📋 {titulo}")
+    else:
+        paginas = (total + por_pagina - 1) // por_pagina
+        print(f"  📋 {titulo} — página {pagina} de {paginas}")
     print(f"  {'─'*70}")
     print(f"  {'#':<4} {'Iniciativa':<28} {'Equipo':<18} {'Puntaje':>8}  {'Veredicto'}")
     print(f"  {'─'*70}")
 
-    for i, ev in enumerate(historial, 1):
+    for i, ev in filas:
         meta = ev.get("meta", {})
         res = ev.get("resultados", {})
         ver = ev.get("veredicto", {})
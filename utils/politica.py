@@ -0,0 +1,230 @@
+"""
+Orden de preguntas que decide el veredicto con menos preguntas.
+
+El optimizador (offline) recorre el historial y arma un árbol de decisión. En
+cada nodo elige la pregunta que, según cómo respondieron las iniciativas del
+historial que llegaron a ese nodo, tiene más probabilidad de dejar fija la
+banda de veredicto (ver core/adaptativo.py); a igualdad, la que deja menos
+bandas posibles en promedio. Cada respuesta lleva a un hijo. Donde el historial
+ya no alcanza (menos de `SOPORTE_MINIMO` registros) se sigue un orden de
+respaldo: por alcance de la pregunta en el puntaje global, o el del
+cuestionario si en el historial hace menos preguntas.
+
+La política solo se guarda si sobre el historial hace menos preguntas que el
+orden del cuestionario; si no, se guarda ese orden, sin árbol.
+
+El árbol se guarda en data/politica_preguntas.json y se usa con
+`python main.py --orden-optimizado`.
+"""
+
+import json
+import os
+import time
+from collections import Counter, defaultdict
+
+from core.adaptativo import CotasPuntaje, alcance_pregunta, banda
+from core.preguntas import PUNTOS, VERSION_CUESTIONARIO
+
+
+ARCHIVO_POLITICA = "politica_preguntas.json"
+SOPORTE_MINIMO = 20     # registros necesarios para seguir ramificando un nodo
+
+ORDEN_FIJO = list(PUNTOS)
+# Respaldo sin datos: primero las preguntas que más mueven el puntaje global
+ORDEN_POR_ALCANCE = sorted(ORDEN_FIJO, key=alcance_pregunta, reverse=True)
+
+
+# ─── Recorrido ─────────────────────────────────────────────────────────────────
+class RecorridoPolitica:
+    """
+    Sigue el árbol de una política respuesta a respuesta.
+
+        recorrido = RecorridoPolitica(politica)
+        pid = recorrido.siguiente(pendientes)
+        recorrido.responder(pid, "B")
+    """
+
+    def __init__(self, politica: dict = None):
+        politica = politica or {}
+        self._nodo = politica.get("arbol")
+        self._orden = politica.get("orden") or ORDEN_POR_ALCANCE
+
+    def siguiente(self, pendientes) -> str:
+        """Próxima pregunta a hacer entre las pendientes."""
+        if self._nodo is not None and self._nodo["pregunta"] in pendientes:
+            return self._nodo["pregunta"]
+        return next(pid for pid in self._orden if pid in pendientes)
+
+    def responder(self, pregunta_id: str, letra: str) -> None:
+        if self._nodo is not None and self._nodo["pregunta"] == pregunta_id:
+            self._nodo = self._nodo["respuestas"].get(letra)
+        else:
+            self._nodo = None
+
+
+def preguntas_hasta_decidir(letras: dict, politica: dict = None, orden: list = None) -> int:
+    """
+    Cuántas preguntas se hacen a una iniciativa hasta que la banda de veredicto
+    queda fija, siguiendo la política o, si se pasa, un orden fijo.
+    """
+    cotas = CotasPuntaje()
+    recorrido = None if orden is not None else RecorridoPolitica(politica)
+    restantes = list(orden) if orden is not None else None
+    hechas = 0
+    while cotas.pendientes and not cotas.decidida:
+        pid = restantes.pop(0) if restantes is not None else recorrido.siguiente(cotas.pendientes)
+        letra = letras[pid]
+        cotas.responder(pid, PUNTOS[pid][letra])
+        if recorrido is not None:
+            recorrido.responder(pid, letra)
+        hechas += 1
+    return hechas
+
+
+def preguntas_esperadas(historial: list, politica: dict = None, orden: list = None) -> float:
+    """Promedio de `preguntas_hasta_decidir` sobre una lista de {pregunta_id: letra}."""
+    if not historial:
+        return 0.0
+    return sum(preguntas_hasta_decidir(letras, politica, orden) for letras in historial) / len(historial)
+
+
+# ─── Optimización ──────────────────────────────────────────────────────────────
+def _elegir_pregunta(registros: list, cotas: CotasPuntaje) -> str:
+    mejor, mejor_clave = None, None
+    for pid in ORDEN_POR_ALCANCE:
+        if pid not in cotas.pendientes:
+            continue
+        decididos, bandas_abiertas = 0, 0
+        for letra, n in Counter(r[pid] for r in registros).items():
+            siguiente = cotas.copia()
+            siguiente.responder(pid, PUNTOS[pid][letra])
+            abiertas = banda(siguiente.maximo) - banda(siguiente.minimo)
+            decididos += n if abiertas == 0 else 0
+            bandas_abiertas += n * abiertas
+        clave = (-decididos, bandas_abiertas)
+        if mejor_clave is None or clave < mejor_clave:
+            mejor, mejor_clave = pid, clave
+    return mejor
+
+
+def _construir_nodo(registros: list, cotas: CotasPuntaje, soporte_minimo: int):
+    if cotas.decidida or len(registros) < soporte_minimo:
+        return None
+    pid = _elegir_pregunta(registros, cotas)
+    grupos = defaultdict(list)
+    for registro in registros:
+        grupos[registro[pid]].append(registro)
+    hijos = {}
+    for letra, grupo in sorted(grupos.items()):
+        siguiente = cotas.copia()
+        siguiente.responder(pid, PUNTOS[pid][letra])
+        hijo = _construir_nodo(grupo, siguiente, soporte_minimo)
+        if hijo is not None:
+            hijos[letra] = hijo
+    return {"pregunta": pid, "respuestas": hijos}
+
+
+def construir_politica(historial: list, soporte_minimo: int = SOPORTE_MINIMO) -> dict:
+    """
+    Arma el árbol de preguntas a partir de respuestas históricas.
+
+    Args:
+        historial: lista de {pregunta_id: letra} con el cuestionario completo
+        soporte_minimo: registros mínimos para ramificar un nodo
+
+    Returns:
+        dict: {"version_cuestionario", "registros", "orden", "arbol"}
+    """
+    return {
+        "version_cuestionario": VERSION_CUESTIONARIO,
+        "registros": len(historial),
+        "orden": _orden_respaldo(historial),
+        "arbol": _construir_nodo(historial, CotasPuntaje(), soporte_minimo),
+    }
+
+
+def _orden_respaldo(historial: list) -> list:
+    """Orden por alcance, salvo que el del cuestionario haga menos preguntas en el historial."""
+    if historial and (
+        preguntas_esperadas(historial, orden=ORDEN_FIJO) < preguntas_esperadas(historial, orden=ORDEN_POR_ALCANCE)
+    ):
+        return ORDEN_FIJO
+    return ORDEN_POR_ALCANCE
+
+
+def respuestas_historial(base_dir: str) -> list:
+    """
+    Letras elegidas en las evaluaciones completas del historial (se omiten las
+    marcadas como duplicado y las que no respondieron todo el cuestionario).
+    """
+    from .persistencia import iterar_historial
+
+    historial = []
+    for _, evaluacion in iterar_historial(base_dir):
+        if "duplicado_de" in evaluacion["meta"]:
+            continue
+        respuestas = evaluacion.get("respuestas", {})
+        letras = {pid: respuestas[pid][0] for pid in ORDEN_FIJO if pid in respuestas}
+        if len(letras) == len(ORDEN_FIJO) and all(
+            letra in PUNTOS[pid] for pid, letra in letras.items()
+        ):
+            historial.append(letras)
+    return historial
+
+
+def optimizar_orden(base_dir: str, soporte_minimo: int = SOPORTE_MINIMO) -> dict:
+    """
+    Construye la política con el historial y la guarda en data/. Si no hace
+    menos preguntas que el orden del cuestionario, guarda ese orden sin árbol.
+
+    Returns:
+        dict: {registros, nodos, preguntas_esperadas, preguntas_orden_fijo,
+               mejora (False si se guardó el orden del cuestionario), segundos}
+    """
+    inicio = time.perf_counter()
+    historial = respuestas_historial(base_dir)
+    politica = construir_politica(historial, soporte_minimo)
+    esperadas = preguntas_esperadas(historial, politica)
+    orden_fijo = preguntas_esperadas(historial, orden=ORDEN_FIJO)
+    mejora = esperadas < orden_fijo
+    if not mejora:
+        politica = dict(politica, orden=ORDEN_FIJO, arbol=None)
+        esperadas = orden_fijo
+    guardar_politica(politica, base_dir)
+    return {
+        "registros": len(historial),
+        "nodos": _contar_nodos(politica["arbol"]),
+        "preguntas_esperadas": round(esperadas, 2),
+        "preguntas_orden_fijo": round(orden_fijo, 2),
+        "mejora": mejora,
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+
+
+def _contar_nodos(nodo) -> int:
+    if nodo is None:
+        return 0
+    return 1 + sum(_contar_nodos(hijo) for hijo in nodo["respuestas"].values())
+
+
+# ─── Archivo ───────────────────────────────────────────────────────────────────
+def guardar_politica(politica: dict, base_dir: str) -> str:
+    ruta = os.path.join(base_dir, "data", ARCHIVO_POLITICA)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(politica, f, separators=(",", ":"))
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def cargar_politica(base_dir: str) -> dict:
+    """Política guardada, o None si no existe o es de otra versión del cuestionario."""
+    try:
+        with open(os.path.join(base_dir, "data", ARCHIVO_POLITICA), encoding="utf-8") as f:
+            politica = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if politica.get("version_cuestionario") != VERSION_CUESTIONARIO:
+        return None
+    return politica
@@ -0,0 +1,335 @@
+"""
+Reporte de portafolio: agregados de todas las evaluaciones del historial.
+
+Se calcula en una sola pasada sobre el historial (con el almacén de segmentos
+la lectura también es en streaming), acumulando solo contadores: la memoria
+depende de la cantidad de equipos, meses y alertas distintas, no de la
+cantidad de evaluaciones. Se exporta a Markdown, HTML autocontenido (barras
+SVG, sin recursos externos) y, si weasyprint está disponible, PDF.
+"""
+
+import html
+import os
+import time
+from datetime import datetime
+
+from core.metricas import LATENCIA_REPORTE, REGISTRO
+from core.modelo import EMOJI_NIVEL
+from core.preguntas import CATEGORIAS
+from core.reglas import UMBRAL_CATEGORIA_DEBIL
+from .reporte import COLORES_EMOJI, ESTILOS_HTML, barra_mini, guardar_pdf, svg_barra, tabla_html
+
+
+TRAMOS_GLOBAL = 10          # histograma del puntaje global en tramos de 10 puntos
+TRAMOS_CATEGORIA = 5        # histograma por categoría en tramos de 20 puntos
+TOP_ALERTAS = 5
+
+
+def _tramo(porcentaje: float, tramos: int) -> int:
+    return min(int(porcentaje * tramos / 100), tramos - 1)
+
+
+def resumir_portafolio(evaluaciones, incluir_duplicados: bool = False) -> dict:
+    """
+    Agrega las evaluaciones en una sola pasada.
+
+    Args:
+        evaluaciones: iterable de evaluaciones (o de tuplas (id, evaluación))
+        incluir_duplicados: si False se saltan las marcadas con meta.duplicado_de
+
+    Returns:
+        dict con total, omitidas, niveles, puntaje (promedio, mínimo, máximo,
+        histograma), categorias, alertas, equipos, meses e incertidumbre
+        (evaluaciones con duda y agentes recomendados esperados)
+    """
+    total = omitidas = construir_total = con_duda = 0
+    construir_esperado = 0.0
+    suma = 0.0
+    minimo, maximo = None, None
+    histograma = [0] * TRAMOS_GLOBAL
+    niveles = {}
+    alertas = {}
+    equipos = {}        # equipo → [evaluaciones, suma de puntaje, construir agente]
+    meses = {}          # AAAA-MM → [evaluaciones, suma de puntaje, construir agente]
+    categorias = {
+        c["id"]: {"nombre": c["nombre"], "suma": 0.0, "debiles": 0, "histograma": [0] * TRAMOS_CATEGORIA}
+        for c in CATEGORIAS
+    }
+
+    for evaluacion in evaluaciones:
+        if isinstance(evaluacion, tuple):
+            evaluacion = evaluacion[1]
+        meta = evaluacion.get("meta", {})
+        if not incluir_duplicados and "duplicado_de" in meta:
+            omitidas += 1
+            continue
+        veredicto = evaluacion.get("veredicto", {})
+        resultados = evaluacion.get("resultados", {})
+        puntaje = resultados.get("puntaje_global", 0)
+        construir = 1 if veredicto.get("construir_agente") else 0
+
+        total += 1
+        construir_total += construir
+        incertidumbre = evaluacion.get("incertidumbre")
+        if incertidumbre:
+            con_duda += 1
+            construir_esperado += incertidumbre["prob_agente_recomendado"]
+        else:
+            construir_esperado += construir
+        suma += puntaje
+        minimo = puntaje if minimo is None else min(minimo, puntaje)
+        maximo = puntaje if maximo is None else max(maximo, puntaje)
+        histograma[_tramo(puntaje, TRAMOS_GLOBAL)] += 1
+
+        nivel = veredicto.get("nivel", "—")
+        niveles[nivel] = niveles.get(nivel, 0) + 1
+        for alerta in veredicto.get("alertas", []):
+            alertas[alerta] = alertas.get(alerta, 0) + 1
+
+        for cat in resultados.get("categorias", []):
+            acumulado = categorias.setdefault(cat["id"], {
+                "nombre": cat["nombre"], "suma": 0.0, "debiles": 0, "histograma": [0] * TRAMOS_CATEGORIA,
+            })
+            acumulado["suma"] += cat["porcentaje"]
+            acumulado["debiles"] += cat["porcentaje"] < UMBRAL_CATEGORIA_DEBIL
+            acumulado["histograma"][_tramo(cat["porcentaje"], TRAMOS_CATEGORIA)] += 1
+
+        for clave, tabla in ((meta.get("equipo") or "—", equipos), (meta.get("fecha", "")[:7] or "—", meses)):
+            fila = tabla.setdefault(clave, [0, 0.0, 0])
+            fila[0] += 1
+            fila[1] += puntaje
+            fila[2] += construir
+
+    def _filas(tabla: dict) -> list:
+        return [
+            {"nombre": clave, "evaluaciones": n, "promedio": round(s / n, 1), "construir_agente": c}
+            for clave, (n, s, c) in tabla.items()
+        ]
+
+    return {
+        "total": total,
+        "omitidas": omitidas,
+        "niveles": sorted(niveles.items(), key=lambda x: -x[1]),
+        "puntaje": {
+            "promedio": round(suma / total, 1) if total else 0,
+            "minimo": minimo or 0,
+            "maximo": maximo or 0,
+            "histograma": histograma,
+        },
+        "categorias": [
+            {
+                "id": cid,
+                "nombre": c["nombre"],
+                "promedio": round(c["suma"] / total, 1) if total else 0,
+                "debiles": c["debiles"],
+                "histograma": c["histograma"],
+            }
+            for cid, c in categorias.items()
+        ],
+        "alertas": sorted(alertas.items(), key=lambda x: -x[1])[:TOP_ALERTAS],
+        "equipos": sorted(_filas(equipos), key=lambda f: (-f["promedio"], -f["evaluaciones"])),
+        "meses": sorted(_filas(meses), key=lambda f: f["nombre"]),
+        "incertidumbre": {
+            "con_duda": con_duda,
+            "construir_agente": construir_total,
+            "construir_esperado": round(construir_esperado, 1),
+        },
+    }
+
+
+def _porcentaje(n: int, total: int) -> float:
+    return round(n / total * 100, 1) if total else 0
+
+
+def _etiquetas_tramos(tramos: int) -> list:
+    ancho = 100 // tramos
+    return [f"{i * ancho}–{(i + 1) * ancho}%" for i in range(tramos)]
+
+
+# ─── Markdown ──────────────────────────────────────────────────────────────────
+def _texto_incertidumbre(resumen: dict) -> str:
+    incertidumbre = resumen["incertidumbre"]
+    if not incertidumbre["con_duda"]:
+        return ""
+    return (
+        f"{incertidumbre['con_duda']} evaluaciones tienen respuestas con duda. Agentes recomendados: "
+        f"{incertidumbre['construir_agente']} según la opción más probable, "
+        f"{incertidumbre['construir_esperado']} esperados considerando las dudas.\n\n"
+    )
+
+
+def generar_markdown_portafolio(resumen: dict) -> str:
+    """Reporte de portafolio en Markdown."""
+    total = resumen["total"]
+    md = []
+    md.append("# 📊 Portafolio de Iniciativas de Agentes de IA\n\n")
+    md.append(f"> **Generado:** {datetime.now().strftime('%d/%m/%Y %H:%M')}  \n")
+    if resumen.get("filtro"):
+        md.append(f"> **Filtro:** {resumen['filtro']}  \n")
+    md.append(f"> **Evaluaciones:** {total}")
+    if resumen["omitidas"]:
+        md.append(f" (se omitieron {resumen['omitidas']} duplicadas)")
+    md.append("  \n")
+    md.append(f"> **Puntaje promedio:** {resumen['puntaje']['promedio']}% "
+              f"(mín. {resumen['puntaje']['minimo']}%, máx. {resumen['puntaje']['maximo']}%)\n\n")
+    md.append("---\n\n")
+
+    md.append("## Mezcla de Veredictos\n\n")
+    md.append("| Veredicto | Evaluaciones | % | Barra |\n")
+    md.append("|-----------|--------------|---|-------|\n")
+    for nivel, n in resumen["niveles"]:
+        pct = _porcentaje(n, total)
+        md.append(f"| {EMOJI_NIVEL.get(nivel, '')} {nivel} | {n} | {pct}% | `{barra_mini(pct)}` |\n")
+    md.append("\n")
+    md.append(_texto_incertidumbre(resumen))
+
+    md.append("## Distribución del Puntaje Global\n\n")
+    md.append("| Tramo | Evaluaciones | Barra |\n")
+    md.append("|-------|--------------|-------|\n")
+    for etiqueta, n in zip(_etiquetas_tramos(TRAMOS_GLOBAL), resumen["puntaje"]["histograma"]):
+        md.append(f"| {etiqueta} | {n} | `{barra_mini(_porcentaje(n, total))}` |\n")
+    md.append("\n")
+
+    md.append("## Puntaje por Categoría\n\n")
+    etiquetas = _etiquetas_tramos(TRAMOS_CATEGORIA)
+    md.append(f"| Categoría | Promedio | Barra | Débiles (<{UMBRAL_CATEGORIA_DEBIL}%) | " + " | ".join(etiquetas) + " |\n")
+    md.append("|-----------|----------|-------|----------------|" + "---|" * len(etiquetas) + "\n")
+    for cat in resumen["categorias"]:
+        md.append(
+            f"| {cat['nombre']} | {cat['promedio']}% | `{barra_mini(cat['promedio'])}` | "
+            f"{cat['debiles']} | " + " | ".join(str(n) for n in cat["histograma"]) + " |\n"
+        )
+    md.append("\n")
+
+    if resumen["alertas"]:
+        md.append("## Alertas Más Frecuentes\n\n")
+        for alerta, n in resumen["alertas"]:
+            md.append(f"- **{n}×** {alerta}\n")
+        md.append("\n")
+
+    md.append("## Ranking de Equipos\n\n")
+    md.append("| # | Equipo | Evaluaciones | Promedio | Construir agente |\n")
+    md.append("|---|--------|--------------|----------|------------------|\n")
+    for i, eq in enumerate(resumen["equipos"], 1):
+        md.append(f"| {i} | {eq['nombre']} | {eq['evaluaciones']} | {eq['promedio']}% | "
+                  f"{eq['construir_agente']} |\n")
+    md.append("\n")
+
+    md.append("## Tendencia Mensual\n\n")
+    md.append("| Mes | Evaluaciones | Promedio | Barra | Construir agente |\n")
+    md.append("|-----|--------------|----------|-------|------------------|\n")
+    for mes in resumen["meses"]:
+        md.append(f"| {mes['nombre']} | {mes['evaluaciones']} | {mes['promedio']}% | "
+                  f"`{barra_mini(mes['promedio'])}` | {mes['construir_agente']} |\n")
+    md.append("\n---\n\n")
+    md.append("*Reporte generado por el Evaluador de Iniciativas de Agentes de IA*\n")
+    return "".join(md)
+
+
+# ─── HTML ──────────────────────────────────────────────────────────────────────
+def generar_html_portafolio(resumen: dict) -> str:
+    """Reporte de portafolio como HTML autocontenido (CSS en línea y barras SVG)."""
+    total = resumen["total"]
+    e = html.escape
+    partes = [
+        "<!DOCTYPE html><html lang=\"es\"><head><meta charset=\"utf-8\">",
+        "<title>Portafolio de Iniciativas de Agentes de IA</title>",
+        f"<style>{ESTILOS_HTML}</style></head><body>",
+        "<h1>📊 Portafolio de Iniciativas de Agentes de IA</h1>",
+        f"<p class=\"resumen\">Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')} · "
+        + (f"{e(resumen['filtro'])} · " if resumen.get("filtro") else "")
+        + f"Evaluaciones: {total}"
+        + (f" (se omitieron {resumen['omitidas']} duplicadas)" if resumen["omitidas"] else "")
+        + f" · Puntaje promedio: {resumen['puntaje']['promedio']}% "
+        f"(mín. {resumen['puntaje']['minimo']}%, máx. {resumen['puntaje']['maximo']}%)</p>",
+    ]
+
+    partes.append("<h2>Mezcla de Veredictos</h2>")
+    partes.append(tabla_html(["Veredicto", "Evaluaciones", "%", ""], [
+        (f"{EMOJI_NIVEL.get(nivel, '')} {e(nivel)}", n, f"{_porcentaje(n, total)}%",
+         svg_barra(_porcentaje(n, total), COLORES_EMOJI.get(EMOJI_NIVEL.get(nivel), "#4a90d9")))
+        for nivel, n in resumen["niveles"]
+    ]))
+    if resumen["incertidumbre"]["con_duda"]:
+        partes.append(f"<p>{e(_texto_incertidumbre(resumen).strip())}</p>")
+
+    partes.append("<h2>Distribución del Puntaje Global</h2>")
+    partes.append(tabla_html(["Tramo", "Evaluaciones", ""], [
+        (etiqueta, n, svg_barra(_porcentaje(n, total)))
+        for etiqueta, n in zip(_etiquetas_tramos(TRAMOS_GLOBAL), resumen["puntaje"]["histograma"])
+    ]))
+
+    partes.append("<h2>Puntaje por Categoría</h2>")
+    partes.append(tabla_html(
+        ["Categoría", "Promedio", "", f"Débiles (<{UMBRAL_CATEGORIA_DEBIL}%)"] + _etiquetas_tramos(TRAMOS_CATEGORIA),
+        [
+            [e(cat["nombre"]), f"{cat['promedio']}%", svg_barra(cat["promedio"]), cat["debiles"]]
+            + cat["histograma"]
+            for cat in resumen["categorias"]
+        ],
+    ))
+
+    if resumen["alertas"]:
+        partes.append("<h2>Alertas Más Frecuentes</h2><ul>")
+        partes.extend(f"<li><strong>{n}×</strong> {e(alerta)}</li>" for alerta, n in resumen["alertas"])
+        partes.append("</ul>")
+
+    partes.append("<h2>Ranking de Equipos</h2>")
+    partes.append(tabla_html(["#", "Equipo", "Evaluaciones", "Promedio", "", "Construir agente"], [
+        (i, e(eq["nombre"]), eq["evaluaciones"], f"{eq['promedio']}%", svg_barra(eq["promedio"]),
+         eq["construir_agente"])
+        for i, eq in enumerate(resumen["equipos"], 1)
+    ]))
+
+    partes.append("<h2>Tendencia Mensual</h2>")
+    partes.append(tabla_html(["Mes", "Evaluaciones", "Promedio", "", "Construir agente"], [
+        (e(mes["nombre"]), mes["evaluaciones"], f"{mes['promedio']}%", svg_barra(mes["promedio"]),
+         mes["construir_agente"])
+        for mes in resumen["meses"]
+    ]))
+
+    partes.append("<hr><p><em>Reporte generado por el Evaluador de Iniciativas de Agentes de IA</em></p>")
+    partes.append("</body></html>")
+    return "".join(partes)
+
+
+# ─── Guardado ──────────────────────────────────────────────────────────────────
+def guardar_portafolio(base_dir: str, directorio_reportes: str, formato: str = "md",
+                       incluir_duplicados: bool = False, equipo: str = None,
+                       desde: str = None, hasta: str = None) -> str:
+    """
+    Calcula el portafolio sobre el historial y lo guarda.
+
+    Args:
+        formato: "md", "html" o "pdf" (el PDF requiere weasyprint + markdown)
+        equipo, desde, hasta: acotan el portafolio a un equipo y/o rango de
+            meses "AAAA-MM"; solo se leen los fragmentos correspondientes
+
+    Returns:
+        str: ruta del archivo generado, o None si se pidió PDF y no está disponible
+    """
+    from .fragmentos import consultar_historial
+    from .persistencia import iterar_historial
+
+    inicio = time.perf_counter()
+    filtros = {k: v for k, v in (("equipo", equipo), ("desde", desde), ("hasta", hasta)) if v}
+    evaluaciones = consultar_historial(base_dir, **filtros) if filtros else iterar_historial(base_dir)
+    resumen = resumir_portafolio(evaluaciones, incluir_duplicados)
+    resumen["filtro"] = " · ".join(f"{k.capitalize()}: {v}" for k, v in filtros.items())
+    os.makedirs(directorio_reportes, exist_ok=True)
+    base = os.path.join(directorio_reportes, f"portafolio_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+    if formato == "html":
+        ruta = f"{base}.html"
+        contenido = generar_html_portafolio(resumen)
+    else:
+        ruta = f"{base}.md"
+        contenido = generar_markdown_portafolio(resumen)
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(contenido)
+    if formato == "pdf":
+        ruta = guardar_pdf(ruta)
+
+    if REGISTRO.activo:
+        LATENCIA_REPORTE.con("portafolio").observar(time.perf_counter() - inicio)
+    return ruta
@@ -1,21 +1,40 @@
 """
-Generador de reportes en formato Markdown y PDF.
+Generador de reportes en formato Markdown, HTML y PDF.
+
+El HTML se arma directamente desde la evaluación (CSS en línea y barras SVG,
+sin recursos externos) y sirve tanto para abrir en el navegador como para
+imprimir. El PDF usa weasyprint si está instalado; si no, el escritor mínimo
+de utils.pdf genera una versión simple sin dependencias.
 """
 
+import html
 import os
+import time
 from datetime import datetime
 
+from core.metricas import LATENCIA_REPORTE, REGISTRO
+from .cache_reportes import obtener_reporte, sincronizar_cache
+from .cuantiles import describir_percentiles, percentil_categoria
+
+
+# Subir cuando cambie el contenido o el formato de los reportes: invalida la
+# caché de artefactos (ver utils.cache_reportes).
+VERSION_PLANTILLA = 2
+
 
-def generar_markdown(evaluacion: dict) -> str:
+def generar_markdown(evaluacion: dict, similares: list = None, percentiles: dict = None) -> str:
     """
     Genera el contenido de un reporte en formato Markdown.
 
     Args:
         evaluacion: dict con todos los datos de la evaluación
+        similares: iniciativas parecidas del historial (ver utils.similitud)
+        percentiles: percentiles respecto del historial (ver utils.cuantiles)
 
     Returns:
         str: contenido Markdown del reporte
     """
+    inicio = time.perf_counter()
     meta = evaluacion["meta"]
     resultados = evaluacion["resultados"]
     veredicto = evaluacion["veredicto"]
@@ -36,6 +55,19 @@ def generar_markdown(evaluacion: dict) -> str:
     md.append(f"### {veredicto['emoji']} {veredicto['nivel']}\n\n")
     md.append(f"**Puntaje Global: {puntaje}% / 100%**\n\n")
     md.append(_barra_progreso(puntaje) + "\n\n")
+    if percentiles:
+        md.append(f"📈 {describir_percentiles(percentiles)}\n\n")
+    incertidumbre = evaluacion.get("incertidumbre")
+    if incertidumbre:
+        bajo, alto = incertidumbre["intervalo"]
+        md.append(f"**Probabilidad de AGENTE RECOMENDADO (≥ 70%): "
+                  f"{incertidumbre['prob_agente_recomendado'] * 100:.0f}%** "
+                  f"(con duda en {len(incertidumbre['respuestas'])} preguntas; puntaje esperado "
+                  f"{incertidumbre['puntaje_esperado']}%, 90% entre {bajo}% y {alto}%)\n\n")
+        md.append("| Veredicto | Probabilidad |\n|-----------|--------------|\n")
+        for nivel, probabilidad in incertidumbre["niveles"].items():
+            md.append(f"| {nivel} | {probabilidad * 100:.1f}% |\n")
+        md.append("\n")
     md.append(f"{veredicto['sustento']}\n\n")
 
     # ── Alertas ───────────────────────────────────────────────────────────────
@@ -49,11 +81,18 @@ def generar_markdown(evaluacion: dict) -> str:
 
     # ── Resultados por categoría ──────────────────────────────────────────────
     md.append("## Resultados por Categoría\n\n")
-    md.append("| Categoría | Puntaje | Porcentaje | Barra |\n")
-    md.append("|-----------|---------|------------|-------|\n")
+    if percentiles:
+        md.append("| Categoría | Puntaje | Porcentaje | Barra | Percentil |\n")
+        md.append("|-----------|---------|------------|-------|-----------|\n")
+    else:
+        md.append("| Categoría | Puntaje | Porcentaje | Barra |\n")
+        md.append("|-----------|---------|------------|-------|\n")
     for cat in resultados["categorias"]:
-        barra = _barra_mini(cat["porcentaje"])
-        md.append(f"| {cat['nombre']} | {cat['puntaje_obtenido']}/{cat['puntaje_maximo']} | {cat['porcentaje']}% | {barra} |\n")
+        barra = barra_mini(cat["porcentaje"])
+        fila = f"| {cat['nombre']} | {cat['puntaje_obtenido']}/{cat['puntaje_maximo']} | {cat['porcentaje']}% | {barra} |"
+        if percentiles:
+            fila += f" {percentil_categoria(percentiles, cat['id'])} |"
+        md.append(fila + "\n")
     md.append("\n")
 
     # ── Detalle de respuestas ─────────────────────────────────────────────────
@@ -67,6 +106,18 @@ def generar_markdown(evaluacion: dict) -> str:
 
     md.append("---\n\n")
 
+    # ── Iniciativas similares del historial ───────────────────────────────────
+    if similares:
+        md.append("## 🔗 Iniciativas Similares en el Historial\n\n")
+        md.append("| # | Iniciativa | Equipo | Puntaje | Veredicto | Similitud |\n")
+        md.append("|---|------------|--------|---------|-----------|-----------|\n")
+        for sim in similares:
+            md.append(
+                f"| {sim['id']} | {sim['nombre_iniciativa']} | {sim['equipo']} | "
+                f"{sim['puntaje_global']}% | {sim['nivel']} | {sim['similitud']}% |\n"
+            )
+        md.append("\n---\n\n")
+
     # ── Recomendaciones de construcción ──────────────────────────────────────
     if veredicto.get("recomendaciones_construccion"):
         md.append("## ✅ Recomendaciones para Proceder\n\n")
@@ -98,39 +149,61 @@ def generar_markdown(evaluacion: dict) -> str:
     md.append("---\n")
     md.append("*Reporte generado por el Evaluador de Iniciativas de Agentes de IA v1.0*\n")
 
-    return "".join(md)
+    contenido = "".join(md)
+    if REGISTRO.activo:
+        LATENCIA_REPORTE.con("markdown").observar(time.perf_counter() - inicio)
+    return contenido
 
 
-def guardar_markdown(evaluacion: dict, directorio_reportes: str) -> str:
+def _escribir_texto(ruta: str, contenido: str) -> None:
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(contenido)
+
+
+def guardar_markdown(evaluacion: dict, directorio_reportes: str, similares: list = None,
+                     percentiles: dict = None) -> str:
     """
-    Guarda el reporte Markdown en disco.
+    Guarda el reporte Markdown en disco (o reutiliza el de la caché si la
+    evaluación no cambió desde la última exportación).
 
     Returns:
         str: ruta del archivo generado
     """
-    os.makedirs(directorio_reportes, exist_ok=True)
+    return obtener_reporte(
+        evaluacion, directorio_reportes, "md",
+        lambda ruta: _escribir_texto(ruta, generar_markdown(evaluacion, similares, percentiles)),
+        similares, VERSION_PLANTILLA, percentiles=percentiles,
+    )[0]
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    nombre_seguro = evaluacion["meta"]["nombre_iniciativa"].replace(" ", "_")[:30]
-    nombre_archivo = f"reporte_{nombre_seguro}_{timestamp}.md"
-    ruta = os.path.join(directorio_reportes, nombre_archivo)
 
-    contenido = generar_markdown(evaluacion)
-    with open(ruta, "w", encoding="utf-8") as f:
-        f.write(contenido)
-
-    return ruta
-
-
-def guardar_pdf(ruta_markdown: str) -> str:
+def guardar_pdf(ruta_markdown: str, evaluacion: dict = None, similares: list = None,
+                percentiles: dict = None) -> str:
     """
-    Convierte el archivo Markdown a PDF usando md-to-pdf o weasyprint.
-    Si no hay herramientas disponibles, informa al usuario.
+    Convierte el archivo Markdown a PDF usando weasyprint.
+
+    Si se pasa la evaluación, el PDF pasa por la caché de reportes y, cuando
+    weasyprint o markdown no están instalados, se genera con el escritor PDF
+    propio (generar_pdf_simple).
 
     Returns:
-        str: ruta del PDF generado, o mensaje de error
+        str: ruta del PDF generado, o None si no hay forma de generarlo
     """
-    ruta_pdf = ruta_markdown.replace(".md", ".pdf")
+    if evaluacion is None:
+        return _convertir_pdf(ruta_markdown, ruta_markdown.replace(".md", ".pdf"))
+
+    def generar(ruta_pdf):
+        if _convertir_pdf(ruta_markdown, ruta_pdf) is None:
+            generar_pdf_simple(evaluacion, ruta_pdf, similares, percentiles)
+
+    return obtener_reporte(
+        evaluacion, os.path.dirname(ruta_markdown), "pdf", generar, similares, VERSION_PLANTILLA,
+        percentiles=percentiles,
+    )[0]
+
+
+def _convertir_pdf(ruta_markdown: str, ruta_pdf: str) -> str:
+    """Markdown → HTML → PDF con markdown + weasyprint; None si no están instalados."""
+    inicio = time.perf_counter()
 
     # Intentar con weasyprint (más común en entornos Python)
     try:
@@ -178,12 +251,370 @@ def guardar_pdf(ruta_markdown: str) -> str:
         """
 
         HTML(string=full_html).write_pdf(ruta_pdf, stylesheets=[css_style])
+        if REGISTRO.activo:
+            LATENCIA_REPORTE.con("pdf").observar(time.perf_counter() - inicio)
         return ruta_pdf
 
     except ImportError:
         return None  # weasyprint no disponible
 
 
+# ─── HTML ──────────────────────────────────────────────────────────────────────
+# Compartidos con el reporte de portafolio (utils/portafolio.py)
+COLORES_EMOJI = {"🟢": "#2e9e5b", "🟡": "#e0a800", "🔴": "#d64541"}
+
+ESTILOS_HTML = """
+body { font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; font-size: 14px;
+       line-height: 1.5; color: #333; max-width: 900px; margin: 0 auto; padding: 24px; }
+h1 { color: #1a1a2e; border-bottom: 3px solid #4a90d9; padding-bottom: 10px; }
+h2 { color: #16213e; border-bottom: 1px solid #ddd; padding-bottom: 5px; margin-top: 32px; }
+h3 { color: #0f3460; }
+table { border-collapse: collapse; width: 100%; margin: 12px 0; }
+th { background-color: #4a90d9; color: white; padding: 6px 10px; text-align: left; }
+td { padding: 5px 10px; border: 1px solid #ddd; }
+tr:nth-child(even) { background-color: #f8f9fa; }
+blockquote { border-left: 4px solid #4a90d9; padding-left: 15px; color: #555; margin: 10px 0; }
+.resumen { color: #555; }
+.veredicto { font-size: 20px; font-weight: bold; }
+@page { size: A4; margin: 18mm; }
+@media print {
+  body { max-width: none; padding: 0; font-size: 11pt; }
+  h2 { break-after: avoid; }
+  tr, li { break-inside: avoid; }
+  th, svg rect { -webkit-print-color-adjust: exact; print-color-adjust: exact; }
+}
+"""
+
+
+def svg_barra(porcentaje: float, color: str = "#4a90d9", ancho: int = 160) -> str:
+    """Barra horizontal SVG para celdas de tabla."""
+    lleno = max(0.0, min(porcentaje, 100)) / 100 * ancho
+    return (
+        f'<svg width="{ancho}" height="12" role="img" aria-label="{porcentaje}%">'
+        f'<rect width="{ancho}" height="12" fill="#e9ecef"/>'
+        f'<rect width="{lleno:.1f}" height="12" fill="{color}"/></svg>'
+    )
+
+
+def tabla_html(encabezados: list, filas: list) -> str:
+    """Tabla HTML; los encabezados se escapan, las celdas ya vienen escapadas."""
+    partes = ["<table><tr>", "".join(f"<th>{html.escape(h)}</th>" for h in encabezados), "</tr>"]
+    for fila in filas:
+        partes.append("<tr>" + "".join(f"<td>{celda}</td>" for celda in fila) + "</tr>")
+    partes.append("</table>")
+    return "".join(partes)
+
+
+_REFERENCIAS = [
+    ("Anthropic: Building Effective Agents (2024)",
+     "https://www.anthropic.com/research/building-effective-agents"),
+    ("Google Cloud: A Methodical Approach to Agent Evaluation",
+     "https://cloud.google.com/blog/topics/developers-practitioners/a-methodical-approach-to-agent-evaluation"),
+    ("AWS: Agents vs Automation - A Strategic Guide",
+     "https://aws.amazon.com/executive-insights/content/agents-vs-automation-a-strategic-guide-for-business-leaders/"),
+    ("Dataiku: How to Select High-Impact AI Agent Use Cases",
+     "https://www.dataiku.com/stories/blog/how-to-select-high-impact-ai-agent-use-cases"),
+    ("McKinsey: Rethinking Decision Making to Unlock AI Potential",
+     "https://www.mckinsey.com/capabilities/operations/our-insights/when-can-ai-make-good-decisions-the-rise-of-ai-corporate-citizens"),
+]
+
+
+def generar_html(evaluacion: dict, similares: list = None, percentiles: dict = None) -> str:
+    """
+    Genera el reporte como HTML autocontenido, con las mismas secciones que
+    el Markdown. No depende de markdown ni de weasyprint.
+
+    Args:
+        evaluacion: dict con todos los datos de la evaluación
+        similares: iniciativas parecidas del historial (ver utils.similitud)
+        percentiles: percentiles respecto del historial (ver utils.cuantiles)
+
+    Returns:
+        str: documento HTML listo para abrir o imprimir
+    """
+    inicio = time.perf_counter()
+    e = html.escape
+    meta = evaluacion["meta"]
+    resultados = evaluacion["resultados"]
+    veredicto = evaluacion["veredicto"]
+    puntaje = resultados["puntaje_global"]
+    color = COLORES_EMOJI.get(veredicto["emoji"], "#4a90d9")
+    fecha_formateada = datetime.fromisoformat(meta["fecha"]).strftime("%d de %B de %Y, %H:%M")
+
+    partes = [
+        "<!DOCTYPE html><html lang=\"es\"><head><meta charset=\"utf-8\">",
+        f"<title>Evaluación: {e(meta['nombre_iniciativa'])}</title>",
+        f"<style>{ESTILOS_HTML}</style></head><body>",
+        "<h1>🤖 Evaluación de Iniciativa de Agente de IA</h1>",
+        f"<blockquote><strong>Fecha:</strong> {e(fecha_formateada)}<br>"
+        f"<strong>Iniciativa:</strong> {e(meta['nombre_iniciativa'])}<br>"
+        f"<strong>Equipo / Empresa:</strong> {e(meta['equipo'])}<br>"
+        f"<strong>Responsable:</strong> {e(meta['responsable'])}</blockquote>",
+        "<h2>Veredicto Final</h2>",
+        f"<p class=\"veredicto\" style=\"color: {color}\">{veredicto['emoji']} {e(veredicto['nivel'])}</p>",
+        f"<p><strong>Puntaje Global: {puntaje}% / 100%</strong></p>",
+        f"<p>{svg_barra(puntaje, color, 360)}</p>",
+    ]
+    if percentiles:
+        partes.append(f"<p>📈 {e(describir_percentiles(percentiles))}</p>")
+    incertidumbre = evaluacion.get("incertidumbre")
+    if incertidumbre:
+        bajo, alto = incertidumbre["intervalo"]
+        partes.append(
+            f"<p><strong>Probabilidad de AGENTE RECOMENDADO (≥ 70%): "
+            f"{incertidumbre['prob_agente_recomendado'] * 100:.0f}%</strong> "
+            f"(con duda en {len(incertidumbre['respuestas'])} preguntas; puntaje esperado "
+            f"{incertidumbre['puntaje_esperado']}%, 90% entre {bajo}% y {alto}%)</p>"
+        )
+        partes.append(tabla_html(["Veredicto", "Probabilidad", ""], [
+            (e(nivel), f"{probabilidad * 100:.1f}%", svg_barra(probabilidad * 100))
+            for nivel, probabilidad in incertidumbre["niveles"].items()
+        ]))
+    partes.append(f"<p>{e(veredicto['sustento'])}</p>")
+
+    if veredicto.get("alertas"):
+        partes.append("<h3>⚠️ Señales de Alerta Identificadas</h3><ul>")
+        partes.extend(f"<li>{e(alerta)}</li>" for alerta in veredicto["alertas"])
+        partes.append("</ul>")
+
+    partes.append("<h2>Resultados por Categoría</h2>")
+    partes.append(tabla_html(["Categoría", "Puntaje", "Porcentaje", ""] + (["Percentil"] if percentiles else []), [
+        (e(cat["nombre"]), f"{cat['puntaje_obtenido']}/{cat['puntaje_maximo']}", f"{cat['porcentaje']}%",
+         svg_barra(cat["porcentaje"])) + ((e(percentil_categoria(percentiles, cat["id"])),) if percentiles else ())
+        for cat in resultados["categorias"]
+    ]))
+
+    partes.append("<h2>Detalle de Respuestas</h2>")
+    for cat in resultados["categorias"]:
+        partes.append(f"<h3>{e(cat['nombre'])}</h3><ol>")
+        for preg in cat["preguntas"]:
+            partes.append(
+                f"<li><strong>{e(preg['pregunta'])}</strong><br>"
+                f"✅ Respuesta elegida ({e(preg['respuesta'])}): <em>{e(preg['texto_respuesta'])}</em><br>"
+                f"📊 Puntaje: {preg['puntaje']} / {preg['puntaje_maximo']} puntos</li>"
+            )
+        partes.append("</ol>")
+
+    if similares:
+        partes.append("<h2>🔗 Iniciativas Similares en el Historial</h2>")
+        partes.append(tabla_html(["#", "Iniciativa", "Equipo", "Puntaje", "Veredicto", "Similitud"], [
+            (sim["id"], e(sim["nombre_iniciativa"]), e(sim["equipo"]), f"{sim['puntaje_global']}%",
+             e(sim["nivel"]), f"{sim['similitud']}%")
+            for sim in similares
+        ]))
+
+    if veredicto.get("recomendaciones_construccion"):
+        partes.append("<h2>✅ Recomendaciones para Proceder</h2><ul>")
+        partes.extend(f"<li>{e(rec)}</li>" for rec in veredicto["recomendaciones_construccion"])
+        partes.append("</ul>")
+
+    if veredicto.get("alternativas"):
+        partes.append("<h2>💡 Alternativas Recomendadas</h2>")
+        partes.append("<p>Dado que un agente de IA no es la solución más adecuada para esta iniciativa, "
+                      "aquí hay alternativas que pueden resolver el problema de forma más eficiente:</p>")
+        for i, alt in enumerate(veredicto["alternativas"], 1):
+            partes.append(
+                f"<h3>{i}. {e(alt['nombre'])}</h3>"
+                f"<p><strong>¿Qué es?</strong> {e(alt['descripcion'])}</p>"
+                f"<p><strong>¿Cuándo usarla?</strong> {e(alt['cuando'])}</p>"
+                f"<p><strong>Herramientas:</strong> {e(', '.join(alt['herramientas']))}</p>"
+            )
+
+    partes.append("<h2>📚 Marcos de Referencia Utilizados</h2><ul>")
+    partes.extend(f'<li><a href="{e(url)}">{e(titulo)}</a></li>' for titulo, url in _REFERENCIAS)
+    partes.append("</ul>")
+    partes.append("<hr><p><em>Reporte generado por el Evaluador de Iniciativas de Agentes de IA v1.0</em></p>")
+    partes.append("</body></html>")
+
+    contenido = "".join(partes)
+    if REGISTRO.activo:
+        LATENCIA_REPORTE.con("html").observar(time.perf_counter() - inicio)
+    return contenido
+
+
+def guardar_html(evaluacion: dict, directorio_reportes: str, similares: list = None,
+                 percentiles: dict = None) -> str:
+    """
+    Guarda el reporte HTML en disco.
+
+    Returns:
+        str: ruta del archivo generado
+    """
+    return obtener_reporte(
+        evaluacion, directorio_reportes, "html",
+        lambda ruta: _escribir_texto(ruta, generar_html(evaluacion, similares, percentiles)),
+        similares, VERSION_PLANTILLA, percentiles=percentiles,
+    )[0]
+
+
+# ─── PDF sin dependencias ──────────────────────────────────────────────────────
+def _color_pdf(hex_color: str) -> tuple:
+    return tuple(int(hex_color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+
+
+def generar_pdf_simple(evaluacion: dict, ruta_pdf: str, similares: list = None,
+                       percentiles: dict = None) -> str:
+    """
+    Escribe el reporte como PDF con el escritor propio (utils.pdf).
+
+    El diseño es más simple que el de weasyprint (una columna, sin tablas
+    con bordes) pero no necesita GTK ni paquetes externos.
+
+    Returns:
+        str: ruta del PDF generado
+    """
+    from .pdf import DocumentoPDF
+
+    inicio = time.perf_counter()
+    meta = evaluacion["meta"]
+    resultados = evaluacion["resultados"]
+    veredicto = evaluacion["veredicto"]
+    puntaje = resultados["puntaje_global"]
+    color = _color_pdf(COLORES_EMOJI.get(veredicto["emoji"], "#4a90d9"))
+    fecha_formateada = datetime.fromisoformat(meta["fecha"]).strftime("%d/%m/%Y %H:%M")
+
+    doc = DocumentoPDF(f"Evaluación: {meta['nombre_iniciativa']}")
+    doc.texto("Evaluación de Iniciativa de Agente de IA", tamano=18, negrita=True, color=(0.1, 0.1, 0.18))
+    doc.separador()
+    doc.texto(f"Fecha: {fecha_formateada}")
+    doc.texto(f"Iniciativa: {meta['nombre_iniciativa']}")
+    doc.texto(f"Equipo / Empresa: {meta['equipo']}")
+    doc.texto(f"Responsable: {meta['responsable']}")
+
+    doc.espacio(10)
+    doc.texto("Veredicto Final", tamano=14, negrita=True)
+    doc.texto(veredicto["nivel"], tamano=12, negrita=True, color=color)
+    doc.texto(f"Puntaje Global: {puntaje}% / 100%", negrita=True)
+    doc.barra(puntaje, color=color)
+    if percentiles:
+        doc.texto(describir_percentiles(percentiles))
+    incertidumbre = evaluacion.get("incertidumbre")
+    if incertidumbre:
+        bajo, alto = incertidumbre["intervalo"]
+        doc.texto(f"Probabilidad de AGENTE RECOMENDADO (>= 70%): "
+                  f"{incertidumbre['prob_agente_recomendado'] * 100:.0f}%", negrita=True)
+        doc.texto(f"Con duda en {len(incertidumbre['respuestas'])} preguntas; puntaje esperado "
+                  f"{incertidumbre['puntaje_esperado']}%, 90% entre {bajo}% y {alto}%")
+        for nivel, probabilidad in incertidumbre["niveles"].items():
+            doc.texto(f"- {nivel}: {probabilidad * 100:.1f}%", sangria=10)
+    doc.texto(veredicto["sustento"])
+
+    if veredicto.get("alertas"):
+        doc.espacio()
+        doc.texto("Señales de Alerta Identificadas", tamano=11, negrita=True)
+        for alerta in veredicto["alertas"]:
+            doc.texto(f"- {alerta}", sangria=10)
+
+    doc.espacio(10)
+    doc.texto("Resultados por Categoría", tamano=14, negrita=True)
+    for cat in resultados["categorias"]:
+        percentil = percentil_categoria(percentiles, cat["id"])
+        doc.texto(f"{cat['nombre']}: {cat['puntaje_obtenido']}/{cat['puntaje_maximo']} ({cat['porcentaje']}%)"
+                  + (f", {percentil}" if percentil else ""))
+        doc.barra(cat["porcentaje"], ancho=200, alto=7)
+
+    doc.espacio(10)
+    doc.texto("Detalle de Respuestas", tamano=14, negrita=True)
+    for cat in resultados["categorias"]:
+        doc.espacio()
+        doc.texto(cat["nombre"], tamano=11, negrita=True)
+        for i, preg in enumerate(cat["preguntas"], 1):
+            doc.texto(f"{i}. {preg['pregunta']}", negrita=True)
+            doc.texto(f"Respuesta elegida ({preg['respuesta']}): {preg['texto_respuesta']}", sangria=10)
+            doc.texto(f"Puntaje: {preg['puntaje']} / {preg['puntaje_maximo']} puntos", sangria=10)
+
+    if similares:
+        doc.espacio(10)
+        doc.texto("Iniciativas Similares en el Historial", tamano=14, negrita=True)
+        for sim in similares:
+            doc.texto(
+                f"#{sim['id']} {sim['nombre_iniciativa']} ({sim['equipo']}): {sim['puntaje_global']}%, "
+                f"{sim['nivel']}, similitud {sim['similitud']}%"
+            )
+
+    if veredicto.get("recomendaciones_construccion"):
+        doc.espacio(10)
+        doc.texto("Recomendaciones para Proceder", tamano=14, negrita=True)
+        for rec in veredicto["recomendaciones_construccion"]:
+            doc.texto(f"- {rec}", sangria=10)
+
+    if veredicto.get("alternativas"):
+        doc.espacio(10)
+        doc.texto("Alternativas Recomendadas", tamano=14, negrita=True)
+        for i, alt in enumerate(veredicto["alternativas"], 1):
+            doc.espacio()
+            doc.texto(f"{i}. {alt['nombre']}", tamano=11, negrita=True)
+            doc.texto(f"¿Qué es? {alt['descripcion']}")
+            doc.texto(f"¿Cuándo usarla? {alt['cuando']}")
+            doc.texto(f"Herramientas: {', '.join(alt['herramientas'])}")
+
+    doc.espacio(10)
+    doc.texto("Marcos de Referencia Utilizados", tamano=14, negrita=True)
+    for titulo, url in _REFERENCIAS:
+        doc.texto(f"- {titulo}: {url}", tamano=9, sangria=10)
+    doc.separador()
+    doc.texto("Reporte generado por el Evaluador de Iniciativas de Agentes de IA v1.0", tamano=9)
+
+    doc.guardar(ruta_pdf)
+    if REGISTRO.activo:
+        LATENCIA_REPORTE.con("pdf_simple").observar(time.perf_counter() - inicio)
+    return ruta_pdf
+
+
+# ─── Exportación masiva ────────────────────────────────────────────────────────
+def exportar_reporte_evaluacion(evaluacion: dict, directorio_reportes: str, formato: str = "md") -> bool:
+    """
+    Reporte de una evaluación para la exportación masiva (sin similares ni
+    percentiles), reutilizando el de la caché si no cambió.
+
+    Returns:
+        bool: True si se reutilizó de la caché
+    """
+    if formato == "html":
+        _, reutilizado = obtener_reporte(
+            evaluacion, directorio_reportes, "html",
+            lambda ruta: _escribir_texto(ruta, generar_html(evaluacion)), None, VERSION_PLANTILLA,
+        )
+    elif formato == "pdf":
+        _, reutilizado = obtener_reporte(
+            evaluacion, directorio_reportes, "pdf",
+            lambda ruta: generar_pdf_simple(evaluacion, ruta), None, VERSION_PLANTILLA,
+        )
+    else:
+        _, reutilizado = obtener_reporte(
+            evaluacion, directorio_reportes, "md",
+            lambda ruta: _escribir_texto(ruta, generar_markdown(evaluacion)), None, VERSION_PLANTILLA,
+        )
+    return reutilizado
+
+
+def exportar_reportes(base_dir: str, directorio_reportes: str, formato: str = "md") -> dict:
+    """
+    Exporta el reporte de cada evaluación del historial. Las que no cambiaron
+    desde la exportación anterior se reutilizan de la caché sin renderizar.
+    Los PDF masivos usan siempre el escritor propio (weasyprint tarda
+    segundos por documento).
+
+    Args:
+        formato: "md", "html" o "pdf"
+
+    Returns:
+        dict con generados, reutilizados y segundos
+    """
+    from .persistencia import iterar_historial
+
+    inicio = time.perf_counter()
+    generados = reutilizados = 0
+    for _, evaluacion in iterar_historial(base_dir):
+        if exportar_reporte_evaluacion(evaluacion, directorio_reportes, formato):
+            reutilizados += 1
+        else:
+            generados += 1
+    sincronizar_cache()
+    return {"generados": generados, "reutilizados": reutilizados,
+            "segundos": round(time.perf_counter() - inicio, 3)}
+
+
 def _barra_progreso(porcentaje: float, ancho: int = 30) -> str:
     """Genera una barra de progreso en texto para Markdown."""
     llenos = int(porcentaje / 100 * ancho)
@@ -192,7 +623,7 @@ def _barra_progreso(porcentaje: float, ancho: int = 30) -> str:
     return f"`{barra}` **{porcentaje}%**"
 
 
-def _barra_mini(porcentaje: float, ancho: int = 15) -> str:
+def barra_mini(porcentaje: float, ancho: int = 15) -> str:
     """Barra de progreso pequeña para tablas."""
     llenos = int(porcentaje / 100 * ancho)
     vacios = ancho - llenos
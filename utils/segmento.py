@@ -0,0 +1,408 @@
+"""
+Formato compacto de almacenamiento del historial (segmentos binarios).
+
+Un segmento es un archivo con una cabecera y una secuencia de bloques
+enmarcados; cada bloque lleva uno o más registros comprimidos juntos con el
+codec del segmento (ninguno, zlib con diccionario predefinido o lzma).
+
+Un registro normal guarda solo lo que no se puede recalcular: las letras
+elegidas, la meta, la versión del cuestionario y el código del nivel del
+veredicto. Al leerlo, `resultados` y `veredicto` se reconstruyen con
+core.modelo.reconstruir_evaluacion y el catálogo congelado de esa versión
+(core/catalogo.py). Si una evaluación no se reconstruye exactamente igual
+(versión sin congelar, campos extra, textos editados, otras reglas), se guarda
+completa como JSON, sin depender de ningún catálogo.
+
+    cabecera: magia(6) versión_formato(1) codec(1) versión_cuestionario(2)
+    bloque:   bytes(4) n_registros(2) crc32(4) datos_comprimidos
+    datos:    [longitud(4) registro] * n_registros
+
+Junto al segmento vive un índice de posiciones (<segmento>.idx) con una
+entrada de tamaño fijo por registro: posición del bloque, bytes del bloque e
+índice dentro del bloque. `LectorSegmento` mapea ambos archivos con mmap, así
+que leer el registro #N es una búsqueda directa sin recorrer el historial.
+"""
+
+import json
+import lzma
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from core.catalogo import cargar_cuestionario
+from core.modelo import NIVELES, desde_registro, reconstruir_evaluacion
+from core.preguntas import VERSION_CUESTIONARIO
+from .similitud import letras_respuestas
+
+
+MAGIA = b"EVSEG\x00"
+VERSION_FORMATO = 1
+CODECS = {"ninguno": 0, "zlib": 1, "lzma": 2}
+REGISTROS_POR_BLOQUE = 64
+
+_CABECERA = struct.Struct("<6sBBH")
+_MARCO = struct.Struct("<IHI")
+_LONGITUD = struct.Struct("<I")
+_RECONSTRUIBLE = struct.Struct("<BHB")    # tipo, versión del cuestionario, código de nivel
+_ENTRADA = struct.Struct("<QIH")          # posición del bloque, bytes con marco, índice en el bloque
+
+_TIPO_RECONSTRUIBLE = 0
+# Modelo compacto de core.modelo: resuelve los textos con el catálogo actual,
+# así que ya no se escribe (se sigue leyendo en segmentos anteriores)
+_TIPO_COMPLETO = 1
+_TIPO_VACIO = 2
+_TIPO_JSON = 3
+
+# Registro que ocupa la posición de una evaluación borrada (conserva los ids)
+REGISTRO_VACIO = bytes((_TIPO_VACIO,))
+
+# Diccionario de zlib: lo que se repite en todo registro pequeño (no modificar:
+# los segmentos existentes se descomprimen con él)
+_DICCIONARIO_ZLIB = (
+    '{"nombre_iniciativa": "", "equipo": "", "responsable": "", "descripcion": "", '
+    '"fecha": "2026-01-01T00:00:00.000000", "duplicado_de": '
+    "Automatizar proceso de clientes facturas reportes soporte ventas operaciones finanzas"
+).encode("utf-8")
+
+_FILTROS_LZMA = [{"id": lzma.FILTER_LZMA2, "preset": 6}]
+
+_LOCK = threading.Lock()    # escrituras al segmento y a su índice
+
+
+# ─── Codificación de registros ─────────────────────────────────────────────────
+def _normalizar(evaluacion: dict) -> dict:
+    """La evaluación tal como quedaría tras guardarse y leerse como JSON."""
+    return json.loads(json.dumps(evaluacion, ensure_ascii=False))
+
+
+def codificar_registro(evaluacion: dict) -> bytes:
+    """Codifica una evaluación; usa la forma reconstruible solo si es exacta."""
+    evaluacion = _normalizar(evaluacion)
+    claves = set(evaluacion)
+    nivel = evaluacion.get("veredicto", {}).get("nivel")
+    if claves == {"meta", "respuestas", "resultados", "veredicto"} and nivel in NIVELES:
+        letras = letras_respuestas(evaluacion)
+        try:
+            reconstruible = reconstruir_evaluacion(evaluacion["meta"], letras) == evaluacion
+        except ValueError:
+            reconstruible = False   # la versión vigente todavía no está congelada
+        if reconstruible:
+            return (
+                _RECONSTRUIBLE.pack(_TIPO_RECONSTRUIBLE, VERSION_CUESTIONARIO, NIVELES.index(nivel))
+                + letras.encode("ascii")
+                + json.dumps(evaluacion["meta"], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            )
+    return bytes((_TIPO_JSON,)) + json.dumps(
+        evaluacion, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def decodificar_registro(datos) -> dict:
+    """Inverso de `codificar_registro` (acepta bytes o memoryview); None si es un registro vacío."""
+    if datos[0] == _TIPO_VACIO:
+        return None
+    if datos[0] == _TIPO_JSON:
+        return json.loads(str(datos[1:], "utf-8"))
+    if datos[0] == _TIPO_COMPLETO:
+        return desde_registro(json.loads(str(datos[1:], "utf-8"))).a_dict()
+    _, version, _ = _RECONSTRUIBLE.unpack_from(datos)
+    inicio = _RECONSTRUIBLE.size
+    n_letras = len(cargar_cuestionario(version).orden)
+    letras = str(datos[inicio:inicio + n_letras], "ascii")
+    meta = json.loads(str(datos[inicio + n_letras:], "utf-8"))
+    return reconstruir_evaluacion(meta, letras, version)
+
+
+def nivel_registro(datos) -> str:
+    """Nivel del veredicto de un registro codificado, sin reconstruirlo (None si está vacío)."""
+    if datos[0] == _TIPO_VACIO:
+        return None
+    if datos[0] == _TIPO_JSON:
+        return json.loads(str(datos[1:], "utf-8")).get("veredicto", {}).get("nivel")
+    if datos[0] == _TIPO_COMPLETO:
+        return json.loads(str(datos[1:], "utf-8"))[2][0]
+    return NIVELES[_RECONSTRUIBLE.unpack_from(datos)[2]]
+
+
+# ─── Bloques ───────────────────────────────────────────────────────────────────
+def _comprimir(datos: bytes, codec: int) -> bytes:
+    if codec == CODECS["zlib"]:
+        compresor = zlib.compressobj(9, zdict=_DICCIONARIO_ZLIB)
+        return compresor.compress(datos) + compresor.flush()
+    if codec == CODECS["lzma"]:
+        return lzma.compress(datos, format=lzma.FORMAT_RAW, filters=_FILTROS_LZMA)
+    return datos
+
+
+def _descomprimir(datos: bytes, codec: int) -> bytes:
+    if codec == CODECS["zlib"]:
+        descompresor = zlib.decompressobj(zdict=_DICCIONARIO_ZLIB)
+        return descompresor.decompress(datos) + descompresor.flush()
+    if codec == CODECS["lzma"]:
+        return lzma.decompress(datos, format=lzma.FORMAT_RAW, filters=_FILTROS_LZMA)
+    return datos
+
+
+def _bloque(registros: list, codec: int) -> bytes:
+    datos = _comprimir(b"".join(_LONGITUD.pack(len(r)) + r for r in registros), codec)
+    return _MARCO.pack(len(datos), len(registros), zlib.crc32(datos)) + datos
+
+
+def _registros_bloque(datos: bytes, codec: int) -> list:
+    datos = _descomprimir(datos, codec)
+    registros, pos = [], 0
+    while pos < len(datos):
+        (longitud,) = _LONGITUD.unpack_from(datos, pos)
+        pos += _LONGITUD.size
+        registros.append(datos[pos:pos + longitud])
+        pos += longitud
+    return registros
+
+
+def _leer_cabecera(f) -> int:
+    """Valida la cabecera y retorna el codec del segmento."""
+    cabecera = f.read(_CABECERA.size)
+    if len(cabecera) < _CABECERA.size:
+        raise ValueError("Segmento sin cabecera")
+    magia, version_formato, codec, _ = _CABECERA.unpack(cabecera)
+    if magia != MAGIA or version_formato != VERSION_FORMATO:
+        raise ValueError("No es un segmento de historial reconocido")
+    return codec
+
+
+def _marcos(f, leer_datos: bool = True):
+    """
+    Itera (posición, n_registros, datos) de los bloques completos; ignora una
+    cola truncada. Con leer_datos=False salta los datos (datos = longitud).
+    """
+    tamano = os.fstat(f.fileno()).st_size
+    while True:
+        posicion = f.tell()
+        marco = f.read(_MARCO.size)
+        if len(marco) < _MARCO.size:
+            return
+        longitud, n_registros, crc = _MARCO.unpack(marco)
+        if posicion + _MARCO.size + longitud > tamano:
+            return
+        if not leer_datos:
+            f.seek(longitud, os.SEEK_CUR)
+            yield posicion, n_registros, longitud
+            continue
+        datos = f.read(longitud)
+        if zlib.crc32(datos) != crc:
+            raise ValueError(f"Bloque corrupto en la posición {posicion}")
+        yield posicion, n_registros, datos
+
+
+# ─── API de segmentos ──────────────────────────────────────────────────────────
+def escribir_segmento(ruta: str, evaluaciones, codec: str = "zlib",
+                      registros_por_bloque: int = REGISTROS_POR_BLOQUE) -> int:
+    """
+    Escribe un segmento nuevo con las evaluaciones dadas (reemplazo atómico).
+
+    Returns:
+        int: cantidad de registros escritos
+    """
+    return escribir_registros(
+        ruta, (codificar_registro(ev) for ev in evaluaciones), codec, registros_por_bloque
+    )
+
+
+def escribir_registros(ruta: str, registros, codec: str = "zlib",
+                       registros_por_bloque: int = REGISTROS_POR_BLOQUE, limite_bytes: int = None) -> int:
+    """
+    Como `escribir_segmento`, con registros ya codificados (bytes). Con
+    `limite_bytes` deja de consumir `registros` al cerrar el bloque con el que
+    el archivo alcanza ese tamaño (el resto queda para otro segmento).
+    """
+    id_codec = CODECS[codec]
+    temporal = f"{ruta}.tmp"
+    total, pendientes = 0, []
+    with open(temporal, "wb") as f:
+        f.write(_CABECERA.pack(MAGIA, VERSION_FORMATO, id_codec, VERSION_CUESTIONARIO))
+        for registro in registros:
+            pendientes.append(registro)
+            total += 1
+            if len(pendientes) == registros_por_bloque:
+                f.write(_bloque(pendientes, id_codec))
+                pendientes = []
+                if limite_bytes is not None and f.tell() >= limite_bytes:
+                    break
+        if pendientes:
+            f.write(_bloque(pendientes, id_codec))
+        f.flush()
+        os.fsync(f.fileno())
+    with _LOCK:
+        os.replace(temporal, ruta)
+        if os.path.exists(ruta_indice(ruta)):
+            os.remove(ruta_indice(ruta))
+    return total
+
+
+def agregar_a_segmento(ruta: str, evaluacion: dict) -> int:
+    """
+    Agrega una evaluación como un bloque de un registro al final del segmento.
+
+    Returns:
+        int: id del registro agregado (posición 1-based en el segmento)
+    """
+    return agregar_registro(ruta, codificar_registro(evaluacion))
+
+
+def agregar_registro(ruta: str, datos: bytes) -> int:
+    """Como `agregar_a_segmento`, con un registro ya codificado."""
+    return agregar_registros(ruta, [datos])
+
+
+def agregar_registros(ruta: str, registros: list) -> int:
+    """
+    Agrega registros ya codificados al final del segmento en bloques de
+    `REGISTROS_POR_BLOQUE`, con una sola escritura al segmento y otra al índice.
+
+    Returns:
+        int: id del último registro agregado
+    """
+    with _LOCK:
+        n_registros, fin = _sincronizar_indice(ruta)
+        with open(ruta, "rb") as f:
+            codec = _leer_cabecera(f)
+        bloques, entradas = [], []
+        posicion = fin
+        for i in range(0, len(registros), REGISTROS_POR_BLOQUE):
+            grupo = registros[i:i + REGISTROS_POR_BLOQUE]
+            bloque = _bloque(grupo, codec)
+            bloques.append(bloque)
+            entradas.extend(_ENTRADA.pack(posicion, len(bloque), j) for j in range(len(grupo)))
+            posicion += len(bloque)
+        with open(ruta, "r+b") as f:
+            # Lo que sigue al último bloque indexado es un bloque truncado
+            f.truncate(fin)
+            f.seek(fin)
+            f.write(b"".join(bloques))
+        with open(ruta_indice(ruta), "ab") as f:
+            f.write(b"".join(entradas))
+    return n_registros + len(registros)
+
+
+def iterar_registros(ruta: str):
+    """Itera los registros codificados (bytes) del segmento, en orden."""
+    with open(ruta, "rb") as f:
+        codec = _leer_cabecera(f)
+        for _, _, datos in _marcos(f):
+            yield from _registros_bloque(datos, codec)
+
+
+def leer_segmento(ruta: str):
+    """Itera las evaluaciones del segmento ya reconstruidas, en orden (None = vacío)."""
+    for datos in iterar_registros(ruta):
+        yield decodificar_registro(datos)
+
+
+def contar_registros(ruta: str) -> int:
+    """Cantidad de registros del segmento (según su índice de posiciones)."""
+    with _LOCK:
+        return _sincronizar_indice(ruta)[0]
+
+
+# ─── Índice de posiciones ──────────────────────────────────────────────────────
+def ruta_indice(ruta: str) -> str:
+    return f"{ruta}.idx"
+
+
+def _sincronizar_indice(ruta: str) -> tuple:
+    """
+    Completa el índice con los bloques que le falten (o lo reconstruye si no
+    corresponde al segmento) y retorna (cantidad de registros, fin del último bloque).
+    """
+    ruta_idx = ruta_indice(ruta)
+    tamano = os.path.getsize(ruta)
+    fin = _CABECERA.size
+    n_registros = 0
+    existe = os.path.exists(ruta_idx)
+    if existe:
+        n_registros = os.path.getsize(ruta_idx) // _ENTRADA.size
+        if n_registros:
+            with open(ruta_idx, "rb") as f:
+                f.seek((n_registros - 1) * _ENTRADA.size)
+                posicion, longitud, _ = _ENTRADA.unpack(f.read(_ENTRADA.size))
+            fin = posicion + longitud
+        if fin > tamano:
+            # El índice no corresponde a este segmento
+            n_registros, fin = 0, _CABECERA.size
+        elif fin == tamano and os.path.getsize(ruta_idx) == n_registros * _ENTRADA.size:
+            return n_registros, fin
+
+    entradas = []
+    with open(ruta, "rb") as f:
+        _leer_cabecera(f)
+        f.seek(fin)
+        for posicion, n, longitud in _marcos(f, leer_datos=False):
+            fin = posicion + _MARCO.size + longitud
+            entradas.extend(_ENTRADA.pack(posicion, _MARCO.size + longitud, i) for i in range(n))
+    with open(ruta_idx, "r+b" if existe else "wb") as f:
+        f.seek(n_registros * _ENTRADA.size)
+        f.write(b"".join(entradas))
+        f.truncate()
+    return n_registros + len(entradas), fin
+
+
+class LectorSegmento:
+    """
+    Acceso aleatorio a un segmento mediante mmap del segmento y de su índice.
+    Los registros sin comprimir se decodifican directamente desde el mapa
+    (memoryview, sin copiar); los comprimidos descomprimen solo su bloque,
+    y el último bloque leído queda en caché para recorridos paginados.
+
+        with LectorSegmento(ruta) as lector:
+            evaluacion = lector.evaluacion(42)
+    """
+
+    def __init__(self, ruta: str):
+        with _LOCK:
+            self._n, _ = _sincronizar_indice(ruta)
+        self._archivo = open(ruta, "rb")
+        self._codec = _leer_cabecera(self._archivo)
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._archivo_idx = open(ruta_indice(ruta), "rb")
+        self._mapa_idx = (
+            mmap.mmap(self._archivo_idx.fileno(), 0, access=mmap.ACCESS_READ) if self._n else None
+        )
+        self._bloque_cache = (None, None)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self._bloque_cache = (None, None)
+        for recurso in (self._mapa, self._mapa_idx, self._archivo, self._archivo_idx):
+            if recurso is not None:
+                recurso.close()
+
+    def datos(self, id_registro: int):
+        """Registro codificado #id_registro (1-based), como memoryview o bytes."""
+        if not 1 <= id_registro <= self._n:
+            raise IndexError(f"No existe el registro #{id_registro}")
+        posicion, longitud, indice = _ENTRADA.unpack_from(
+            self._mapa_idx, (id_registro - 1) * _ENTRADA.size
+        )
+        if self._bloque_cache[0] != posicion:
+            vista = memoryview(self._mapa)[posicion + _MARCO.size:posicion + longitud]
+            self._bloque_cache = (posicion, _registros_bloque(vista, self._codec))
+        return self._bloque_cache[1][indice]
+
+    def evaluacion(self, id_registro: int) -> dict:
+        """Evaluación #id_registro (1-based) reconstruida, o None si está vacía."""
+        return decodificar_registro(self.datos(id_registro))
+
+    def pagina(self, desde: int, cantidad: int) -> list:
+        """[(id, evaluación)] desde el id dado (1-based), hasta `cantidad` registros."""
+        hasta = min(self._n, desde + cantidad - 1)
+        return [(i, self.evaluacion(i)) for i in range(max(desde, 1), hasta + 1)]
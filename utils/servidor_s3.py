@@ -0,0 +1,232 @@
+"""
+Servidor compatible con la API de S3 que corre dentro del proceso, para
+probar y medir AlmacenamientoS3 sin red ni credenciales reales.
+
+Implementa lo que usa el backend: PUT, GET, HEAD y DELETE de objetos,
+ListObjectsV2 y la subida multiparte (iniciar, subir partes, completar y
+abortar). Verifica la firma SigV4 y el hash del cuerpo de cada pedido, usa
+HTTP/1.1 con conexiones persistentes y cuenta las que se abren. Puede sumar
+una latencia fija por pedido para parecerse a un servicio remoto.
+
+    with ServidorS3Local(latencia=0.005) as servidor:
+        backend = servidor.backend("evaluador")
+        backend.escribir("historial/00000001.json", datos)
+"""
+
+import hashlib
+import threading
+import time
+import urllib.parse
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+from .almacenamiento import AlmacenamientoS3, firmar_sigv4
+
+
+CLAVE_ACCESO = "evaluador-local"
+CLAVE_SECRETA = "secreto-local"
+MAXIMO_LISTADO = 1000           # claves por página de ListObjectsV2, como S3
+
+_XMLNS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class _Pedido(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True      # cabeceras y cuerpo salen en dos escrituras
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.s3.lock:
+            self.server.s3.conexiones += 1
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _atender(self) -> None:
+        largo = int(self.headers.get("Content-Length") or 0)
+        cuerpo = self.rfile.read(largo) if largo else b""
+        estado, cabeceras, respuesta = self.server.s3.atender(self.command, self.path, self.headers, cuerpo)
+        self.send_response(estado)
+        for nombre, valor in cabeceras.items():
+            self.send_header(nombre, valor)
+        self.send_header("Content-Length", str(len(respuesta)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(respuesta)
+
+    do_GET = do_PUT = do_POST = do_DELETE = do_HEAD = _atender
+
+
+def _error(estado: int, codigo: str) -> tuple:
+    return estado, {"Content-Type": "application/xml"}, (
+        f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><Error><Code>{codigo}</Code></Error>"
+    ).encode("utf-8")
+
+
+def _xml(contenido: str) -> tuple:
+    return 200, {"Content-Type": "application/xml"}, (
+        "<?xml version=\"1.0\" encoding=\"UTF-8\"?>" + contenido
+    ).encode("utf-8")
+
+
+class ServidorS3Local:
+    """
+    Servidor S3 en un hilo, escuchando en 127.0.0.1 (puerto libre).
+
+    Args:
+        buckets: buckets que existen (los demás responden NoSuchBucket)
+        latencia: segundos que se demora cada respuesta
+    """
+
+    def __init__(self, buckets: tuple = ("evaluador",), latencia: float = 0.0, region: str = "us-east-1"):
+        self.objetos = {bucket: {} for bucket in buckets}     # bucket → {clave: (datos, etag)}
+        self.cargas = {}                                       # uploadId → (bucket, clave, {n: (datos, etag)})
+        self.latencia = latencia
+        self.region = region
+        self.conexiones = 0
+        self.pedidos = 0
+        self.lock = threading.Lock()
+        self._http = None
+        self._hilo = None
+
+    # ── Ciclo de vida ─────────────────────────────────────────────────────────
+    def iniciar(self) -> "ServidorS3Local":
+        self._http = ThreadingHTTPServer(("127.0.0.1", 0), _Pedido)
+        self._http.daemon_threads = True
+        self._http.s3 = self
+        self._hilo = threading.Thread(target=self._http.serve_forever, name="servidor-s3", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+
+    def __enter__(self) -> "ServidorS3Local":
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.detener()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._http.server_address[1]}"
+
+    def backend(self, bucket: str = "evaluador", prefijo: str = "", **opciones) -> AlmacenamientoS3:
+        """AlmacenamientoS3 que apunta a este servidor con sus credenciales."""
+        return AlmacenamientoS3(self.url, bucket, prefijo, region=self.region, clave_acceso=CLAVE_ACCESO,
+                                clave_secreta=CLAVE_SECRETA, **opciones)
+
+    # ── Pedidos ───────────────────────────────────────────────────────────────
+    def _firma_valida(self, metodo: str, ruta: str, consulta: dict, cabeceras, cuerpo: bytes) -> str:
+        """None si la firma es correcta, si no el código de error de S3."""
+        hash_cuerpo = cabeceras.get("x-amz-content-sha256", "")
+        if hash_cuerpo != hashlib.sha256(cuerpo).hexdigest():
+            return "XAmzContentSHA256Mismatch"
+        autorizacion = cabeceras.get("Authorization", "")
+        try:
+            credencial = autorizacion.split("Credential=", 1)[1].split(",", 1)[0]
+            clave_acceso = credencial.split("/", 1)[0]
+            instante = time.strptime(cabeceras["x-amz-date"], "%Y%m%dT%H%M%SZ")
+        except (IndexError, KeyError, ValueError):
+            return "AccessDenied"
+        if clave_acceso != CLAVE_ACCESO:
+            return "InvalidAccessKeyId"
+        esperada = firmar_sigv4(
+            metodo, cabeceras.get("Host", ""), ruta, consulta, hash_cuerpo, CLAVE_ACCESO, CLAVE_SECRETA,
+            self.region, datetime(*instante[:6], tzinfo=timezone.utc),
+        )["Authorization"]
+        return None if esperada == autorizacion else "SignatureDoesNotMatch"
+
+    def atender(self, metodo: str, url: str, cabeceras, cuerpo: bytes) -> tuple:
+        """(estado, cabeceras, cuerpo) de la respuesta a un pedido."""
+        if self.latencia:
+            time.sleep(self.latencia)
+        with self.lock:
+            self.pedidos += 1
+        ruta, _, consulta_texto = url.partition("?")
+        consulta = dict(urllib.parse.parse_qsl(consulta_texto, keep_blank_values=True))
+        error = self._firma_valida(metodo, ruta, consulta, cabeceras, cuerpo)
+        if error:
+            return _error(403 if error != "XAmzContentSHA256Mismatch" else 400, error)
+
+        bucket, _, clave = urllib.parse.unquote(ruta.lstrip("/")).partition("/")
+        if bucket not in self.objetos:
+            return _error(404, "NoSuchBucket")
+        with self.lock:
+            if not clave:
+                if metodo == "GET" and consulta.get("list-type") == "2":
+                    return self._listar(bucket, consulta)
+                return _error(405, "MethodNotAllowed")
+            if "uploads" in consulta and metodo == "POST":
+                carga = uuid.uuid4().hex
+                self.cargas[carga] = (bucket, clave, {})
+                return _xml(f"<InitiateMultipartUploadResult xmlns=\"{_XMLNS}\"><Bucket>{bucket}</Bucket>"
+                            f"<Key>{escape(clave)}</Key><UploadId>{carga}</UploadId>"
+                            "</InitiateMultipartUploadResult>")
+            if "uploadId" in consulta:
+                return self._multiparte(metodo, bucket, clave, consulta, cuerpo)
+            objetos = self.objetos[bucket]
+            if metodo == "PUT":
+                etag = hashlib.md5(cuerpo).hexdigest()
+                objetos[clave] = (cuerpo, etag)
+                return 200, {"ETag": f'"{etag}"'}, b""
+            if metodo in ("GET", "HEAD"):
+                if clave not in objetos:
+                    return _error(404, "NoSuchKey")
+                datos, etag = objetos[clave]
+                return 200, {"ETag": f'"{etag}"', "Content-Type": "application/octet-stream"}, datos
+            if metodo == "DELETE":
+                objetos.pop(clave, None)
+                return 204, {}, b""
+        return _error(405, "MethodNotAllowed")
+
+    def _multiparte(self, metodo: str, bucket: str, clave: str, consulta: dict, cuerpo: bytes) -> tuple:
+        carga = self.cargas.get(consulta["uploadId"])
+        if carga is None or carga[:2] != (bucket, clave):
+            return _error(404, "NoSuchUpload")
+        partes = carga[2]
+        if metodo == "PUT":
+            etag = hashlib.md5(cuerpo).hexdigest()
+            partes[int(consulta["partNumber"])] = (cuerpo, etag)
+            return 200, {"ETag": f'"{etag}"'}, b""
+        if metodo == "DELETE":
+            del self.cargas[consulta["uploadId"]]
+            return 204, {}, b""
+        if metodo == "POST":
+            pedidas = [
+                (int(parte.findtext("PartNumber")), parte.findtext("ETag").strip('"'))
+                for parte in ET.fromstring(cuerpo).iter("Part")
+            ]
+            if not pedidas or [n for n, _ in pedidas] != sorted(n for n, _ in pedidas):
+                return _error(400, "InvalidPartOrder")
+            if any(n not in partes or partes[n][1] != etag for n, etag in pedidas):
+                return _error(400, "InvalidPart")
+            datos = b"".join(partes[n][0] for n, _ in pedidas)
+            resumenes = b"".join(bytes.fromhex(partes[n][1]) for n, _ in pedidas)
+            etag = f"{hashlib.md5(resumenes).hexdigest()}-{len(pedidas)}"
+            self.objetos[bucket][clave] = (datos, etag)
+            del self.cargas[consulta["uploadId"]]
+            return _xml(f"<CompleteMultipartUploadResult xmlns=\"{_XMLNS}\"><Key>{escape(clave)}</Key>"
+                        f"<ETag>\"{etag}\"</ETag></CompleteMultipartUploadResult>")
+        return _error(405, "MethodNotAllowed")
+
+    def _listar(self, bucket: str, consulta: dict) -> tuple:
+        prefijo = consulta.get("prefix", "")
+        desde = consulta.get("continuation-token", "")
+        claves = sorted(c for c in self.objetos[bucket] if c.startswith(prefijo) and c > desde)
+        pagina, truncado = claves[:MAXIMO_LISTADO], len(claves) > MAXIMO_LISTADO
+        contenidos = "".join(
+            f"<Contents><Key>{escape(c)}</Key><ETag>\"{self.objetos[bucket][c][1]}\"</ETag>"
+            f"<Size>{len(self.objetos[bucket][c][0])}</Size></Contents>"
+            for c in pagina
+        )
+        siguiente = f"<NextContinuationToken>{escape(pagina[-1])}</NextContinuationToken>" if truncado else ""
+        return _xml(f"<ListBucketResult xmlns=\"{_XMLNS}\"><Name>{bucket}</Name><Prefix>{escape(prefijo)}</Prefix>"
+                    f"<KeyCount>{len(pagina)}</KeyCount><IsTruncated>{'true' if truncado else 'false'}</IsTruncated>"
+                    f"{contenidos}{siguiente}</ListBucketResult>")
@@ -0,0 +1,333 @@
+"""
+Índice de iniciativas similares sobre el historial de evaluaciones.
+
+Combina dos señales:
+  - Respuestas: distancia L1 ponderada entre vectores de puntaje por pregunta,
+    con el mismo peso que cada pregunta tiene en el puntaje global. Los pesos
+    se escalan a enteros exactos y cada pregunta se guarda como una columna de
+    bytes (un código de letra por registro); para una consulta, `bytes.translate`
+    convierte cada columna en distancias y se suman las 16 columnas como enteros
+    grandes con un campo de 16 bits por registro. Así la distancia a los 100k
+    registros se calcula sin un bucle Python por registro, y el byte alto de
+    esos campos preselecciona los candidatos con `bytes.count`.
+  - Texto: índice invertido de tokens de `nombre_iniciativa` y `descripcion`
+    con similitud coseno ponderada por IDF.
+
+El índice se persiste como un log JSONL en data/ que crece con cada
+`guardar_evaluacion`; en memoria se carga una sola vez y luego solo se leen
+las líneas nuevas. La primera línea lleva la generación del archivo, que cambia
+cada vez que se reconstruye: si otro proceso lo reconstruyó (tras un borrado o
+una edición), la posición leída ya no vale y se vuelve a cargar entero.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import threading
+from array import array
+from fractions import Fraction
+from functools import reduce
+
+from core.preguntas import CATEGORIAS, PUNTOS, obtener_puntaje_maximo_categoria
+from .texto import tokenizar
+
+
+ARCHIVO_INDICE_SIMILITUD = "data/indice_similitud.jsonl"
+
+PESO_RESPUESTAS = 0.6
+PESO_TEXTO = 0.4
+FRACCION_TOKEN_COMUN = 0.10   # tokens presentes en >10% de los registros no generan candidatos
+
+# ─── Vector de respuestas ──────────────────────────────────────────────────────
+# Orden fijo de preguntas, puntos por letra y peso de cada punto en el puntaje global
+_ORDEN_PREGUNTAS = []
+_PUNTOS = []
+_PESOS = []
+for _cat in CATEGORIAS:
+    _maximo = obtener_puntaje_maximo_categoria(_cat)
+    for _preg in _cat["preguntas"]:
+        _ORDEN_PREGUNTAS.append(_preg["id"])
+        _PUNTOS.append(PUNTOS[_preg["id"]])
+        _PESOS.append(Fraction(str(_cat["peso"])) / _maximo if _maximo else Fraction(0))
+
+# Escala entera exacta: mínimo común múltiplo de los denominadores de los pesos.
+# Si la distancia máxima no cabe en 16 bits se usa una escala aproximada.
+_ESCALA = reduce(lambda a, b: a * b // math.gcd(a, b), (w.denominator for w in _PESOS), 1)
+_MAX_DISTANCIA = sum(w * max(t.values()) for w, t in zip(_PESOS, _PUNTOS))
+if _MAX_DISTANCIA * _ESCALA > 0xFFFF:
+    _ESCALA = int(0xFFFF / _MAX_DISTANCIA)
+_UNIDADES = [round(w * _ESCALA) for w in _PESOS]
+_PESOS = [float(w) for w in _PESOS]
+# Desplazamiento que lleva la distancia máxima al tope de 16 bits: así el byte
+# alto de cada campo tiene la mayor resolución posible para preseleccionar.
+_DESPLAZAMIENTO = 0
+while (sum(_UNIDADES[i] * max(t.values()) for i, t in enumerate(_PUNTOS)) << (_DESPLAZAMIENTO + 1)) <= 0xFFFF:
+    _DESPLAZAMIENTO += 1
+
+# Cada registro ocupa 2 bytes por columna: el código de la letra (byte bajo)
+# y el código + 128 (byte alto); una sola tabla de traducción produce ambos.
+_CODIGOS = {letra: i for i, letra in enumerate("-ABCDEFGHIJKLMNOPQRSTUVWXYZ")}
+_ALTO = 128
+
+
+def letras_respuestas(evaluacion: dict) -> str:
+    """Vector de respuestas como cadena de letras en el orden del cuestionario ('-' = sin responder)."""
+    respuestas = evaluacion.get("respuestas", {})
+    return "".join(
+        (respuestas[pid][0] if pid in respuestas else "-") for pid in _ORDEN_PREGUNTAS
+    )
+
+
+def _vector(letras: str) -> tuple:
+    return tuple(
+        tabla.get(letra, 0) * peso
+        for letra, tabla, peso in zip(letras, _PUNTOS, _PESOS)
+    )
+
+
+def _tablas_distancia(letras: str) -> list:
+    """Por pregunta, tabla de traducción código → bytes (bajo, alto) de la distancia entera."""
+    tablas = []
+    for letra, puntos, unidad in zip(letras, _PUNTOS, _UNIDADES):
+        propio = puntos.get(letra, 0)
+        tabla = bytearray(256)
+        for otra, codigo in _CODIGOS.items():
+            distancia = (abs(propio - puntos.get(otra, 0)) * unidad) << _DESPLAZAMIENTO
+            tabla[codigo] = distancia & 0xFF
+            tabla[codigo + _ALTO] = distancia >> 8
+        tablas.append(bytes(tabla))
+    return tablas
+
+
+def _tokens(evaluacion: dict) -> list:
+    meta = evaluacion.get("meta", {})
+    texto = f"{meta.get('nombre_iniciativa', '')} {meta.get('descripcion', '')}"
+    return sorted(set(tokenizar(texto)))
+
+
+class IndiceSimilitud:
+    """Índice en memoria: columnas de respuestas + índice invertido de tokens."""
+
+    def __init__(self):
+        self.letras = {}        # id → cadena de letras
+        self.tokens = {}        # id → frozenset de tokens
+        self.resumen = {}       # id → dict para mostrar
+        self._ids = []          # posición en columnas → id
+        self._columnas = [bytearray() for _ in _ORDEN_PREGUNTAS]
+        self._postings = {}     # token → [ids]
+
+    def __len__(self):
+        return len(self._ids)
+
+    def agregar(self, id_registro: int, letras: str, tokens: list, resumen: dict) -> None:
+        if id_registro in self.letras:
+            return
+        self.letras[id_registro] = letras
+        self.tokens[id_registro] = frozenset(tokens)
+        self.resumen[id_registro] = resumen
+        self._ids.append(id_registro)
+        for columna, letra in zip(self._columnas, letras):
+            codigo = _CODIGOS.get(letra, 0)
+            columna.append(codigo)
+            columna.append(codigo + _ALTO)
+        for token in tokens:
+            self._postings.setdefault(token, []).append(id_registro)
+
+    # ── Vecinos por respuestas ────────────────────────────────────────────────
+    def distancias(self, letras: str) -> bytes:
+        """
+        Distancias enteras (escala _ESCALA << _DESPLAZAMIENTO) de `letras` a cada
+        registro, en orden de inserción, como bytes little-endian de 16 bits.
+        """
+        total = 0
+        for columna, tabla in zip(self._columnas, _tablas_distancia(letras)):
+            total += int.from_bytes(columna.translate(tabla), "little")
+        return total.to_bytes(2 * len(self._ids), "little")
+
+    def vecinos_respuestas(self, letras: str, k: int, excluir=None) -> list:
+        """Top-k por distancia L1 ponderada. Retorna [(distancia, id)] ascendente."""
+        if not self._ids:
+            return []
+        crudo = self.distancias(letras)
+        distancias = array("H", crudo)
+        if sys.byteorder == "big":
+            distancias.byteswap()
+
+        # Menor byte alto que ya reúne k+1 registros (k más el excluido);
+        # solo esos registros compiten por el top-k.
+        altos = crudo[1::2]
+        acumulado = 0
+        for umbral in range(256):
+            acumulado += altos.count(umbral)
+            if acumulado > k:
+                break
+        patron = re.compile(b"[\\x00-" + re.escape(bytes([umbral])) + b"]")
+        candidatos = (
+            (distancias[m.start()], self._ids[m.start()]) for m in patron.finditer(altos)
+        )
+        mejores = heapq.nsmallest(k + 1, candidatos)
+        return [((d >> _DESPLAZAMIENTO) / _ESCALA, i) for d, i in mejores if i != excluir][:k]
+
+    # ── Vecinos por texto ─────────────────────────────────────────────────────
+    def _idf(self, token: str) -> float:
+        df = len(self._postings.get(token, ()))
+        return math.log(1 + len(self._ids) / df) if df else 0.0
+
+    def similitud_texto(self, tokens_consulta, id_registro: int) -> float:
+        tokens_doc = self.tokens.get(id_registro)
+        if not tokens_consulta or not tokens_doc:
+            return 0.0
+        comunes = sum(self._idf(t) ** 2 for t in tokens_consulta & tokens_doc)
+        if not comunes:
+            return 0.0
+        norma_q = math.sqrt(sum(self._idf(t) ** 2 for t in tokens_consulta))
+        norma_d = math.sqrt(sum(self._idf(t) ** 2 for t in tokens_doc))
+        return comunes / (norma_q * norma_d)
+
+    def vecinos_texto(self, tokens: frozenset, k: int, excluir=None) -> list:
+        """Top-k candidatos por coincidencia de tokens ponderada por IDF."""
+        limite_df = max(50, int(len(self._ids) * FRACCION_TOKEN_COMUN))
+        acumulado = {}
+        for token in tokens:
+            postings = self._postings.get(token)
+            if not postings or len(postings) > limite_df:
+                continue
+            peso = self._idf(token) ** 2
+            for id_reg in postings:
+                acumulado[id_reg] = acumulado.get(id_reg, 0.0) + peso
+        acumulado.pop(excluir, None)
+        return heapq.nlargest(k, acumulado, key=acumulado.get)
+
+    # ── Búsqueda combinada ────────────────────────────────────────────────────
+    def buscar(self, letras: str, tokens: list, k: int = 5, excluir=None) -> list:
+        if not self._ids:
+            return []
+        vector = _vector(letras)
+        tokens = frozenset(tokens)
+        n_candidatos = max(k * 10, 50)
+
+        candidatos = {i for _, i in self.vecinos_respuestas(letras, n_candidatos, excluir)}
+        candidatos.update(self.vecinos_texto(tokens, n_candidatos, excluir))
+
+        puntuados = []
+        for id_reg in candidatos:
+            sim_resp = 1.0 - sum(abs(a - b) for a, b in zip(vector, _vector(self.letras[id_reg])))
+            sim_texto = self.similitud_texto(tokens, id_reg)
+            total = PESO_RESPUESTAS * sim_resp + PESO_TEXTO * sim_texto
+            puntuados.append((total, sim_resp, sim_texto, id_reg))
+
+        puntuados.sort(key=lambda x: (-x[0], x[3]))
+        return [
+            dict(
+                self.resumen[id_reg],
+                id=id_reg,
+                similitud=round(total * 100, 1),
+                similitud_respuestas=round(sim_resp * 100, 1),
+                similitud_texto=round(sim_texto * 100, 1),
+            )
+            for total, sim_resp, sim_texto, id_reg in puntuados[:k]
+        ]
+
+
+# ─── Persistencia del índice ───────────────────────────────────────────────────
+_CACHE = {}     # ruta → [IndiceSimilitud, bytes leídos, línea de generación]
+_LOCK = threading.Lock()
+_CABECERA = b'{"generacion": '      # comienzo de la primera línea del archivo
+
+
+def _cabecera() -> str:
+    return json.dumps({"generacion": os.urandom(8).hex()}) + "\n"
+
+
+def _entrada(evaluacion: dict, id_registro: int) -> dict:
+    meta = evaluacion.get("meta", {})
+    return {
+        "id": id_registro,
+        "letras": letras_respuestas(evaluacion),
+        "tokens": _tokens(evaluacion),
+        "resumen": {
+            "nombre_iniciativa": meta.get("nombre_iniciativa", "—"),
+            "equipo": meta.get("equipo", "—"),
+            "fecha": meta.get("fecha", ""),
+            "puntaje_global": evaluacion.get("resultados", {}).get("puntaje_global", 0),
+            "nivel": evaluacion.get("veredicto", {}).get("nivel", "—"),
+        },
+    }
+
+
+def _sincronizar(ruta: str) -> IndiceSimilitud:
+    """
+    Pone al día el índice en memoria con las líneas agregadas desde la última
+    lectura, o lo carga entero si el archivo es de otra generación. Retorna
+    None si el archivo no tiene generación (de una versión anterior).
+    """
+    with open(ruta, "rb") as f:
+        generacion = f.readline()
+        if not generacion.startswith(_CABECERA):
+            return None
+        entrada = _CACHE.get(ruta)
+        if entrada is None or entrada[2] != generacion:
+            entrada = _CACHE[ruta] = [IndiceSimilitud(), f.tell(), generacion]
+        f.seek(entrada[1])
+        for linea in f:
+            if not linea.endswith(b"\n"):
+                break   # línea incompleta: se leerá en la próxima carga
+            entrada[1] += len(linea)
+            e = json.loads(linea)
+            entrada[0].agregar(e["id"], e["letras"], e["tokens"], e["resumen"])
+    return entrada[0]
+
+
+def cargar_indice_similitud(base_dir: str) -> IndiceSimilitud:
+    """Retorna el índice en memoria, leyendo solo lo agregado desde la última carga."""
+    ruta = os.path.join(base_dir, ARCHIVO_INDICE_SIMILITUD)
+    with _LOCK:
+        indice = _sincronizar(ruta) if os.path.exists(ruta) else None
+        if indice is None:
+            _reconstruir(base_dir, ruta)
+            indice = _sincronizar(ruta)
+        return indice
+
+
+def indexar_similitud_lote(registros: list, base_dir: str) -> None:
+    """
+    Agrega [(id, evaluación)] recién guardadas al índice existente (en disco y
+    en memoria), con una sola escritura.
+    """
+    ruta = os.path.join(base_dir, ARCHIVO_INDICE_SIMILITUD)
+    lineas = "".join(
+        json.dumps(_entrada(evaluacion, id_registro), ensure_ascii=False) + "\n"
+        for id_registro, evaluacion in registros
+    )
+    with _LOCK:
+        with open(ruta, "a", encoding="utf-8") as f:
+            f.write(lineas)
+        if ruta in _CACHE:
+            _sincronizar(ruta)
+
+
+def _reconstruir(base_dir: str, ruta: str) -> None:
+    from .persistencia import iterar_historial
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(_cabecera())
+        for i, ev in iterar_historial(base_dir):
+            f.write(json.dumps(_entrada(ev, i), ensure_ascii=False) + "\n")
+    os.replace(temporal, ruta)
+    _CACHE.pop(ruta, None)
+
+
+def buscar_similares(evaluacion: dict, base_dir: str, k: int = 5, excluir_id: int = None) -> list:
+    """
+    Retorna las k iniciativas del historial más parecidas a `evaluacion`.
+
+    Cada elemento trae nombre_iniciativa, equipo, fecha, puntaje_global, nivel,
+    id y los porcentajes de similitud (combinada, de respuestas y de texto).
+    """
+    indice = cargar_indice_similitud(base_dir)
+    return indice.buscar(letras_respuestas(evaluacion), _tokens(evaluacion), k=k, excluir=excluir_id)
@@ -0,0 +1,39 @@
+"""
+Normalización y tokenización de texto en español para los índices de búsqueda.
+
+Insensible a mayúsculas y tildes: "Evaluación" y "evaluacion" producen el
+mismo token.
+"""
+
+import re
+import unicodedata
+
+
+_PATRON_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes como con contra cual cuando de del
+desde donde durante e el ella ellas ello ellos en entre era es esa esas ese eso esos esta
+estan estas este esto estos fue ha hay la las le les lo los mas me mi mis mucho muy ni no
+nos o os otra otro para pero poco por porque que quien se ser si sin sobre son su sus
+tambien tan te tiene tu tus un una uno unos y ya
+""".split())
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes ni diacríticos (la ñ se conserva como n)."""
+    if texto.isascii():
+        return texto.lower()
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    # Se consulta cada carácter distinto una sola vez (los textos indexados
+    # son largos y repiten pocas tildes)
+    marcas = {ord(c): None for c in set(descompuesto) if unicodedata.combining(c)}
+    return descompuesto.translate(marcas) if marcas else descompuesto
+
+
+def tokenizar(texto: str) -> list:
+    """Tokens normalizados de al menos 2 caracteres, sin stopwords."""
+    return [
+        t for t in _PATRON_TOKEN.findall(normalizar(texto))
+        if len(t) > 1 and t not in STOPWORDS
+    ]
@@ -0,0 +1,635 @@
+"""
+Cola persistente de trabajos largos sobre el historial: importar un archivo,
+exportar los reportes, re-puntuar el historial y reconstruir los índices.
+
+Los trabajos se encolan en data/trabajos.db (SQLite) y los ejecuta un
+trabajador (`python main.py --jobs trabajar`), varios a la vez en hilos hasta
+un tope. Los que escriben el historial (importar y reindexar) corren solos y
+respetan el orden de la cola: una exportación encolada después de una
+importación ve el historial ya importado. Vale también entre trabajadores.
+
+    pendiente → en_curso → terminado | fallido | cancelado
+
+Cada trabajo avanza por bloques de `TAMANO_BLOQUE` filas o evaluaciones, y
+después de cada bloque guarda en la base su avance y un punto de control. El
+trabajador anota un latido en los trabajos que tiene en curso. Un trabajo en
+curso sin latido hace `LATIDO_VENCIDO` segundos, o cuyo proceso ya no existe
+en esta máquina, vuelve a pendiente. El próximo trabajador lo retoma desde el
+último bloque completo. El bloque cortado pudo quedar guardado sin que se
+registrara su avance: al retomar una importación, las filas de ese bloque que
+ya están en el historial después del punto de control no se guardan de nuevo.
+
+Cancelar un trabajo en curso lo detiene al terminar el bloque actual. Uno
+fallido o cancelado se puede reanudar desde su punto de control.
+"""
+
+import csv
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import closing
+from datetime import datetime
+from itertools import islice
+
+from core.evaluador import ALTERNATIVAS, calcular_puntaje, generar_veredicto, motor_reglas
+from core.preguntas import PUNTOS
+from core.reglas import compilar_reglas
+
+
+ARCHIVO_TRABAJOS = "data/trabajos.db"
+TAMANO_BLOQUE = 200
+PARALELO = 2                    # trabajos a la vez por trabajador
+INTERVALO_SONDEO = 0.5          # segundos entre revisiones de la cola
+LATIDO_VENCIDO = 60.0           # segundos sin latido tras los que se retoma un trabajo en curso
+ERRORES_GUARDADOS = 20          # errores de fila que se conservan en el resumen de una importación
+TIPOS = ("importar", "exportar", "repuntuar", "reindexar")
+EXCLUSIVOS = ("importar", "reindexar")      # escriben el historial: corren solos
+FORMATOS_EXPORTAR = ("md", "html", "pdf")
+
+_ESQUEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS trabajos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    hecho INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    punto TEXT NOT NULL DEFAULT '{}',
+    resumen TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    cancelar INTEGER NOT NULL DEFAULT 0,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    trabajador TEXT,
+    latido REAL,
+    creado TEXT NOT NULL,
+    terminado TEXT
+);
+CREATE INDEX IF NOT EXISTS trabajos_estado ON trabajos (estado);
+"""
+
+
+def _conectar(base_dir: str) -> sqlite3.Connection:
+    ruta = os.path.join(base_dir, ARCHIVO_TRABAJOS)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    conexion = sqlite3.connect(ruta, timeout=30)
+    conexion.row_factory = sqlite3.Row
+    conexion.executescript(_ESQUEMA)
+    return conexion
+
+
+def _ahora() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _trabajo(fila: sqlite3.Row) -> dict:
+    trabajo = dict(fila)
+    for columna in ("parametros", "punto", "resumen"):
+        trabajo[columna] = json.loads(trabajo[columna])
+    return trabajo
+
+
+# ─── Cola ──────────────────────────────────────────────────────────────────────
+def encolar_trabajo(base_dir: str, tipo: str, parametros: dict = None) -> int:
+    """
+    Agrega un trabajo pendiente a la cola.
+
+    Args:
+        tipo: "importar" ({ruta, mapa, omitir_duplicados, reglas}),
+              "exportar" ({formato}), "repuntuar" ({reglas}) o "reindexar"
+        parametros: `reglas` es la lista de reglas (core.reglas.cargar_reglas)
+
+    Returns:
+        int: id del trabajo
+
+    Raises:
+        ValueError: tipo o parámetros inválidos (el archivo a importar no
+                    existe o sus columnas no cubren el cuestionario, formato
+                    o reglas inválidos)
+    """
+    from .importador import encabezados_archivo, resolver_columnas
+
+    parametros = dict(parametros or {})
+    if tipo not in TIPOS:
+        raise ValueError(f"tipo de trabajo desconocido: {tipo!r} (usa {', '.join(TIPOS)})")
+    if tipo == "importar":
+        if not parametros.get("ruta") or not os.path.isfile(parametros["ruta"]):
+            raise ValueError(f"no existe el archivo a importar: {parametros.get('ruta')!r}")
+        parametros["ruta"] = os.path.abspath(parametros["ruta"])
+        resolver_columnas(encabezados_archivo(parametros["ruta"]), parametros.get("mapa"))
+    if tipo == "exportar":
+        parametros.setdefault("formato", "md")
+        if parametros["formato"] not in FORMATOS_EXPORTAR:
+            raise ValueError(f"formato inválido: {parametros['formato']!r} (usa {', '.join(FORMATOS_EXPORTAR)})")
+    if parametros.get("reglas"):
+        compilar_reglas(parametros["reglas"], ALTERNATIVAS)
+
+    with closing(_conectar(base_dir)) as conexion:
+        with conexion:
+            cursor = conexion.execute(
+                "INSERT INTO trabajos (tipo, parametros, creado) VALUES (?, ?, ?)",
+                (tipo, json.dumps(parametros, ensure_ascii=False), _ahora()),
+            )
+    return cursor.lastrowid
+
+
+def listar_trabajos(base_dir: str) -> list:
+    """Todos los trabajos de la cola, del más antiguo al más nuevo."""
+    with closing(_conectar(base_dir)) as conexion:
+        return [_trabajo(fila) for fila in conexion.execute("SELECT * FROM trabajos ORDER BY id")]
+
+
+def obtener_trabajo(base_dir: str, trabajo_id: int) -> dict:
+    """El trabajo #trabajo_id, o None si no existe."""
+    with closing(_conectar(base_dir)) as conexion:
+        fila = conexion.execute("SELECT * FROM trabajos WHERE id = ?", (trabajo_id,)).fetchone()
+    return _trabajo(fila) if fila else None
+
+
+def cancelar_trabajo(base_dir: str, trabajo_id: int) -> str:
+    """
+    Cancela un trabajo pendiente; uno en curso se detiene al terminar su
+    bloque actual.
+
+    Returns:
+        str: "cancelado", "cancelando" (en curso) o el estado en que ya
+             estaba si terminó; None si no existe
+    """
+    with closing(_conectar(base_dir)) as conexion:
+        with conexion:
+            fila = conexion.execute("SELECT estado FROM trabajos WHERE id = ?", (trabajo_id,)).fetchone()
+            if fila is None:
+                return None
+            if fila["estado"] == "pendiente":
+                conexion.execute(
+                    "UPDATE trabajos SET estado = 'cancelado', terminado = ? WHERE id = ?", (_ahora(), trabajo_id)
+                )
+                return "cancelado"
+            if fila["estado"] == "en_curso":
+                conexion.execute("UPDATE trabajos SET cancelar = 1 WHERE id = ?", (trabajo_id,))
+                return "cancelando"
+            return fila["estado"]
+
+
+def reanudar_trabajo(base_dir: str, trabajo_id: int) -> bool:
+    """Vuelve a pendiente un trabajo fallido o cancelado; sigue desde su punto de control."""
+    with closing(_conectar(base_dir)) as conexion:
+        with conexion:
+            cursor = conexion.execute(
+                "UPDATE trabajos SET estado = 'pendiente', cancelar = 0, error = NULL, terminado = NULL, "
+                "intentos = intentos + 1 WHERE id = ? AND estado IN ('fallido', 'cancelado')",
+                (trabajo_id,),
+            )
+    return cursor.rowcount == 1
+
+
+# ─── Tipos de trabajo ──────────────────────────────────────────────────────────
+# Cada uno es un generador que recibe el avance guardado ({hecho, total,
+# punto, resumen, retomado}), lo actualiza y cede después de cada bloque.
+def _motor(parametros: dict):
+    return compilar_reglas(parametros["reglas"], ALTERNATIVAS) if parametros.get("reglas") else motor_reglas()
+
+
+def _total_historial(base_dir: str) -> int:
+    """Evaluaciones vigentes, contando el CSV de resumen en lugar de leer todo el historial."""
+    from .persistencia import ARCHIVO_CSV
+
+    try:
+        with open(os.path.join(base_dir, ARCHIVO_CSV), newline="", encoding="utf-8") as f:
+            return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _ultimo_id(base_dir: str) -> int:
+    from .persistencia import pagina_historial
+
+    return pagina_historial(base_dir, 1, 1)[0]
+
+
+def _bloques_historial(base_dir: str, avance: dict):
+    """Bloques de [(id, evaluación)] posteriores al último id del punto de control."""
+    from .persistencia import iterar_historial
+
+    ultimo = avance["punto"].get("ultimo_id", 0)
+    registros = ((i, ev) for i, ev in iterar_historial(base_dir) if i > ultimo)
+    while True:
+        bloque = list(islice(registros, TAMANO_BLOQUE))
+        if not bloque:
+            return
+        yield bloque
+
+
+def _clave_fila(evaluacion: dict) -> str:
+    meta = evaluacion["meta"]
+    return json.dumps(
+        [meta.get("nombre_iniciativa"), meta.get("equipo"), meta.get("responsable"), evaluacion["respuestas"]],
+        ensure_ascii=False, sort_keys=True,
+    )
+
+
+def _ya_guardadas(base_dir: str, ultimo_id: int) -> Counter:
+    """Filas guardadas después del id `ultimo_id` (las de un bloque cortado, si se guardó)."""
+    from .persistencia import iterar_historial
+
+    return Counter(_clave_fila(ev) for i, ev in iterar_historial(base_dir) if i > ultimo_id)
+
+
+def _importar(base_dir: str, parametros: dict, avance: dict):
+    from .importador import ErrorFila, encabezados_archivo, leer_filas, puntuar_lote, resolver_columnas, validar_fila
+    from .persistencia import guardar_evaluaciones
+
+    ruta = parametros["ruta"]
+    columnas = resolver_columnas(encabezados_archivo(ruta), parametros.get("mapa"))
+    motor = _motor(parametros)
+    if avance["total"] is None:
+        avance["total"] = sum(1 for _ in leer_filas(ruta))
+    resumen = avance["resumen"]
+    for clave in ("importadas", "duplicadas", "omitidas", "errores"):
+        resumen.setdefault(clave, 0)
+    resumen.setdefault("detalle_errores", [])
+    # Último id del historial al cerrar el bloque anterior
+    punto = avance["punto"]
+    guardadas = Counter()
+    if "ultimo_id" not in punto:
+        punto["ultimo_id"] = _ultimo_id(base_dir)
+        yield       # el punto de partida queda guardado antes del primer bloque
+    elif avance["retomado"]:
+        guardadas = _ya_guardadas(base_dir, punto["ultimo_id"])
+
+    filas = islice(leer_filas(ruta), avance["hecho"], None)
+    while True:
+        bloque = list(islice(filas, TAMANO_BLOQUE))
+        if not bloque:
+            return
+        lote = []
+        for numero, fila in bloque:
+            try:
+                lote.append(validar_fila(fila, columnas, numero))
+            except ErrorFila as error:
+                resumen["errores"] += 1
+                if len(resumen["detalle_errores"]) < ERRORES_GUARDADOS:
+                    resumen["detalle_errores"].append(str(error))
+        evaluaciones = puntuar_lote(lote, motor)
+        if guardadas:
+            pendientes = []
+            for evaluacion in evaluaciones:
+                clave = _clave_fila(evaluacion)
+                if guardadas[clave] > 0:
+                    guardadas[clave] -= 1
+                    resumen["importadas"] += 1
+                else:
+                    pendientes.append(evaluacion)
+            evaluaciones, guardadas = pendientes, Counter()
+        ids = guardar_evaluaciones(evaluaciones, base_dir, parametros.get("omitir_duplicados", False))
+        for id_registro, evaluacion in zip(ids, evaluaciones):
+            if id_registro is None:
+                resumen["omitidas"] += 1
+                continue
+            resumen["importadas"] += 1
+            if "duplicado_de" in evaluacion["meta"]:
+                resumen["duplicadas"] += 1
+        punto["ultimo_id"] = max((i for i in ids if i is not None), default=punto["ultimo_id"])
+        avance["hecho"] += len(bloque)
+        yield
+
+
+def _exportar(base_dir: str, parametros: dict, avance: dict):
+    from .cache_reportes import sincronizar_cache
+    from .reporte import exportar_reporte_evaluacion
+
+    directorio = os.path.join(base_dir, "reports")
+    if avance["total"] is None:
+        avance["total"] = _total_historial(base_dir)
+    resumen = avance["resumen"]
+    resumen.setdefault("generados", 0)
+    resumen.setdefault("reutilizados", 0)
+    for bloque in _bloques_historial(base_dir, avance):
+        for _, evaluacion in bloque:
+            if exportar_reporte_evaluacion(evaluacion, directorio, parametros["formato"]):
+                resumen["reutilizados"] += 1
+            else:
+                resumen["generados"] += 1
+        sincronizar_cache()
+        avance["punto"]["ultimo_id"] = bloque[-1][0]
+        avance["hecho"] += len(bloque)
+        yield
+
+
+ENCABEZADOS_REPUNTUACION = [
+    "id", "fecha", "equipo", "iniciativa", "puntaje_anterior", "puntaje_nuevo",
+    "veredicto_anterior", "veredicto_nuevo", "alertas_anteriores", "alertas_nuevas",
+]
+
+
+def _repuntuar(base_dir: str, parametros: dict, avance: dict):
+    """
+    Vuelve a puntuar cada evaluación con el cuestionario y las reglas
+    vigentes y deja la comparación en reports/repuntuacion_<id>.csv; el
+    historial no se modifica.
+    """
+    motor = _motor(parametros)
+    if avance["total"] is None:
+        avance["total"] = _total_historial(base_dir)
+    resumen = avance["resumen"]
+    resumen.setdefault("revisadas", 0)
+    resumen.setdefault("cambios_veredicto", 0)
+    ruta = resumen.setdefault(
+        "archivo", os.path.join(base_dir, "reports", f"repuntuacion_{avance['id']}.csv")
+    )
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    # Lo escrito después del último punto de control se descarta
+    with open(ruta, "a+b") as f:
+        f.truncate(avance["punto"].get("bytes", 0))
+
+    for bloque in _bloques_historial(base_dir, avance):
+        with open(ruta, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ENCABEZADOS_REPUNTUACION)
+            if f.tell() == 0:
+                writer.writeheader()
+            for id_registro, evaluacion in bloque:
+                respuestas = {
+                    pid: (letra, PUNTOS[pid].get(letra, puntaje))
+                    for pid, (letra, puntaje) in evaluacion["respuestas"].items() if pid in PUNTOS
+                }
+                resultados = calcular_puntaje(respuestas, registrar_metricas=False)
+                veredicto = generar_veredicto(
+                    resultados["puntaje_global"], resultados["categorias"], registrar_metricas=False, motor=motor
+                )
+                anterior = evaluacion["veredicto"]
+                if veredicto["nivel"] != anterior["nivel"]:
+                    resumen["cambios_veredicto"] += 1
+                writer.writerow({
+                    "id": id_registro,
+                    "fecha": evaluacion["meta"].get("fecha", ""),
+                    "equipo": evaluacion["meta"].get("equipo", ""),
+                    "iniciativa": evaluacion["meta"].get("nombre_iniciativa", ""),
+                    "puntaje_anterior": evaluacion["resultados"]["puntaje_global"],
+                    "puntaje_nuevo": resultados["puntaje_global"],
+                    "veredicto_anterior": anterior["nivel"],
+                    "veredicto_nuevo": veredicto["nivel"],
+                    "alertas_anteriores": len(anterior.get("alertas", [])),
+                    "alertas_nuevas": len(veredicto.get("alertas", [])),
+                })
+            f.flush()
+            os.fsync(f.fileno())
+            avance["punto"]["bytes"] = f.tell()
+        resumen["revisadas"] += len(bloque)
+        avance["punto"]["ultimo_id"] = bloque[-1][0]
+        avance["hecho"] += len(bloque)
+        yield
+
+
+def _reindexar(base_dir: str, parametros: dict, avance: dict):
+    from .persistencia import reconstruir_indices
+
+    avance["total"] = 1
+    reconstruir_indices(base_dir)
+    avance["hecho"] = 1
+    yield
+
+
+_EJECUTORES = {"importar": _importar, "exportar": _exportar, "repuntuar": _repuntuar, "reindexar": _reindexar}
+
+
+# ─── Trabajador ────────────────────────────────────────────────────────────────
+def _proceso_vivo(pid: int) -> bool:
+    if os.name != "posix":
+        return True         # sin una forma segura de saberlo, solo cuenta el latido
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Trabajador:
+    """
+    Ejecuta los trabajos pendientes, hasta `paralelo` a la vez, cada uno en su
+    hilo. Sin `seguir` termina cuando no quedan pendientes ni en curso.
+
+    `al_avanzar(evento, trabajo)` se llama con "inicio", "bloque" y "fin" (el
+    trabajo es un dict como los de `listar_trabajos`).
+    """
+
+    def __init__(self, base_dir: str, paralelo: int = PARALELO, seguir: bool = False, al_avanzar=None):
+        self.base_dir = base_dir
+        self.paralelo = max(1, paralelo)
+        self.seguir = seguir
+        self.al_avanzar = al_avanzar
+        self.nombre = f"{socket.gethostname()}:{os.getpid()}"
+        self._hilos = {}                    # id del trabajo → hilo
+        self._detener = threading.Event()
+
+    def detener(self) -> None:
+        """Los trabajos en curso terminan su bloque y vuelven a pendiente."""
+        self._detener.set()
+
+    def correr(self) -> list:
+        """
+        Atiende la cola hasta que no queden trabajos (o hasta `detener`).
+
+        Returns:
+            list con los ids de los trabajos que tomó
+        """
+        tomados = []
+        try:
+            while not self._detener.is_set():
+                self._retomar_abandonados()
+                self._latir()
+                for trabajo_id in [i for i, hilo in self._hilos.items() if not hilo.is_alive()]:
+                    del self._hilos[trabajo_id]
+                while len(self._hilos) < self.paralelo:
+                    trabajo = self._tomar()
+                    if trabajo is None:
+                        break
+                    hilo = threading.Thread(target=self._ejecutar, args=(trabajo,), name=f"trabajo-{trabajo['id']}")
+                    self._hilos[trabajo["id"]] = hilo
+                    tomados.append(trabajo["id"])
+                    hilo.start()
+                if not self._hilos and not self.seguir and not self._quedan_trabajos():
+                    break
+                self._detener.wait(INTERVALO_SONDEO)
+        finally:
+            self._detener.set()
+            for hilo in list(self._hilos.values()):
+                hilo.join()
+        return tomados
+
+    # ── Cola compartida ────────────────────────────────────────────────────────
+    def _tomar(self) -> dict:
+        """
+        Marca como en curso el primer trabajo pendiente que puede correr ya.
+
+        Los que escriben el historial hacen de barrera en el orden de la cola:
+        corren solos y ninguno de los encolados después empieza antes de que
+        terminen.
+        """
+        with closing(_conectar(self.base_dir)) as conexion:
+            conexion.isolation_level = None
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                filas = conexion.execute(
+                    "SELECT * FROM trabajos WHERE estado IN ('pendiente', 'en_curso') ORDER BY id"
+                ).fetchall()
+                hay_en_curso = any(fila["estado"] == "en_curso" for fila in filas)
+                elegido = None
+                for fila in filas:
+                    exclusivo = fila["tipo"] in EXCLUSIVOS
+                    if fila["estado"] == "en_curso":
+                        if exclusivo:
+                            break
+                        continue
+                    if not exclusivo or not hay_en_curso:
+                        elegido = fila
+                    break
+                if elegido is not None:
+                    conexion.execute(
+                        "UPDATE trabajos SET estado = 'en_curso', trabajador = ?, latido = ? WHERE id = ?",
+                        (self.nombre, time.time(), elegido["id"]),
+                    )
+                conexion.execute("COMMIT")
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+        return _trabajo(elegido) if elegido else None
+
+    def _quedan_trabajos(self) -> bool:
+        with closing(_conectar(self.base_dir)) as conexion:
+            return conexion.execute(
+                "SELECT 1 FROM trabajos WHERE estado IN ('pendiente', 'en_curso') LIMIT 1"
+            ).fetchone() is not None
+
+    def _latir(self) -> None:
+        with closing(_conectar(self.base_dir)) as conexion:
+            with conexion:
+                conexion.execute(
+                    "UPDATE trabajos SET latido = ? WHERE trabajador = ? AND estado = 'en_curso'",
+                    (time.time(), self.nombre),
+                )
+
+    def _retomar_abandonados(self) -> None:
+        """Devuelve a pendiente (o cancela, si se pidió) los trabajos de trabajadores caídos."""
+        vencido = time.time() - LATIDO_VENCIDO
+        host = socket.gethostname()
+        with closing(_conectar(self.base_dir)) as conexion:
+            with conexion:
+                for fila in conexion.execute(
+                    "SELECT id, trabajador, latido FROM trabajos WHERE estado = 'en_curso'"
+                ).fetchall():
+                    if fila["trabajador"] == self.nombre:
+                        continue
+                    equipo, _, pid = (fila["trabajador"] or "").rpartition(":")
+                    caido = equipo == host and pid.isdigit() and not _proceso_vivo(int(pid))
+                    if not caido and (fila["latido"] or 0) >= vencido:
+                        continue
+                    conexion.execute(
+                        "UPDATE trabajos SET estado = CASE WHEN cancelar THEN 'cancelado' ELSE 'pendiente' END, "
+                        "intentos = intentos + 1, trabajador = NULL WHERE id = ? AND trabajador IS ?",
+                        (fila["id"], fila["trabajador"]),
+                    )
+
+    def _guardar_avance(self, trabajo_id: int, avance: dict) -> bool:
+        """Guarda el punto de control; retorna True si se pidió cancelar el trabajo."""
+        with closing(_conectar(self.base_dir)) as conexion:
+            with conexion:
+                conexion.execute(
+                    "UPDATE trabajos SET hecho = ?, total = ?, punto = ?, resumen = ?, latido = ? WHERE id = ?",
+                    (avance["hecho"], avance["total"], json.dumps(avance["punto"]),
+                     json.dumps(avance["resumen"], ensure_ascii=False), time.time(), trabajo_id),
+                )
+                fila = conexion.execute("SELECT cancelar FROM trabajos WHERE id = ?", (trabajo_id,)).fetchone()
+        return bool(fila["cancelar"])
+
+    def _cerrar(self, trabajo_id: int, estado: str, error: str = None) -> None:
+        terminado = None if estado == "pendiente" else _ahora()
+        with closing(_conectar(self.base_dir)) as conexion:
+            with conexion:
+                conexion.execute(
+                    "UPDATE trabajos SET estado = ?, error = ?, terminado = ?, trabajador = NULL WHERE id = ?",
+                    (estado, error, terminado, trabajo_id),
+                )
+
+    # ── Ejecución ──────────────────────────────────────────────────────────────
+    def _avisar(self, evento: str, trabajo_id: int) -> None:
+        if self.al_avanzar is None:
+            return
+        try:
+            self.al_avanzar(evento, obtener_trabajo(self.base_dir, trabajo_id))
+        except OSError:
+            pass        # p. ej. la consola se cerró: el trabajo sigue igual
+
+    def _ejecutar(self, trabajo: dict) -> None:
+        trabajo_id = trabajo["id"]
+        avance = {
+            "id": trabajo_id, "hecho": trabajo["hecho"], "total": trabajo["total"],
+            "punto": trabajo["punto"], "resumen": trabajo["resumen"], "retomado": trabajo["intentos"] > 0,
+        }
+        self._avisar("inicio", trabajo_id)
+        try:
+            for _ in _EJECUTORES[trabajo["tipo"]](self.base_dir, trabajo["parametros"], avance):
+                if self._guardar_avance(trabajo_id, avance):
+                    self._cerrar(trabajo_id, "cancelado")
+                    break
+                if self._detener.is_set():
+                    self._cerrar(trabajo_id, "pendiente")
+                    break
+                self._avisar("bloque", trabajo_id)
+            else:
+                avance["total"] = avance["hecho"]
+                self._guardar_avance(trabajo_id, avance)
+                self._cerrar(trabajo_id, "terminado")
+        except Exception as e:
+            self._cerrar(trabajo_id, "fallido", f"{type(e).__name__}: {e}")
+        self._avisar("fin", trabajo_id)
+
+
+# ─── Consola ───────────────────────────────────────────────────────────────────
+def describir_avance(trabajo: dict) -> str:
+    """"1.200/5.000 (24%)" o "1.200" si todavía no se conoce el total."""
+    if not trabajo["total"]:
+        return f"{trabajo['hecho']:,}".replace(",", ".")
+    porcentaje = trabajo["hecho"] / trabajo["total"] * 100
+    return f"{trabajo['hecho']:,}/{trabajo['total']:,} ({porcentaje:.0f}%)".replace(",", ".")
+
+
+def describir_trabajo(trabajo: dict) -> str:
+    """Qué hace el trabajo y, si terminó, su resultado, en una línea."""
+    parametros, resumen = trabajo["parametros"], trabajo["resumen"]
+    if trabajo["estado"] == "fallido":
+        return trabajo["error"] or ""
+    if trabajo["tipo"] == "importar":
+        detalle = os.path.basename(parametros["ruta"])
+        if resumen:
+            detalle += f": {resumen['importadas']} importadas, {resumen['errores']} con errores"
+        return detalle
+    if trabajo["tipo"] == "exportar":
+        detalle = parametros["formato"]
+        if resumen:
+            detalle += f": {resumen['generados']} generados, {resumen['reutilizados']} reutilizados"
+        return detalle
+    if trabajo["tipo"] == "repuntuar" and resumen:
+        return f"{resumen['cambios_veredicto']} cambios de veredicto → {os.path.basename(resumen['archivo'])}"
+    return ""
+
+
+def mostrar_trabajos(base_dir: str) -> None:
+    """Muestra en consola la cola de trabajos y su avance."""
+    trabajos = listar_trabajos(base_dir)
+    if not trabajos:
+        print("\n  No hay trabajos en la cola. Encola uno con: python main.py --jobs encolar TIPO\n")
+        return
+    print(f"\n  {'─'*78}")
+    print(f"  {'#':<5} {'Tipo':<10} {'Estado':<11} {'Avance':<20} {'Creado':<17} Detalle")
+    print(f"  {'─'*78}")
+    for t in trabajos:
+        estado = "cancelando" if t["estado"] == "en_curso" and t["cancelar"] else t["estado"]
+        print(f"  {t['id']:<5} {t['tipo']:<10} {estado:<11} {describir_avance(t):<20} "
+              f"{t['creado'][:16].replace('T', ' '):<17} {describir_trabajo(t)[:40]}")
+    print(f"  {'─'*78}\n")